@@ -3,12 +3,38 @@ using Cargohub.models;
 using Cargohub.services;
 using Cargohub.Services;
 
+// "snapshot <json|binary> <files>" converts collection files and exits, see SnapshotConverter;
+// "serializer-benchmark" compares the record serializers on the data files.
+if (args.Length > 0 && args[0] == SnapshotConverter.Command)
+{
+    return SnapshotConverter.Run(args[1..], Console.Out);
+}
+if (args.Length > 0 && args[0] == SerializerBenchmark.Command)
+{
+    return SerializerBenchmark.Run(args[1..], Console.Out);
+}
+
 var builder = WebApplication.CreateBuilder(args);
 
+// Format of collection files created from now on (--SnapshotFormat=Binary); existing files
+// keep theirs until converted.
+JsonFileStore.DefaultFormat = builder.Configuration.GetValue("SnapshotFormat", SnapshotFormat.Json);
+
+// --RecordSerializer=newtonsoft goes back to the reflection-based serializer for the data files.
+if (builder.Configuration["RecordSerializer"] == NewtonsoftRecordSerializer.Instance.Name)
+{
+    JsonFileStore.Serializer = NewtonsoftRecordSerializer.Instance;
+}
+
 builder.Services.AddControllers(options =>
 {
     options.Filters.Add<AdminOnly>();
     options.Filters.Add<CustomForbidResultFilter>();
+    options.Filters.Add<ResponseTimingFilter>();
+}).AddJsonOptions(options =>
+{
+    // Responses use the compile-time metadata of the record types instead of reflection.
+    options.JsonSerializerOptions.TypeInfoResolverChain.Insert(0, RecordJsonContext.Default);
 });
 
 
@@ -20,15 +46,21 @@ builder.Services.AddSingleton<ItemService, ItemService>();
 builder.Services.AddSingleton<ICrudService<ItemLine, int>, ItemLineService>();
 builder.Services.AddSingleton<ItemLineService>();
 builder.Services.AddSingleton<ICrudService<ItemType, int>, ItemTypeService>();
+builder.Services.AddSingleton<ItemTypeService>();
 builder.Services.AddSingleton<ICrudService<Transfer, int>, TransferService>();
+builder.Services.AddSingleton<TransferService>();
 builder.Services.AddSingleton<ICrudService<Order, int>, OrderService>();
 builder.Services.AddSingleton<ICrudService<Shipment, int>, ShipmentService>();
 builder.Services.AddSingleton<ICrudService<Supplier, int>, SupplierService>();
+builder.Services.AddSingleton<SupplierService>();
 builder.Services.AddSingleton<CrossDockingLogService>();
 builder.Services.AddSingleton<ICrudService<LogEntry, string>, StockLogService>();
 builder.Services.AddSingleton<ICrudService<ItemGroup, int>, ItemGroupService>();
+builder.Services.AddSingleton<ItemGroupService>();
 builder.Services.AddSingleton<ICrudService<Client, int>, ClientsService>();
+builder.Services.AddSingleton<ClientsService>();
 builder.Services.AddSingleton<ICrudService<Location, int>, LocationsService>();
+builder.Services.AddSingleton<LocationsService>();
 builder.Services.AddSingleton<ICrudService<Inventory, int>, InventoryService>();
 builder.Services.AddSingleton<ICrudService<Classifications, int>, ClassificationService>();
 builder.Services.AddSingleton<ICrudService<Item, string>, ItemService>();
@@ -38,6 +70,11 @@ builder.Services.AddSingleton<OrderService>();
 builder.Services.AddSingleton<CrossDockingService>();
 builder.Services.AddSingleton<ShipmentService>();
 builder.Services.AddSingleton<LogService>();
+builder.Services.AddSingleton<BulkImportService>();
+builder.Services.AddSingleton<ExpansionService>();
+builder.Services.AddSingleton<WarmupStatus>();
+builder.Services.AddHostedService<StartupWarmup>();
+builder.Services.AddHostedService<ArchivalService>();
 
 builder.Services.AddEndpointsApiExplorer();
 builder.Services.AddSwaggerGen(options =>
@@ -107,13 +144,15 @@ if (app.Environment.IsDevelopment())
     });
 }
 
+app.UseMiddleware<MetricsMiddleware>();
+app.UseMiddleware<ProfilingMiddleware>();
 
 app.UseAuthorization();
 app.Use(async (ctx, next) =>
 {
     var path = ctx.Request.Path.Value;
 
-    if (path.StartsWith("/swagger") || path.StartsWith("/index.html") || path.Contains("/swagger"))
+    if (path.StartsWith("/swagger") || path.StartsWith("/index.html") || path.Contains("/swagger") || path.StartsWith("/health"))
     {
         await next();
         return;
@@ -140,7 +179,28 @@ app.Use(async (ctx, next) =>
 
 
 app.UseRouting();
+app.UseMiddleware<CompressedResponseCacheMiddleware>();
+app.UseMiddleware<RequestCoalescingMiddleware>();
 app.MapControllers();
 
+// Prometheus text format by default, ?format=json for a readable summary.
+app.MapGet("/metrics", (HttpContext context) =>
+{
+    if (context.Request.Query["format"] == "json")
+    {
+        return Results.Json(Metrics.Snapshot());
+    }
+
+    var writer = new StringWriter();
+    Metrics.WritePrometheus(writer);
+    return Results.Text(writer.ToString(), "text/plain; version=0.0.4");
+});
+
+// Liveness only says the process is up; readiness waits for the startup warm-up.
+app.MapGet("/health/live", () => Results.Ok(new { Status = "alive" }));
+app.MapGet("/health/ready", (WarmupStatus warmup) =>
+    warmup.IsReady ? Results.Ok(warmup.Snapshot()) : Results.Json(warmup.Snapshot(), statusCode: StatusCodes.Status503ServiceUnavailable));
+
 app.Run("http://[::]:3000");
+return 0;
 
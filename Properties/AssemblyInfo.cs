@@ -0,0 +1,4 @@
+using System.Runtime.CompilerServices;
+
+// The unit tests exercise internal helpers such as the bulk import validators.
+[assembly: InternalsVisibleTo("unit_tests")]
@@ -28,8 +28,7 @@ namespace Cargohub.services
 
             if (File.Exists(filePath))
             {
-                var jsonData = File.ReadAllText(filePath);
-                _users = JsonConvert.DeserializeObject<List<User>>(jsonData) ?? new List<User>();
+                _users = JsonFileStore.Serializer.DeserializeList<User>(File.ReadAllBytes(filePath));
             }
             else
             {
@@ -68,8 +67,7 @@ namespace Cargohub.services
 
         private static void SaveUsers()
         {
-            var jsonData = JsonConvert.SerializeObject(_users, Formatting.Indented);
-            File.WriteAllText(filePath, jsonData);
+            File.WriteAllBytes(filePath, JsonFileStore.Serializer.SerializeList(_users));
         }
         public static void DeactivateUser(string performedBy, string apiKey)
         {
@@ -208,6 +206,7 @@ namespace Cargohub.services
 
         public static User GetUser(string apiKey)
         {
+            using var step = RequestProfiler.Step("auth", "GetUser");
             var user = _users.FirstOrDefault(x => x.ApiKey == apiKey);
             return user;
         }
@@ -263,6 +262,7 @@ namespace Cargohub.services
 
         public static bool HasAccess(User user, string path, string permission)
         {
+            using var step = RequestProfiler.Step("auth", "HasAccess");
 
             if (!user.IsActive)
             {
@@ -288,6 +288,7 @@ namespace Cargohub.services
 
         public static bool HasWarehouseAccess(string apiKey, int warehouseId)
         {
+            using var step = RequestProfiler.Step("auth", "HasWarehouseAccess");
             var user = GetUser(apiKey);
             if (user == null)
             {
@@ -296,6 +297,21 @@ namespace Cargohub.services
 
             return user.Warehouses.First() == -1 || user.Warehouses.Contains(warehouseId);
         }
+
+        /// <summary>
+        /// The warehouses the user's list queries are limited to, or null when the user may
+        /// see every warehouse.
+        /// </summary>
+        public static IReadOnlyCollection<int>? WarehouseScope(string apiKey)
+        {
+            var user = GetUser(apiKey);
+            if (user == null)
+            {
+                throw new KeyNotFoundException("User not found.");
+            }
+
+            return user.Warehouses.FirstOrDefault() == -1 ? null : user.Warehouses;
+        }
         public static void AddWarehouse(string performedBy, string apiKey, int warehouseId)
         {
             var user = GetUser(apiKey);
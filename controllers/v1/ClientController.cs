@@ -41,7 +41,7 @@ namespace Cargohub.controllers.v1
             try
             {
                 var client = _clientService.GetById(id);
-                var orders = _orderService.GetAll().FindAll( o => o.Ship_To == client.Id ||o.Bill_To == client.Id);
+                var orders = ((OrderService)_orderService).GetAll(includeArchived: true).FindAll( o => o.Ship_To == client.Id ||o.Bill_To == client.Id);
                 return Ok(orders);
             }
             catch(KeyNotFoundException e)
@@ -33,6 +33,7 @@ namespace Cargohub.controllers
         }
 
         [HttpGet]
+        [CompressedResponseCache<Inventory>("data/inventories.json")]
         public IActionResult GetInventories()
         {
             var inventories = _inventoryService.GetAll();
@@ -64,40 +65,18 @@ namespace Cargohub.controllers
             {
                 return BadRequest("Inventory data is null.");
             }
-            var classifications = _classificationsService.GetAll();
-            var hazardousClassification = classifications.First(c => c.Name == "hazardous");
             var item = _itemService.GetById(inventory.Item_Id);
             if (item == null)
             {
                 return BadRequest("Item not found");
             }
-            // item is hazardous
-            if (item.Classifications_Id.Contains(hazardousClassification.Id))
+
+            var storageError = ((WarehouseService)_warehouseService).StorageRules().Check(item, inventory.Locations);
+            if (storageError != null)
             {
-                foreach (var locationId in inventory.Locations.Keys)
-                {
-                    var isParsed = int.TryParse(locationId, out int parsedLocationId);
-                    if (!isParsed) {
-                        return BadRequest("Invalid locationId");
-                    }
-                    var location = _locationsService.GetById(parsedLocationId);
-                    if (location == null)
-                    {
-                        return BadRequest("Location not found");
-                    }
-                    var warehouse = _warehouseService.GetById(location.Warehouse_Id);
-                    if (warehouse == null)
-                    {
-                        return BadRequest("Warehouse not found");
-                    }
-                    if (!warehouse.Classifications_Id.Contains(hazardousClassification.Id))
-                    {
-                        return BadRequest("Warehouse is non-hazardous");
-                    }
-                }
+                return BadRequest(storageError);
             }
 
-
             await _inventoryService.Create(inventory);
             return CreatedAtAction(nameof(GetInventoryById), new { id = inventory.Id }, inventory);
         }
@@ -20,6 +20,7 @@ namespace Cargohub.Controllers.v1
         }
 
         [HttpGet]
+        [CompressedResponseCache<Item>("data/items.json")]
         public IActionResult GetItems()
         {
             var items = _itemService.GetAll();
@@ -21,9 +21,9 @@ namespace Cargohub.controllers.v1
         }
 
         [HttpGet]
-        public IActionResult GetOrders()
+        public IActionResult GetOrders([FromQuery(Name = "include_archived")] bool includeArchived = false)
         {
-            var orders = _orderService.GetAll();
+            var orders = ((OrderService)_orderService).GetAll(includeArchived);
             if (orders == null || !orders.Any())
             {
                 return NotFound();
@@ -110,7 +110,7 @@ namespace Cargohub.controllers.v1
         {
             try
             {
-                var targetOrder = _orderService.GetById(id);
+                var targetOrder = EntityCopy.Shallow(_orderService.GetById(id));
                 targetOrder.Items = orderBody.Items;
                 await _orderService.Update(targetOrder);
                 return NoContent();
@@ -4,6 +4,7 @@ using System.Linq;
 using System.Threading.Tasks;
 using Cargohub.interfaces;
 using Cargohub.models;
+using Cargohub.services;
 using Microsoft.AspNetCore.Mvc;
 
 namespace Cargohub.controllers
@@ -24,9 +25,9 @@ namespace Cargohub.controllers
         }
 
         [HttpGet]
-        public IActionResult GetShipments()
+        public IActionResult GetShipments([FromQuery(Name = "include_archived")] bool includeArchived = false)
         {
-            var shipments = _shipmentService.GetAll();
+            var shipments = ((ShipmentService)_shipmentService).GetAll(includeArchived);
             if (shipments == null || !shipments.Any())
             {
                 return NotFound();
@@ -113,7 +114,7 @@ namespace Cargohub.controllers
         {
             try
             {
-                var shipment = _shipmentService.GetById(id);
+                var shipment = EntityCopy.Shallow(_shipmentService.GetById(id));
                 shipment.Items = shipmentBody.Items;
                 await _shipmentService.Update(shipment);
                 return NoContent();
@@ -153,7 +154,7 @@ namespace Cargohub.controllers
                 if (order == null) return BadRequest("order is missing");
 
                 var targetOrder = _orderService.GetById(order.Id);
-                var targetShipment = _shipmentService.GetById(id);
+                var targetShipment = EntityCopy.Shallow(_shipmentService.GetById(id));
                 targetShipment.Order_Id = new List<int> { targetOrder.Id };
                 targetShipment.Order_Date = targetOrder.Order_Date;
                 await _shipmentService.Update(targetShipment);
@@ -21,6 +21,7 @@ namespace Cargohub.controllers.v1
         }
 
         [HttpGet]
+        [CompressedResponseCache<Supplier>("data/suppliers.json")]
         public IActionResult GetSuppliers()
         {
             var suppliers = _supplierService.GetAll();
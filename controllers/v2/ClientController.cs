@@ -16,10 +16,10 @@ namespace Cargohub.controllers.v2
     [ApiController]
     public class ClientsController : Controller
     {
-        private readonly ICrudService<Client, int> _clientService;
-        private readonly ICrudService<Order, int> _orderService;
+        private readonly ClientsService _clientService;
+        private readonly OrderService _orderService;
 
-        public ClientsController(ICrudService<Client, int> clientService, ICrudService<Order, int> orderService)
+        public ClientsController(ClientsService clientService, OrderService orderService)
         {
             _clientService = clientService;
             _orderService = orderService;
@@ -46,7 +46,7 @@ namespace Cargohub.controllers.v2
 
 
         [HttpGet]
-        public IActionResult GetClients([FromQuery] int? pageNumber = null, [FromQuery] int? pageSize = null)
+        public async Task<IActionResult> GetClients([FromQuery] int? pageNumber = null, [FromQuery] int? pageSize = null)
         {
             // TODO: chek/change "get" to correct permission
             var validationResult = ValidateApiKeyAndUser("all");
@@ -61,14 +61,14 @@ namespace Cargohub.controllers.v2
                 return BadRequest("Page number and page size must be greater than zero if provided.");
             }
 
-            var clients = _clientService.GetAll(pageNumber, pageSize);
+            var clients = await _clientService.GetAllAsync(pageNumber, pageSize, HttpContext.RequestAborted);
 
             if (clients == null || !clients.Any())
             {
                 return NotFound();
             }
 
-            var totalRecords = _clientService.GetAll(null, null).Count; // Total count without pagination
+            var totalRecords = (await _clientService.GetAllAsync(cancellationToken: HttpContext.RequestAborted)).Count; // Total count without pagination
 
             if (pageNumber.HasValue && pageSize.HasValue)
             {
@@ -94,8 +94,8 @@ namespace Cargohub.controllers.v2
 
             try
             {
-                var client = _clientService.GetById(id);
-                var orders = _orderService.GetAll().FindAll(o => o.Ship_To == client.Id || o.Bill_To == client.Id);
+                var client = await _clientService.GetByIdAsync(id, HttpContext.RequestAborted);
+                var orders = (await _orderService.GetAllAsync(includeArchived: true, cancellationToken: HttpContext.RequestAborted)).FindAll(o => o.Ship_To == client.Id || o.Bill_To == client.Id);
                 return Ok(orders);
             }
             catch (KeyNotFoundException e)
@@ -105,7 +105,7 @@ namespace Cargohub.controllers.v2
         }
 
         [HttpGet("{id}")]
-        public IActionResult GetClientById(int id)
+        public async Task<IActionResult> GetClientById(int id)
         {
 
             var validationResult = ValidateApiKeyAndUser("single");
@@ -116,7 +116,7 @@ namespace Cargohub.controllers.v2
 
             try
             {
-                var client = _clientService.GetById(id);
+                var client = await _clientService.GetByIdAsync(id, HttpContext.RequestAborted);
                 return Ok(client);
             }
             catch (KeyNotFoundException ex)
@@ -140,7 +140,7 @@ namespace Cargohub.controllers.v2
                 return BadRequest("Client data is null.");
             }
 
-            await _clientService.Create(client);
+            await _clientService.CreateAsync(client, HttpContext.RequestAborted);
             return CreatedAtAction(nameof(GetClientById), new { id = client.Id }, client);
         }
 
@@ -162,7 +162,7 @@ namespace Cargohub.controllers.v2
 
             try
             {
-                await _clientService.Update(client);
+                await _clientService.UpdateAsync(client, HttpContext.RequestAborted);
                 return Ok(client);
             }
             catch (KeyNotFoundException ex)
@@ -182,7 +182,7 @@ namespace Cargohub.controllers.v2
 
             try
             {
-                await _clientService.Delete(id);
+                await _clientService.DeleteAsync(id, HttpContext.RequestAborted);
                 return Ok();
             }
             catch (KeyNotFoundException ex)
@@ -51,12 +51,12 @@ namespace Cargohub.Controllers.v2
         /// <param name="shipmentId">ID of the shipment to receive.</param>
         /// <returns>A success message if the shipment is received.</returns>
         [HttpPost("receive")]
-        public IActionResult ReceiveShipment([FromBody] int shipmentId)
+        public async Task<IActionResult> ReceiveShipment([FromBody] int shipmentId)
         {
             try
             {
                 var apiKey = Request.Headers["API_KEY"].FirstOrDefault();
-                var message = _crossDockingService.ReceiveShipment(shipmentId, apiKey);
+                var message = await _crossDockingService.ReceiveShipment(shipmentId, apiKey);
                 return Ok(new { message });
             }
             catch (Exception ex)
@@ -71,12 +71,12 @@ namespace Cargohub.Controllers.v2
         /// <param name="shipmentId">ID of the shipment to ship.</param>
         /// <returns>A success message if the shipment is shipped.</returns>
         [HttpPost("ship")]
-        public IActionResult ShipShipment([FromBody] int shipmentId)
+        public async Task<IActionResult> ShipShipment([FromBody] int shipmentId)
         {
             try
             {
                 var apiKey = Request.Headers["API_KEY"].FirstOrDefault();
-                var message = _crossDockingService.ShipItems(shipmentId, apiKey);
+                var message = await _crossDockingService.ShipItems(shipmentId, apiKey);
                 return Ok(new { message });
             }
             catch (Exception ex)
@@ -0,0 +1,143 @@
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Threading.Tasks;
+using Cargohub.interfaces;
+using Cargohub.models;
+using Cargohub.services;
+using Microsoft.AspNetCore.Mvc;
+using Microsoft.Extensions.Options;
+
+namespace Cargohub.controllers.v2
+{
+    /// <summary>
+    /// Full extracts of a collection as NDJSON or CSV, streamed while the records are read
+    /// instead of built into one JSON array. Accepts the same filters and sort order as the
+    /// list endpoints, and restricted API keys only get their own warehouses' records.
+    /// </summary>
+    [ApiExplorerSettings(GroupName = "Exports")]
+    [ApiController]
+    [NoCoalescing]
+    public class ExportController : ControllerBase
+    {
+        private readonly ItemService _itemService;
+        private readonly ICrudService<Supplier, int> _supplierService;
+        private readonly InventoryService _inventoryService;
+        private readonly ICrudService<Location, int> _locationService;
+        private readonly OrderService _orderService;
+        private readonly ShipmentService _shipmentService;
+        private readonly ICrudService<Transfer, int> _transferService;
+        private readonly IOptions<JsonOptions> _jsonOptions;
+
+        public ExportController(ItemService itemService, ICrudService<Supplier, int> supplierService, InventoryService inventoryService, ICrudService<Location, int> locationService, OrderService orderService, ShipmentService shipmentService, ICrudService<Transfer, int> transferService, IOptions<JsonOptions> jsonOptions)
+        {
+            _itemService = itemService;
+            _supplierService = supplierService;
+            _inventoryService = inventoryService;
+            _locationService = locationService;
+            _orderService = orderService;
+            _shipmentService = shipmentService;
+            _transferService = transferService;
+            _jsonOptions = jsonOptions;
+        }
+
+        [HttpGet("api/v2/items/export")]
+        public Task<IActionResult> ExportItems([FromQuery] string format = "ndjson")
+        {
+            return Export("items", format, _ => _itemService.GetAll());
+        }
+
+        [HttpGet("api/v2/suppliers/export")]
+        public Task<IActionResult> ExportSuppliers([FromQuery] string format = "ndjson")
+        {
+            return Export("suppliers", format, _ => _supplierService.GetAll());
+        }
+
+        [HttpGet("api/v2/transfers/export")]
+        public Task<IActionResult> ExportTransfers([FromQuery] string format = "ndjson")
+        {
+            return Export("transfers", format, _ => _transferService.GetAll());
+        }
+
+        [HttpGet("api/v2/locations/export")]
+        public Task<IActionResult> ExportLocations([FromQuery] string format = "ndjson")
+        {
+            return Export("locations", format, scope => scope == null
+                ? _locationService.GetAll()
+                : ((LocationsService)_locationService).GetAllForWarehouses(scope));
+        }
+
+        [HttpGet("api/v2/inventories/export")]
+        public Task<IActionResult> ExportInventories([FromQuery] string format = "ndjson")
+        {
+            return Export("inventories", format, scope => scope == null
+                ? _inventoryService.GetAll()
+                : _inventoryService.GetAllForLocations(((LocationsService)_locationService).GetAllForWarehouses(scope).Select(l => l.Id)));
+        }
+
+        [HttpGet("api/v2/orders/export")]
+        public Task<IActionResult> ExportOrders([FromQuery] string format = "ndjson", [FromQuery(Name = "include_archived")] bool includeArchived = false)
+        {
+            return Export("orders", format, scope => scope == null
+                ? _orderService.GetAll(includeArchived)
+                : _orderService.GetAllForWarehouses(scope, includeArchived));
+        }
+
+        [HttpGet("api/v2/shipments/export")]
+        public Task<IActionResult> ExportShipments([FromQuery] string format = "ndjson", [FromQuery(Name = "include_archived")] bool includeArchived = false)
+        {
+            return Export("shipments", format, scope => scope == null
+                ? _shipmentService.GetAll(includeArchived)
+                : _shipmentService.GetAllForOrders(_orderService.GetAllForWarehouses(scope, includeArchived: true).Select(o => o.Id), includeArchived));
+        }
+
+        private async Task<IActionResult> Export<T>(string collection, string format, Func<IReadOnlyCollection<int>?, IEnumerable<T>> source)
+        {
+            var apiKey = Request.Headers["API_KEY"].FirstOrDefault();
+            if (string.IsNullOrEmpty(apiKey))
+            {
+                return Unauthorized("API_KEY header is missing.");
+            }
+
+            var user = AuthProvider.GetUser(apiKey);
+            if (user == null || !AuthProvider.HasAccess(user, collection, "all"))
+            {
+                return Forbid("You do not have permission to access this resource.");
+            }
+
+            format = format.ToLowerInvariant();
+            if (!RecordExport.Formats.Contains(format))
+            {
+                return BadRequest($"Unknown export format '{format}'. Use one of: {string.Join(", ", RecordExport.Formats)}.");
+            }
+
+            ListQuery query;
+            try
+            {
+                query = ListQuery.Parse<T>(Request.Query);
+            }
+            catch (InvalidOperationException ex)
+            {
+                return BadRequest(ex.Message);
+            }
+
+            var records = source(AuthProvider.WarehouseScope(apiKey));
+            // Sorting needs every match before the first one can be written; filtering does not.
+            var matches = query.IsSorted ? query.Apply(records) : query.Matching(records);
+
+            Response.ContentType = RecordExport.ContentType(format);
+            Response.Headers.ContentDisposition = $"attachment; filename=\"{collection}.{format}\"";
+            var options = _jsonOptions.Value.JsonSerializerOptions;
+            if (format == "csv")
+            {
+                await RecordExport.WriteCsv(Response.Body, matches, options, HttpContext.RequestAborted);
+            }
+            else
+            {
+                await RecordExport.WriteNdjson(Response.Body, matches, options, HttpContext.RequestAborted);
+            }
+
+            return new EmptyResult();
+        }
+    }
+}
@@ -0,0 +1,86 @@
+using System;
+using System.IO;
+using System.Linq;
+using System.Text.Json;
+using System.Threading;
+using System.Threading.Tasks;
+using Cargohub.services;
+using Microsoft.AspNetCore.Mvc;
+using Microsoft.Extensions.Options;
+
+namespace Cargohub.controllers.v2
+{
+    /// <summary>
+    /// Bulk imports of master data as NDJSON or CSV in the request body, in the same shape the
+    /// export endpoints produce. Responds with how many rows were imported and why the others
+    /// were rejected.
+    /// </summary>
+    [ApiExplorerSettings(GroupName = "Imports")]
+    [ApiController]
+    public class ImportController : ControllerBase
+    {
+        private readonly BulkImportService _importService;
+        private readonly IOptions<JsonOptions> _jsonOptions;
+
+        public ImportController(BulkImportService importService, IOptions<JsonOptions> jsonOptions)
+        {
+            _importService = importService;
+            _jsonOptions = jsonOptions;
+        }
+
+        [HttpPost("api/v2/items/import")]
+        [DisableRequestSizeLimit]
+        public Task<IActionResult> ImportItems([FromQuery] string format = "ndjson")
+        {
+            return Import("items", format, _importService.ImportItems);
+        }
+
+        [HttpPost("api/v2/inventories/import")]
+        [DisableRequestSizeLimit]
+        public Task<IActionResult> ImportInventories([FromQuery] string format = "ndjson")
+        {
+            return Import("inventories", format, _importService.ImportInventories);
+        }
+
+        [HttpPost("api/v2/locations/import")]
+        [DisableRequestSizeLimit]
+        public Task<IActionResult> ImportLocations([FromQuery] string format = "ndjson")
+        {
+            return Import("locations", format, _importService.ImportLocations);
+        }
+
+        private async Task<IActionResult> Import(
+            string collection,
+            string format,
+            Func<Stream, string, JsonSerializerOptions, CancellationToken, Task<ImportReport>> import)
+        {
+            var apiKey = Request.Headers["API_KEY"].FirstOrDefault();
+            if (string.IsNullOrEmpty(apiKey))
+            {
+                return Unauthorized("API_KEY header is missing.");
+            }
+
+            var user = AuthProvider.GetUser(apiKey);
+            if (user == null || !AuthProvider.HasAccess(user, collection, "post"))
+            {
+                return Forbid("You do not have permission to access this resource.");
+            }
+
+            format = format.ToLowerInvariant();
+            if (!RecordExport.Formats.Contains(format))
+            {
+                return BadRequest($"Unknown import format '{format}'. Use one of: {string.Join(", ", RecordExport.Formats)}.");
+            }
+
+            try
+            {
+                var report = await import(Request.Body, format, _jsonOptions.Value.JsonSerializerOptions, HttpContext.RequestAborted);
+                return Ok(report);
+            }
+            catch (InvalidOperationException ex)
+            {
+                return BadRequest(ex.Message);
+            }
+        }
+    }
+}
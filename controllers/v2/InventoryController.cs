@@ -1,6 +1,9 @@
 using System;
 using System.Collections.Generic;
+using System.Text.Json;
+using System.Text.Json.Nodes;
 using Microsoft.AspNetCore.Mvc;
+using Microsoft.Extensions.Options;
 using Cargohub.services;
 using Cargohub.models;
 using Cargohub.interfaces;
@@ -17,14 +20,16 @@ namespace Cargohub.controllers.v2
         private readonly ICrudService<Location, int> _locationsService;
         private readonly ICrudService<Warehouse, int> _warehouseService;
         private readonly ICrudService<Classifications, int> _classificationsService;
+        private readonly JsonSerializerOptions _jsonOptions;
         
-        public InventoryControllerV2(InventoryService inventoryService, ICrudService<Item, string> itemService, ICrudService<Location, int> locationsService, ICrudService<Warehouse, int> warehouseService, ICrudService<Classifications, int> classificationsService)
+        public InventoryControllerV2(InventoryService inventoryService, ICrudService<Item, string> itemService, ICrudService<Location, int> locationsService, ICrudService<Warehouse, int> warehouseService, ICrudService<Classifications, int> classificationsService, IOptions<JsonOptions> jsonOptions)
         {
             _inventoryService = inventoryService;
             _itemService = itemService;
             _locationsService = locationsService;
             _warehouseService = warehouseService;
             _classificationsService = classificationsService;
+            _jsonOptions = jsonOptions.Value.JsonSerializerOptions;
         }
         private IActionResult ValidateApiKeyAndUser(string permission)
         {
@@ -43,9 +48,57 @@ namespace Cargohub.controllers.v2
             return null;
         }
 
+        [HttpPost("by-ids")]
+        public IActionResult GetInventoriesByIds([FromBody] List<int> ids)
+        {
+            return InventoriesByIds(() => IdList.Distinct(ids));
+        }
+
+        // ?ids= on the list endpoint and POST by-ids: one primary-index lookup per id, returned
+        // in the order asked for. Ids that do not exist are left out.
+        private IActionResult InventoriesByIds(Func<List<int>> ids)
+        {
+            var validationResult = ValidateApiKeyAndUser("single");
+            if (validationResult != null)
+            {
+                return validationResult;
+            }
+
+            List<int> requested;
+            try
+            {
+                requested = ids();
+            }
+            catch (InvalidOperationException ex)
+            {
+                return BadRequest(ex.Message);
+            }
+
+            // Keys limited to some warehouses only get the inventories stocked in those
+            // warehouses' locations, as on the list.
+            var scope = AuthProvider.WarehouseScope(Request.Headers["API_KEY"].FirstOrDefault());
+            var found = _inventoryService.GetByIds(requested);
+            if (scope != null)
+            {
+                var locationIds = ((LocationsService)_locationsService).GetAllForWarehouses(scope).Select(l => l.Id).ToHashSet();
+                found = found.Where(i => i.Locations.ById.Any(l => locationIds.Contains(l.Key))).ToList();
+            }
+            if (!found.Any())
+            {
+                return NotFound("No inventories found.");
+            }
+            return Ok(found);
+        }
+
         [HttpGet]
-        public IActionResult GetInventories([FromQuery] int? pageNumber = null, [FromQuery] int? pageSize = null)
+        [CompressedResponseCache<Inventory>("data/inventories.json", LocationsPath = "data/locations.json")]
+        public async Task<IActionResult> GetInventories([FromQuery] int? pageNumber = null, [FromQuery] int? pageSize = null)
         {
+            if (Request.Query.ContainsKey(IdList.Parameter))
+            {
+                return InventoriesByIds(() => IdList.ParseInts(Request.Query[IdList.Parameter]));
+            }
+
 
             var validationResult = ValidateApiKeyAndUser("all");
             if (validationResult != null)
@@ -59,14 +112,56 @@ namespace Cargohub.controllers.v2
                 return BadRequest("Page number and page size must be greater than zero if provided.");
             }
 
-            var inventories = _inventoryService.GetAll(pageNumber, pageSize);
+            ListQuery query;
+            try
+            {
+                query = ListQuery.Parse<Inventory>(Request.Query);
+            }
+            catch (InvalidOperationException ex)
+            {
+                return BadRequest(ex.Message);
+            }
+
+            // Keys limited to some warehouses only read the inventories stocked in those
+            // warehouses' locations.
+            var scope = AuthProvider.WarehouseScope(Request.Headers["API_KEY"].FirstOrDefault());
+            var locationIds = scope == null
+                ? null
+                : ((LocationsService)_locationsService).GetAllForWarehouses(scope).Select(l => l.Id).ToList();
+
+            if (!query.IsEmpty)
+            {
+                var matches = _inventoryService.Find(query, locationIds);
+                if (!matches.Any())
+                {
+                    return NotFound("No inventories found.");
+                }
+
+                if (pageNumber.HasValue && pageSize.HasValue)
+                {
+                    return Ok(new
+                    {
+                        PageNumber = pageNumber,
+                        PageSize = pageSize,
+                        TotalRecords = matches.Count,
+                        Inventories = matches.Skip((pageNumber.Value - 1) * pageSize.Value).Take(pageSize.Value).ToList()
+                    });
+                }
+                return Ok(matches);
+            }
+
+            var inventories = locationIds == null
+                ? await _inventoryService.GetAllAsync(pageNumber, pageSize, HttpContext.RequestAborted)
+                : _inventoryService.GetAllForLocations(locationIds, pageNumber, pageSize);
 
             if (inventories == null || !inventories.Any())
             {
                 return NotFound("No inventories found.");
             }
 
-            var totalRecords = _inventoryService.GetAll(null, null).Count; // Total count without pagination
+            var totalRecords = locationIds == null
+                ? (await _inventoryService.GetAllAsync(cancellationToken: HttpContext.RequestAborted)).Count // Total count without pagination
+                : _inventoryService.GetAllForLocations(locationIds).Count;
 
             // Return metadata only if pagination is applied
             if (pageNumber.HasValue && pageSize.HasValue)
@@ -85,7 +180,7 @@ namespace Cargohub.controllers.v2
         }
 
         [HttpGet("{id}")]
-        public IActionResult GetInventoryById(int id)
+        public async Task<IActionResult> GetInventoryById(int id)
         {
 
             var validationResult = ValidateApiKeyAndUser("single");
@@ -96,7 +191,8 @@ namespace Cargohub.controllers.v2
 
             try
             {
-                var inventory = _inventoryService.GetById(id);
+                var inventory = await _inventoryService.GetByIdAsync(id, HttpContext.RequestAborted);
+                Response.Headers.ETag = EntityVersion.Of(inventory);
                 return Ok(inventory);
             }
             catch (KeyNotFoundException ex)
@@ -119,46 +215,24 @@ namespace Cargohub.controllers.v2
             {
                 return BadRequest("Inventory data is null.");
             }
-            var classifications = _classificationsService.GetAll();
-            var hazardousClassification = classifications.First(c => c.Name == "hazardous");
             var item = _itemService.GetById(inventory.Item_Id);
             if (item == null)
             {
                 return BadRequest("Item not found");
             }
-            // item is hazardous
-            if (item.Classifications_Id.Contains(hazardousClassification.Id))
+
+            var storageError = ((WarehouseService)_warehouseService).StorageRules().Check(item, inventory.Locations);
+            if (storageError != null)
             {
-                foreach (var locationId in inventory.Locations.Keys)
-                {
-                    var isParsed = int.TryParse(locationId, out int parsedLocationId);
-                    if (!isParsed) {
-                        return BadRequest("Invalid locationId");
-                    }
-                    var location = _locationsService.GetById(parsedLocationId);
-                    if (location == null)
-                    {
-                        return BadRequest("Location not found");
-                    }
-                    var warehouse = _warehouseService.GetById(location.Warehouse_Id);
-                    if (warehouse == null)
-                    {
-                        return BadRequest("Warehouse not found");
-                    }
-                    if (!warehouse.Classifications_Id.Contains(hazardousClassification.Id))
-                    {
-                        return BadRequest("Warehouse is non-hazardous");
-                    }
-                }
+                return BadRequest(storageError);
             }
 
-
-            await _inventoryService.Create(inventory);
+            await _inventoryService.CreateAsync(inventory, HttpContext.RequestAborted);
             return CreatedAtAction(nameof(GetInventoryById), new { id = inventory.Id }, inventory);
         }
 
         [HttpPut("{id}")]
-        public IActionResult UpdateInventory(int id, [FromBody] Inventory inventory)
+        public async Task<IActionResult> UpdateInventory(int id, [FromBody] Inventory inventory)
         {
 
             var validationResult = ValidateApiKeyAndUser("put");
@@ -179,14 +253,7 @@ namespace Cargohub.controllers.v2
 
             try
             {
-                var existingInventory = _inventoryService.GetAll().FirstOrDefault(i => i.Id == id);
-                if (existingInventory == null)
-                {
-                    return NotFound($"Inventory with ID {id} not found.");
-                }
-
-                // Update inventory
-                _inventoryService.Update(inventory);
+                await _inventoryService.UpdateAsync(inventory, HttpContext.RequestAborted);
                 return NoContent();
             }
             catch (KeyNotFoundException ex)
@@ -199,6 +266,42 @@ namespace Cargohub.controllers.v2
             }
         }
 
+        // JSON merge patch: only the fields in the body change. With If-Match set to the ETag of
+        // an earlier GET the patch is refused with 412 when the inventory has changed since.
+        [HttpPatch("{id}")]
+        public IActionResult PatchInventory(int id, [FromBody] JsonObject patch)
+        {
+            var validationResult = ValidateApiKeyAndUser("put");
+            if (validationResult != null)
+            {
+                return validationResult;
+            }
+
+            if (patch == null)
+            {
+                return BadRequest("Patch data is null.");
+            }
+
+            try
+            {
+                var inventory = _inventoryService.Patch(id, patch, Request.Headers.IfMatch, _jsonOptions);
+                Response.Headers.ETag = EntityVersion.Of(inventory);
+                return Ok(inventory);
+            }
+            catch (KeyNotFoundException ex)
+            {
+                return NotFound(ex.Message);
+            }
+            catch (VersionConflictException ex)
+            {
+                return StatusCode(StatusCodes.Status412PreconditionFailed, ex.Message);
+            }
+            catch (InvalidOperationException ex)
+            {
+                return BadRequest(ex.Message);
+            }
+        }
+
         [HttpDelete("{id}")]
         public async Task<IActionResult> DeleteInventory(int id)
         {
@@ -209,7 +312,7 @@ namespace Cargohub.controllers.v2
             }
             try
             {
-                await _inventoryService.Delete(id);
+                await _inventoryService.DeleteAsync(id, HttpContext.RequestAborted);
                 return NoContent();
             }
             catch (KeyNotFoundException ex)
@@ -14,9 +14,9 @@ namespace Cargohub.Controllers.v2
     [ApiController]
     public class ItemGroupController : Controller
     {
-      private readonly ICrudService<ItemGroup, int> _itemGroupService;
+      private readonly ItemGroupService _itemGroupService;
 
-      public ItemGroupController(ICrudService<ItemGroup, int> itemGroupService)
+      public ItemGroupController(ItemGroupService itemGroupService)
       {
         _itemGroupService = itemGroupService;
       }
@@ -39,7 +39,7 @@ namespace Cargohub.Controllers.v2
       }
 
       [HttpGet]
-      public IActionResult GetItemGroups([FromQuery] int? pageNumber = null, [FromQuery] int? pageSize = null)
+      public async Task<IActionResult> GetItemGroups([FromQuery] int? pageNumber = null, [FromQuery] int? pageSize = null)
       {
         var validationResult = ValidateApiKeyAndUser("all");
         if (validationResult != null)
@@ -52,12 +52,12 @@ namespace Cargohub.Controllers.v2
         {
           return BadRequest("Page number and page size must be greater than zero if provided.");
         }
-        var itemGroups = _itemGroupService.GetAll(pageNumber, pageSize);
+        var itemGroups = await _itemGroupService.GetAllAsync(pageNumber, pageSize, HttpContext.RequestAborted);
         if (itemGroups == null || !itemGroups.Any())
         {
           return NotFound("No inventories found.");
         }
-        var totalRecords = _itemGroupService.GetAll(null, null).Count; // Total count without pagination
+        var totalRecords = (await _itemGroupService.GetAllAsync(cancellationToken: HttpContext.RequestAborted)).Count; // Total count without pagination
 
         // Return metadata only if pagination is applied
         if (pageNumber.HasValue && pageSize.HasValue)
@@ -76,7 +76,7 @@ namespace Cargohub.Controllers.v2
       }
 
       [HttpGet("{id}")]
-      public IActionResult GetItemGroupById(int id)
+      public async Task<IActionResult> GetItemGroupById(int id)
       {
         var validationResult = ValidateApiKeyAndUser("single");
         if (validationResult != null)
@@ -86,7 +86,7 @@ namespace Cargohub.Controllers.v2
 
         try
         {
-          var itemGroup = _itemGroupService.GetById(id);
+          var itemGroup = await _itemGroupService.GetByIdAsync(id, HttpContext.RequestAborted);
           return Ok(itemGroup);
         }
         catch (KeyNotFoundException ex)
@@ -109,7 +109,7 @@ namespace Cargohub.Controllers.v2
           return BadRequest("ItemGroup data is null.");
         }
 
-        await _itemGroupService.Create(itemGroup);
+        await _itemGroupService.CreateAsync(itemGroup, HttpContext.RequestAborted);
         return CreatedAtAction(nameof(GetItemGroupById), new { id = itemGroup.Id }, itemGroup);
       }
 
@@ -129,7 +129,7 @@ namespace Cargohub.Controllers.v2
 
         try
         {
-          await _itemGroupService.Update(itemGroup);
+          await _itemGroupService.UpdateAsync(itemGroup, HttpContext.RequestAborted);
           return NoContent();
         }
         catch (KeyNotFoundException ex)
@@ -149,7 +149,7 @@ namespace Cargohub.Controllers.v2
 
         try
         {
-          await _itemGroupService.Delete(id);
+          await _itemGroupService.DeleteAsync(id, HttpContext.RequestAborted);
           return NoContent();
         }
         catch (KeyNotFoundException ex)
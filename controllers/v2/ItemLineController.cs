@@ -14,13 +14,11 @@ namespace Cargohub.Controllers.v2
     [ApiController]
     public class ItemLineController : Controller
     {
-        private readonly ICrudService<ItemLine, int> _itemLineService;
-        private readonly ItemLineService _itemLineServiceWithItems;
+        private readonly ItemLineService _itemLineService;
 
-        public ItemLineController(ICrudService<ItemLine, int> itemLineService, ItemLineService itemLineServiceWithItems)
+        public ItemLineController(ItemLineService itemLineService)
         {
             _itemLineService = itemLineService;
-            _itemLineServiceWithItems = itemLineServiceWithItems;
         }
 
         private IActionResult ValidateApiKeyAndUser(string permission)
@@ -41,7 +39,7 @@ namespace Cargohub.Controllers.v2
         }
 
         [HttpGet]
-        public IActionResult GetItemLines([FromQuery] int? pageNumber = null, [FromQuery] int? pageSize = null)
+        public async Task<IActionResult> GetItemLines([FromQuery] int? pageNumber = null, [FromQuery] int? pageSize = null)
         {
             var validationResult = ValidateApiKeyAndUser("all");
             if (validationResult != null)
@@ -54,13 +52,13 @@ namespace Cargohub.Controllers.v2
             {
                 return BadRequest("Page number and page size must be greater than zero if provided.");
             }
-            var itemLines = _itemLineService.GetAll(pageNumber, pageSize);
+            var itemLines = await _itemLineService.GetAllAsync(pageNumber, pageSize, HttpContext.RequestAborted);
             if (itemLines == null || !itemLines.Any())
             {
                 return NotFound("No inventories found.");
             }
 
-            var totalRecords = _itemLineService.GetAll(null, null).Count; // Total count without pagination
+            var totalRecords = (await _itemLineService.GetAllAsync(cancellationToken: HttpContext.RequestAborted)).Count; // Total count without pagination
 
             // Return metadata only if pagination is applied
             if (pageNumber.HasValue && pageSize.HasValue)
@@ -79,7 +77,7 @@ namespace Cargohub.Controllers.v2
         }
 
         [HttpGet("{id}")]
-        public IActionResult GetItemLineById(int id)
+        public async Task<IActionResult> GetItemLineById(int id)
         {
             var validationResult = ValidateApiKeyAndUser("single");
             if (validationResult != null)
@@ -89,7 +87,7 @@ namespace Cargohub.Controllers.v2
 
             try
             {
-                var itemLine = _itemLineService.GetById(id);
+                var itemLine = await _itemLineService.GetByIdAsync(id, HttpContext.RequestAborted);
                 return Ok(itemLine);
             }
             catch (KeyNotFoundException ex)
@@ -107,7 +105,7 @@ namespace Cargohub.Controllers.v2
                 return validationResult;
             }
 
-            var items = _itemLineServiceWithItems.GetItemsByItemLineId(id);
+            var items = _itemLineService.GetItemsByItemLineId(id);
             if (items == null || items.Count == 0)
             {
                 return NotFound();
@@ -129,7 +127,7 @@ namespace Cargohub.Controllers.v2
                 return BadRequest("ItemLine data is null.");
             }
 
-            await _itemLineService.Create(itemLine);
+            await _itemLineService.CreateAsync(itemLine, HttpContext.RequestAborted);
             return CreatedAtAction(nameof(GetItemLineById), new { id = itemLine.Id }, itemLine);
         }
 
@@ -149,7 +147,7 @@ namespace Cargohub.Controllers.v2
 
             try
             {
-                await _itemLineService.Update(itemLine);
+                await _itemLineService.UpdateAsync(itemLine, HttpContext.RequestAborted);
                 return NoContent();
             }
             catch (KeyNotFoundException ex)
@@ -169,7 +167,7 @@ namespace Cargohub.Controllers.v2
             
             try
             {
-                await _itemLineService.Delete(id);
+                await _itemLineService.DeleteAsync(id, HttpContext.RequestAborted);
                 return NoContent();
             }
             catch (KeyNotFoundException ex)
@@ -13,9 +13,9 @@ namespace Cargohub.Controllers.v2
     [ApiController]
     public class ItemTypeController : Controller
     {
-        private readonly ICrudService<ItemType, int> _itemTypeService;
+        private readonly ItemTypeService _itemTypeService;
 
-        public ItemTypeController(ICrudService<ItemType, int> itemTypeService)
+        public ItemTypeController(ItemTypeService itemTypeService)
         {
             _itemTypeService = itemTypeService;
         }
@@ -37,7 +37,7 @@ namespace Cargohub.Controllers.v2
       }
 
         [HttpGet]
-        public IActionResult GetItemTypes([FromQuery] int? pageNumber = null, [FromQuery] int? pageSize = null)
+        public async Task<IActionResult> GetItemTypes([FromQuery] int? pageNumber = null, [FromQuery] int? pageSize = null)
         {
             var validationResult = ValidateApiKeyAndUser("all");
             if (validationResult != null)
@@ -50,13 +50,13 @@ namespace Cargohub.Controllers.v2
             {
                 return BadRequest("Page number and page size must be greater than zero if provided.");
             }
-            var itemTypes = _itemTypeService.GetAll(pageNumber, pageSize);
+            var itemTypes = await _itemTypeService.GetAllAsync(pageNumber, pageSize, HttpContext.RequestAborted);
             if (itemTypes == null || !itemTypes.Any())
             {
                 return NotFound("No inventories found.");
             }
 
-            var totalRecords = _itemTypeService.GetAll(null, null).Count; // Total count without pagination
+            var totalRecords = (await _itemTypeService.GetAllAsync(cancellationToken: HttpContext.RequestAborted)).Count; // Total count without pagination
 
             // Return metadata only if pagination is applied
             if (pageNumber.HasValue && pageSize.HasValue)
@@ -75,7 +75,7 @@ namespace Cargohub.Controllers.v2
         }
 
         [HttpGet("{id}")]
-        public IActionResult GetItemTypeById(int id)
+        public async Task<IActionResult> GetItemTypeById(int id)
         {
             var validationResult = ValidateApiKeyAndUser("single");
             if (validationResult != null)
@@ -85,7 +85,7 @@ namespace Cargohub.Controllers.v2
 
             try
             {
-                var itemType = _itemTypeService.GetById(id);
+                var itemType = await _itemTypeService.GetByIdAsync(id, HttpContext.RequestAborted);
                 return Ok(itemType);
             }
             catch (KeyNotFoundException ex)
@@ -103,7 +103,7 @@ namespace Cargohub.Controllers.v2
                 return validationResult;
             }
 
-            var items = ((ItemTypeService)_itemTypeService).GetItemsByItemTypeId(id);
+            var items = _itemTypeService.GetItemsByItemTypeId(id);
             if (items == null || items.Count == 0)
             {
                 return NotFound();
@@ -125,7 +125,7 @@ namespace Cargohub.Controllers.v2
                 return BadRequest("ItemType data is null.");
             }
 
-            await _itemTypeService.Create(itemType);
+            await _itemTypeService.CreateAsync(itemType, HttpContext.RequestAborted);
             return CreatedAtAction(nameof(GetItemTypeById), new { id = itemType.Id }, itemType);
         }
 
@@ -145,7 +145,7 @@ namespace Cargohub.Controllers.v2
 
             try
             {
-                await _itemTypeService.Update(itemType);
+                await _itemTypeService.UpdateAsync(itemType, HttpContext.RequestAborted);
                 return NoContent();
             }
             catch (KeyNotFoundException ex)
@@ -165,7 +165,7 @@ namespace Cargohub.Controllers.v2
             
             try
             {
-                await _itemTypeService.Delete(id);
+                await _itemTypeService.DeleteAsync(id, HttpContext.RequestAborted);
                 return NoContent();
             }
             catch (KeyNotFoundException ex)
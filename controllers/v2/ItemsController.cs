@@ -1,6 +1,9 @@
 using System.Collections.Generic;
+using System.Text.Json;
+using System.Text.Json.Nodes;
 using System.Threading.Tasks;
 using Microsoft.AspNetCore.Mvc;
+using Microsoft.Extensions.Options;
 using Cargohub.interfaces;
 using Cargohub.models;
 using Cargohub.services;
@@ -13,10 +16,14 @@ namespace Cargohub.Controllers.v2
     public class ItemController : Controller
     {
         private readonly ItemService _itemService;
+        private readonly ExpansionService _expansionService;
+        private readonly JsonSerializerOptions _jsonOptions;
 
-        public ItemController(ItemService itemService)
+        public ItemController(ItemService itemService, ExpansionService expansionService, IOptions<JsonOptions> jsonOptions)
         {
             _itemService = itemService;
+            _expansionService = expansionService;
+            _jsonOptions = jsonOptions.Value.JsonSerializerOptions;
         }
 
         private IActionResult ValidateApiKeyAndUser(string permission)
@@ -36,21 +43,99 @@ namespace Cargohub.Controllers.v2
             return null;
         }
 
+        [HttpPost("by-ids")]
+        public IActionResult GetItemsByIds([FromBody] List<string> ids)
+        {
+            return ItemsByIds(() => IdList.Distinct(ids));
+        }
+
+        // ?ids= on the list endpoint and POST by-ids: one primary-index lookup per id, returned
+        // in the order asked for. Ids that do not exist are left out.
+        private IActionResult ItemsByIds(Func<List<string>> ids)
+        {
+            var validationResult = ValidateApiKeyAndUser("single");
+            if (validationResult != null)
+            {
+                return validationResult;
+            }
+
+            List<string> requested;
+            try
+            {
+                requested = ids();
+            }
+            catch (InvalidOperationException ex)
+            {
+                return BadRequest(ex.Message);
+            }
+
+            var found = _itemService.GetByIds(requested);
+            if (!found.Any())
+            {
+                return NotFound("No items found.");
+            }
+            return Ok(found);
+        }
+
         [HttpGet]
-        public IActionResult GetItems()
+        [CompressedResponseCache<Item>("data/items.json")]
+        public async Task<IActionResult> GetItems()
         {
+            if (Request.Query.ContainsKey(IdList.Parameter))
+            {
+                return ItemsByIds(() => IdList.Parse(Request.Query[IdList.Parameter]));
+            }
+
             var validationResult = ValidateApiKeyAndUser("all");
             if (validationResult != null)
             {
                 return validationResult;
             }
 
-            var items = _itemService.GetAll();
+            var items = await _itemService.GetAllAsync(cancellationToken: HttpContext.RequestAborted);
             return Ok(items);
         }
 
+        [HttpGet("search")]
+        public IActionResult SearchItems([FromQuery] string? q, [FromQuery] int? pageNumber = null, [FromQuery] int? pageSize = null)
+        {
+            var validationResult = ValidateApiKeyAndUser("all");
+            if (validationResult != null)
+            {
+                return validationResult;
+            }
+
+            if (string.IsNullOrWhiteSpace(q))
+            {
+                return BadRequest("Query parameter 'q' is required.");
+            }
+
+            if ((pageNumber.HasValue && pageNumber <= 0) || (pageSize.HasValue && pageSize <= 0))
+            {
+                return BadRequest("Page number and page size must be greater than zero if provided.");
+            }
+
+            var matches = _itemService.Search(q);
+            if (!matches.Any())
+            {
+                return NotFound();
+            }
+
+            if (pageNumber.HasValue && pageSize.HasValue)
+            {
+                return Ok(new
+                {
+                    PageNumber = pageNumber,
+                    PageSize = pageSize,
+                    TotalRecords = matches.Count,
+                    Items = matches.Skip((pageNumber.Value - 1) * pageSize.Value).Take(pageSize.Value).ToList()
+                });
+            }
+            return Ok(matches);
+        }
+
         [HttpGet("{uid}")]
-        public IActionResult GetItemById(string uid)
+        public async Task<IActionResult> GetItemById(string uid)
         {
             var validationResult = ValidateApiKeyAndUser("single");
             if (validationResult != null)
@@ -58,12 +143,21 @@ namespace Cargohub.Controllers.v2
                 return validationResult;
             }
 
-            var item = _itemService.GetById(uid);
+            var item = await _itemService.GetByIdAsync(uid, HttpContext.RequestAborted);
             if (item == null)
             {
                 return NotFound();
             }
-            return Ok(item);
+
+            try
+            {
+                Response.Headers.ETag = EntityVersion.Of(item);
+                return Ok(_expansionService.Expand(item, Request.Query[ExpansionService.Parameter]));
+            }
+            catch (InvalidOperationException ex)
+            {
+                return BadRequest(ex.Message);
+            }
         }
 
         [HttpGet("{itemId}/inventory")]
@@ -112,7 +206,7 @@ namespace Cargohub.Controllers.v2
                 return BadRequest();
             }
 
-            await _itemService.Create(item);
+            await _itemService.CreateAsync(item, HttpContext.RequestAborted);
             return CreatedAtAction(nameof(GetItemById), new { uid = item.Uid }, item);
         }
 
@@ -132,7 +226,7 @@ namespace Cargohub.Controllers.v2
 
             try
             {
-                await _itemService.Update(item);
+                await _itemService.UpdateAsync(item, HttpContext.RequestAborted);
             }
             catch (KeyNotFoundException)
             {
@@ -142,6 +236,42 @@ namespace Cargohub.Controllers.v2
             return NoContent();
         }
 
+        // JSON merge patch: only the fields in the body change. With If-Match set to the ETag of
+        // an earlier GET the patch is refused with 412 when the item has changed since.
+        [HttpPatch("{uid}")]
+        public IActionResult PatchItem(string uid, [FromBody] JsonObject patch)
+        {
+            var validationResult = ValidateApiKeyAndUser("put");
+            if (validationResult != null)
+            {
+                return validationResult;
+            }
+
+            if (patch == null)
+            {
+                return BadRequest("Patch data is null.");
+            }
+
+            try
+            {
+                var item = _itemService.Patch(uid, patch, Request.Headers.IfMatch, _jsonOptions);
+                Response.Headers.ETag = EntityVersion.Of(item);
+                return Ok(item);
+            }
+            catch (KeyNotFoundException ex)
+            {
+                return NotFound(ex.Message);
+            }
+            catch (VersionConflictException ex)
+            {
+                return StatusCode(StatusCodes.Status412PreconditionFailed, ex.Message);
+            }
+            catch (InvalidOperationException ex)
+            {
+                return BadRequest(ex.Message);
+            }
+        }
+
         [HttpDelete("{uid}")]
         public async Task<IActionResult> DeleteItem(string uid)
         {
@@ -153,7 +283,7 @@ namespace Cargohub.Controllers.v2
             
             try
             {
-                await _itemService.Delete(uid);
+                await _itemService.DeleteAsync(uid, HttpContext.RequestAborted);
                 return NoContent();
             }
             catch (KeyNotFoundException ex)
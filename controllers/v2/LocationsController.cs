@@ -14,11 +14,13 @@ namespace StrawhatsV2.controllers.v2
     [ApiController]
     public class LocationsController : Controller
     {
-        private readonly ICrudService<Location, int> _locationService;
+        private readonly LocationsService _locationService;
+        private readonly ExpansionService _expansionService;
 
-        public LocationsController(ICrudService<Location, int> locationService)
+        public LocationsController(LocationsService locationService, ExpansionService expansionService)
         {
             _locationService = locationService;
+            _expansionService = expansionService;
         }
 
         private IActionResult ValidateApiKeyAndUser(string permission)
@@ -38,16 +40,66 @@ namespace StrawhatsV2.controllers.v2
             return null;
         }
 
+        [HttpPost("by-ids")]
+        public IActionResult GetLocationsByIds([FromBody] List<int> ids)
+        {
+            return LocationsByIds(() => IdList.Distinct(ids));
+        }
+
+        // ?ids= on the list endpoint and POST by-ids: one primary-index lookup per id, returned
+        // in the order asked for. Ids that do not exist are left out.
+        private IActionResult LocationsByIds(Func<List<int>> ids)
+        {
+            var validationResult = ValidateApiKeyAndUser("single");
+            if (validationResult != null)
+            {
+                return validationResult;
+            }
+
+            List<int> requested;
+            try
+            {
+                requested = ids();
+            }
+            catch (InvalidOperationException ex)
+            {
+                return BadRequest(ex.Message);
+            }
+
+            // Keys limited to some warehouses only get those warehouses' locations, as on the list.
+            var scope = AuthProvider.WarehouseScope(Request.Headers["API_KEY"].FirstOrDefault());
+            var found = _locationService.GetByIds(requested);
+            if (scope != null)
+            {
+                found = found.Where(l => scope.Contains(l.Warehouse_Id)).ToList();
+            }
+            if (!found.Any())
+            {
+                return NotFound("No locations found.");
+            }
+            return Ok(found);
+        }
+
         [HttpGet]
-        public IActionResult GetLocations()
+        [CompressedResponseCache<Location>("data/locations.json", Sharded = true)]
+        public async Task<IActionResult> GetLocations()
         {
+            if (Request.Query.ContainsKey(IdList.Parameter))
+            {
+                return LocationsByIds(() => IdList.ParseInts(Request.Query[IdList.Parameter]));
+            }
+
             var validationResult = ValidateApiKeyAndUser("all");
             if (validationResult != null)
             {
                 return validationResult;
             }
 
-            var locations = _locationService.GetAll();
+            // Keys limited to some warehouses only read those warehouses' location shards.
+            var scope = AuthProvider.WarehouseScope(Request.Headers["API_KEY"].FirstOrDefault());
+            var locations = scope == null
+                ? await _locationService.GetAllAsync(cancellationToken: HttpContext.RequestAborted)
+                : _locationService.GetAllForWarehouses(scope);
             if (locations == null || !locations.Any())
             {
                 return NotFound();
@@ -56,7 +108,7 @@ namespace StrawhatsV2.controllers.v2
         }
 
         [HttpGet("{id}")]
-        public IActionResult GetLocationById(int id)
+        public async Task<IActionResult> GetLocationById(int id)
         {
             var validationResult = ValidateApiKeyAndUser("single");
             if (validationResult != null)
@@ -66,13 +118,17 @@ namespace StrawhatsV2.controllers.v2
 
             try
             {
-                var location = _locationService.GetById(id);
-                return Ok(location);
+                var location = await _locationService.GetByIdAsync(id, HttpContext.RequestAborted);
+                return Ok(_expansionService.Expand(location, Request.Query[ExpansionService.Parameter]));
             }
             catch (KeyNotFoundException ex)
             {
                 return NotFound(ex.Message);
             }
+            catch (InvalidOperationException ex)
+            {
+                return BadRequest(ex.Message);
+            }
         }
 
         [HttpPost]
@@ -89,7 +145,7 @@ namespace StrawhatsV2.controllers.v2
                 return BadRequest("Location data is null.");
             }
 
-            await _locationService.Create(location);
+            await _locationService.CreateAsync(location, HttpContext.RequestAborted);
             return CreatedAtAction(nameof(GetLocationById), new { id = location.Id }, location);
         }
 
@@ -109,7 +165,7 @@ namespace StrawhatsV2.controllers.v2
 
             try
             {
-                await _locationService.Update(location);
+                await _locationService.UpdateAsync(location, HttpContext.RequestAborted);
                 return NoContent();
             }
             catch (KeyNotFoundException ex)
@@ -129,7 +185,7 @@ namespace StrawhatsV2.controllers.v2
 
             try
             {
-                await _locationService.Delete(id);
+                await _locationService.DeleteAsync(id, HttpContext.RequestAborted);
                 return NoContent();
             }
             catch (KeyNotFoundException ex)
@@ -1,11 +1,14 @@
 using System;
 using System.Collections.Generic;
 using System.Linq;
+using System.Text.Json;
+using System.Text.Json.Nodes;
 using System.Threading.Tasks;
 using Cargohub.interfaces;
 using Cargohub.models;
 using Cargohub.services;
 using Microsoft.AspNetCore.Mvc;
+using Microsoft.Extensions.Options;
 
 namespace Cargohub.controllers.v2
 {
@@ -15,9 +18,13 @@ namespace Cargohub.controllers.v2
     public class OrderContoller : Controller
     {
         private readonly OrderService _orderService;
-        public OrderContoller(OrderService orderService)
+        private readonly ExpansionService _expansionService;
+        private readonly JsonSerializerOptions _jsonOptions;
+        public OrderContoller(OrderService orderService, ExpansionService expansionService, IOptions<JsonOptions> jsonOptions)
         {
             _orderService = orderService;
+            _expansionService = expansionService;
+            _jsonOptions = jsonOptions.Value.JsonSerializerOptions;
         }
 
         private IActionResult ValidateApiKeyAndUser(string permission)
@@ -37,9 +44,54 @@ namespace Cargohub.controllers.v2
             return null;
         }
 
+        [HttpPost("by-ids")]
+        public IActionResult GetOrdersByIds([FromBody] List<int> ids)
+        {
+            return OrdersByIds(() => IdList.Distinct(ids));
+        }
+
+        // ?ids= on the list endpoint and POST by-ids: one primary-index lookup per id, returned
+        // in the order asked for. Ids that do not exist are left out.
+        private IActionResult OrdersByIds(Func<List<int>> ids)
+        {
+            var validationResult = ValidateApiKeyAndUser("single");
+            if (validationResult != null)
+            {
+                return validationResult;
+            }
+
+            List<int> requested;
+            try
+            {
+                requested = ids();
+            }
+            catch (InvalidOperationException ex)
+            {
+                return BadRequest(ex.Message);
+            }
+
+            // Keys limited to some warehouses only get those warehouses' orders, as on the list.
+            var scope = AuthProvider.WarehouseScope(Request.Headers["API_KEY"].FirstOrDefault());
+            var found = _orderService.GetByIds(requested);
+            if (scope != null)
+            {
+                found = found.Where(o => scope.Contains(o.Warehouse_Id)).ToList();
+            }
+            if (!found.Any())
+            {
+                return NotFound("No orders found.");
+            }
+            return Ok(found);
+        }
+
         [HttpGet]
-        public IActionResult GetOrders([FromQuery] int? pageNumber = null, [FromQuery] int? pageSize = null)
+        public async Task<IActionResult> GetOrders([FromQuery] int? pageNumber = null, [FromQuery] int? pageSize = null, [FromQuery(Name = "include_archived")] bool includeArchived = false)
         {
+            if (Request.Query.ContainsKey(IdList.Parameter))
+            {
+                return OrdersByIds(() => IdList.ParseInts(Request.Query[IdList.Parameter]));
+            }
+
             var validationResult = ValidateApiKeyAndUser("all");
             if (validationResult != null)
             {
@@ -51,14 +103,51 @@ namespace Cargohub.controllers.v2
                 return BadRequest("Page number and page size must be greater than zero if provided.");
             }
 
-            var orders = _orderService.GetAll(pageNumber, pageSize);
+            ListQuery query;
+            try
+            {
+                query = ListQuery.Parse<Order>(Request.Query);
+            }
+            catch (InvalidOperationException ex)
+            {
+                return BadRequest(ex.Message);
+            }
+
+            // Keys limited to some warehouses only read those warehouses' orders.
+            var scope = AuthProvider.WarehouseScope(Request.Headers["API_KEY"].FirstOrDefault());
+            if (!query.IsEmpty)
+            {
+                var matches = _orderService.Find(query, scope, includeArchived);
+                if (!matches.Any())
+                {
+                    return NotFound();
+                }
+
+                if (pageNumber.HasValue && pageSize.HasValue)
+                {
+                    return Ok(new
+                    {
+                        PageNumber = pageNumber,
+                        PageSize = pageSize,
+                        TotalRecords = matches.Count,
+                        Orders = matches.Skip((pageNumber.Value - 1) * pageSize.Value).Take(pageSize.Value).ToList()
+                    });
+                }
+                return Ok(matches);
+            }
+
+            var orders = scope == null
+                ? await _orderService.GetAllAsync(includeArchived, pageNumber, pageSize, HttpContext.RequestAborted)
+                : _orderService.GetAllForWarehouses(scope, includeArchived, pageNumber, pageSize);
 
             if (orders == null || !orders.Any())
             {
                 return NotFound();
             }
 
-            var totalRecords = _orderService.GetAll(null, null).Count;
+            var totalRecords = scope == null
+                ? (await _orderService.GetAllAsync(includeArchived, cancellationToken: HttpContext.RequestAborted)).Count
+                : _orderService.GetAllForWarehouses(scope, includeArchived).Count;
 
             if (pageNumber.HasValue && pageSize.HasValue)
             {
@@ -74,7 +163,7 @@ namespace Cargohub.controllers.v2
         }
 
         [HttpGet("{id}")]
-        public IActionResult GetOrderById(int id)
+        public async Task<IActionResult> GetOrderById(int id)
         {
             var validationResult = ValidateApiKeyAndUser("single");
             if (validationResult != null)
@@ -84,13 +173,18 @@ namespace Cargohub.controllers.v2
 
             try
             {
-                var order = _orderService.GetById(id);
-                return Ok(order);
+                var order = await _orderService.GetByIdAsync(id, HttpContext.RequestAborted);
+                Response.Headers.ETag = EntityVersion.Of(order);
+                return Ok(_expansionService.Expand(order, Request.Query[ExpansionService.Parameter]));
             }
             catch (KeyNotFoundException ex)
             {
                 return NotFound(ex.Message);
             }
+            catch (InvalidOperationException ex)
+            {
+                return BadRequest(ex.Message);
+            }
         }
 
         [HttpPost]
@@ -107,7 +201,7 @@ namespace Cargohub.controllers.v2
                 return BadRequest("Order data is null.");
             }
 
-            await _orderService.Create(order);
+            await _orderService.CreateAsync(order, HttpContext.RequestAborted);
             return CreatedAtAction(nameof(GetOrderById), new { id = order.Id }, order);
         }
 
@@ -127,7 +221,7 @@ namespace Cargohub.controllers.v2
 
             try
             {
-                await _orderService.Update(order);
+                await _orderService.UpdateAsync(order, HttpContext.RequestAborted);
                 return NoContent();
             }
             catch (KeyNotFoundException ex)
@@ -136,6 +230,42 @@ namespace Cargohub.controllers.v2
             }
         }
 
+        // JSON merge patch: only the fields in the body change. With If-Match set to the ETag of
+        // an earlier GET the patch is refused with 412 when the order has changed since.
+        [HttpPatch("{id}")]
+        public IActionResult PatchOrder(int id, [FromBody] JsonObject patch)
+        {
+            var validationResult = ValidateApiKeyAndUser("put");
+            if (validationResult != null)
+            {
+                return validationResult;
+            }
+
+            if (patch == null)
+            {
+                return BadRequest("Patch data is null.");
+            }
+
+            try
+            {
+                var order = _orderService.Patch(id, patch, Request.Headers.IfMatch, _jsonOptions);
+                Response.Headers.ETag = EntityVersion.Of(order);
+                return Ok(order);
+            }
+            catch (KeyNotFoundException ex)
+            {
+                return NotFound(ex.Message);
+            }
+            catch (VersionConflictException ex)
+            {
+                return StatusCode(StatusCodes.Status412PreconditionFailed, ex.Message);
+            }
+            catch (InvalidOperationException ex)
+            {
+                return BadRequest(ex.Message);
+            }
+        }
+
         [HttpDelete("{id}")]
         public async Task<IActionResult> DeleteOrder(int id)
         {
@@ -147,7 +277,7 @@ namespace Cargohub.controllers.v2
 
             try
             {
-                await _orderService.Delete(id);
+                await _orderService.DeleteAsync(id, HttpContext.RequestAborted);
                 return NoContent();
             }
             catch (KeyNotFoundException ex)
@@ -167,7 +297,7 @@ namespace Cargohub.controllers.v2
 
             try
             {
-                var order = _orderService.GetById(id);
+                var order = await _orderService.GetByIdAsync(id, HttpContext.RequestAborted);
                 return Ok(order.Items);
             }
             catch (KeyNotFoundException ex)
@@ -194,8 +324,20 @@ namespace Cargohub.controllers.v2
             }
         }
 
+        [HttpPost("backorders/recompute")]
+        public IActionResult RecomputeBackorders()
+        {
+            var validationResult = ValidateApiKeyAndUser("put");
+            if (validationResult != null)
+            {
+                return validationResult;
+            }
+
+            return Ok(_orderService.RecomputeAllBackorders());
+        }
+
         [HttpPut("{id}/items")]
-        public async Task<IActionResult> UpdateOrderItems(int id, [FromBody] Order orderBody)
+        public IActionResult UpdateOrderItems(int id, [FromBody] Order orderBody)
         {
             var validationResult = ValidateApiKeyAndUser("put");
             if (validationResult != null)
@@ -205,15 +347,18 @@ namespace Cargohub.controllers.v2
 
             try
             {
-                var targetOrder = _orderService.GetById(id);
-                targetOrder.Items = orderBody.Items;
-                await _orderService.Update(targetOrder);
+                var order = _orderService.UpdateItems(id, orderBody.Items, Request.Headers.IfMatch);
+                Response.Headers.ETag = EntityVersion.Of(order);
                 return NoContent();
             }
             catch (KeyNotFoundException e)
             {
                 return NotFound(e.Message);
             }
+            catch (VersionConflictException e)
+            {
+                return StatusCode(StatusCodes.Status412PreconditionFailed, e.Message);
+            }
         }
     }
 }
\ No newline at end of file
@@ -14,14 +14,17 @@ namespace Cargohub.controllers.v2
     [ApiController]
     public class ShipmentController : Controller
     {
-        private readonly ICrudService<Shipment, int> _shipmentService;
+        private readonly ShipmentService _shipmentService;
 
-        private readonly ICrudService<Order, int> _orderService;
+        private readonly OrderService _orderService;
 
-        public ShipmentController(ICrudService<Shipment, int> shipmentService, ICrudService<Order, int> orderService)
+        private readonly ExpansionService _expansionService;
+
+        public ShipmentController(ShipmentService shipmentService, OrderService orderService, ExpansionService expansionService)
         {
             _shipmentService = shipmentService;
             _orderService = orderService;
+            _expansionService = expansionService;
         }
 
         private IActionResult ValidateApiKeyAndUser(string permission)
@@ -49,7 +52,7 @@ namespace Cargohub.controllers.v2
 
             try
             {
-                var picklist = ((ShipmentService)_shipmentService).GeneratePicklist(id);
+                var picklist = _shipmentService.GeneratePicklist(id);
                 return Ok(picklist);
             }
             catch (KeyNotFoundException ex)
@@ -66,7 +69,7 @@ namespace Cargohub.controllers.v2
 
             try
             {
-                await ((ShipmentService)_shipmentService).SavePickingList(id, request.PickedItems, Request.Headers["API_KEY"].FirstOrDefault(), request.Description);
+                await _shipmentService.SavePickingList(id, request.PickedItems, Request.Headers["API_KEY"].FirstOrDefault(), request.Description);
                 return Ok("Picking list saved successfully.");
             }
             catch (InvalidOperationException ex)
@@ -79,9 +82,86 @@ namespace Cargohub.controllers.v2
             }
         }
 
+        [HttpPost("wave-picking")]
+        public async Task<IActionResult> SaveWavePicking([FromBody] WavePickingRequest request)
+        {
+            var validationResult = ValidateApiKeyAndUser("post");
+            if (validationResult != null) return validationResult;
+
+            if (request?.Picks == null || !request.Picks.Any())
+            {
+                return BadRequest("A wave must contain at least one shipment pick.");
+            }
+
+            try
+            {
+                var waveId = await _shipmentService.SaveWavePicking(request.Picks, Request.Headers["API_KEY"].FirstOrDefault(), request.Description);
+                return Ok(new
+                {
+                    WaveId = waveId,
+                    Shipments = request.Picks.Select(p => p.ShipmentId).Distinct().Count()
+                });
+            }
+            catch (InvalidOperationException ex)
+            {
+                return BadRequest(ex.Message);
+            }
+            catch (KeyNotFoundException ex)
+            {
+                return NotFound(ex.Message);
+            }
+        }
+
+        [HttpPost("by-ids")]
+        public IActionResult GetShipmentsByIds([FromBody] List<int> ids)
+        {
+            return ShipmentsByIds(() => IdList.Distinct(ids));
+        }
+
+        // ?ids= on the list endpoint and POST by-ids: one primary-index lookup per id, returned
+        // in the order asked for. Ids that do not exist are left out.
+        private IActionResult ShipmentsByIds(Func<List<int>> ids)
+        {
+            var validationResult = ValidateApiKeyAndUser("single");
+            if (validationResult != null)
+            {
+                return validationResult;
+            }
+
+            List<int> requested;
+            try
+            {
+                requested = ids();
+            }
+            catch (InvalidOperationException ex)
+            {
+                return BadRequest(ex.Message);
+            }
+
+            // Keys limited to some warehouses only get the shipments of those warehouses'
+            // orders, as on the list.
+            var scope = AuthProvider.WarehouseScope(Request.Headers["API_KEY"].FirstOrDefault());
+            var found = _shipmentService.GetByIds(requested);
+            if (scope != null)
+            {
+                var orderIds = _orderService.GetAllForWarehouses(scope, includeArchived: true).Select(o => o.Id).ToHashSet();
+                found = found.Where(s => s.Order_Id?.Any(orderIds.Contains) == true).ToList();
+            }
+            if (!found.Any())
+            {
+                return NotFound("No shipments found.");
+            }
+            return Ok(found);
+        }
+
         [HttpGet]
-        public IActionResult GetShipments([FromQuery] int? pageNumber = null, [FromQuery] int? pageSize = null)
+        public async Task<IActionResult> GetShipments([FromQuery] int? pageNumber = null, [FromQuery] int? pageSize = null, [FromQuery(Name = "include_archived")] bool includeArchived = false)
         {
+            if (Request.Query.ContainsKey(IdList.Parameter))
+            {
+                return ShipmentsByIds(() => IdList.ParseInts(Request.Query[IdList.Parameter]));
+            }
+
             var validationResult = ValidateApiKeyAndUser("all");
             if (validationResult != null) return validationResult;
 
@@ -91,7 +171,46 @@ namespace Cargohub.controllers.v2
                 return BadRequest("Page number and page size must be greater than zero if provided.");
             }
 
-            var shipments = _shipmentService.GetAll(pageNumber, pageSize);
+            ListQuery query;
+            try
+            {
+                query = ListQuery.Parse<Shipment>(Request.Query);
+            }
+            catch (InvalidOperationException ex)
+            {
+                return BadRequest(ex.Message);
+            }
+
+            // Keys limited to some warehouses only read the shipments of those warehouses' orders.
+            var scope = AuthProvider.WarehouseScope(Request.Headers["API_KEY"].FirstOrDefault());
+            var orderIds = scope == null
+                ? null
+                : _orderService.GetAllForWarehouses(scope, includeArchived: true).Select(o => o.Id).ToList();
+
+            if (!query.IsEmpty)
+            {
+                var matches = _shipmentService.Find(query, orderIds, includeArchived);
+                if (!matches.Any())
+                {
+                    return NotFound("No shipments found.");
+                }
+
+                if (pageNumber.HasValue && pageSize.HasValue)
+                {
+                    return Ok(new
+                    {
+                        PageNumber = pageNumber,
+                        PageSize = pageSize,
+                        TotalRecords = matches.Count,
+                        Shipments = matches.Skip((pageNumber.Value - 1) * pageSize.Value).Take(pageSize.Value).ToList()
+                    });
+                }
+                return Ok(matches);
+            }
+
+            var shipments = orderIds == null
+                ? await _shipmentService.GetAllAsync(includeArchived, pageNumber, pageSize, HttpContext.RequestAborted)
+                : _shipmentService.GetAllForOrders(orderIds, includeArchived, pageNumber, pageSize);
 
             if (shipments == null || !shipments.Any())
             {
@@ -101,7 +220,9 @@ namespace Cargohub.controllers.v2
             // Include pagination metadata if pagination is applied
             if (pageNumber.HasValue && pageSize.HasValue)
             {
-                var totalRecords = _shipmentService.GetAll(null, null).Count;
+                var totalRecords = orderIds == null
+                    ? (await _shipmentService.GetAllAsync(includeArchived, cancellationToken: HttpContext.RequestAborted)).Count
+                    : _shipmentService.GetAllForOrders(orderIds, includeArchived).Count;
                 return Ok(new
                 {
                     PageNumber = pageNumber,
@@ -117,20 +238,24 @@ namespace Cargohub.controllers.v2
 
 
         [HttpGet("{id}")]
-        public IActionResult GetShipmentById(int id)
+        public async Task<IActionResult> GetShipmentById(int id)
         {
             var validationResult = ValidateApiKeyAndUser("single");
             if (validationResult != null) return validationResult;
 
             try
             {
-                var shipment = _shipmentService.GetById(id);
-                return Ok(shipment);
+                var shipment = await _shipmentService.GetByIdAsync(id, HttpContext.RequestAborted);
+                return Ok(_expansionService.Expand(shipment, Request.Query[ExpansionService.Parameter]));
             }
             catch (KeyNotFoundException ex)
             {
                 return NotFound(ex.Message);
             }
+            catch (InvalidOperationException ex)
+            {
+                return BadRequest(ex.Message);
+            }
         }
 
         [HttpPost]
@@ -144,7 +269,7 @@ namespace Cargohub.controllers.v2
                 return BadRequest("Shipment data is null.");
             }
 
-            await _shipmentService.Create(shipment);
+            await _shipmentService.CreateAsync(shipment, HttpContext.RequestAborted);
             return CreatedAtAction(nameof(GetShipmentById), new { id = shipment.Id }, shipment);
         }
 
@@ -161,7 +286,7 @@ namespace Cargohub.controllers.v2
 
             try
             {
-                await _shipmentService.Update(shipment);
+                await _shipmentService.UpdateAsync(shipment, HttpContext.RequestAborted);
                 return NoContent();
             }
             catch (KeyNotFoundException ex)
@@ -178,7 +303,7 @@ namespace Cargohub.controllers.v2
 
             try
             {
-                await _shipmentService.Delete(id);
+                await _shipmentService.DeleteAsync(id, HttpContext.RequestAborted);
                 return NoContent();
             }
             catch (KeyNotFoundException ex)
@@ -195,7 +320,7 @@ namespace Cargohub.controllers.v2
 
             try
             {
-                var shipment = _shipmentService.GetById(id);
+                var shipment = await _shipmentService.GetByIdAsync(id, HttpContext.RequestAborted);
                 return Ok(shipment.Items);
             }
             catch (KeyNotFoundException e)
@@ -213,9 +338,9 @@ namespace Cargohub.controllers.v2
 
             try
             {
-                var shipment = _shipmentService.GetById(id);
+                var shipment = EntityCopy.Shallow(await _shipmentService.GetByIdAsync(id, HttpContext.RequestAborted));
                 shipment.Items = shipmentBody.Items;
-                await _shipmentService.Update(shipment);
+                await _shipmentService.UpdateAsync(shipment, HttpContext.RequestAborted);
                 return NoContent();
             }
             catch (KeyNotFoundException e)
@@ -233,8 +358,12 @@ namespace Cargohub.controllers.v2
 
             try
             {
-                var shipment = _shipmentService.GetById(id);
-                var orders = shipment.Order_Id.Select(orderId => _orderService.GetById(orderId)).ToList();
+                var shipment = await _shipmentService.GetByIdAsync(id, HttpContext.RequestAborted);
+                var orders = new List<Order>();
+                foreach (var orderId in shipment.Order_Id)
+                {
+                    orders.Add(await _orderService.GetByIdAsync(orderId, HttpContext.RequestAborted));
+                }
                 return Ok(orders);
             }
             catch (KeyNotFoundException e)
@@ -253,11 +382,11 @@ namespace Cargohub.controllers.v2
             {
                 if (order == null) return BadRequest("order is missing");
 
-                var targetOrder = _orderService.GetById(order.Id);
-                var targetShipment = _shipmentService.GetById(id);
-                targetShipment.Order_Id.Add(targetOrder.Id);
+                var targetOrder = await _orderService.GetByIdAsync(order.Id, HttpContext.RequestAborted);
+                var targetShipment = EntityCopy.Shallow(await _shipmentService.GetByIdAsync(id, HttpContext.RequestAborted));
+                targetShipment.Order_Id = new List<int>(targetShipment.Order_Id) { targetOrder.Id };
                 targetShipment.Order_Date = targetOrder.Order_Date;
-                await _shipmentService.Update(targetShipment);
+                await _shipmentService.UpdateAsync(targetShipment, HttpContext.RequestAborted);
                 return NoContent();
             }
             catch (KeyNotFoundException e)
@@ -145,7 +145,7 @@ public async Task<IActionResult> ApproveAudit(string timestamp)
     // Save the updated inventories to the inventories.json file
     var inventories = _inventoryService.GetAll();
     var inventoriesFilePath = Path.Combine("data", "inventories.json");
-    await System.IO.File.WriteAllTextAsync(inventoriesFilePath, JsonConvert.SerializeObject(inventories, Formatting.Indented));
+    await JsonFileStore.WriteListAsync(inventoriesFilePath, inventories);
 
     return Ok("Audit approved and inventory updated.");
 }
@@ -14,9 +14,9 @@ namespace Cargohub.controllers.v2
     [ApiController]
     public class SupplierController : Controller
     {
-        private readonly ICrudService<Supplier, int> _supplierService;
+        private readonly SupplierService _supplierService;
 
-        public SupplierController(ICrudService<Supplier, int> supplierService)
+        public SupplierController(SupplierService supplierService)
         {
             _supplierService = supplierService;
         }
@@ -39,7 +39,8 @@ namespace Cargohub.controllers.v2
         }
 
         [HttpGet]
-        public IActionResult GetSuppliers([FromQuery] int? pageNumber = null, [FromQuery] int? pageSize = null)
+        [CompressedResponseCache<Supplier>("data/suppliers.json")]
+        public async Task<IActionResult> GetSuppliers([FromQuery] int? pageNumber = null, [FromQuery] int? pageSize = null)
         {
             var validationResult = ValidateApiKeyAndUser("all");
             if (validationResult != null)
@@ -52,14 +53,14 @@ namespace Cargohub.controllers.v2
                 return BadRequest("Page number and page size must be greater than zero if provided.");
             }
 
-            var suppliers = _supplierService.GetAll(pageNumber, pageSize);
+            var suppliers = await _supplierService.GetAllAsync(pageNumber, pageSize, HttpContext.RequestAborted);
 
             if (suppliers == null || !suppliers.Any())
             {
                 return NotFound();
             }
 
-            var totalRecords = _supplierService.GetAll(null, null).Count;
+            var totalRecords = (await _supplierService.GetAllAsync(cancellationToken: HttpContext.RequestAborted)).Count;
 
             if (pageNumber.HasValue && pageSize.HasValue)
             {
@@ -74,8 +75,46 @@ namespace Cargohub.controllers.v2
             return Ok(suppliers);
         }
 
+        [HttpGet("search")]
+        public IActionResult SearchSuppliers([FromQuery] string? q, [FromQuery] int? pageNumber = null, [FromQuery] int? pageSize = null)
+        {
+            var validationResult = ValidateApiKeyAndUser("all");
+            if (validationResult != null)
+            {
+                return validationResult;
+            }
+
+            if (string.IsNullOrWhiteSpace(q))
+            {
+                return BadRequest("Query parameter 'q' is required.");
+            }
+
+            if ((pageNumber.HasValue && pageNumber <= 0) || (pageSize.HasValue && pageSize <= 0))
+            {
+                return BadRequest("Page number and page size must be greater than zero if provided.");
+            }
+
+            var matches = _supplierService.Search(q);
+            if (!matches.Any())
+            {
+                return NotFound();
+            }
+
+            if (pageNumber.HasValue && pageSize.HasValue)
+            {
+                return Ok(new
+                {
+                    PageNumber = pageNumber,
+                    PageSize = pageSize,
+                    TotalRecords = matches.Count,
+                    Suppliers = matches.Skip((pageNumber.Value - 1) * pageSize.Value).Take(pageSize.Value).ToList()
+                });
+            }
+            return Ok(matches);
+        }
+
         [HttpGet("{id}")]
-        public IActionResult GetSupplierById(int id)
+        public async Task<IActionResult> GetSupplierById(int id)
         {
             var validationResult = ValidateApiKeyAndUser("single");
             if (validationResult != null)
@@ -85,7 +124,7 @@ namespace Cargohub.controllers.v2
 
             try
             {
-                var supplier = _supplierService.GetById(id);
+                var supplier = await _supplierService.GetByIdAsync(id, HttpContext.RequestAborted);
                 return Ok(supplier);
             }
             catch (KeyNotFoundException ex)
@@ -108,7 +147,7 @@ namespace Cargohub.controllers.v2
                 return BadRequest("Supplier data is null.");
             }
 
-            await _supplierService.Create(supplier);
+            await _supplierService.CreateAsync(supplier, HttpContext.RequestAborted);
             return CreatedAtAction(nameof(GetSupplierById), new { id = supplier.Id }, supplier);
         }
 
@@ -128,7 +167,7 @@ namespace Cargohub.controllers.v2
 
             try
             {
-                await _supplierService.Update(supplier);
+                await _supplierService.UpdateAsync(supplier, HttpContext.RequestAborted);
                 return NoContent();
             }
             catch (KeyNotFoundException ex)
@@ -148,7 +187,7 @@ namespace Cargohub.controllers.v2
 
             try
             {
-                await _supplierService.Delete(id);
+                await _supplierService.DeleteAsync(id, HttpContext.RequestAborted);
                 return NoContent();
             }
             catch (KeyNotFoundException ex)
@@ -168,7 +207,7 @@ namespace Cargohub.controllers.v2
 
             try
             {
-                var targetSupplier = _supplierService.GetById(id);
+                var targetSupplier = await _supplierService.GetByIdAsync(id, HttpContext.RequestAborted);
                 return Ok(targetSupplier);
             }
             catch (KeyNotFoundException e)
@@ -14,9 +14,9 @@ namespace Cargohub.controllers.v2
   [ApiController]
   public class TransferController : Controller
   {
-    private readonly ICrudService<Transfer, int> _transferService;
+    private readonly TransferService _transferService;
 
-    public TransferController(ICrudService<Transfer, int> transferService)
+    public TransferController(TransferService transferService)
     {
       _transferService = transferService;
     }
@@ -39,7 +39,7 @@ namespace Cargohub.controllers.v2
     }
 
     [HttpGet]
-    public IActionResult GetTransfers([FromQuery] int? pageNumber = null, [FromQuery] int? pageSize = null)
+    public async Task<IActionResult> GetTransfers([FromQuery] int? pageNumber = null, [FromQuery] int? pageSize = null)
     {
         var validationResult = ValidateApiKeyAndUser("all");
         if (validationResult != null)
@@ -53,7 +53,38 @@ namespace Cargohub.controllers.v2
             return BadRequest("Page number and page size must be greater than zero if provided.");
         }
 
-        var transfers = _transferService.GetAll(pageNumber, pageSize);
+        ListQuery query;
+        try
+        {
+            query = ListQuery.Parse<Transfer>(Request.Query);
+        }
+        catch (InvalidOperationException ex)
+        {
+            return BadRequest(ex.Message);
+        }
+
+        if (!query.IsEmpty)
+        {
+            var matches = _transferService.Find(query);
+            if (!matches.Any())
+            {
+                return NotFound("No transfers found.");
+            }
+
+            if (pageNumber.HasValue && pageSize.HasValue)
+            {
+                return Ok(new
+                {
+                    PageNumber = pageNumber,
+                    PageSize = pageSize,
+                    TotalRecords = matches.Count,
+                    Transfers = matches.Skip((pageNumber.Value - 1) * pageSize.Value).Take(pageSize.Value).ToList()
+                });
+            }
+            return Ok(matches);
+        }
+
+        var transfers = await _transferService.GetAllAsync(pageNumber, pageSize, HttpContext.RequestAborted);
 
         if (transfers == null || !transfers.Any())
         {
@@ -63,7 +94,7 @@ namespace Cargohub.controllers.v2
         // Include pagination metadata if pagination is applied
         if (pageNumber.HasValue && pageSize.HasValue)
         {
-            var totalRecords = _transferService.GetAll(null, null).Count;
+            var totalRecords = (await _transferService.GetAllAsync(cancellationToken: HttpContext.RequestAborted)).Count;
             return Ok(new
             {
                 PageNumber = pageNumber,
@@ -79,7 +110,7 @@ namespace Cargohub.controllers.v2
 
 
     [HttpGet("{id}")]
-    public IActionResult GetTransferById(int id)
+    public async Task<IActionResult> GetTransferById(int id)
     {
         var validationResult = ValidateApiKeyAndUser("single");
         if (validationResult != null)
@@ -89,7 +120,7 @@ namespace Cargohub.controllers.v2
 
         try
         {
-            var transfer = _transferService.GetById(id);
+            var transfer = await _transferService.GetByIdAsync(id, HttpContext.RequestAborted);
             return Ok(transfer);
         }
         catch (KeyNotFoundException ex)
@@ -109,7 +140,7 @@ namespace Cargohub.controllers.v2
 
         try
         {
-            var items = ((TransferService)_transferService).GetTransferItems(transfer_id);
+            var items = _transferService.GetTransferItems(transfer_id);
             if (items == null || !items.Any())
             {
                 return NotFound($"No items found for Transfer ID {transfer_id}");
@@ -137,7 +168,7 @@ namespace Cargohub.controllers.v2
             return BadRequest("Transfer data is null.");
         }
 
-        await _transferService.Create(transfer);
+        await _transferService.CreateAsync(transfer, HttpContext.RequestAborted);
         return CreatedAtAction(nameof(GetTransferById), new { id = transfer.Id }, transfer);
     }
 
@@ -157,7 +188,7 @@ namespace Cargohub.controllers.v2
 
         try
         {
-            await _transferService.Update(transfer);
+            await _transferService.UpdateAsync(transfer, HttpContext.RequestAborted);
             return NoContent();
         }
         catch (KeyNotFoundException ex)
@@ -177,7 +208,7 @@ namespace Cargohub.controllers.v2
 
         try
         {
-            await _transferService.Delete(id);
+            await _transferService.DeleteAsync(id, HttpContext.RequestAborted);
             return NoContent();
         }
         catch (KeyNotFoundException ex)
@@ -15,9 +15,11 @@ namespace Cargohub.controllers.v2
     public class WarehouseController : Controller
     {
         private readonly WarehouseService _warehouseService;
-        public WarehouseController(WarehouseService warehouseService)
+        private readonly ExpansionService _expansionService;
+        public WarehouseController(WarehouseService warehouseService, ExpansionService expansionService)
         {
             _warehouseService = warehouseService;
+            _expansionService = expansionService;
         }
 
         private IActionResult ValidateApiKeyAndUser(string permission)
@@ -59,14 +61,14 @@ namespace Cargohub.controllers.v2
         }
         
         [HttpGet]
-        public IActionResult GetWarehouses()
+        public async Task<IActionResult> GetWarehouses()
         {
             var validationResult = ValidateApiKeyAndUser("all");
             if (validationResult != null) return validationResult;
             
             var apiKey = Request.Headers["API_KEY"].FirstOrDefault();
             
-            var warehouses = _warehouseService.GetAll()
+            var warehouses = (await _warehouseService.GetAllAsync(cancellationToken: HttpContext.RequestAborted))
                 .Where(warehouse => AuthProvider.HasWarehouseAccess(apiKey, warehouse.Id))
                 .ToList();
 
@@ -74,7 +76,7 @@ namespace Cargohub.controllers.v2
         }
 
         [HttpGet("{id}")]
-        public IActionResult GetWarehouseById(int id)
+        public async Task<IActionResult> GetWarehouseById(int id)
         {
             var validationResult = ValidateApiKeyAndUser("single");
             if (validationResult != null) return validationResult;
@@ -87,13 +89,17 @@ namespace Cargohub.controllers.v2
 
             try
             {
-                var warehouse = _warehouseService.GetById(id);
-                return Ok(warehouse);
+                var warehouse = await _warehouseService.GetByIdAsync(id, HttpContext.RequestAborted);
+                return Ok(_expansionService.Expand(warehouse, Request.Query[ExpansionService.Parameter]));
             }
             catch (KeyNotFoundException ex)
             {
                 return NotFound(ex.Message);
             }
+            catch (InvalidOperationException ex)
+            {
+                return BadRequest(ex.Message);
+            }
         }
 
         [HttpPost]
@@ -107,7 +113,7 @@ namespace Cargohub.controllers.v2
                 return BadRequest("Warehouse data is null.");
             }
 
-            await _warehouseService.Create(warehouse);
+            await _warehouseService.CreateAsync(warehouse, HttpContext.RequestAborted);
             return CreatedAtAction(nameof(GetWarehouseById), new { id = warehouse.Id }, warehouse);
         }
 
@@ -124,7 +130,7 @@ namespace Cargohub.controllers.v2
 
             try
             {
-                await _warehouseService.Update(warehouse);
+                await _warehouseService.UpdateAsync(warehouse, HttpContext.RequestAborted);
                 return NoContent();
             }
             catch (KeyNotFoundException ex)
@@ -141,7 +147,7 @@ namespace Cargohub.controllers.v2
 
             try
             {
-                await _warehouseService.Delete(id);
+                await _warehouseService.DeleteAsync(id, HttpContext.RequestAborted);
                 return NoContent();
             }
             catch (KeyNotFoundException ex)
@@ -224,7 +230,7 @@ namespace Cargohub.controllers.v2
 
             try
             {
-                await _warehouseService.TransferItemBetweenWarehouses(sourceWarehouseId, destinationWarehouseId, transferRequest.ItemId, transferRequest.Quantity);
+                await _warehouseService.TransferItemBetweenWarehouses(sourceWarehouseId, destinationWarehouseId, transferRequest.ItemId, transferRequest.Quantity, HttpContext.RequestAborted);
                 return Ok("Transfer successful.");
             }
             catch (KeyNotFoundException ex)
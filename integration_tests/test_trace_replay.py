@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+
+from tools.trace_replay import load_workload, parse_timestamp, _apply_changes
+
+
+class TestTraceReplay(unittest.TestCase):
+
+    def setUp(self):
+        self.logs_dir = tempfile.mkdtemp()
+        self.write("picking_logs.log",
+                   "Timestamp=2024-12-17T13:41:37+01:00 | PerformedBy=a1b2c3d4e5 | ShipmentId=29 | "
+                   "Description=test | PickedItems=P009334:45, P009920:42\n"
+                   "Timestamp=2025-01-14T14:33:24.4474180+01:00 | PerformedBy=a1b2c3d4e5 | ShipmentId=5 | "
+                   "Description=string | PickedItems=P008440:32\n")
+        self.write("cross_docking_logs.log",
+                   "Timestamp=2024-12-17T12:41:38.000000Z | PerformedBy=joe | Operation=ReceiveShipment | "
+                   "Details={'ShipmentId': 1, 'Status': 'Transit'}\n")
+        self.write("inventory_audit.log",
+                   "Timestamp=2024-12-17T12:41:40Z | PerformedBy=a1b2c3d4e5 | Status=Live | "
+                   "AuditData={\"1\":{\"3211\":25}} | Discrepancies=[]\n")
+        self.write("user_changes.log",
+                   "Timestamp=2024-12-17T12:41:39Z | Action=Updated | PerformedBy=a1b2c3d4e5 | APIkey=admin12345 | "
+                   "Changes=App={'OldValue': 'Old', 'NewValue': 'New'}, "
+                   "EndpointAccess={'clients': {'All': {'OldValue': False, 'NewValue': True}}}\n"
+                   "{\n  \"Timestamp\": \"2024-12-17T12:41:41Z\",\n  \"Action\": \"Deactivated\",\n"
+                   "  \"PerformedBy\": \"a1b2c3d4e5\",\n  \"APIkey\": \"admin12345\",\n"
+                   "  \"Changes\": {\"DeletedUser\": {\"ApiKey\": \"admin12345\"}}\n}\n")
+
+    def write(self, name, content):
+        with open(os.path.join(self.logs_dir, name), "w", encoding="utf-8") as handle:
+            handle.write(content)
+
+    def test_parse_timestamp_with_seven_fractional_digits(self):
+        """.NET round-trip timestamps are normalised to UTC."""
+        parsed = parse_timestamp("2025-01-14T14:33:24.4474180+01:00")
+        self.assertEqual(parsed.hour, 13)
+        self.assertEqual(parsed.microsecond, 447418)
+
+    def test_workload_is_ordered_across_logs(self):
+        """Records from every log are merged in timestamp order."""
+        events = load_workload(self.logs_dir, max_gap=5)
+        self.assertEqual(
+            [event.path for event in events],
+            ["/shipments/29/pickinglist", "/cross-docking/receive", "/users/admin12345",
+             "/inventories/audit", "/users/admin12345/deactivate", "/shipments/5/pickinglist"])
+        self.assertEqual(events[0].body["pickedItems"], {"P009334": 45, "P009920": 42})
+        self.assertEqual(events[1].body, 1)
+        self.assertEqual(events[3].body, {"1": {"3211": 25}})
+
+    def test_offsets_keep_bursts_and_cap_idle_gaps(self):
+        """Gaps are divided by the speed, idle periods are capped by max_gap."""
+        events = load_workload(self.logs_dir, speed=2, max_gap=5)
+        self.assertEqual([event.offset for event in events], [0, 0.5, 1.0, 1.5, 2.0, 4.5])
+
+    def test_source_filter(self):
+        """Only the requested logs are replayed."""
+        events = load_workload(self.logs_dir, sources=["picking"])
+        self.assertEqual({event.source for event in events}, {"picking"})
+
+    def test_apply_user_changes(self):
+        """Logged user updates are re-applied on top of the current user."""
+        events = load_workload(self.logs_dir, sources=["user_changes"])
+        user = {"apiKey": "admin12345", "app": "Old", "endpointAccess": {"clients": {"all": False, "single": True}}}
+        updated = _apply_changes(user, events[0].changes)
+        self.assertEqual(updated["app"], "New")
+        self.assertEqual(updated["endpointAccess"]["clients"], {"all": True, "single": True})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,18 @@
+using System.Collections.Generic;
+using System.Threading;
+using System.Threading.Tasks;
+
+namespace Cargohub.interfaces
+{
+    // Non-blocking counterpart of ICrudService. Reads complete synchronously while the
+    // collection is cached, so they return ValueTask; every call stops waiting when the
+    // token is cancelled.
+    public interface IAsyncCrudService<TEntity, TKey>
+    {
+        ValueTask<List<TEntity>> GetAllAsync(int? pageNumber = null, int? pageSize = null, CancellationToken cancellationToken = default);
+        ValueTask<TEntity> GetByIdAsync(TKey id, CancellationToken cancellationToken = default);
+        Task CreateAsync(TEntity entity, CancellationToken cancellationToken = default);
+        Task UpdateAsync(TEntity entity, CancellationToken cancellationToken = default);
+        Task DeleteAsync(TKey id, CancellationToken cancellationToken = default);
+    }
+}
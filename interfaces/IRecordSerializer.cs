@@ -0,0 +1,14 @@
+using System.Collections.Generic;
+
+namespace Cargohub.interfaces
+{
+    // Turns the records of a collection into the UTF-8 bytes of its JSON data file and back.
+    // Every implementation writes the same bytes for the same records, so the files do not
+    // change when the implementation does.
+    public interface IRecordSerializer
+    {
+        string Name { get; }
+        byte[] SerializeList<T>(IEnumerable<T> records);
+        List<T> DeserializeList<T>(byte[] json);
+    }
+}
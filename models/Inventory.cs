@@ -9,7 +9,7 @@ namespace Cargohub.models
         public string Item_Id { get; set; }
         public string Description { get; set; }
         public string Item_Reference { get; set; }
-        public Dictionary<string, int> Locations {get;  set;}
+        public LocationQuantities Locations {get;  set;}
         public int Total_On_Hand { get; set; }
         public int Total_Expected { get; set; }
         public int Total_Ordered { get; set; }
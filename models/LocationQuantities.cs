@@ -0,0 +1,299 @@
+using System;
+using System.Collections;
+using System.Collections.Generic;
+using System.Globalization;
+
+namespace Cargohub.models
+{
+    /// <summary>
+    /// Quantity per location for an inventory. On the wire this is still an object keyed by
+    /// location id strings ({"69": 37}), but ids are kept as ints in a small array so the
+    /// hot loops can look locations up without parsing or formatting strings. Maps with
+    /// more than <see cref="IndexThreshold"/> locations get a position index. Keys that are
+    /// not canonical integers are kept as strings so they round-trip unchanged.
+    /// </summary>
+    public class LocationQuantities : IDictionary<string, int>
+    {
+        private const int IndexThreshold = 8;
+
+        private Entry[] _entries = Array.Empty<Entry>();
+        private int _count;
+        private Dictionary<int, int>? _positions;
+        private Dictionary<string, int>? _named;
+
+        public LocationQuantities()
+        {
+        }
+
+        public LocationQuantities(IEnumerable<KeyValuePair<string, int>> quantities)
+        {
+            foreach (var (key, quantity) in quantities)
+            {
+                this[key] = quantity;
+            }
+        }
+
+        public LocationQuantities Copy()
+        {
+            var copy = new LocationQuantities
+            {
+                _entries = _entries.AsSpan(0, _count).ToArray(),
+                _count = _count,
+                _named = _named == null ? null : new Dictionary<string, int>(_named)
+            };
+            copy.RebuildIndex();
+            return copy;
+        }
+
+        public static implicit operator LocationQuantities?(Dictionary<string, int>? quantities) =>
+            quantities == null ? null : new LocationQuantities(quantities);
+
+        public int Count => _count + (_named?.Count ?? 0);
+
+        public bool IsReadOnly => false;
+
+        /// <summary>
+        /// Location ids and quantities in insertion order, without string conversion.
+        /// </summary>
+        public IEnumerable<KeyValuePair<int, int>> ById
+        {
+            get
+            {
+                for (var i = 0; i < _count; i++)
+                {
+                    yield return new KeyValuePair<int, int>(_entries[i].LocationId, _entries[i].Quantity);
+                }
+            }
+        }
+
+        /// <summary>
+        /// Keys that are not location ids, e.g. "LocationA".
+        /// </summary>
+        public IEnumerable<string> NonNumericKeys => _named?.Keys ?? (IEnumerable<string>)Array.Empty<string>();
+
+        public int this[int locationId]
+        {
+            get => TryGetQuantity(locationId, out var quantity)
+                ? quantity
+                : throw new KeyNotFoundException($"Location {locationId} not found.");
+            set
+            {
+                var position = PositionOf(locationId);
+                if (position >= 0)
+                {
+                    _entries[position].Quantity = value;
+                    return;
+                }
+
+                if (_count == _entries.Length)
+                {
+                    Array.Resize(ref _entries, _count == 0 ? 4 : _count * 2);
+                }
+                _entries[_count] = new Entry { LocationId = locationId, Quantity = value };
+                _positions?.Add(locationId, _count);
+                _count++;
+
+                if (_positions == null && _count > IndexThreshold)
+                {
+                    RebuildIndex();
+                }
+            }
+        }
+
+        public int this[string key]
+        {
+            get
+            {
+                if (TryParseLocationId(key, out var locationId))
+                {
+                    return this[locationId];
+                }
+                return _named != null && _named.TryGetValue(key, out var quantity)
+                    ? quantity
+                    : throw new KeyNotFoundException($"Location {key} not found.");
+            }
+            set
+            {
+                if (TryParseLocationId(key, out var locationId))
+                {
+                    this[locationId] = value;
+                    return;
+                }
+                _named ??= new Dictionary<string, int>();
+                _named[key] = value;
+            }
+        }
+
+        public bool ContainsLocation(int locationId) => PositionOf(locationId) >= 0;
+
+        public bool TryGetQuantity(int locationId, out int quantity)
+        {
+            var position = PositionOf(locationId);
+            quantity = position >= 0 ? _entries[position].Quantity : 0;
+            return position >= 0;
+        }
+
+        public bool RemoveLocation(int locationId)
+        {
+            var position = PositionOf(locationId);
+            if (position < 0)
+            {
+                return false;
+            }
+
+            _count--;
+            Array.Copy(_entries, position + 1, _entries, position, _count - position);
+            _entries[_count] = default;
+            if (_positions != null)
+            {
+                RebuildIndex();
+            }
+            return true;
+        }
+
+        public ICollection<string> Keys
+        {
+            get
+            {
+                var keys = new List<string>(Count);
+                foreach (var entry in this)
+                {
+                    keys.Add(entry.Key);
+                }
+                return keys;
+            }
+        }
+
+        public ICollection<int> Values
+        {
+            get
+            {
+                var values = new List<int>(Count);
+                foreach (var entry in this)
+                {
+                    values.Add(entry.Value);
+                }
+                return values;
+            }
+        }
+
+        public void Add(string key, int value)
+        {
+            if (ContainsKey(key))
+            {
+                throw new ArgumentException($"Location {key} already exists.", nameof(key));
+            }
+            this[key] = value;
+        }
+
+        public void Add(KeyValuePair<string, int> item) => Add(item.Key, item.Value);
+
+        public bool ContainsKey(string key) => TryGetValue(key, out _);
+
+        public bool TryGetValue(string key, out int value)
+        {
+            if (TryParseLocationId(key, out var locationId))
+            {
+                return TryGetQuantity(locationId, out value);
+            }
+            value = 0;
+            return _named != null && _named.TryGetValue(key, out value);
+        }
+
+        public bool Remove(string key)
+        {
+            if (TryParseLocationId(key, out var locationId))
+            {
+                return RemoveLocation(locationId);
+            }
+            return _named != null && _named.Remove(key);
+        }
+
+        public bool Contains(KeyValuePair<string, int> item) =>
+            TryGetValue(item.Key, out var value) && value == item.Value;
+
+        public bool Remove(KeyValuePair<string, int> item) => Contains(item) && Remove(item.Key);
+
+        public void Clear()
+        {
+            _entries = Array.Empty<Entry>();
+            _count = 0;
+            _positions = null;
+            _named = null;
+        }
+
+        public void CopyTo(KeyValuePair<string, int>[] array, int arrayIndex)
+        {
+            foreach (var entry in this)
+            {
+                array[arrayIndex++] = entry;
+            }
+        }
+
+        public IEnumerator<KeyValuePair<string, int>> GetEnumerator()
+        {
+            for (var i = 0; i < _count; i++)
+            {
+                yield return new KeyValuePair<string, int>(_entries[i].LocationId.ToString(CultureInfo.InvariantCulture), _entries[i].Quantity);
+            }
+
+            if (_named != null)
+            {
+                foreach (var entry in _named)
+                {
+                    yield return entry;
+                }
+            }
+        }
+
+        IEnumerator IEnumerable.GetEnumerator() => GetEnumerator();
+
+        private int PositionOf(int locationId)
+        {
+            if (_positions != null)
+            {
+                return _positions.TryGetValue(locationId, out var position) ? position : -1;
+            }
+
+            for (var i = 0; i < _count; i++)
+            {
+                if (_entries[i].LocationId == locationId)
+                {
+                    return i;
+                }
+            }
+            return -1;
+        }
+
+        private void RebuildIndex()
+        {
+            if (_count <= IndexThreshold)
+            {
+                _positions = null;
+                return;
+            }
+
+            _positions = new Dictionary<int, int>(_count);
+            for (var i = 0; i < _count; i++)
+            {
+                _positions[_entries[i].LocationId] = i;
+            }
+        }
+
+        // Only canonical integers ("69", not "069" or "+69") become ids, so every key
+        // is written back exactly as it was read.
+        private static bool TryParseLocationId(string key, out int locationId)
+        {
+            locationId = 0;
+            return key.Length > 0
+                && (key.Length == 1 || key[0] != '0')
+                && int.TryParse(key, NumberStyles.None, CultureInfo.InvariantCulture, out locationId);
+        }
+
+        private struct Entry
+        {
+            public int LocationId;
+            public int Quantity;
+        }
+    }
+}
@@ -0,0 +1,11 @@
+public class WavePickingRequest
+    {
+        public List<ShipmentPicks> Picks { get; set; }
+        public string? Description { get; set; }
+    }
+
+public class ShipmentPicks
+    {
+        public int ShipmentId { get; set; }
+        public Dictionary<string, int> PickedItems { get; set; }
+    }
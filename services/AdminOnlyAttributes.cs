@@ -6,6 +6,7 @@ using System.IO;
 using System.Linq;
 using Newtonsoft.Json;
 using Cargohub.models;
+using Cargohub.services;
 
 public class AdminOnly : Attribute, IAsyncActionFilter
 {
@@ -21,8 +22,7 @@ public class AdminOnly : Attribute, IAsyncActionFilter
     {
         if (File.Exists(filePath))
         {
-            var jsonData = File.ReadAllText(filePath);
-            _users = JsonConvert.DeserializeObject<List<User>>(jsonData) ?? new List<User>();
+            _users = JsonFileStore.Serializer.DeserializeList<User>(File.ReadAllBytes(filePath));
         }
         else
         {
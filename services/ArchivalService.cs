@@ -0,0 +1,62 @@
+using System;
+using System.Collections.Generic;
+using System.IO;
+using System.Linq;
+using System.Threading;
+using System.Threading.Tasks;
+using Microsoft.Extensions.Hosting;
+
+namespace Cargohub.services
+{
+    /// <summary>
+    /// Moves delivered shipments and orders out of the hot collection files shortly after
+    /// start-up and then once an hour, see <see cref="ColdStorage"/>. Each run is logged to
+    /// logs/archive.log.
+    /// </summary>
+    public class ArchivalService : BackgroundService
+    {
+        private static readonly TimeSpan Interval = TimeSpan.FromHours(1);
+        private readonly ShipmentService _shipmentService;
+        private readonly OrderService _orderService;
+
+        public ArchivalService(ShipmentService shipmentService, OrderService orderService)
+        {
+            _shipmentService = shipmentService;
+            _orderService = orderService;
+        }
+
+        protected override async Task ExecuteAsync(CancellationToken stoppingToken)
+        {
+            using var timer = new PeriodicTimer(Interval);
+            do
+            {
+                var runs = new List<Func<ArchiveResult>> { _shipmentService.ArchiveCompleted, _orderService.ArchiveCompleted };
+                foreach (var run in runs)
+                {
+                    try
+                    {
+                        Log(run());
+                    }
+                    catch (Exception ex) when (ex is IOException || ex is UnauthorizedAccessException)
+                    {
+                        // The next run picks up whatever this one could not move.
+                        Console.WriteLine($"Archival failed: {ex.Message}");
+                    }
+                }
+            }
+            while (await timer.WaitForNextTickAsync(stoppingToken));
+        }
+
+        private static void Log(ArchiveResult result)
+        {
+            Directory.CreateDirectory("logs");
+            var logLine = $"Timestamp={DateTime.UtcNow:O} | Collection={result.Collection} | Archived={result.Archived} | Restored={result.Restored}";
+            if (result.Conflicts.Any())
+            {
+                logLine += $" | Conflicts={string.Join(",", result.Conflicts)}";
+                Console.WriteLine($"Archival of {result.Collection} skipped ids stored in both the hot and the archive file: {string.Join(", ", result.Conflicts)}");
+            }
+            File.AppendAllText(Path.Combine("logs", "archive.log"), logLine + Environment.NewLine);
+        }
+    }
+}
@@ -0,0 +1,127 @@
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using Cargohub.models;
+
+namespace Cargohub.services
+{
+    /// <summary>
+    /// Shipped amount per order and item, built in one pass over all shipments.
+    /// </summary>
+    public class ShippedTotalsIndex
+    {
+        private static readonly IReadOnlyDictionary<string, int> NothingShipped = new Dictionary<string, int>();
+        private readonly Dictionary<int, Dictionary<string, int>> _byOrder;
+        private readonly ShippedTotalsIndex? _including;
+
+        private ShippedTotalsIndex(Dictionary<int, Dictionary<string, int>> byOrder, ShippedTotalsIndex? including = null)
+        {
+            _byOrder = byOrder;
+            _including = including;
+        }
+
+        public static ShippedTotalsIndex Build(IEnumerable<Shipment> shipments)
+        {
+            var index = new ShippedTotalsIndex(new Dictionary<int, Dictionary<string, int>>());
+            foreach (var shipment in shipments)
+            {
+                if (shipment.Order_Id == null || shipment.Items == null)
+                {
+                    continue;
+                }
+
+                foreach (var orderId in shipment.Order_Id.Distinct())
+                {
+                    if (!index._byOrder.TryGetValue(orderId, out var shipped))
+                    {
+                        shipped = new Dictionary<string, int>();
+                        index._byOrder[orderId] = shipped;
+                    }
+
+                    foreach (var item in shipment.Items)
+                    {
+                        var itemId = item.Item_Id ?? string.Empty;
+                        shipped[itemId] = shipped.GetValueOrDefault(itemId) + item.Amount;
+                    }
+                }
+            }
+            return index;
+        }
+
+        /// <summary>
+        /// An index that adds the totals of <paramref name="other"/> (e.g. archived shipments)
+        /// to this one, without copying either.
+        /// </summary>
+        public ShippedTotalsIndex Including(ShippedTotalsIndex other) => new ShippedTotalsIndex(_byOrder, other);
+
+        public IReadOnlyDictionary<string, int> ForOrder(int orderId)
+        {
+            IReadOnlyDictionary<string, int> shipped = _byOrder.TryGetValue(orderId, out var own) ? own : NothingShipped;
+            if (_including == null)
+            {
+                return shipped;
+            }
+
+            var other = _including.ForOrder(orderId);
+            if (other.Count == 0 || shipped.Count == 0)
+            {
+                return other.Count == 0 ? shipped : other;
+            }
+
+            var total = new Dictionary<string, int>(shipped);
+            foreach (var (itemId, amount) in other)
+            {
+                total[itemId] = total.GetValueOrDefault(itemId) + amount;
+            }
+            return total;
+        }
+    }
+
+    public static class BackorderEngine
+    {
+        /// <summary>
+        /// Order lines that have not been fully shipped, with the amount still missing.
+        /// </summary>
+        public static List<ItemDetail> MissingItems(Order order, ShippedTotalsIndex shippedTotals)
+        {
+            var shipped = shippedTotals.ForOrder(order.Id);
+            var missingItems = new List<ItemDetail>();
+
+            foreach (var item in order.Items ?? new List<ItemDetail>())
+            {
+                var totalShippedAmount = shipped.GetValueOrDefault(item.Item_Id ?? string.Empty);
+                if (totalShippedAmount < item.Amount)
+                {
+                    missingItems.Add(new ItemDetail
+                    {
+                        Item_Id = item.Item_Id,
+                        Amount = item.Amount - totalShippedAmount,
+                        CrossDockingStatus = null
+                    });
+                }
+            }
+
+            return missingItems;
+        }
+
+        /// <summary>
+        /// Marks the order as backordered and moves the missing lines from Items to ShipmentDetails.
+        /// </summary>
+        public static void ApplyBackorder(Order order, List<ItemDetail> missingItems)
+        {
+            var missingIds = missingItems.Select(mi => mi.Item_Id).ToHashSet();
+
+            order.IsBackordered = true;
+            order.ShipmentDetails = missingItems;
+
+            // Remove the missing items from the order's Items list to avoid duplicates
+            order.Items = (order.Items ?? new List<ItemDetail>()).Where(item => !missingIds.Contains(item.Item_Id)).ToList();
+        }
+    }
+
+    public class BackorderRecomputeSummary
+    {
+        public int OrdersProcessed { get; set; }
+        public int OrdersBackordered { get; set; }
+    }
+}
@@ -0,0 +1,380 @@
+using System;
+using System.Collections.Generic;
+using System.IO;
+using System.Linq;
+using System.Reflection;
+using System.Text;
+using System.Text.Json;
+using System.Threading;
+using System.Threading.Tasks;
+using Cargohub.interfaces;
+using Cargohub.models;
+
+namespace Cargohub.services
+{
+    /// <summary>
+    /// Imports items, inventories and locations from NDJSON or CSV (the formats of the export
+    /// endpoints). The input is read in batches of <see cref="BatchSize"/> rows; each batch is
+    /// parsed and validated in parallel and its valid rows are added in one write. Foreign keys
+    /// are checked against lookup sets built once per import instead of a read per row. Rows
+    /// that fail are skipped and listed in the returned report.
+    /// </summary>
+    public class BulkImportService
+    {
+        public const int BatchSize = 5000;
+
+        private readonly ItemService _itemService;
+        private readonly InventoryService _inventoryService;
+        private readonly ICrudService<Location, int> _locationService;
+        private readonly ICrudService<Warehouse, int> _warehouseService;
+        private readonly ICrudService<ItemLine, int> _itemLineService;
+        private readonly ICrudService<ItemGroup, int> _itemGroupService;
+        private readonly ICrudService<ItemType, int> _itemTypeService;
+        private readonly ICrudService<Supplier, int> _supplierService;
+        private readonly ICrudService<Classifications, int> _classificationsService;
+
+        public BulkImportService(ItemService itemService, InventoryService inventoryService, ICrudService<Location, int> locationService, ICrudService<Warehouse, int> warehouseService, ICrudService<ItemLine, int> itemLineService, ICrudService<ItemGroup, int> itemGroupService, ICrudService<ItemType, int> itemTypeService, ICrudService<Supplier, int> supplierService, ICrudService<Classifications, int> classificationsService)
+        {
+            _itemService = itemService;
+            _inventoryService = inventoryService;
+            _locationService = locationService;
+            _warehouseService = warehouseService;
+            _itemLineService = itemLineService;
+            _itemGroupService = itemGroupService;
+            _itemTypeService = itemTypeService;
+            _supplierService = supplierService;
+            _classificationsService = classificationsService;
+        }
+
+        public async Task<ImportReport> ImportItems(Stream input, string format, JsonSerializerOptions options, CancellationToken cancellationToken)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            var uids = _itemService.GetAll().Select(i => i.Uid).ToHashSet();
+            var itemLines = _itemLineService.GetAll().Select(l => l.Id).ToHashSet();
+            var itemGroups = _itemGroupService.GetAll().Select(g => g.Id).ToHashSet();
+            var itemTypes = _itemTypeService.GetAll().Select(t => t.Id).ToHashSet();
+            var suppliers = _supplierService.GetAll().Select(s => s.Id).ToHashSet();
+            var classifications = _classificationsService.GetAll().Select(c => c.Id).ToHashSet();
+
+            var validate = ItemValidator(itemLines, itemGroups, itemTypes, suppliers, classifications);
+            return await Import<Item>(input, format, options, validate, UidClaim(uids), _itemService.CreateMany, cancellationToken);
+        }
+
+        /// <summary>
+        /// Checks an item's references against the ids that exist; a reference of 0 means the
+        /// field was not set.
+        /// </summary>
+        internal static Func<Item, string?> ItemValidator(ISet<int> itemLines, ISet<int> itemGroups, ISet<int> itemTypes, ISet<int> suppliers, ISet<int> classifications)
+        {
+            return item =>
+            {
+                if (string.IsNullOrWhiteSpace(item.Uid))
+                    return "Uid is required.";
+                if (item.ItemLine != 0 && !itemLines.Contains(item.ItemLine))
+                    return $"Item line {item.ItemLine} not found.";
+                if (item.ItemGroup != 0 && !itemGroups.Contains(item.ItemGroup))
+                    return $"Item group {item.ItemGroup} not found.";
+                if (item.ItemType != 0 && !itemTypes.Contains(item.ItemType))
+                    return $"Item type {item.ItemType} not found.";
+                if (item.SupplierId != 0 && !suppliers.Contains(item.SupplierId))
+                    return $"Supplier {item.SupplierId} not found.";
+                var unknownClassification = item.Classifications_Id?.FirstOrDefault(id => !classifications.Contains(id));
+                if (unknownClassification is int classificationId && classificationId != 0)
+                    return $"Classification {classificationId} not found.";
+                return null;
+            };
+        }
+
+        /// <summary>
+        /// Claims each Uid for the first row that uses it. Claims run in row order, so of two
+        /// rows with the same Uid the first wins, as does an item that already exists.
+        /// </summary>
+        internal static Func<Item, string?> UidClaim(HashSet<string> uids)
+        {
+            return item => uids.Add(item.Uid) ? null : $"Item with UID {item.Uid} already exists.";
+        }
+
+        public async Task<ImportReport> ImportInventories(Stream input, string format, JsonSerializerOptions options, CancellationToken cancellationToken)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            var rules = ((WarehouseService)_warehouseService).StorageRules();
+            var items = _itemService.GetAll()
+                .Where(i => i.Uid != null)
+                .GroupBy(i => i.Uid)
+                .ToDictionary(g => g.Key, g => g.First());
+
+            return await Import<Inventory>(input, format, options, InventoryValidator(items, rules), _ => null, _inventoryService.CreateMany, cancellationToken);
+        }
+
+        /// <summary>
+        /// Checks that an inventory's item and locations exist and that a hazardous item is only
+        /// stored in warehouses that accept it.
+        /// </summary>
+        internal static Func<Inventory, string?> InventoryValidator(IReadOnlyDictionary<string, Item> items, StorageRules rules)
+        {
+            return inventory =>
+            {
+                if (inventory.Item_Id == null || !items.TryGetValue(inventory.Item_Id, out var item))
+                    return "Item not found";
+                if (inventory.Locations == null)
+                    return null;
+
+                var invalidKey = inventory.Locations.NonNumericKeys.FirstOrDefault();
+                if (invalidKey != null)
+                    return $"Invalid location type key: {invalidKey}. Keys must integers.";
+
+                var itemIsHazardous = rules.IsHazardous(item);
+                foreach (var (locationId, _) in inventory.Locations.ById)
+                {
+                    if (!rules.TryGetWarehouse(locationId, out var warehouseId))
+                        return $"Location {locationId} not found";
+                    if (rules.AcceptsHazardous(warehouseId) is not bool acceptsHazardous)
+                        return $"Warehouse {warehouseId} not found";
+                    if (itemIsHazardous && !acceptsHazardous)
+                        return $"Warehouse {warehouseId} is non-hazardous";
+                }
+                return null;
+            };
+        }
+
+        public async Task<ImportReport> ImportLocations(Stream input, string format, JsonSerializerOptions options, CancellationToken cancellationToken)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            var warehouses = _warehouseService.GetAll().Select(w => w.Id).ToHashSet();
+
+            string? Validate(Location location) =>
+                warehouses.Contains(location.Warehouse_Id) ? null : $"Warehouse {location.Warehouse_Id} not found.";
+
+            return await Import<Location>(input, format, options, Validate, _ => null, ((LocationsService)_locationService).CreateMany, cancellationToken);
+        }
+
+        /// <summary>
+        /// Reads, validates and commits the rows of <paramref name="input"/> batch by batch.
+        /// <paramref name="claim"/> runs after validation, one row at a time in row order.
+        /// </summary>
+        internal static async Task<ImportReport> Import<T>(
+            Stream input,
+            string format,
+            JsonSerializerOptions options,
+            Func<T, string?> validate,
+            Func<T, string?> claim,
+            Action<IReadOnlyList<T>> commit,
+            CancellationToken cancellationToken) where T : class
+        {
+            var report = new ImportReport();
+            using var reader = new StreamReader(input, Encoding.UTF8);
+            var parse = format == "csv"
+                ? await CsvRowParser<T>.Create(reader, options)
+                : (Func<string, T?>)(line => JsonSerializer.Deserialize<T>(line, options));
+
+            var batch = new List<(int Row, string Text)>(BatchSize);
+            await foreach (var row in ReadRows(reader, format, cancellationToken))
+            {
+                batch.Add(row);
+                if (batch.Count == BatchSize)
+                {
+                    ImportBatch(batch, parse, validate, claim, commit, report);
+                    batch.Clear();
+                }
+            }
+            ImportBatch(batch, parse, validate, claim, commit, report);
+
+            return report;
+        }
+
+        private static void ImportBatch<T>(
+            List<(int Row, string Text)> batch,
+            Func<string, T?> parse,
+            Func<T, string?> validate,
+            Func<T, string?> claim,
+            Action<IReadOnlyList<T>> commit,
+            ImportReport report) where T : class
+        {
+            if (batch.Count == 0)
+            {
+                return;
+            }
+
+            var results = batch
+                .AsParallel()
+                .AsOrdered()
+                .Select(row =>
+                {
+                    try
+                    {
+                        var record = parse(row.Text);
+                        return (row.Row, Record: record, Error: record == null ? "Empty record." : validate(record));
+                    }
+                    catch (Exception ex) when (ex is JsonException || ex is FormatException || ex is InvalidOperationException)
+                    {
+                        return (row.Row, Record: (T?)null, Error: ex.Message);
+                    }
+                })
+                .ToList();
+
+            var accepted = new List<T>(results.Count);
+            foreach (var (row, record, error) in results)
+            {
+                var rejection = error ?? claim(record!);
+                if (rejection != null)
+                {
+                    report.Errors.Add(new ImportRowError { Row = row, Message = rejection });
+                    continue;
+                }
+                accepted.Add(record!);
+            }
+
+            report.Received += batch.Count;
+            if (accepted.Count > 0)
+            {
+                commit(accepted);
+                report.Imported += accepted.Count;
+            }
+        }
+
+        // One NDJSON line or one CSV record per row, numbered by the line it starts on. CSV
+        // records continue over line breaks inside quoted fields.
+        private static async IAsyncEnumerable<(int Row, string Text)> ReadRows(
+            StreamReader reader, string format, [System.Runtime.CompilerServices.EnumeratorCancellation] CancellationToken cancellationToken)
+        {
+            var lineNumber = format == "csv" ? 1 : 0; // The CSV header is line 1.
+            string? line;
+            while ((line = await reader.ReadLineAsync(cancellationToken)) != null)
+            {
+                lineNumber++;
+                var row = lineNumber;
+                if (format == "csv")
+                {
+                    while (line.Count(c => c == '"') % 2 == 1
+                        && await reader.ReadLineAsync(cancellationToken) is string continuation)
+                    {
+                        lineNumber++;
+                        line += "\n" + continuation;
+                    }
+                }
+
+                if (!string.IsNullOrWhiteSpace(line))
+                {
+                    yield return (row, line);
+                }
+            }
+        }
+
+        /// <summary>
+        /// Turns CSV records into <typeparamref name="T"/>. Header names are matched to
+        /// properties ignoring case and underscores; each record is rewritten as a JSON object
+        /// so values are read exactly like a POST body. Lists and other nested values are
+        /// expected as JSON inside the cell.
+        /// </summary>
+        private static class CsvRowParser<T>
+        {
+            public static async Task<Func<string, T?>> Create(StreamReader reader, JsonSerializerOptions options)
+            {
+                var header = await reader.ReadLineAsync() ?? string.Empty;
+                var properties = typeof(T).GetProperties(BindingFlags.Public | BindingFlags.Instance)
+                    .ToDictionary(p => Normalize(p.Name));
+                var columns = SplitRecord(header)
+                    .Select(name => properties.TryGetValue(Normalize(name), out var property)
+                        ? property
+                        : throw new InvalidOperationException($"Unknown column '{name}'."))
+                    .ToArray();
+                var names = columns.Select(p => options.PropertyNamingPolicy?.ConvertName(p.Name) ?? p.Name).ToArray();
+
+                return text =>
+                {
+                    var cells = SplitRecord(text);
+                    if (cells.Count != columns.Length)
+                    {
+                        throw new FormatException($"Expected {columns.Length} columns but found {cells.Count}.");
+                    }
+
+                    var buffer = new System.Buffers.ArrayBufferWriter<byte>();
+                    using (var writer = new Utf8JsonWriter(buffer))
+                    {
+                        writer.WriteStartObject();
+                        for (var i = 0; i < columns.Length; i++)
+                        {
+                            var type = Nullable.GetUnderlyingType(columns[i].PropertyType) ?? columns[i].PropertyType;
+                            if (type == typeof(string))
+                            {
+                                writer.WriteString(names[i], cells[i]);
+                            }
+                            else if (cells[i].Length == 0)
+                            {
+                                continue;
+                            }
+                            else if (type == typeof(DateTime))
+                            {
+                                writer.WriteString(names[i], cells[i]);
+                            }
+                            else
+                            {
+                                writer.WritePropertyName(names[i]);
+                                writer.WriteRawValue(cells[i]);
+                            }
+                        }
+                        writer.WriteEndObject();
+                    }
+                    return JsonSerializer.Deserialize<T>(buffer.WrittenSpan, options);
+                };
+            }
+
+            private static List<string> SplitRecord(string record)
+            {
+                var cells = new List<string>();
+                var cell = new StringBuilder();
+                var quoted = false;
+                for (var i = 0; i < record.Length; i++)
+                {
+                    var c = record[i];
+                    if (quoted)
+                    {
+                        if (c == '"' && i + 1 < record.Length && record[i + 1] == '"')
+                        {
+                            cell.Append('"');
+                            i++;
+                        }
+                        else if (c == '"')
+                        {
+                            quoted = false;
+                        }
+                        else
+                        {
+                            cell.Append(c);
+                        }
+                    }
+                    else if (c == '"')
+                    {
+                        quoted = true;
+                    }
+                    else if (c == ',')
+                    {
+                        cells.Add(cell.ToString());
+                        cell.Clear();
+                    }
+                    else if (c != '\r')
+                    {
+                        cell.Append(c);
+                    }
+                }
+                cells.Add(cell.ToString());
+                return cells;
+            }
+
+            private static string Normalize(string name) => name.Trim().Replace("_", string.Empty).ToLowerInvariant();
+        }
+    }
+
+    public class ImportReport
+    {
+        public int Received { get; set; }
+        public int Imported { get; set; }
+        public List<ImportRowError> Errors { get; set; } = new();
+    }
+
+    public class ImportRowError
+    {
+        public int Row { get; set; }
+        public string Message { get; set; } = string.Empty;
+    }
+}
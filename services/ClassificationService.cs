@@ -8,53 +8,58 @@ namespace Cargohub.services
     {
         private readonly string jsonFilePath = "data/classifications.json";
 
-        public async Task Create(Classifications entity)
+        public Task Create(Classifications entity)
         {
-            var classifications = GetAll() ?? new List<Classifications>();
-
-            entity.Id = classifications.Any() ? classifications.Max(w => w.Id) + 1 : 1;
-            entity.Created_At = DateTime.Now;
-            entity.Updated_At = DateTime.Now;
+            using var trace = RequestProfiler.ServiceCall();
+            JsonFileStore.Update<Classifications>(jsonFilePath, classifications =>
+            {
+                entity.Id = IdSequence.Next(jsonFilePath, classifications, w => w.Id);
+                entity.Created_At = DateTime.Now;
+                entity.Updated_At = DateTime.Now;
 
-            classifications.Add(entity);
-            await SaveToFile(jsonFilePath, classifications);
+                return classifications.Add(entity);
+            });
+            return Task.CompletedTask;
         }
 
-        public async Task Delete(int Id)
+        public Task Delete(int Id)
         {
-            var Classificationss = GetAll() ?? new List<Classifications>();
-            var Classifications = Classificationss.FirstOrDefault(c => c.Id == Id) ?? throw new KeyNotFoundException($"Classifications with Id {Id} not found.");
-            Classificationss.Remove(Classifications);
-            await SaveToFile(jsonFilePath, Classificationss);
+            using var trace = RequestProfiler.ServiceCall();
+            JsonFileStore.Update<Classifications>(jsonFilePath, Classificationss =>
+            {
+                var Classifications = Classificationss.FirstOrDefault(c => c.Id == Id) ?? throw new KeyNotFoundException($"Classifications with Id {Id} not found.");
+                return Classificationss.Remove(Classifications);
+            });
+            return Task.CompletedTask;
         }
 
         public List<Classifications> GetAll(int? pageNumber = null, int? pageSize = null)
         {
+            using var trace = RequestProfiler.ServiceCall();
             if (!File.Exists(jsonFilePath))
             {
                 return new List<Classifications>();
             }
 
-            var jsonData = File.ReadAllText(jsonFilePath);
-            var classifications = JsonConvert.DeserializeObject<List<Classifications>>(jsonData) ?? new List<Classifications>();
+            var classifications = JsonFileStore.Snapshot<Classifications>(jsonFilePath);
 
             // Apply pagination only if pageNumber and pageSize are provided and valid
             if (pageNumber.HasValue && pageSize.HasValue && pageNumber > 0 && pageSize > 0)
             {
-                classifications = classifications
+                return classifications
                     .Skip((pageNumber.Value - 1) * pageSize.Value)
                     .Take(pageSize.Value)
                     .ToList();
             }
 
-            return classifications;
+            return classifications.ToList();
         }
 
 
         public Classifications GetById(int Id)
         {
-            var classifications = GetAll();
-            var classification = classifications.FirstOrDefault(c => c.Id == Id);
+            using var trace = RequestProfiler.ServiceCall();
+            var classification = JsonFileStore.FindById<Classifications, int>(jsonFilePath, c => c.Id, Id);
 
             if (classification == null)
             {
@@ -64,26 +69,25 @@ namespace Cargohub.services
             return classification;
         }
 
-        public async Task Update(Classifications entity)
+        public Task Update(Classifications entity)
         {
-            var Classificationss = GetAll() ?? new List<Classifications>();
-            var existingClassifications = Classificationss.FirstOrDefault(c => c.Id == entity.Id);
-
-            if (existingClassifications == null)
+            using var trace = RequestProfiler.ServiceCall();
+            JsonFileStore.Update<Classifications>(jsonFilePath, Classificationss =>
             {
-                throw new KeyNotFoundException($"Classifications with Id {entity.Id} not found.");
-            }
+                var existingClassifications = Classificationss.FirstOrDefault(c => c.Id == entity.Id);
 
-            existingClassifications.Name = entity.Name;
-            existingClassifications.Updated_At = DateTime.Now;
+                if (existingClassifications == null)
+                {
+                    throw new KeyNotFoundException($"Classifications with Id {entity.Id} not found.");
+                }
 
-            await SaveToFile(jsonFilePath, Classificationss);
-        }
+                var updated = EntityCopy.Shallow(existingClassifications);
+                updated.Name = entity.Name;
+                updated.Updated_At = DateTime.Now;
 
-        private async Task SaveToFile<T>(string filePath, List<T> data)
-        {
-            var jsonData = JsonConvert.SerializeObject(data, Formatting.Indented);
-            await File.WriteAllTextAsync(filePath, jsonData);
+                return Classificationss.Replace(existingClassifications, updated);
+            });
+            return Task.CompletedTask;
         }
     }
 }
\ No newline at end of file
@@ -2,6 +2,7 @@ using System;
 using System.Collections.Generic;
 using System.IO;
 using System.Linq;
+using System.Threading;
 using System.Threading.Tasks;
 using Cargohub.interfaces;
 using Cargohub.models;
@@ -9,65 +10,74 @@ using Newtonsoft.Json;
 
 namespace Cargohub.services
 {
-    public class ClientsService : ICrudService<Client, int>
+    public class ClientsService : ICrudService<Client, int>, IAsyncCrudService<Client, int>
     {
         private readonly string jsonFilePath = "data/clients.json";
 
-        public Task Create(Client entity)
-        {
-            var clients = GetAll() ?? new List<Client>();
+        public Task Create(Client entity) => CreateAsync(entity);
 
-            // Find the next available ID
-            var nextId = clients.Any() ? clients.Max(c => c.Id) + 1 : 1;
-            entity.Id = nextId;
+        public async Task CreateAsync(Client entity, CancellationToken cancellationToken = default)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            await JsonFileStore.UpdateAsync<Client>(jsonFilePath, clients =>
+            {
+                // Find the next available ID
+                var nextId = IdSequence.Next(jsonFilePath, clients, c => c.Id);
+                entity.Id = nextId;
 
-            clients.Add(entity);
-            SaveToFile(clients);
-            return Task.CompletedTask;
+                return clients.Add(entity);
+            }, cancellationToken);
         }
 
-        public Task Delete(int id)
-        {
-            var clients = GetAll() ?? new List<Client>();
-            var client = clients.FirstOrDefault(c => c.Id == id);
+        public Task Delete(int id) => DeleteAsync(id);
 
-            if (client == null)
+        public async Task DeleteAsync(int id, CancellationToken cancellationToken = default)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            await JsonFileStore.UpdateAsync<Client>(jsonFilePath, clients =>
             {
-                throw new KeyNotFoundException($"Client with ID {id} not found.");
-            }
+                var client = clients.FirstOrDefault(c => c.Id == id);
+
+                if (client == null)
+                {
+                    throw new KeyNotFoundException($"Client with ID {id} not found.");
+                }
 
-            clients.Remove(client);
-            SaveToFile(clients);
-            return Task.CompletedTask;
+                return clients.Remove(client);
+            }, cancellationToken);
         }
 
         public List<Client> GetAll(int? pageNumber = null, int? pageSize = null)
         {
-            if (!File.Exists(jsonFilePath))
-            {
-                return new List<Client>();
-            }
+            using var trace = RequestProfiler.ServiceCall();
+            return Page(JsonFileStore.Snapshot<Client>(jsonFilePath), pageNumber, pageSize);
+        }
 
-            var jsonData = File.ReadAllText(jsonFilePath);
-            var clients = JsonConvert.DeserializeObject<List<Client>>(jsonData) ?? new List<Client>();
+        public async ValueTask<List<Client>> GetAllAsync(int? pageNumber = null, int? pageSize = null, CancellationToken cancellationToken = default)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            return Page(await JsonFileStore.SnapshotAsync<Client>(jsonFilePath, cancellationToken), pageNumber, pageSize);
+        }
 
+        private static List<Client> Page(IReadOnlyList<Client> clients, int? pageNumber, int? pageSize)
+        {
             // Apply pagination only if pageNumber and pageSize are provided and valid
             if (pageNumber.HasValue && pageSize.HasValue && pageNumber > 0 && pageSize > 0)
             {
-                clients = clients
+                return clients
                     .Skip((pageNumber.Value - 1) * pageSize.Value)
                     .Take(pageSize.Value)
                     .ToList();
             }
 
-            return clients;
+            return clients.ToList();
         }
 
 
         public Client GetById(int id)
         {
-            var clients = GetAll();
-            var client = clients.FirstOrDefault(c => c.Id == id);
+            using var trace = RequestProfiler.ServiceCall();
+            var client = JsonFileStore.FindById<Client, int>(jsonFilePath, c => c.Id, id);
 
             if (client == null)
             {
@@ -77,39 +87,43 @@ namespace Cargohub.services
             return client;
         }
 
-        public Task Update(Client entity)
+        public async ValueTask<Client> GetByIdAsync(int id, CancellationToken cancellationToken = default)
         {
-            var clients = GetAll() ?? new List<Client>();
-            var client = clients.FirstOrDefault(c => c.Id == entity.Id);
-
-            if (client == null)
-            {
-                throw new KeyNotFoundException($"Client with ID {entity.Id} not found.");
-            }
-
-            client.Name = entity.Name;
-            client.Address = entity.Address;
-            client.City = entity.City;
-            client.Zip_Code = entity.Zip_Code;
-            client.Province = entity.Province;
-            client.Country = entity.Country;
-            client.Contact_Name = entity.Contact_Name;
-            client.Contact_Phone = entity.Contact_Phone;
-            client.Contact_Email = entity.Contact_Email;
-            client.Created_At = entity.Created_At;
-            client.Updated_At = DateTime.Now;
-
-
-
-
-            SaveToFile(clients);
-            return Task.CompletedTask;
+            using var trace = RequestProfiler.ServiceCall();
+            return await JsonFileStore.FindByIdAsync<Client, int>(jsonFilePath, c => c.Id, id, cancellationToken)
+                ?? throw new KeyNotFoundException($"Client with ID {id} not found.");
         }
 
-        private void SaveToFile(List<Client> clients)
+        public Task Update(Client entity) => UpdateAsync(entity);
+
+        public async Task UpdateAsync(Client entity, CancellationToken cancellationToken = default)
         {
-            var jsonData = JsonConvert.SerializeObject(clients, Formatting.Indented);
-            File.WriteAllText(jsonFilePath, jsonData);
+            using var trace = RequestProfiler.ServiceCall();
+            await JsonFileStore.UpdateAsync<Client>(jsonFilePath, clients =>
+            {
+                var client = clients.FirstOrDefault(c => c.Id == entity.Id);
+
+                if (client == null)
+                {
+                    throw new KeyNotFoundException($"Client with ID {entity.Id} not found.");
+                }
+
+                var updated = EntityCopy.Shallow(client);
+
+                updated.Name = entity.Name;
+                updated.Address = entity.Address;
+                updated.City = entity.City;
+                updated.Zip_Code = entity.Zip_Code;
+                updated.Province = entity.Province;
+                updated.Country = entity.Country;
+                updated.Contact_Name = entity.Contact_Name;
+                updated.Contact_Phone = entity.Contact_Phone;
+                updated.Contact_Email = entity.Contact_Email;
+                updated.Created_At = entity.Created_At;
+                updated.Updated_At = DateTime.Now;
+
+                return clients.Replace(client, updated);
+            }, cancellationToken);
         }
     }
 }
\ No newline at end of file
@@ -0,0 +1,169 @@
+using System;
+using System.Collections.Generic;
+using System.Collections.Immutable;
+using System.IO;
+using System.Linq;
+using System.Threading;
+using System.Threading.Tasks;
+
+namespace Cargohub.services
+{
+    /// <summary>
+    /// Keeps records that have reached a terminal state (delivered shipments, closed orders)
+    /// out of the hot collection file that every request parses and scans. They are moved to
+    /// a cold partition with the same file name under data/archive/, which is only read when
+    /// a record is not found in the hot file or a caller asks for archived records.
+    /// </summary>
+    public static class ColdStorage
+    {
+        private const string ArchiveDirectory = "archive";
+
+        public static string PathFor(string hotPath)
+        {
+            return Path.Combine(Path.GetDirectoryName(hotPath) ?? string.Empty, ArchiveDirectory, Path.GetFileName(hotPath));
+        }
+
+        /// <summary>
+        /// Looks the record up in the hot file first and in the cold partition after that.
+        /// </summary>
+        public static T? FindById<T, TKey>(string hotPath, Func<T, TKey> keySelector, TKey id) where TKey : notnull
+        {
+            return JsonFileStore.FindById(hotPath, keySelector, id) ?? JsonFileStore.FindById(PathFor(hotPath), keySelector, id);
+        }
+
+        public static async ValueTask<T?> FindByIdAsync<T, TKey>(string hotPath, Func<T, TKey> keySelector, TKey id, CancellationToken cancellationToken = default) where TKey : notnull
+        {
+            return await JsonFileStore.FindByIdAsync(hotPath, keySelector, id, cancellationToken)
+                ?? await JsonFileStore.FindByIdAsync(PathFor(hotPath), keySelector, id, cancellationToken);
+        }
+
+        /// <summary>
+        /// The file a write for this record should go to: the cold partition when the record
+        /// only exists there, otherwise the hot file.
+        /// </summary>
+        public static string PathContaining<T, TKey>(string hotPath, Func<T, TKey> keySelector, TKey id) where TKey : notnull
+        {
+            if (JsonFileStore.FindById(hotPath, keySelector, id) == null
+                && JsonFileStore.FindById(PathFor(hotPath), keySelector, id) != null)
+            {
+                return PathFor(hotPath);
+            }
+            return hotPath;
+        }
+
+        public static async ValueTask<string> PathContainingAsync<T, TKey>(string hotPath, Func<T, TKey> keySelector, TKey id, CancellationToken cancellationToken = default) where TKey : notnull
+        {
+            if (await JsonFileStore.FindByIdAsync(hotPath, keySelector, id, cancellationToken) == null
+                && await JsonFileStore.FindByIdAsync(PathFor(hotPath), keySelector, id, cancellationToken) != null)
+            {
+                return PathFor(hotPath);
+            }
+            return hotPath;
+        }
+
+        /// <summary>
+        /// Hot and archived records together, ordered by id.
+        /// </summary>
+        public static List<T> ReadAll<T>(string hotPath, Func<T, int> idSelector)
+        {
+            return JsonFileStore.Snapshot<T>(hotPath)
+                .Concat(JsonFileStore.Snapshot<T>(PathFor(hotPath)))
+                .OrderBy(idSelector)
+                .ToList();
+        }
+
+        public static async ValueTask<List<T>> ReadAllAsync<T>(string hotPath, Func<T, int> idSelector, CancellationToken cancellationToken = default)
+        {
+            var hot = await JsonFileStore.SnapshotAsync<T>(hotPath, cancellationToken);
+            var cold = await JsonFileStore.SnapshotAsync<T>(PathFor(hotPath), cancellationToken);
+            return hot.Concat(cold).OrderBy(idSelector).ToList();
+        }
+
+        /// <summary>
+        /// Moves terminal records from the hot file to the cold partition, and records that are
+        /// no longer terminal (e.g. after an update) back. The cold partition is written first,
+        /// so a crash in between can leave an identical copy of a record in both files; such a
+        /// leftover cold copy is dropped on the next run. A record whose id is in both files with
+        /// different contents is left alone in both and reported in
+        /// <see cref="ArchiveResult.Conflicts"/>, as neither copy can safely be discarded.
+        /// </summary>
+        public static ArchiveResult Rebalance<T>(string hotPath, Func<T, int> idSelector, Func<T, bool> isTerminal)
+        {
+            var coldPath = PathFor(hotPath);
+            Directory.CreateDirectory(Path.GetDirectoryName(coldPath)!);
+            var result = new ArchiveResult { Collection = JsonFileStore.CollectionName(hotPath) };
+
+            JsonFileStore.Update<T>(hotPath, hot =>
+            {
+                var nextHot = hot;
+
+                JsonFileStore.Update<T>(coldPath, cold =>
+                {
+                    var hotById = hot.GroupBy(idSelector).ToDictionary(g => g.Key, g => g.First());
+                    var duplicates = cold.Where(record => hotById.ContainsKey(idSelector(record))).ToList();
+                    var leftoverIds = duplicates
+                        .Where(record => EntityVersion.Of(record) == EntityVersion.Of(hotById[idSelector(record)]))
+                        .Select(idSelector)
+                        .ToHashSet();
+                    var conflictIds = duplicates.Select(idSelector).Where(id => !leftoverIds.Contains(id)).ToHashSet();
+                    result.Conflicts = conflictIds.OrderBy(id => id).ToList();
+
+                    bool Archives(T record) => isTerminal(record) && !conflictIds.Contains(idSelector(record));
+                    var archiving = hot.Where(Archives).ToList();
+                    var restoring = cold.Where(record => !isTerminal(record) && !hotById.ContainsKey(idSelector(record))).ToList();
+                    var restoringIds = restoring.Select(idSelector).ToHashSet();
+                    if (!archiving.Any() && !restoring.Any() && !leftoverIds.Any())
+                    {
+                        return cold;
+                    }
+
+                    result.Archived = archiving.Count;
+                    result.Restored = restoring.Count;
+                    nextHot = hot.RemoveAll(record => Archives(record));
+                    if (restoring.Any())
+                    {
+                        nextHot = SortedById(nextHot.AddRange(restoring), idSelector);
+                    }
+
+                    var remaining = cold.RemoveAll(record => leftoverIds.Contains(idSelector(record)) || restoringIds.Contains(idSelector(record)));
+                    return SortedById(remaining.AddRange(archiving), idSelector);
+                });
+
+                return nextHot;
+            });
+
+            return result;
+        }
+
+        /// <summary>
+        /// The hot records followed by the archived ones, read only when enumerated that far,
+        /// e.g. to seed an <see cref="IdSequence"/> with ids that are no longer in the hot file.
+        /// </summary>
+        public static IEnumerable<T> WithArchived<T>(string hotPath, IEnumerable<T> hot)
+        {
+            foreach (var record in hot)
+            {
+                yield return record;
+            }
+            foreach (var record in JsonFileStore.Snapshot<T>(PathFor(hotPath)))
+            {
+                yield return record;
+            }
+        }
+
+        private static ImmutableList<T> SortedById<T>(ImmutableList<T> records, Func<T, int> idSelector)
+        {
+            return records.Sort((a, b) => idSelector(a).CompareTo(idSelector(b)));
+        }
+    }
+
+    public class ArchiveResult
+    {
+        public string Collection { get; set; } = string.Empty;
+        public int Archived { get; set; }
+        public int Restored { get; set; }
+
+        // Ids found in both files with different contents; both copies are kept.
+        public List<int> Conflicts { get; set; } = new();
+    }
+}
@@ -0,0 +1,411 @@
+using System;
+using System.Buffers.Binary;
+using System.Collections.Generic;
+using System.Globalization;
+using System.IO;
+using System.Numerics;
+using System.Text;
+using Cargohub.interfaces;
+using Newtonsoft.Json;
+
+namespace Cargohub.services
+{
+    public enum SnapshotFormat
+    {
+        Json,
+        Binary
+    }
+
+    /// <summary>
+    /// The two on-disk formats of a collection file. Binary snapshots start with "CHSB" and a
+    /// format version, followed by the JSON token stream in tagged binary form: property names
+    /// are written once and then referred to by number, numbers and dates are stored in fixed
+    /// or variable-length binary and strings carry their length, so there is no whitespace,
+    /// escaping or number and date parsing. Binary snapshots are read and written through
+    /// Newtonsoft, so the models and their attributes work unchanged; JSON goes through the
+    /// given <see cref="IRecordSerializer"/>.
+    /// </summary>
+    public static class CompactSnapshot
+    {
+        public const byte FormatVersion = 1;
+
+        private static readonly byte[] Magic = Encoding.ASCII.GetBytes("CHSB");
+
+        public static SnapshotFormat FormatOf(ReadOnlySpan<byte> data) =>
+            data.StartsWith(Magic) ? SnapshotFormat.Binary : SnapshotFormat.Json;
+
+        /// <summary>
+        /// The format of the file on disk, from its first bytes; <see cref="SnapshotFormat.Json"/>
+        /// when it does not exist.
+        /// </summary>
+        public static SnapshotFormat FormatOf(string filePath)
+        {
+            if (!File.Exists(filePath))
+            {
+                return SnapshotFormat.Json;
+            }
+
+            Span<byte> header = stackalloc byte[4];
+            using var stream = new FileStream(filePath, FileMode.Open, FileAccess.Read, FileShare.ReadWrite);
+            var read = stream.ReadAtLeast(header, header.Length, throwOnEndOfStream: false);
+            return FormatOf(header[..read]);
+        }
+
+        public static byte[] Serialize<T>(IEnumerable<T> data, SnapshotFormat format, IRecordSerializer serializer)
+        {
+            if (format == SnapshotFormat.Json)
+            {
+                return serializer.SerializeList(data);
+            }
+
+            using var buffer = new MemoryStream();
+            using (var writer = OpenWriter(buffer))
+            {
+                JsonSerializer.CreateDefault().Serialize(writer, data);
+            }
+            return buffer.ToArray();
+        }
+
+        public static List<T> Deserialize<T>(byte[] data, IRecordSerializer serializer)
+        {
+            if (FormatOf(data) == SnapshotFormat.Json)
+            {
+                return serializer.DeserializeList<T>(data);
+            }
+
+            using var reader = OpenReader(data, DateParseHandling.DateTime);
+            return JsonSerializer.CreateDefault().Deserialize<List<T>>(reader) ?? new List<T>();
+        }
+
+        /// <summary>
+        /// Rewrites a collection file's contents in <paramref name="format"/> without knowing its
+        /// record type. Date-like strings in JSON are kept as strings, so converting to binary and
+        /// back gives the same values.
+        /// </summary>
+        public static byte[] Convert(byte[] data, SnapshotFormat format)
+        {
+            using var buffer = new MemoryStream();
+            using (var reader = OpenReader(data, DateParseHandling.None))
+            using (var writer = format == SnapshotFormat.Binary
+                ? OpenWriter(buffer)
+                : new JsonTextWriter(new StreamWriter(buffer, new UTF8Encoding(false))) { Formatting = Formatting.Indented })
+            {
+                if (reader.Read())
+                {
+                    writer.WriteToken(reader);
+                }
+            }
+            return buffer.ToArray();
+        }
+
+        private static JsonReader OpenReader(byte[] data, DateParseHandling dateParseHandling)
+        {
+            if (FormatOf(data) == SnapshotFormat.Json)
+            {
+                return new JsonTextReader(new StreamReader(new MemoryStream(data), Encoding.UTF8)) { DateParseHandling = dateParseHandling };
+            }
+
+            var version = data.Length > Magic.Length ? data[Magic.Length] : (byte)0;
+            if (version != FormatVersion)
+            {
+                throw new InvalidDataException($"Unsupported binary snapshot version {version}; this build reads version {FormatVersion}.");
+            }
+            return new CompactSnapshotReader(data, Magic.Length + 1);
+        }
+
+        private static JsonWriter OpenWriter(Stream output)
+        {
+            output.Write(Magic);
+            output.WriteByte(FormatVersion);
+            return new CompactSnapshotWriter(output);
+        }
+    }
+
+    internal enum SnapshotTag : byte
+    {
+        StartObject = 1,
+        EndObject,
+        StartArray,
+        EndArray,
+        NewName,
+        NameRef,
+        String,
+        Integer,
+        Double,
+        Decimal,
+        True,
+        False,
+        Null,
+        Undefined,
+        Date,
+        DateOffset,
+        Bytes
+    }
+
+    internal sealed class CompactSnapshotWriter : JsonWriter
+    {
+        private readonly BinaryWriter _out;
+        private readonly Dictionary<string, int> _names = new(StringComparer.Ordinal);
+
+        public CompactSnapshotWriter(Stream output)
+        {
+            _out = new BinaryWriter(output, Encoding.UTF8, leaveOpen: true);
+        }
+
+        public override void Flush() => _out.Flush();
+
+        public override void Close()
+        {
+            base.Close();
+            _out.Dispose();
+        }
+
+        public override void WriteStartObject()
+        {
+            base.WriteStartObject();
+            Tag(SnapshotTag.StartObject);
+        }
+
+        public override void WriteStartArray()
+        {
+            base.WriteStartArray();
+            Tag(SnapshotTag.StartArray);
+        }
+
+        protected override void WriteEnd(JsonToken token)
+        {
+            Tag(token == JsonToken.EndObject ? SnapshotTag.EndObject : SnapshotTag.EndArray);
+        }
+
+        public override void WritePropertyName(string name)
+        {
+            base.WritePropertyName(name);
+            if (_names.TryGetValue(name, out var index))
+            {
+                Tag(SnapshotTag.NameRef);
+                _out.Write7BitEncodedInt(index);
+            }
+            else
+            {
+                _names.Add(name, _names.Count);
+                Tag(SnapshotTag.NewName);
+                _out.Write(name);
+            }
+        }
+
+        public override void WriteNull()
+        {
+            base.WriteNull();
+            Tag(SnapshotTag.Null);
+        }
+
+        public override void WriteUndefined()
+        {
+            base.WriteUndefined();
+            Tag(SnapshotTag.Undefined);
+        }
+
+        public override void WriteValue(string? value)
+        {
+            if (value == null)
+            {
+                WriteNull();
+                return;
+            }
+            base.WriteValue(value);
+            Tag(SnapshotTag.String);
+            _out.Write(value);
+        }
+
+        public override void WriteValue(long value)
+        {
+            base.WriteValue(value);
+            Tag(SnapshotTag.Integer);
+            _out.Write7BitEncodedInt64((value << 1) ^ (value >> 63));
+        }
+
+        public override void WriteValue(int value) => WriteValue((long)value);
+        public override void WriteValue(short value) => WriteValue((long)value);
+        public override void WriteValue(ushort value) => WriteValue((long)value);
+        public override void WriteValue(uint value) => WriteValue((long)value);
+        public override void WriteValue(byte value) => WriteValue((long)value);
+        public override void WriteValue(sbyte value) => WriteValue((long)value);
+
+        public override void WriteValue(ulong value)
+        {
+            if (value > long.MaxValue)
+            {
+                WriteValue((decimal)value);
+                return;
+            }
+            WriteValue((long)value);
+        }
+
+        public override void WriteValue(double value)
+        {
+            base.WriteValue(value);
+            Tag(SnapshotTag.Double);
+            _out.Write(value);
+        }
+
+        public override void WriteValue(float value) => WriteValue((double)value);
+
+        public override void WriteValue(decimal value)
+        {
+            base.WriteValue(value);
+            Tag(SnapshotTag.Decimal);
+            _out.Write(value);
+        }
+
+        public override void WriteValue(bool value)
+        {
+            base.WriteValue(value);
+            Tag(value ? SnapshotTag.True : SnapshotTag.False);
+        }
+
+        public override void WriteValue(DateTime value)
+        {
+            base.WriteValue(value);
+            Tag(SnapshotTag.Date);
+            _out.Write(value.ToBinary());
+        }
+
+        public override void WriteValue(DateTimeOffset value)
+        {
+            base.WriteValue(value);
+            Tag(SnapshotTag.DateOffset);
+            _out.Write(value.Ticks);
+            _out.Write((short)value.Offset.TotalMinutes);
+        }
+
+        public override void WriteValue(byte[]? value)
+        {
+            if (value == null)
+            {
+                WriteNull();
+                return;
+            }
+            base.WriteValue(value);
+            Tag(SnapshotTag.Bytes);
+            _out.Write7BitEncodedInt(value.Length);
+            _out.Write(value);
+        }
+
+        public override void WriteValue(char value) => WriteValue(value.ToString());
+        public override void WriteValue(Guid value) => WriteValue(value.ToString("D"));
+        public override void WriteValue(TimeSpan value) => WriteValue(value.ToString(null, CultureInfo.InvariantCulture));
+        public override void WriteValue(Uri? value) => WriteValue(value?.OriginalString);
+
+        public override void WriteValue(object? value)
+        {
+            if (value is BigInteger)
+            {
+                throw new JsonWriterException("Integers outside the range of a decimal cannot be stored in a binary snapshot.");
+            }
+            base.WriteValue(value);
+        }
+
+        public override void WriteRaw(string? json)
+        {
+            throw new NotSupportedException("Raw JSON cannot be written to a binary snapshot.");
+        }
+
+        private void Tag(SnapshotTag tag) => _out.Write((byte)tag);
+    }
+
+    internal sealed class CompactSnapshotReader : JsonReader
+    {
+        private readonly byte[] _data;
+        private readonly List<string> _names = new();
+        private int _position;
+
+        public CompactSnapshotReader(byte[] data, int start)
+        {
+            _data = data;
+            _position = start;
+        }
+
+        public override bool Read()
+        {
+            if (_position >= _data.Length)
+            {
+                SetToken(JsonToken.None);
+                return false;
+            }
+
+            var tag = (SnapshotTag)_data[_position++];
+            try
+            {
+                switch (tag)
+                {
+                    case SnapshotTag.StartObject: SetToken(JsonToken.StartObject); break;
+                    case SnapshotTag.EndObject: SetToken(JsonToken.EndObject); break;
+                    case SnapshotTag.StartArray: SetToken(JsonToken.StartArray); break;
+                    case SnapshotTag.EndArray: SetToken(JsonToken.EndArray); break;
+                    case SnapshotTag.NewName:
+                        var name = ReadString();
+                        _names.Add(name);
+                        SetToken(JsonToken.PropertyName, name);
+                        break;
+                    case SnapshotTag.NameRef: SetToken(JsonToken.PropertyName, _names[(int)ReadVarint()]); break;
+                    case SnapshotTag.String: SetToken(JsonToken.String, ReadString()); break;
+                    case SnapshotTag.Integer:
+                        var zigzag = ReadVarint();
+                        SetToken(JsonToken.Integer, (long)(zigzag >> 1) ^ -(long)(zigzag & 1));
+                        break;
+                    case SnapshotTag.Double: SetToken(JsonToken.Float, BitConverter.Int64BitsToDouble(ReadInt64())); break;
+                    case SnapshotTag.Decimal: SetToken(JsonToken.Float, new decimal(new[] { ReadInt32(), ReadInt32(), ReadInt32(), ReadInt32() })); break;
+                    case SnapshotTag.True: SetToken(JsonToken.Boolean, true); break;
+                    case SnapshotTag.False: SetToken(JsonToken.Boolean, false); break;
+                    case SnapshotTag.Null: SetToken(JsonToken.Null); break;
+                    case SnapshotTag.Undefined: SetToken(JsonToken.Undefined); break;
+                    case SnapshotTag.Date: SetToken(JsonToken.Date, DateTime.FromBinary(ReadInt64())); break;
+                    case SnapshotTag.DateOffset:
+                        var ticks = ReadInt64();
+                        SetToken(JsonToken.Date, new DateTimeOffset(ticks, TimeSpan.FromMinutes(BinaryPrimitives.ReadInt16LittleEndian(Take(2)))));
+                        break;
+                    case SnapshotTag.Bytes: SetToken(JsonToken.Bytes, Take((int)ReadVarint()).ToArray()); break;
+                    default:
+                        throw new JsonReaderException($"Unknown tag {(byte)tag} in binary snapshot at byte {_position - 1}.");
+                }
+            }
+            catch (Exception ex) when (ex is IndexOutOfRangeException || ex is ArgumentOutOfRangeException)
+            {
+                throw new JsonReaderException("The binary snapshot is truncated.", ex);
+            }
+            return true;
+        }
+
+        private ulong ReadVarint()
+        {
+            ulong value = 0;
+            var shift = 0;
+            byte next;
+            do
+            {
+                next = _data[_position++];
+                value |= (ulong)(next & 0x7F) << shift;
+                shift += 7;
+            }
+            while ((next & 0x80) != 0);
+            return value;
+        }
+
+        private string ReadString()
+        {
+            var length = (int)ReadVarint();
+            return length == 0 ? string.Empty : Encoding.UTF8.GetString(Take(length));
+        }
+
+        private int ReadInt32() => BinaryPrimitives.ReadInt32LittleEndian(Take(4));
+
+        private long ReadInt64() => BinaryPrimitives.ReadInt64LittleEndian(Take(8));
+
+        private ReadOnlySpan<byte> Take(int length)
+        {
+            var span = new ReadOnlySpan<byte>(_data, _position, length);
+            _position += length;
+            return span;
+        }
+    }
+}
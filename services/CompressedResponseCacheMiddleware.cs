@@ -0,0 +1,266 @@
+using System;
+using System.Collections.Concurrent;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.IO;
+using System.IO.Compression;
+using System.Linq;
+using System.Threading;
+using System.Threading.Tasks;
+using Microsoft.AspNetCore.Http;
+using Microsoft.Extensions.Primitives;
+using Microsoft.Net.Http.Headers;
+using Cargohub.models;
+using Cargohub.services;
+
+/// <summary>
+/// Keeps the responses of large list endpoints, marked with <see cref="CompressedResponseCacheAttribute{T}"/>,
+/// together with their gzip and brotli forms for as long as the collection behind them is
+/// unchanged. A repeated request is answered from the cache in the best encoding its
+/// Accept-Encoding allows, without running the controller, so a list is serialized and
+/// compressed once per change of the collection instead of once per request. Responses are
+/// kept per path, query string and permission scope, like <see cref="RequestCoalescingMiddleware"/>.
+/// </summary>
+public class CompressedResponseCacheMiddleware
+{
+    // Different query strings (pages, id lists) each get an entry. Storing one more first drops
+    // the entries whose collections have changed, then the least recently used one.
+    private const int MaxEntries = 512;
+
+    private readonly RequestDelegate _next;
+    private readonly ConcurrentDictionary<string, CachedBody> _cache = new();
+    private readonly object _evictionLock = new();
+
+    public CompressedResponseCacheMiddleware(RequestDelegate next)
+    {
+        _next = next;
+    }
+
+    public async Task InvokeAsync(HttpContext context)
+    {
+        var source = context.GetEndpoint()?.Metadata.GetMetadata<CompressedResponseCacheAttribute>();
+        var key = source == null ? null : CacheKey(context);
+        if (source == null || key == null)
+        {
+            await _next(context);
+            return;
+        }
+
+        var versions = source.Versions();
+        if (_cache.TryGetValue(key, out var cached))
+        {
+            if (cached.Versions.SequenceEqual(versions))
+            {
+                Metrics.ForRoute(MetricsMiddleware.RouteLabel(context)).RecordCompressedCacheHit();
+                await cached.WriteTo(context);
+                return;
+            }
+
+            // Outdated; dropped now so its bodies are not kept until the key is stored again.
+            _cache.TryRemove(new KeyValuePair<string, CachedBody>(key, cached));
+        }
+
+        var originalBody = context.Response.Body;
+        using var buffer = new MemoryStream();
+        context.Response.Body = buffer;
+        try
+        {
+            await _next(context);
+        }
+        finally
+        {
+            context.Response.Body = originalBody;
+        }
+
+        // Only keep the body when no write happened while the controller ran; otherwise it
+        // may belong to either version.
+        if (context.Response.StatusCode == StatusCodes.Status200OK && versions.SequenceEqual(source.Versions()))
+        {
+            cached = CachedBody.From(context.Response, source, versions, buffer.ToArray());
+            Store(key, cached);
+            await cached.WriteTo(context);
+            return;
+        }
+
+        await context.Response.Body.WriteAsync(buffer.GetBuffer().AsMemory(0, (int)buffer.Length), context.RequestAborted);
+    }
+
+    private void Store(string key, CachedBody body)
+    {
+        if (_cache.Count >= MaxEntries && !_cache.ContainsKey(key))
+        {
+            lock (_evictionLock)
+            {
+                foreach (var (staleKey, stale) in _cache.Where(e => !e.Value.IsCurrent()).ToList())
+                {
+                    _cache.TryRemove(new KeyValuePair<string, CachedBody>(staleKey, stale));
+                }
+
+                while (_cache.Count >= MaxEntries)
+                {
+                    var (oldestKey, oldest) = _cache.MinBy(e => e.Value.LastUsed);
+                    _cache.TryRemove(new KeyValuePair<string, CachedBody>(oldestKey, oldest));
+                }
+            }
+        }
+        _cache[key] = body;
+    }
+
+    private static string? CacheKey(HttpContext context)
+    {
+        if (!HttpMethods.IsGet(context.Request.Method) || RequestProfiler.Current != null)
+        {
+            return null;
+        }
+
+        var user = AuthProvider.GetUser(context.Request.Headers["API_KEY"].FirstOrDefault());
+        if (user == null)
+        {
+            return null;
+        }
+
+        return $"{context.Request.Path}{context.Request.QueryString}|{RequestCoalescingMiddleware.PermissionScope(user)}";
+    }
+
+    /// <summary>
+    /// "br" or "gzip" when <paramref name="acceptEncoding"/> accepts it (brotli first, as it is
+    /// smaller), otherwise null for the uncompressed body.
+    /// </summary>
+    public static string? ChooseEncoding(StringValues acceptEncoding)
+    {
+        if (!StringWithQualityHeaderValue.TryParseList(acceptEncoding, out var values))
+        {
+            return null;
+        }
+
+        double Quality(string encoding)
+        {
+            var match = values.FirstOrDefault(v => StringSegment.Equals(v.Value, encoding, StringComparison.OrdinalIgnoreCase))
+                ?? values.FirstOrDefault(v => v.Value == "*");
+            return match == null ? 0 : match.Quality ?? 1;
+        }
+
+        var brotli = Quality("br");
+        var gzip = Quality("gzip");
+        if (brotli > 0 && brotli >= gzip)
+        {
+            return "br";
+        }
+        return gzip > 0 ? "gzip" : null;
+    }
+
+    private sealed class CachedBody
+    {
+        private long _lastUsed = Stopwatch.GetTimestamp();
+
+        public CompressedResponseCacheAttribute Source { get; private init; } = null!;
+        public long[] Versions { get; private init; } = Array.Empty<long>();
+        public int StatusCode { get; private init; }
+        public List<KeyValuePair<string, StringValues>> Headers { get; private init; } = new();
+        public byte[] Identity { get; private init; } = Array.Empty<byte>();
+        public byte[] Gzip { get; private init; } = Array.Empty<byte>();
+        public byte[] Brotli { get; private init; } = Array.Empty<byte>();
+
+        public long LastUsed => Interlocked.Read(ref _lastUsed);
+
+        public bool IsCurrent() => Versions.SequenceEqual(Source.Versions());
+
+        public static CachedBody From(HttpResponse response, CompressedResponseCacheAttribute source, long[] versions, byte[] body)
+        {
+            return new CachedBody
+            {
+                Source = source,
+                Versions = versions,
+                StatusCode = response.StatusCode,
+                Headers = response.Headers
+                    .Where(h => !h.Key.Equals(HeaderNames.ContentLength, StringComparison.OrdinalIgnoreCase))
+                    .ToList(),
+                Identity = body,
+                Gzip = Compress(body, stream => new GZipStream(stream, CompressionLevel.Optimal)),
+                Brotli = Compress(body, stream => new BrotliStream(stream, CompressionLevel.Optimal))
+            };
+        }
+
+        public async Task WriteTo(HttpContext context)
+        {
+            Interlocked.Exchange(ref _lastUsed, Stopwatch.GetTimestamp());
+            var response = context.Response;
+            response.StatusCode = StatusCode;
+            foreach (var (name, value) in Headers)
+            {
+                response.Headers[name] = value;
+            }
+
+            var encoding = ChooseEncoding(context.Request.Headers.AcceptEncoding);
+            var body = encoding switch
+            {
+                "br" => Brotli,
+                "gzip" => Gzip,
+                _ => Identity
+            };
+            if (encoding != null)
+            {
+                response.Headers.ContentEncoding = encoding;
+            }
+            response.Headers.Vary = HeaderNames.AcceptEncoding;
+            response.ContentLength = body.Length;
+            await response.Body.WriteAsync(body, context.RequestAborted);
+        }
+
+        private static byte[] Compress(byte[] body, Func<Stream, Stream> compressor)
+        {
+            using var output = new MemoryStream();
+            using (var stream = compressor(output))
+            {
+                stream.Write(body);
+            }
+            return output.ToArray();
+        }
+    }
+}
+
+/// <summary>
+/// Lets <see cref="CompressedResponseCacheMiddleware"/> keep the responses of a list action.
+/// </summary>
+[AttributeUsage(AttributeTargets.Method)]
+public abstract class CompressedResponseCacheAttribute : Attribute
+{
+    /// <summary>
+    /// The versions of the collection files the response is built from; a kept response is
+    /// used only while they are unchanged.
+    /// </summary>
+    public abstract long[] Versions();
+}
+
+/// <summary>
+/// The response is built from the <typeparamref name="T"/> collection at the given path, or
+/// from its warehouse shards when <see cref="Sharded"/> is set, and also from the location
+/// shards when <see cref="LocationsPath"/> is set.
+/// </summary>
+public class CompressedResponseCacheAttribute<T> : CompressedResponseCacheAttribute
+{
+    public CompressedResponseCacheAttribute(string collectionPath)
+    {
+        CollectionPath = collectionPath;
+    }
+
+    public string CollectionPath { get; }
+
+    public bool Sharded { get; set; }
+
+    /// <summary>
+    /// The location collection the response also depends on, e.g. when keys limited to some
+    /// warehouses are answered through those warehouses' locations.
+    /// </summary>
+    public string? LocationsPath { get; set; }
+
+    public override long[] Versions()
+    {
+        var versions = Sharded
+            ? WarehouseShards<T>.VersionsOf(CollectionPath)
+            : new[] { JsonFileStore.Version<T>(CollectionPath) };
+        return LocationsPath == null
+            ? versions
+            : versions.Concat(WarehouseShards<Location>.VersionsOf(LocationsPath)).ToArray();
+    }
+}
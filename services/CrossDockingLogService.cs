@@ -2,6 +2,7 @@ using System;
 using System.Collections.Generic;
 using System.IO;
 using System.Linq;
+using Cargohub.services;
 using Newtonsoft.Json;
 using StrawhatsV2.models;
 
@@ -13,6 +14,7 @@ namespace Cargohub.Services
 
         public List<CrossDockingLogEntry> GetAllLogs()
         {
+            using var trace = RequestProfiler.ServiceCall();
             if (!File.Exists(_logFilePath))
                 return new List<CrossDockingLogEntry>();
 
@@ -33,6 +35,7 @@ namespace Cargohub.Services
 
         public List<CrossDockingLogEntry> FilterLogs(DateTime? startDate, DateTime? endDate, string adminApiKey = null)
         {
+            using var trace = RequestProfiler.ServiceCall();
             var logs = GetAllLogs();
 
             return logs.Where(log =>
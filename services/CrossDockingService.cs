@@ -1,5 +1,6 @@
 using Cargohub.interfaces;
 using Cargohub.models;
+using Cargohub.services;
 using Newtonsoft.Json;
 using StrawhatsV2.models;
 
@@ -34,9 +35,10 @@ public class CrossDockingService
         File.AppendAllText(logFilePath, logLine + Environment.NewLine);
     }
 
-    public string ReceiveShipment(int shipmentId, string apiKey)
+    public async Task<string> ReceiveShipment(int shipmentId, string apiKey)
     {
-        var shipment = _shipmentService.GetById(shipmentId);
+        using var trace = RequestProfiler.ServiceCall();
+        var shipment = CopyWithItems(_shipmentService.GetById(shipmentId));
         if (shipment == null)
         {
             throw new KeyNotFoundException($"Shipment with ID {shipmentId} not found.");
@@ -53,7 +55,7 @@ public class CrossDockingService
         }
 
         shipment.Shipment_Status = "Transit";
-        _shipmentService.Update(shipment);
+        await _shipmentService.Update(shipment);
 
         var details = new Dictionary<string, object>
     {
@@ -66,9 +68,10 @@ public class CrossDockingService
         return $"Shipment with ID {shipmentId} has been received and marked as 'Transit'.";
     }
 
-    public string ShipItems(int shipmentId, string apiKey)
+    public async Task<string> ShipItems(int shipmentId, string apiKey)
     {
-        var shipment = _shipmentService.GetById(shipmentId);
+        using var trace = RequestProfiler.ServiceCall();
+        var shipment = CopyWithItems(_shipmentService.GetById(shipmentId));
         if (shipment == null)
         {
             throw new KeyNotFoundException($"Shipment with ID {shipmentId} not found.");
@@ -79,8 +82,8 @@ public class CrossDockingService
             throw new InvalidOperationException($"Shipment with ID {shipmentId} must be in transit before it can be shipped.");
         }
 
-        var orders = _orderService.GetAll();
-        var matchingOrder = orders.FirstOrDefault(o => o.Shipment_Id.Contains(shipmentId));
+        var orders = OrdersIncludingArchived();
+        var matchingOrder = CopyWithItems(orders.FirstOrDefault(o => o.Shipment_Id.Contains(shipmentId)));
         if (matchingOrder == null)
         {
             throw new KeyNotFoundException($"No order found linked to shipment ID {shipmentId}.");
@@ -102,8 +105,8 @@ public class CrossDockingService
         {
             item.CrossDockingStatus = "Shipped";
         }
-        _shipmentService.Update(shipment);
-        _orderService.Update(matchingOrder);
+        await _shipmentService.Update(shipment);
+        await _orderService.Update(matchingOrder);
 
         var details = new Dictionary<string, object>
     {
@@ -116,13 +119,48 @@ public class CrossDockingService
         return $"Shipment with ID {shipmentId} has been shipped and marked as 'Delivered'.";
     }
 
+    // A shipment's order may already be delivered and moved to the archive.
+    private List<Order> OrdersIncludingArchived()
+    {
+        return ((OrderService)_orderService).GetAll(includeArchived: true);
+    }
+
+    // Shipments and orders come from the shared collection snapshot; the amounts and
+    // statuses changed here are set on copies, which are then saved through Update.
+    private static Shipment? CopyWithItems(Shipment? shipment)
+    {
+        if (shipment == null)
+        {
+            return null;
+        }
+
+        var copy = EntityCopy.Shallow(shipment);
+        copy.Items = EntityCopy.ShallowAll(shipment.Items);
+        return copy;
+    }
+
+    private static Order? CopyWithItems(Order? order)
+    {
+        if (order == null)
+        {
+            return null;
+        }
+
+        var copy = EntityCopy.Shallow(order);
+        copy.Items = EntityCopy.ShallowAll(order.Items);
+        return copy;
+    }
+
     public List<object> MatchItems(int? shipmentId = null, int? pageNumber = null, int? pageSize = null)
     {
+        using var trace = RequestProfiler.ServiceCall();
         var shipments = _shipmentService.GetAll();
-        var orders = _orderService.GetAll();
+        var orders = OrdersIncludingArchived();
 
         var matches = new List<object>();
         var pendingItems = new List<object>();
+        // Remaining order amounts are tracked here; the entities are shared with the collection cache.
+        var remaining = new Dictionary<(int OrderId, string ItemId), int>();
 
         foreach (var shipment in shipments.Where(s => shipmentId == null || s.Id == shipmentId))
         {
@@ -134,7 +172,9 @@ public class CrossDockingService
                     var orderItem = matchingOrder.Items.FirstOrDefault(o => o.Item_Id == shipmentItem.Item_Id);
                     if (orderItem != null)
                     {
-                        int matchedAmount = Math.Min(shipmentItem.Amount, orderItem.Amount);
+                        var key = (matchingOrder.Id, orderItem.Item_Id);
+                        var orderAmount = remaining.TryGetValue(key, out var left) ? left : orderItem.Amount;
+                        int matchedAmount = Math.Min(shipmentItem.Amount, orderAmount);
 
                         matches.Add(new
                         {
@@ -142,11 +182,10 @@ public class CrossDockingService
                             OrderId = matchingOrder.Id,
                             ItemId = shipmentItem.Item_Id,
                             MatchedAmount = matchedAmount,
-                            RemainingOrderAmount = orderItem.Amount - matchedAmount
+                            RemainingOrderAmount = orderAmount - matchedAmount
                         });
 
-                        shipmentItem.CrossDockingStatus = "Matched";
-                        orderItem.Amount -= matchedAmount;
+                        remaining[key] = orderAmount - matchedAmount;
                     }
                     else
                     {
@@ -0,0 +1,29 @@
+using System;
+using System.Collections.Generic;
+using System.Reflection;
+
+namespace Cargohub.services
+{
+    /// <summary>
+    /// Copies entities before they are changed, so snapshots already handed out by
+    /// <see cref="JsonFileStore"/> are never modified in place.
+    /// </summary>
+    public static class EntityCopy
+    {
+        private static readonly Func<object, object> _memberwiseClone = (Func<object, object>)Delegate.CreateDelegate(
+            typeof(Func<object, object>),
+            typeof(object).GetMethod("MemberwiseClone", BindingFlags.Instance | BindingFlags.NonPublic)!);
+
+        /// <summary>
+        /// Field-by-field copy. Lists and other reference-typed properties are shared with
+        /// the original, so replace them rather than changing them.
+        /// </summary>
+        public static T Shallow<T>(T entity) where T : class => (T)_memberwiseClone(entity);
+
+        /// <summary>
+        /// A new list holding a shallow copy of every element, e.g. the item lines of an order.
+        /// </summary>
+        public static List<T>? ShallowAll<T>(List<T>? entities) where T : class =>
+            entities?.ConvertAll(Shallow);
+    }
+}
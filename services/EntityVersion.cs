@@ -0,0 +1,55 @@
+using System;
+using System.Linq;
+using System.Security.Cryptography;
+using System.Text;
+using Microsoft.Extensions.Primitives;
+using Newtonsoft.Json;
+
+namespace Cargohub.services
+{
+    /// <summary>
+    /// The version of a stored record, sent as its ETag and checked against If-Match before a
+    /// conditional write. It is a hash of the record as stored, so every write changes it,
+    /// whichever endpoint or background job made it.
+    /// </summary>
+    public static class EntityVersion
+    {
+        public static string Of<T>(T entity)
+        {
+            var hash = SHA256.HashData(Encoding.UTF8.GetBytes(JsonConvert.SerializeObject(entity)));
+            return $"\"{Convert.ToHexString(hash, 0, 8).ToLowerInvariant()}\"";
+        }
+
+        /// <summary>
+        /// Throws a <see cref="VersionConflictException"/> when <paramref name="ifMatch"/> is given
+        /// and names neither the current version of <paramref name="current"/> nor "*".
+        /// </summary>
+        public static void Check<T>(T current, StringValues ifMatch)
+        {
+            var expected = ifMatch
+                .SelectMany(value => (value ?? string.Empty).Split(',', StringSplitOptions.RemoveEmptyEntries | StringSplitOptions.TrimEntries))
+                .Select(tag => tag.StartsWith("W/", StringComparison.Ordinal) ? tag[2..] : tag)
+                .ToList();
+            if (expected.Count == 0 || expected.Contains("*"))
+            {
+                return;
+            }
+
+            var version = Of(current);
+            if (!expected.Contains(version))
+            {
+                throw new VersionConflictException($"The record was changed by someone else; its current version is {version}.");
+            }
+        }
+    }
+
+    /// <summary>
+    /// A conditional write was based on an outdated version of the record.
+    /// </summary>
+    public class VersionConflictException : Exception
+    {
+        public VersionConflictException(string message) : base(message)
+        {
+        }
+    }
+}
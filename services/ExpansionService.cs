@@ -0,0 +1,138 @@
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text.Json;
+using System.Text.Json.Nodes;
+using Cargohub.interfaces;
+using Cargohub.models;
+using Microsoft.AspNetCore.Mvc;
+using Microsoft.Extensions.Options;
+using Microsoft.Extensions.Primitives;
+
+namespace Cargohub.services
+{
+    /// <summary>
+    /// Embeds related records in a single-record response: <c>?include=items,shipments</c> on
+    /// an order adds an "included" object holding the order's items and shipments. Related
+    /// records are looked up through the collections' indexes, so the client gets in one
+    /// request what used to take a request per reference.
+    /// </summary>
+    public class ExpansionService
+    {
+        public const string Parameter = "include";
+
+        private readonly ItemService _itemService;
+        private readonly InventoryService _inventoryService;
+        private readonly LocationsService _locationService;
+        private readonly OrderService _orderService;
+        private readonly ShipmentService _shipmentService;
+        private readonly JsonSerializerOptions _options;
+
+        public ExpansionService(ItemService itemService, InventoryService inventoryService, ICrudService<Location, int> locationService, OrderService orderService, ShipmentService shipmentService, IOptions<JsonOptions> jsonOptions)
+        {
+            _itemService = itemService;
+            _inventoryService = inventoryService;
+            _locationService = (LocationsService)locationService;
+            _orderService = orderService;
+            _shipmentService = shipmentService;
+            _options = jsonOptions.Value.JsonSerializerOptions;
+        }
+
+        public object Expand(Order order, StringValues include)
+        {
+            var itemIds = ItemIds(order.Items);
+            return Embed(order, include, new Dictionary<string, Func<object>>
+            {
+                ["items"] = () => _itemService.GetByIds(itemIds),
+                ["inventories"] = () => _inventoryService.GetByItems(itemIds),
+                ["shipments"] = () => _shipmentService.GetAllForOrders(new[] { order.Id }, includeArchived: true)
+            });
+        }
+
+        public object Expand(Shipment shipment, StringValues include)
+        {
+            var itemIds = ItemIds(shipment.Items);
+            return Embed(shipment, include, new Dictionary<string, Func<object>>
+            {
+                ["items"] = () => _itemService.GetByIds(itemIds),
+                ["inventories"] = () => _inventoryService.GetByItems(itemIds),
+                ["orders"] = () => _orderService.GetByIds((shipment.Order_Id ?? new List<int>()).Distinct())
+            });
+        }
+
+        public object Expand(Warehouse warehouse, StringValues include)
+        {
+            var locations = new Lazy<List<Location>>(() => _locationService.GetAllForWarehouses(new[] { warehouse.Id }));
+            return Embed(warehouse, include, new Dictionary<string, Func<object>>
+            {
+                ["locations"] = () => locations.Value,
+                ["inventories"] = () => _inventoryService.GetAllForLocations(locations.Value.Select(l => l.Id))
+            });
+        }
+
+        public object Expand(Item item, StringValues include)
+        {
+            var inventories = new Lazy<List<Inventory>>(() => _inventoryService.GetByItems(new[] { item.Uid }));
+            return Embed(item, include, new Dictionary<string, Func<object>>
+            {
+                ["inventories"] = () => inventories.Value,
+                ["locations"] = () => _locationService.GetByIds(inventories.Value
+                    .SelectMany(i => i.Locations?.ById.Select(l => l.Key) ?? Enumerable.Empty<int>())
+                    .Distinct()
+                    .ToList())
+            });
+        }
+
+        public object Expand(Location location, StringValues include)
+        {
+            return Embed(location, include, new Dictionary<string, Func<object>>
+            {
+                ["inventories"] = () => _inventoryService.GetAllForLocations(new[] { location.Id })
+            });
+        }
+
+        private static List<string> ItemIds(IEnumerable<ItemDetail>? items)
+        {
+            return (items ?? Enumerable.Empty<ItemDetail>())
+                .Select(i => i.Item_Id)
+                .Where(itemId => itemId != null)
+                .Distinct()
+                .ToList();
+        }
+
+        /// <summary>
+        /// The record itself when nothing is included; otherwise its JSON with an "included"
+        /// object holding the requested relations. Unknown relation names throw an
+        /// <see cref="InvalidOperationException"/>.
+        /// </summary>
+        private object Embed<T>(T record, StringValues include, Dictionary<string, Func<object>> relations) where T : notnull
+        {
+            var names = include
+                .SelectMany(value => (value ?? string.Empty).Split(',', StringSplitOptions.RemoveEmptyEntries | StringSplitOptions.TrimEntries))
+                .Select(name => name.ToLowerInvariant())
+                .Distinct()
+                .ToList();
+            if (names.Count == 0)
+            {
+                return record;
+            }
+
+            var unknown = names.FirstOrDefault(name => !relations.ContainsKey(name));
+            if (unknown != null)
+            {
+                throw new InvalidOperationException($"'{unknown}' cannot be included. Use one of: {string.Join(", ", relations.Keys)}.");
+            }
+
+            var included = new JsonObject();
+            foreach (var name in names)
+            {
+                var related = relations[name]();
+                included[name] = JsonSerializer.SerializeToNode(related, related.GetType(), _options);
+            }
+
+            var node = JsonSerializer.SerializeToNode(record, _options)!.AsObject();
+            node["included"] = included;
+            return node;
+        }
+    }
+}
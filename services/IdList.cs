@@ -0,0 +1,54 @@
+using System;
+using System.Collections.Generic;
+using System.Globalization;
+using System.Linq;
+using Microsoft.Extensions.Primitives;
+
+namespace Cargohub.services
+{
+    /// <summary>
+    /// The ids of a multi-get request, from <c>?ids=1,2,3</c> (the parameter may also be
+    /// repeated) or a JSON array in the body. Duplicates are dropped and the first occurrence
+    /// decides the order of the response.
+    /// </summary>
+    public static class IdList
+    {
+        public const string Parameter = "ids";
+
+        public const int MaxIds = 10_000;
+
+        public static List<string> Parse(StringValues values)
+        {
+            return Distinct(Split(values));
+        }
+
+        public static List<int> ParseInts(StringValues values)
+        {
+            return Distinct(Split(values).Select(id => int.TryParse(id, NumberStyles.Integer, CultureInfo.InvariantCulture, out var parsed)
+                ? parsed
+                : throw new InvalidOperationException($"'{id}' is not a valid id.")));
+        }
+
+        /// <summary>
+        /// The ids without duplicates, in the order given. Throws an
+        /// <see cref="InvalidOperationException"/> when there are none or more than
+        /// <see cref="MaxIds"/>.
+        /// </summary>
+        public static List<T> Distinct<T>(IEnumerable<T>? ids)
+        {
+            var distinct = (ids ?? Enumerable.Empty<T>()).Where(id => id != null).Distinct().ToList();
+            if (distinct.Count == 0)
+            {
+                throw new InvalidOperationException("At least one id is required.");
+            }
+            if (distinct.Count > MaxIds)
+            {
+                throw new InvalidOperationException($"At most {MaxIds} ids can be requested at once.");
+            }
+            return distinct;
+        }
+
+        private static IEnumerable<string> Split(StringValues values) =>
+            values.SelectMany(value => (value ?? string.Empty).Split(',', StringSplitOptions.RemoveEmptyEntries | StringSplitOptions.TrimEntries));
+    }
+}
@@ -0,0 +1,99 @@
+using System;
+using System.Collections.Generic;
+using System.IO;
+using System.Linq;
+using Newtonsoft.Json;
+
+namespace Cargohub.services
+{
+    /// <summary>
+    /// Hands out entity ids per collection from counters kept in sequences.json next to the
+    /// collection files, instead of scanning a collection for its highest id on every create.
+    /// The first allocation for a collection after start-up also looks at the collection's
+    /// highest id once, so records added while the service was down are never handed out again.
+    /// Every allocation is saved before it is returned, so an id is never issued twice.
+    /// </summary>
+    public static class IdSequence
+    {
+        private const string SequencesFileName = "sequences.json";
+
+        private static readonly object _lock = new();
+        private static readonly Dictionary<string, SequenceFile> _files = new();
+
+        public static int Next<T>(string filePath, IEnumerable<T> existing, Func<T, int> idSelector)
+        {
+            return NextBlock(filePath, 1, existing, idSelector);
+        }
+
+        /// <summary>
+        /// Reserves <paramref name="count"/> consecutive ids and returns the first one.
+        /// <paramref name="existing"/> is only enumerated the first time the collection is used.
+        /// </summary>
+        public static int NextBlock<T>(string filePath, int count, IEnumerable<T> existing, Func<T, int> idSelector)
+        {
+            if (count < 1)
+            {
+                throw new ArgumentOutOfRangeException(nameof(count), "At least one id must be reserved.");
+            }
+
+            var collection = JsonFileStore.CollectionName(filePath);
+            lock (_lock)
+            {
+                var sequences = Load(SequencesPath(filePath));
+                if (sequences.Seeded.Add(collection))
+                {
+                    var highest = existing.Select(idSelector).DefaultIfEmpty(0).Max();
+                    sequences.LastIssued[collection] = Math.Max(sequences.LastIssued.GetValueOrDefault(collection), highest);
+                }
+
+                var first = sequences.LastIssued[collection] + 1;
+                sequences.LastIssued[collection] = first + count - 1;
+                Save(sequences);
+                return first;
+            }
+        }
+
+        private static string SequencesPath(string filePath)
+        {
+            var directory = Path.GetDirectoryName(Path.GetFullPath(filePath))!;
+            return Path.Combine(directory, SequencesFileName);
+        }
+
+        // Caller holds _lock.
+        private static SequenceFile Load(string path)
+        {
+            if (_files.TryGetValue(path, out var sequences))
+            {
+                return sequences;
+            }
+
+            var lastIssued = File.Exists(path)
+                ? JsonConvert.DeserializeObject<Dictionary<string, int>>(File.ReadAllText(path))
+                : null;
+            sequences = new SequenceFile(path, lastIssued ?? new Dictionary<string, int>());
+            _files[path] = sequences;
+            return sequences;
+        }
+
+        // Written to a temporary file first, so a crash never leaves a truncated sequences file.
+        private static void Save(SequenceFile sequences)
+        {
+            var temporaryPath = sequences.Path + ".tmp";
+            File.WriteAllText(temporaryPath, JsonConvert.SerializeObject(sequences.LastIssued, Formatting.Indented));
+            File.Move(temporaryPath, sequences.Path, overwrite: true);
+        }
+
+        private sealed class SequenceFile
+        {
+            public SequenceFile(string path, Dictionary<string, int> lastIssued)
+            {
+                Path = path;
+                LastIssued = lastIssued;
+            }
+
+            public string Path { get; }
+            public Dictionary<string, int> LastIssued { get; }
+            public HashSet<string> Seeded { get; } = new();
+        }
+    }
+}
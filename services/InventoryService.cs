@@ -2,87 +2,147 @@ using System;
 using System.Collections.Generic;
 using System.IO;
 using System.Linq;
+using System.Threading;
 using System.Threading.Tasks;
 using Cargohub.interfaces;
 using Cargohub.models;
 using Newtonsoft.Json;
 using Newtonsoft.Json.Linq;
+using System.Text.Json;
+using System.Text.Json.Nodes;
+using Microsoft.Extensions.Primitives;
 
 namespace Cargohub.services
 {
 
-    public class InventoryService : ICrudService<Inventory, int>
+    public class InventoryService : ICrudService<Inventory, int>, IAsyncCrudService<Inventory, int>
     {
         private readonly string jsonFilePath = "data/inventories.json";
-        public Task Create(Inventory entity)
-        {
-            var inventories = GetAll() ?? new List<Inventory>();
-
-            // Find the next available ID
-            var nextId = inventories.Any() ? inventories.Max(i => i.Id) + 1 : 1;
-            entity.Id = nextId;
+        public Task Create(Inventory entity) => CreateAsync(entity);
 
-            // Ensure Locations is a valid dictionary
-            if (entity.Locations == null)
-            {
-                entity.Locations = new Dictionary<string, int>();
-            }
-            else
+        public async Task CreateAsync(Inventory entity, CancellationToken cancellationToken = default)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            await JsonFileStore.UpdateAsync<Inventory>(jsonFilePath, inventories =>
             {
-                // Convert string keys to ensure consistency (keys must be valid integers)
-                var validatedLocations = new Dictionary<string, int>();
-                foreach (var location in entity.Locations)
+                // Ensure Locations is a valid dictionary
+                if (entity.Locations == null)
                 {
-                    if (int.TryParse(location.Key, out _))
-                    {
-                        validatedLocations[location.Key] = location.Value;
-                    }
-                    else
+                    entity.Locations = new LocationQuantities();
+                }
+                else
+                {
+                    // Keys must be location ids, anything else is kept aside as a named key
+                    var invalidKey = entity.Locations.NonNumericKeys.FirstOrDefault();
+                    if (invalidKey != null)
                     {
-                        throw new ArgumentException($"Invalid location type key: {location.Key}. Keys must integers.");
+                        throw new ArgumentException($"Invalid location type key: {invalidKey}. Keys must integers.");
                     }
                 }
-                entity.Locations = validatedLocations;
-            }
 
-            inventories.Add(entity);
-            SaveToFile(inventories);
-            return Task.CompletedTask;
+                // Find the next available ID
+                var nextId = IdSequence.Next(jsonFilePath, inventories, i => i.Id);
+                entity.Id = nextId;
+
+                return inventories.Add(entity);
+            }, cancellationToken);
         }
 
-        public Task Delete(int id)
+        /// <summary>
+        /// Adds a batch of validated inventories in one write, with a block of consecutive IDs.
+        /// </summary>
+        public void CreateMany(IReadOnlyList<Inventory> entities)
         {
-            var inventories = GetAll() ?? new List<Inventory>();
-            var inventory = inventories.FirstOrDefault(i => i.Id == id);
+            using var trace = RequestProfiler.ServiceCall();
+            JsonFileStore.Update<Inventory>(jsonFilePath, inventories =>
+            {
+                var nextId = IdSequence.NextBlock(jsonFilePath, entities.Count, inventories, i => i.Id);
+                foreach (var entity in entities)
+                {
+                    entity.Locations ??= new LocationQuantities();
+                    entity.Id = nextId++;
+                }
 
-            if (inventory == null)
+                return inventories.AddRange(entities);
+            });
+        }
+
+        public Task Delete(int id) => DeleteAsync(id);
+
+        public async Task DeleteAsync(int id, CancellationToken cancellationToken = default)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            await JsonFileStore.UpdateAsync<Inventory>(jsonFilePath, inventories =>
             {
-                throw new KeyNotFoundException($"Inventory with ID {id} not found.");
-            }
+                var inventory = inventories.FirstOrDefault(i => i.Id == id);
+
+                if (inventory == null)
+                {
+                    throw new KeyNotFoundException($"Inventory with ID {id} not found.");
+                }
 
-            inventories.Remove(inventory);
-            SaveToFile(inventories);
-            return Task.CompletedTask;
+                return inventories.Remove(inventory);
+            }, cancellationToken);
         }
 
         public List<Inventory> GetAll(int? pageNumber = null, int? pageSize = null)
         {
-            var jsonData = File.ReadAllText(jsonFilePath);
-            var inventories = JsonConvert.DeserializeObject<List<Inventory>>(jsonData);
+            using var trace = RequestProfiler.ServiceCall();
+            return Page(JsonFileStore.Snapshot<Inventory>(jsonFilePath), pageNumber, pageSize);
+        }
 
-            foreach (var inventory in inventories)
+        public async ValueTask<List<Inventory>> GetAllAsync(int? pageNumber = null, int? pageSize = null, CancellationToken cancellationToken = default)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            return Page(await JsonFileStore.SnapshotAsync<Inventory>(jsonFilePath, cancellationToken), pageNumber, pageSize);
+        }
+
+        private static List<Inventory> Page(IReadOnlyList<Inventory> inventories, int? pageNumber, int? pageSize)
+        {
+            // Apply pagination only if both pageNumber and pageSize are provided
+            if (pageNumber.HasValue && pageSize.HasValue && pageNumber > 0 && pageSize > 0)
             {
-                // Ensure Locations is always deserialized as a dictionary
-                if (inventory.Locations == null)
-                {
-                    inventory.Locations = new Dictionary<string, int>();
-                }
+                return inventories
+                    .Skip((pageNumber.Value - 1) * pageSize.Value)
+                    .Take(pageSize.Value)
+                    .Select(WithLocations)
+                    .ToList();
+            }
+
+            return inventories.Select(WithLocations).ToList();
+        }
+
+        // Locations is always returned as a dictionary. Snapshot entities are shared with every
+        // reader, so one stored without locations is copied rather than changed in place; the
+        // copy has the same EntityVersion on every read.
+        private static Inventory WithLocations(Inventory inventory)
+        {
+            if (inventory.Locations != null)
+            {
+                return inventory;
             }
 
+            var copy = EntityCopy.Shallow(inventory);
+            copy.Locations = new LocationQuantities();
+            return copy;
+        }
+
+
+        /// <summary>
+        /// The inventories that hold stock in any of the given locations, read from a
+        /// per-location index instead of a scan over all inventories.
+        /// </summary>
+        public List<Inventory> GetAllForLocations(IEnumerable<int> locationIds, int? pageNumber = null, int? pageSize = null)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            var inventories = JsonFileStore.GetView<Inventory, KeyedIndex<Inventory>>(jsonFilePath, "by-location",
+                    all => KeyedIndex<Inventory>.Build(all, i => i.Locations?.ById.Select(l => l.Key) ?? Enumerable.Empty<int>()))
+                .For(locationIds, i => i.Id);
+
             // Apply pagination only if both pageNumber and pageSize are provided
             if (pageNumber.HasValue && pageSize.HasValue && pageNumber > 0 && pageSize > 0)
             {
-                inventories = inventories
+                return inventories
                     .Skip((pageNumber.Value - 1) * pageSize.Value)
                     .Take(pageSize.Value)
                     .ToList();
@@ -91,91 +151,202 @@ namespace Cargohub.services
             return inventories;
         }
 
+        /// <summary>
+        /// The inventories matching <paramref name="query"/>, limited to the inventories stocked
+        /// in <paramref name="locationIds"/> when given. Equality filters on Item_Id are answered
+        /// from an index; other queries scan the inventories once.
+        /// </summary>
+        public List<Inventory> Find(ListQuery query, IReadOnlyCollection<int>? locationIds = null)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            var candidates = locationIds != null
+                ? GetAllForLocations(locationIds)
+                : query.Candidates(JsonFileStore.Snapshot<Inventory>(jsonFilePath),
+                    new QueryIndex<Inventory>("Item_Id", value => ByItem()[(string)value!]));
+
+            return query.Apply(candidates);
+        }
+
+        /// <summary>
+        /// The inventories of the given items, read from a per-item index.
+        /// </summary>
+        public List<Inventory> GetByItems(IEnumerable<string> itemIds)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            var byItem = ByItem();
+            return itemIds
+                .Where(itemId => itemId != null)
+                .Distinct()
+                .SelectMany(itemId => byItem[itemId])
+                .Distinct()
+                .OrderBy(i => i.Id)
+                .ToList();
+        }
+
+        private ILookup<string, Inventory> ByItem()
+        {
+            return JsonFileStore.GetView<Inventory, ILookup<string, Inventory>>(jsonFilePath, "by-item",
+                inventories => inventories.ToLookup(i => i.Item_Id ?? string.Empty, StringComparer.OrdinalIgnoreCase));
+        }
+
+        /// <summary>
+        /// The inventories with the given ids, in the order asked for. Unknown ids are skipped.
+        /// </summary>
+        public List<Inventory> GetByIds(IEnumerable<int> ids)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            return ids
+                .Select(id => JsonFileStore.FindById<Inventory, int>(jsonFilePath, i => i.Id, id))
+                .Where(inventory => inventory != null)
+                .Select(inventory => WithLocations(inventory!))
+                .ToList();
+        }
 
         public Inventory GetById(int id)
         {
-            var inventories = GetAll();
-            var inventory = inventories.FirstOrDefault(i => i.Id == id);
+            using var trace = RequestProfiler.ServiceCall();
+            var inventory = JsonFileStore.FindById<Inventory, int>(jsonFilePath, i => i.Id, id);
 
             if (inventory == null)
             {
                 throw new KeyNotFoundException($"Inventory with ID {id} not found.");
             }
 
-            return inventory;
+            return WithLocations(inventory);
         }
 
-        public Task Update(Inventory entity)
+        public async ValueTask<Inventory> GetByIdAsync(int id, CancellationToken cancellationToken = default)
         {
-            var inventories = GetAll();
-            var inventory = inventories.FirstOrDefault(i => i.Id == entity.Id);
+            using var trace = RequestProfiler.ServiceCall();
+            var inventory = await JsonFileStore.FindByIdAsync<Inventory, int>(jsonFilePath, i => i.Id, id, cancellationToken)
+                ?? throw new KeyNotFoundException($"Inventory with ID {id} not found.");
 
-            if (inventory == null)
+            return WithLocations(inventory);
+        }
+
+        public Task Update(Inventory entity) => UpdateAsync(entity);
+
+        public async Task UpdateAsync(Inventory entity, CancellationToken cancellationToken = default)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            await JsonFileStore.UpdateAsync<Inventory>(jsonFilePath, inventories =>
             {
-                throw new KeyNotFoundException($"Inventory with ID {entity.Id} not found.");
-            }
+                var inventory = inventories.FirstOrDefault(i => i.Id == entity.Id);
+
+                if (inventory == null)
+                {
+                    throw new KeyNotFoundException($"Inventory with ID {entity.Id} not found.");
+                }
+
+                var updated = EntityCopy.Shallow(inventory);
+
+                updated.Id = entity.Id;
+                updated.Item_Id = entity.Item_Id;
+                updated.Description = entity.Description;
+                updated.Item_Reference = entity.Item_Reference;
+                updated.Locations = entity.Locations;
+                updated.Total_On_Hand = entity.Total_On_Hand;
+                updated.Total_Expected = entity.Total_Expected;
+                updated.Total_Ordered = entity.Total_Ordered;
+                updated.Total_Allocated = entity.Total_Allocated;
+                updated.Total_Available = entity.Total_Available;
+                updated.Created_At = entity.Created_At;
+                updated.Updated_At = DateTime.UtcNow;
+
+                return inventories.Replace(inventory, updated);
+            }, cancellationToken);
+        }
+
+        /// <summary>
+        /// Applies a JSON merge patch to the inventory under the file's write lock; a patch of
+        /// "locations" sets or (with null) removes single locations. When
+        /// <paramref name="ifMatch"/> is given the inventory must still be at that
+        /// <see cref="EntityVersion"/>.
+        /// </summary>
+        public Inventory Patch(int id, JsonObject patch, StringValues ifMatch, JsonSerializerOptions options)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            Inventory? patched = null;
+            JsonFileStore.Update<Inventory>(jsonFilePath, inventories =>
+            {
+                var stored = inventories.FirstOrDefault(i => i.Id == id)
+                    ?? throw new KeyNotFoundException($"Inventory with ID {id} not found.");
+                // Checked against the record as GET returns it, which is the ETag the client has.
+                var inventory = WithLocations(stored);
+                EntityVersion.Check(inventory, ifMatch);
+
+                patched = MergePatch.Apply(inventory, patch, options);
+                if (patched.Id != inventory.Id)
+                {
+                    throw new InvalidOperationException("The inventory id cannot be changed.");
+                }
 
-            inventory.Id = entity.Id;
-            inventory.Item_Id = entity.Item_Id;
-            inventory.Description = entity.Description;
-            inventory.Item_Reference = entity.Item_Reference;
-            inventory.Locations = entity.Locations;
-            inventory.Total_On_Hand = entity.Total_On_Hand;
-            inventory.Total_Expected = entity.Total_Expected;
-            inventory.Total_Ordered = entity.Total_Ordered;
-            inventory.Total_Allocated = entity.Total_Allocated;
-            inventory.Total_Available = entity.Total_Available;
-            inventory.Created_At = entity.Created_At;
-            inventory.Updated_At = DateTime.UtcNow;
+                patched.Locations ??= new LocationQuantities();
+                var invalidKey = patched.Locations.NonNumericKeys.FirstOrDefault();
+                if (invalidKey != null)
+                {
+                    throw new InvalidOperationException($"Invalid location type key: {invalidKey}. Keys must integers.");
+                }
 
-            SaveToFile(inventories);
-            return Task.CompletedTask;
+                patched.Updated_At = DateTime.UtcNow;
+                return inventories.Replace(stored, patched);
+            });
+            return patched!;
         }
 
         public List<string> AuditInventory(string performedBy, Dictionary<int, Dictionary<int, int>> physicalCountsByLocation)
 {
-    var inventories = GetAll();
+    using var trace = RequestProfiler.ServiceCall();
     var discrepancies = new List<string>();
 
-    foreach (var auditEntry in physicalCountsByLocation)
+    JsonFileStore.Update<Inventory>(jsonFilePath, inventories =>
     {
-        var inventory = inventories.FirstOrDefault(i => i.Id == auditEntry.Key);
-
-        if (inventory == null)
+        foreach (var auditEntry in physicalCountsByLocation)
         {
-            discrepancies.Add($"Inventory ID {auditEntry.Key} not found.");
-            continue;
-        }
+            var index = inventories.FindIndex(i => i.Id == auditEntry.Key);
 
-        foreach (var locationEntry in auditEntry.Value)
-        {
-            int locationId = locationEntry.Key;
-            int physicalCount = locationEntry.Value;
+            if (index < 0)
+            {
+                discrepancies.Add($"Inventory ID {auditEntry.Key} not found.");
+                continue;
+            }
 
-            if (inventory.Locations.ContainsKey(locationId.ToString()))
+            // Work on a copy so readers of the current snapshot never see a half-applied audit
+            var inventory = EntityCopy.Shallow(inventories[index]);
+            inventory.Locations = inventory.Locations?.Copy() ?? new LocationQuantities();
+
+            foreach (var locationEntry in auditEntry.Value)
             {
-                int systemCount = inventory.Locations[locationId.ToString()];
-                if (systemCount != physicalCount)
+                int locationId = locationEntry.Key;
+                int physicalCount = locationEntry.Value;
+
+                if (inventory.Locations.TryGetQuantity(locationId, out int systemCount))
+                {
+                    if (systemCount != physicalCount)
+                    {
+                        discrepancies.Add(
+                            $"Discrepancy for Inventory ID {inventory.Id} at Location {locationId}: System = {systemCount}, Physical = {physicalCount}"
+                        );
+                        // Update the inventory with the physical count
+                        inventory.Locations[locationId] = physicalCount;
+                    }
+                }
+                else
                 {
                     discrepancies.Add(
-                        $"Discrepancy for Inventory ID {inventory.Id} at Location {locationId}: System = {systemCount}, Physical = {physicalCount}"
+                        $"Location {locationId} not found for Inventory ID {inventory.Id}."
                     );
-                    // Update the inventory with the physical count
-                    inventory.Locations[locationId.ToString()] = physicalCount;
                 }
             }
-            else
-            {
-                discrepancies.Add(
-                    $"Location {locationId} not found for Inventory ID {inventory.Id}."
-                );
-            }
+
+            inventories = inventories.SetItem(index, inventory);
         }
-    }
+
+        return inventories;
+    });
 
     // Log the discrepancies with status "Live"
     LogAuditChange(performedBy, physicalCountsByLocation, discrepancies, "Live");
-    SaveToFile(inventories); // Save the updated inventories to the file
     return discrepancies;
 }
 
@@ -198,10 +369,5 @@ namespace Cargohub.services
     File.AppendAllText(logFilePath, logLine + Environment.NewLine);
 }
 
-private void SaveToFile(List<Inventory> inventories)
-{
-    var jsonData = JsonConvert.SerializeObject(inventories, Formatting.Indented);
-    File.WriteAllText(jsonFilePath, jsonData);
-}
             }
         }
\ No newline at end of file
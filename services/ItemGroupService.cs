@@ -2,6 +2,7 @@ using System;
 using System.Collections.Generic;
 using System.IO;
 using System.Linq;
+using System.Threading;
 using System.Threading.Tasks;
 using Cargohub.interfaces;
 using Cargohub.models;
@@ -9,67 +10,76 @@ using Newtonsoft.Json;
 
 namespace Cargohub.services
 {
-    public class ItemGroupService : ICrudService<ItemGroup, int>
+    public class ItemGroupService : ICrudService<ItemGroup, int>, IAsyncCrudService<ItemGroup, int>
     {
         private readonly string jsonFilePath = "data/item_groups.json";
 
-        public Task Create(ItemGroup entity)
-        {
-            var itemGroups = GetAll() ?? new List<ItemGroup>();
-
-            // Find the next available ID
-            var nextId = itemGroups.Any() ? itemGroups.Max(ig => ig.Id) + 1 : 1;
-            entity.Id = nextId;
-            entity.Created_At = DateTime.UtcNow;
-            entity.Updated_At = DateTime.UtcNow;
+        public Task Create(ItemGroup entity) => CreateAsync(entity);
 
-            itemGroups.Add(entity);
-            SaveToFile(itemGroups);
-            return Task.CompletedTask;
+        public async Task CreateAsync(ItemGroup entity, CancellationToken cancellationToken = default)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            await JsonFileStore.UpdateAsync<ItemGroup>(jsonFilePath, itemGroups =>
+            {
+                // Find the next available ID
+                var nextId = IdSequence.Next(jsonFilePath, itemGroups, ig => ig.Id);
+                entity.Id = nextId;
+                entity.Created_At = DateTime.UtcNow;
+                entity.Updated_At = DateTime.UtcNow;
+
+                return itemGroups.Add(entity);
+            }, cancellationToken);
         }
 
-        public Task Delete(int id)
-        {
-            var itemGroups = GetAll() ?? new List<ItemGroup>();
-            var itemGroup = itemGroups.FirstOrDefault(ig => ig.Id == id);
+        public Task Delete(int id) => DeleteAsync(id);
 
-            if (itemGroup == null)
+        public async Task DeleteAsync(int id, CancellationToken cancellationToken = default)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            await JsonFileStore.UpdateAsync<ItemGroup>(jsonFilePath, itemGroups =>
             {
-                throw new KeyNotFoundException($"ItemGroup with ID {id} not found.");
-            }
+                var itemGroup = itemGroups.FirstOrDefault(ig => ig.Id == id);
 
-            itemGroups.Remove(itemGroup);
-            SaveToFile(itemGroups);
-            return Task.CompletedTask;
+                if (itemGroup == null)
+                {
+                    throw new KeyNotFoundException($"ItemGroup with ID {id} not found.");
+                }
+
+                return itemGroups.Remove(itemGroup);
+            }, cancellationToken);
         }
 
         public List<ItemGroup> GetAll(int? pageNumber = null, int? pageSize = null)
         {
-            if (!File.Exists(jsonFilePath))
-            {
-                return new List<ItemGroup>();
-            }
+            using var trace = RequestProfiler.ServiceCall();
+            return Page(JsonFileStore.Snapshot<ItemGroup>(jsonFilePath), pageNumber, pageSize);
+        }
 
-            var jsonData = File.ReadAllText(jsonFilePath);
-            var itemGroups = JsonConvert.DeserializeObject<List<ItemGroup>>(jsonData) ?? new List<ItemGroup>();
+        public async ValueTask<List<ItemGroup>> GetAllAsync(int? pageNumber = null, int? pageSize = null, CancellationToken cancellationToken = default)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            return Page(await JsonFileStore.SnapshotAsync<ItemGroup>(jsonFilePath, cancellationToken), pageNumber, pageSize);
+        }
 
+        private static List<ItemGroup> Page(IReadOnlyList<ItemGroup> itemGroups, int? pageNumber, int? pageSize)
+        {
             // Apply pagination only if pageNumber and pageSize are provided and valid
             if (pageNumber.HasValue && pageSize.HasValue && pageNumber > 0 && pageSize > 0)
             {
-                itemGroups = itemGroups
+                return itemGroups
                     .Skip((pageNumber.Value - 1) * pageSize.Value)
                     .Take(pageSize.Value)
                     .ToList();
             }
 
-            return itemGroups;
+            return itemGroups.ToList();
         }
 
 
         public ItemGroup GetById(int id)
         {
-            var itemGroups = GetAll();
-            var itemGroup = itemGroups.FirstOrDefault(ig => ig.Id == id);
+            using var trace = RequestProfiler.ServiceCall();
+            var itemGroup = JsonFileStore.FindById<ItemGroup, int>(jsonFilePath, ig => ig.Id, id);
 
             if (itemGroup == null)
             {
@@ -79,29 +89,36 @@ namespace Cargohub.services
             return itemGroup;
         }
 
-        public Task Update(ItemGroup entity)
+        public async ValueTask<ItemGroup> GetByIdAsync(int id, CancellationToken cancellationToken = default)
         {
-            var itemGroups = GetAll() ?? new List<ItemGroup>();
-            var existingItemGroup = itemGroups.FirstOrDefault(ig => ig.Id == entity.Id);
+            using var trace = RequestProfiler.ServiceCall();
+            return await JsonFileStore.FindByIdAsync<ItemGroup, int>(jsonFilePath, ig => ig.Id, id, cancellationToken)
+                ?? throw new KeyNotFoundException($"ItemGroup with ID {id} not found.");
+        }
+
+        public Task Update(ItemGroup entity) => UpdateAsync(entity);
 
-            if (existingItemGroup == null)
+        public async Task UpdateAsync(ItemGroup entity, CancellationToken cancellationToken = default)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            await JsonFileStore.UpdateAsync<ItemGroup>(jsonFilePath, itemGroups =>
             {
-                throw new KeyNotFoundException($"ItemGroup with ID {entity.Id} not found.");
-            }
+                var existingItemGroup = itemGroups.FirstOrDefault(ig => ig.Id == entity.Id);
 
-            // Update properties
-            existingItemGroup.Name = entity.Name;
-            existingItemGroup.Description = entity.Description;
-            existingItemGroup.Updated_At = DateTime.UtcNow;
+                if (existingItemGroup == null)
+                {
+                    throw new KeyNotFoundException($"ItemGroup with ID {entity.Id} not found.");
+                }
 
-            SaveToFile(itemGroups);
-            return Task.CompletedTask;
-        }
+                var updated = EntityCopy.Shallow(existingItemGroup);
 
-        private void SaveToFile(List<ItemGroup> itemGroups)
-        {
-            var jsonData = JsonConvert.SerializeObject(itemGroups, Formatting.Indented);
-            File.WriteAllText(jsonFilePath, jsonData);
+                // Update properties
+                updated.Name = entity.Name;
+                updated.Description = entity.Description;
+                updated.Updated_At = DateTime.UtcNow;
+
+                return itemGroups.Replace(existingItemGroup, updated);
+            }, cancellationToken);
         }
     }
 }
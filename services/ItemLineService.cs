@@ -2,6 +2,7 @@ using System;
 using System.Collections.Generic;
 using System.IO;
 using System.Linq;
+using System.Threading;
 using System.Threading.Tasks;
 using Cargohub.interfaces;
 using Cargohub.models;
@@ -9,65 +10,76 @@ using Newtonsoft.Json;
 
 namespace Cargohub.services
 {
-    public class ItemLineService : ICrudService<ItemLine, int>
+    public class ItemLineService : ICrudService<ItemLine, int>, IAsyncCrudService<ItemLine, int>
     {
         private readonly string jsonFilePath = "data/item_lines.json";
         private readonly string itemsFilePath = "data/items.json";
 
-        public async Task Create(ItemLine entity)
-        {
-            var itemLines = GetAll() ?? new List<ItemLine>();
+        public Task Create(ItemLine entity) => CreateAsync(entity);
 
-            var nextId = itemLines.Any() ? itemLines.Max(il => il.Id) + 1 : 1;
-            entity.Id = nextId;
-            entity.Created_At = DateTime.Now;
-            entity.Updated_At = DateTime.Now;
+        public async Task CreateAsync(ItemLine entity, CancellationToken cancellationToken = default)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            await JsonFileStore.UpdateAsync<ItemLine>(jsonFilePath, itemLines =>
+            {
+                var nextId = IdSequence.Next(jsonFilePath, itemLines, il => il.Id);
+                entity.Id = nextId;
+                entity.Created_At = DateTime.Now;
+                entity.Updated_At = DateTime.Now;
 
-            itemLines.Add(entity);
-            await SaveToFile(itemLines);
+                return itemLines.Add(entity);
+            }, cancellationToken);
         }
 
-        public async Task Delete(int id)
-        {
-            var itemLines = GetAll() ?? new List<ItemLine>();
-            var itemLine = itemLines.FirstOrDefault(il => il.Id == id);
+        public Task Delete(int id) => DeleteAsync(id);
 
-            if (itemLine == null)
+        public async Task DeleteAsync(int id, CancellationToken cancellationToken = default)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            await JsonFileStore.UpdateAsync<ItemLine>(jsonFilePath, itemLines =>
             {
-                throw new KeyNotFoundException($"ItemLine with ID {id} not found.");
-            }
+                var itemLine = itemLines.FirstOrDefault(il => il.Id == id);
+
+                if (itemLine == null)
+                {
+                    throw new KeyNotFoundException($"ItemLine with ID {id} not found.");
+                }
 
-            itemLines.Remove(itemLine);
-            await SaveToFile(itemLines);
+                return itemLines.Remove(itemLine);
+            }, cancellationToken);
         }
 
         public List<ItemLine> GetAll(int? pageNumber = null, int? pageSize = null)
         {
-            if (!File.Exists(jsonFilePath))
-            {
-                return new List<ItemLine>();
-            }
+            using var trace = RequestProfiler.ServiceCall();
+            return Page(JsonFileStore.Snapshot<ItemLine>(jsonFilePath), pageNumber, pageSize);
+        }
 
-            var jsonData = File.ReadAllText(jsonFilePath);
-            var itemLines = JsonConvert.DeserializeObject<List<ItemLine>>(jsonData) ?? new List<ItemLine>();
+        public async ValueTask<List<ItemLine>> GetAllAsync(int? pageNumber = null, int? pageSize = null, CancellationToken cancellationToken = default)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            return Page(await JsonFileStore.SnapshotAsync<ItemLine>(jsonFilePath, cancellationToken), pageNumber, pageSize);
+        }
 
+        private static List<ItemLine> Page(IReadOnlyList<ItemLine> itemLines, int? pageNumber, int? pageSize)
+        {
             // Apply pagination only if pageNumber and pageSize are provided and valid
             if (pageNumber.HasValue && pageSize.HasValue && pageNumber > 0 && pageSize > 0)
             {
-                itemLines = itemLines
+                return itemLines
                     .Skip((pageNumber.Value - 1) * pageSize.Value)
                     .Take(pageSize.Value)
                     .ToList();
             }
 
-            return itemLines;
+            return itemLines.ToList();
         }
 
 
         public ItemLine GetById(int id)
         {
-            var itemLines = GetAll();
-            var itemLine = itemLines.FirstOrDefault(il => il.Id == id);
+            using var trace = RequestProfiler.ServiceCall();
+            var itemLine = JsonFileStore.FindById<ItemLine, int>(jsonFilePath, il => il.Id, id);
 
             if (itemLine == null)
             {
@@ -77,39 +89,47 @@ namespace Cargohub.services
             return itemLine;
         }
 
-        public async Task Update(ItemLine entity)
+        public async ValueTask<ItemLine> GetByIdAsync(int id, CancellationToken cancellationToken = default)
         {
-            var itemLines = GetAll() ?? new List<ItemLine>();
-            var existingItemLine = itemLines.FirstOrDefault(il => il.Id == entity.Id);
+            using var trace = RequestProfiler.ServiceCall();
+            return await JsonFileStore.FindByIdAsync<ItemLine, int>(jsonFilePath, il => il.Id, id, cancellationToken)
+                ?? throw new KeyNotFoundException($"ItemLine with ID {id} not found.");
+        }
+
+        public Task Update(ItemLine entity) => UpdateAsync(entity);
 
-            if (existingItemLine == null)
+        public async Task UpdateAsync(ItemLine entity, CancellationToken cancellationToken = default)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            await JsonFileStore.UpdateAsync<ItemLine>(jsonFilePath, itemLines =>
             {
-                throw new KeyNotFoundException($"ItemLine with ID {entity.Id} not found.");
-            }
+                var existingItemLine = itemLines.FirstOrDefault(il => il.Id == entity.Id);
+
+                if (existingItemLine == null)
+                {
+                    throw new KeyNotFoundException($"ItemLine with ID {entity.Id} not found.");
+                }
+
+                var updated = EntityCopy.Shallow(existingItemLine);
 
-            existingItemLine.Name = entity.Name;
-            existingItemLine.Description = entity.Description;
-            existingItemLine.Updated_At = DateTime.Now;
+                updated.Name = entity.Name;
+                updated.Description = entity.Description;
+                updated.Updated_At = DateTime.Now;
 
-            await SaveToFile(itemLines);
+                return itemLines.Replace(existingItemLine, updated);
+            }, cancellationToken);
         }
 
         public List<Item> GetItemsByItemLineId(int itemLineId)
         {
+            using var trace = RequestProfiler.ServiceCall();
             if (!File.Exists(itemsFilePath))
             {
                 return new List<Item>();
             }
 
-            var jsonData = File.ReadAllText(itemsFilePath);
-            var items = JsonConvert.DeserializeObject<List<Item>>(jsonData) ?? new List<Item>();
+            var items = JsonFileStore.ReadList<Item>(itemsFilePath);
             return items.Where(it => it.ItemLine == itemLineId).ToList();
         }
-
-        private async Task SaveToFile(List<ItemLine> itemLines)
-        {
-            var jsonData = JsonConvert.SerializeObject(itemLines, Formatting.Indented);
-            await File.WriteAllTextAsync(jsonFilePath, jsonData);
-        }
     }
 }
\ No newline at end of file
@@ -1,67 +1,128 @@
 using Cargohub.interfaces;
 using Cargohub.models;
 using Newtonsoft.Json;
+using System.Text.Json;
+using System.Text.Json.Nodes;
+using Microsoft.Extensions.Primitives;
 
 namespace Cargohub.services
 {
-    public class ItemService : ICrudService<Item, string>
+    public class ItemService : ICrudService<Item, string>, IAsyncCrudService<Item, string>
     {
         private readonly string jsonFilePath = "data/items.json";
         private readonly string inventoriesFilePath = "data/inventories.json";
+        private readonly SearchIndex<Item, string> _search =
+            SearchIndex<Item, string>.For("data/items.json", it => it.Uid, it => it.Code, it => it.Description, it => it.ShortDescription);
 
-        public async Task Create(Item entity)
-        {
-            var items = GetAll() ?? new List<Item>();
+        public Task Create(Item entity) => CreateAsync(entity);
 
-            // entity.Uid = Guid.NewGuid().ToString();
-            entity.Created_At = DateTime.Now;
-            entity.Updated_At = DateTime.Now;
+        public async Task CreateAsync(Item entity, CancellationToken cancellationToken = default)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            await JsonFileStore.UpdateAsync<Item>(jsonFilePath, items =>
+            {
+                // entity.Uid = Guid.NewGuid().ToString();
+                entity.Created_At = DateTime.Now;
+                entity.Updated_At = DateTime.Now;
 
-            items.Add(entity);
-            await SaveToFile(jsonFilePath, items);
+                return items.Add(entity);
+            }, cancellationToken);
+            _search.Reindex(entity.Uid);
         }
 
-        public async Task Delete(string uid)
+        /// <summary>
+        /// Adds a batch of validated items in one write.
+        /// </summary>
+        public void CreateMany(IReadOnlyList<Item> entities)
         {
-            var items = GetAll() ?? new List<Item>();
-            var item = items.FirstOrDefault(it => it.Uid == uid);
+            using var trace = RequestProfiler.ServiceCall();
+            var now = DateTime.Now;
+            foreach (var entity in entities)
+            {
+                entity.Created_At = now;
+                entity.Updated_At = now;
+            }
 
-            if (item == null)
+            JsonFileStore.Update<Item>(jsonFilePath, items => items.AddRange(entities));
+            foreach (var entity in entities)
             {
-                throw new KeyNotFoundException($"Item with UID {uid} not found.");
+                _search.Reindex(entity.Uid);
             }
+        }
+
+        public Task Delete(string uid) => DeleteAsync(uid);
+
+        public async Task DeleteAsync(string uid, CancellationToken cancellationToken = default)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            await JsonFileStore.UpdateAsync<Item>(jsonFilePath, items =>
+            {
+                var item = items.FirstOrDefault(it => it.Uid == uid);
+
+                if (item == null)
+                {
+                    throw new KeyNotFoundException($"Item with UID {uid} not found.");
+                }
 
-            items.Remove(item);
-            await SaveToFile(jsonFilePath, items);
+                return items.Remove(item);
+            }, cancellationToken);
+            _search.Reindex(uid);
         }
 
         public List<Item> GetAll(int? pageNumber = null, int? pageSize = null)
         {
-            if (!File.Exists(jsonFilePath))
-            {
-                return new List<Item>();
-            }
+            using var trace = RequestProfiler.ServiceCall();
+            return Page(JsonFileStore.Snapshot<Item>(jsonFilePath), pageNumber, pageSize);
+        }
 
-            var jsonData = File.ReadAllText(jsonFilePath);
-            var items = JsonConvert.DeserializeObject<List<Item>>(jsonData) ?? new List<Item>();
+        public async ValueTask<List<Item>> GetAllAsync(int? pageNumber = null, int? pageSize = null, CancellationToken cancellationToken = default)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            return Page(await JsonFileStore.SnapshotAsync<Item>(jsonFilePath, cancellationToken), pageNumber, pageSize);
+        }
 
+        private static List<Item> Page(IReadOnlyList<Item> items, int? pageNumber, int? pageSize)
+        {
             // Apply pagination only if pageNumber and pageSize are provided and valid
             if (pageNumber.HasValue && pageSize.HasValue && pageNumber > 0 && pageSize > 0)
             {
-                items = items
+                return items
                     .Skip((pageNumber.Value - 1) * pageSize.Value)
                     .Take(pageSize.Value)
                     .ToList();
             }
 
-            return items;
+            return items.ToList();
         }
 
 
+        /// <summary>
+        /// Items whose code, description or short description contain words starting with
+        /// every word of <paramref name="query"/>.
+        /// </summary>
+        public List<Item> Search(string query)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            return _search.Search(query);
+        }
+
+        /// <summary>
+        /// The items with the given uids, in the order asked for. Unknown uids are skipped.
+        /// </summary>
+        public List<Item> GetByIds(IEnumerable<string> uids)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            return uids
+                .Select(uid => JsonFileStore.FindById<Item, string>(jsonFilePath, it => it.Uid, uid))
+                .Where(item => item != null)
+                .Select(item => item!)
+                .ToList();
+        }
+
         public Item? GetById(string uid)
         {
-            var items = GetAll();
-            var item = items.FirstOrDefault(it => it.Uid == uid);
+            using var trace = RequestProfiler.ServiceCall();
+            var item = JsonFileStore.FindById<Item, string>(jsonFilePath, it => it.Uid, uid);
 
             if (item == null)
             {
@@ -71,45 +132,87 @@ namespace Cargohub.services
             return item;
         }
 
-        public async Task Update(Item entity)
+        // Like GetById, null when there is no item with this uid.
+        public async ValueTask<Item?> GetByIdAsync(string uid, CancellationToken cancellationToken = default)
         {
-            var items = GetAll() ?? new List<Item>();
-            var existingItem = items.FirstOrDefault(it => it.Uid == entity.Uid);
+            using var trace = RequestProfiler.ServiceCall();
+            return await JsonFileStore.FindByIdAsync<Item, string>(jsonFilePath, it => it.Uid, uid, cancellationToken);
+        }
 
-            if (existingItem == null)
+        public Task Update(Item entity) => UpdateAsync(entity);
+
+        public async Task UpdateAsync(Item entity, CancellationToken cancellationToken = default)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            await JsonFileStore.UpdateAsync<Item>(jsonFilePath, items =>
             {
-                throw new KeyNotFoundException($"Item with UID {entity.Uid} not found.");
-            }
+                var existingItem = items.FirstOrDefault(it => it.Uid == entity.Uid);
+
+                if (existingItem == null)
+                {
+                    throw new KeyNotFoundException($"Item with UID {entity.Uid} not found.");
+                }
+
+                var updated = EntityCopy.Shallow(existingItem);
+
+                updated.Code = entity.Code;
+                updated.Description = entity.Description;
+                updated.ShortDescription = entity.ShortDescription;
+                updated.UpcCode = entity.UpcCode;
+                updated.ModelNumber = entity.ModelNumber;
+                updated.CommodityCode = entity.CommodityCode;
+                updated.ItemLine = entity.ItemLine;
+                updated.ItemGroup = entity.ItemGroup;
+                updated.ItemType = entity.ItemType;
+                updated.UnitPurchaseQuantity = entity.UnitPurchaseQuantity;
+                updated.UnitOrderQuantity = entity.UnitOrderQuantity;
+                updated.PackOrderQuantity = entity.PackOrderQuantity;
+                updated.SupplierId = entity.SupplierId;
+                updated.SupplierCode = entity.SupplierCode;
+                updated.SupplierPartNumber = entity.SupplierPartNumber;
+                updated.Updated_At = DateTime.Now;
+
+                return items.Replace(existingItem, updated);
+            }, cancellationToken);
+            _search.Reindex(entity.Uid);
+        }
 
-            existingItem.Code = entity.Code;
-            existingItem.Description = entity.Description;
-            existingItem.ShortDescription = entity.ShortDescription;
-            existingItem.UpcCode = entity.UpcCode;
-            existingItem.ModelNumber = entity.ModelNumber;
-            existingItem.CommodityCode = entity.CommodityCode;
-            existingItem.ItemLine = entity.ItemLine;
-            existingItem.ItemGroup = entity.ItemGroup;
-            existingItem.ItemType = entity.ItemType;
-            existingItem.UnitPurchaseQuantity = entity.UnitPurchaseQuantity;
-            existingItem.UnitOrderQuantity = entity.UnitOrderQuantity;
-            existingItem.PackOrderQuantity = entity.PackOrderQuantity;
-            existingItem.SupplierId = entity.SupplierId;
-            existingItem.SupplierCode = entity.SupplierCode;
-            existingItem.SupplierPartNumber = entity.SupplierPartNumber;
-            existingItem.Updated_At = DateTime.Now;
-
-            await SaveToFile(jsonFilePath, items);
+        /// <summary>
+        /// Applies a JSON merge patch to the item under the file's write lock. When
+        /// <paramref name="ifMatch"/> is given the item must still be at that
+        /// <see cref="EntityVersion"/>.
+        /// </summary>
+        public Item Patch(string uid, JsonObject patch, StringValues ifMatch, JsonSerializerOptions options)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            Item? patched = null;
+            JsonFileStore.Update<Item>(jsonFilePath, items =>
+            {
+                var existingItem = items.FirstOrDefault(it => it.Uid == uid)
+                    ?? throw new KeyNotFoundException($"Item with UID {uid} not found.");
+                EntityVersion.Check(existingItem, ifMatch);
+
+                patched = MergePatch.Apply(existingItem, patch, options);
+                if (patched.Uid != existingItem.Uid)
+                {
+                    throw new InvalidOperationException("The item uid cannot be changed.");
+                }
+                patched.Updated_At = DateTime.Now;
+                return items.Replace(existingItem, patched);
+            });
+            _search.Reindex(uid);
+            return patched!;
         }
 
         public int GetTotalInventory(string itemId)
         {
+            using var trace = RequestProfiler.ServiceCall();
             if (!File.Exists(inventoriesFilePath))
             {
                 return 0;
             }
 
-            var jsonData = File.ReadAllText(inventoriesFilePath);
-            var inventories = JsonConvert.DeserializeObject<List<Inventory>>(jsonData) ?? new List<Inventory>();
+            var inventories = JsonFileStore.ReadList<Inventory>(inventoriesFilePath);
 
             var inventory = inventories.FirstOrDefault(inv => inv.Item_Id == itemId);
 
@@ -122,29 +225,25 @@ namespace Cargohub.services
         }
         public Item AddClassifications(string itemUid, List<int> newClassifications)
         {
-            var items = GetAll() ?? new List<Item>();
-            var item = items.FirstOrDefault(it => it.Uid == itemUid);
-
-            if (item == null)
+            using var trace = RequestProfiler.ServiceCall();
+            Item? item = null;
+            JsonFileStore.Update<Item>(jsonFilePath, items =>
             {
-                throw new KeyNotFoundException($"Item with UID {itemUid} not found.");
-            }
+                var existingItem = items.FirstOrDefault(it => it.Uid == itemUid);
 
-            if (item.Classifications_Id == null)
-            {
-                item.Classifications_Id = new List<int>();
-            }
+                if (existingItem == null)
+                {
+                    throw new KeyNotFoundException($"Item with UID {itemUid} not found.");
+                }
 
-            item.Classifications_Id.AddRange(newClassifications.Except(item.Classifications_Id));
-            SaveToFile(jsonFilePath, items);
+                item = EntityCopy.Shallow(existingItem);
+                var classifications = item.Classifications_Id ?? new List<int>();
+                item.Classifications_Id = classifications.Concat(newClassifications.Except(classifications)).ToList();
 
-            return item;
-        }
+                return items.Replace(existingItem, item);
+            });
 
-        private async Task SaveToFile<T>(string filePath, List<T> data)
-        {
-            var jsonData = JsonConvert.SerializeObject(data, Formatting.Indented);
-            await File.WriteAllTextAsync(filePath, jsonData);
+            return item!;
         }
     }
 }
\ No newline at end of file
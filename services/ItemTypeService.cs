@@ -2,6 +2,7 @@ using System;
 using System.Collections.Generic;
 using System.IO;
 using System.Linq;
+using System.Threading;
 using System.Threading.Tasks;
 using Cargohub.interfaces;
 using Cargohub.models;
@@ -9,65 +10,76 @@ using Newtonsoft.Json;
 
 namespace Cargohub.services
 {
-    public class ItemTypeService : ICrudService<ItemType, int>
+    public class ItemTypeService : ICrudService<ItemType, int>, IAsyncCrudService<ItemType, int>
     {
         private readonly string jsonFilePath = "data/item_types.json";
         private readonly string itemsFilePath = "data/items.json";
 
-        public async Task Create(ItemType entity)
-        {
-            var itemTypes = GetAll() ?? new List<ItemType>();
+        public Task Create(ItemType entity) => CreateAsync(entity);
 
-            var nextId = itemTypes.Any() ? itemTypes.Max(it => it.Id) + 1 : 1;
-            entity.Id = nextId;
-            entity.Created_At = DateTime.Now;
-            entity.Updated_At = DateTime.Now;
+        public async Task CreateAsync(ItemType entity, CancellationToken cancellationToken = default)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            await JsonFileStore.UpdateAsync<ItemType>(jsonFilePath, itemTypes =>
+            {
+                var nextId = IdSequence.Next(jsonFilePath, itemTypes, it => it.Id);
+                entity.Id = nextId;
+                entity.Created_At = DateTime.Now;
+                entity.Updated_At = DateTime.Now;
 
-            itemTypes.Add(entity);
-            await SaveToFile(itemTypes);
+                return itemTypes.Add(entity);
+            }, cancellationToken);
         }
 
-        public async Task Delete(int id)
-        {
-            var itemTypes = GetAll() ?? new List<ItemType>();
-            var itemType = itemTypes.FirstOrDefault(it => it.Id == id);
+        public Task Delete(int id) => DeleteAsync(id);
 
-            if (itemType == null)
+        public async Task DeleteAsync(int id, CancellationToken cancellationToken = default)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            await JsonFileStore.UpdateAsync<ItemType>(jsonFilePath, itemTypes =>
             {
-                throw new KeyNotFoundException($"ItemType with ID {id} not found.");
-            }
+                var itemType = itemTypes.FirstOrDefault(it => it.Id == id);
+
+                if (itemType == null)
+                {
+                    throw new KeyNotFoundException($"ItemType with ID {id} not found.");
+                }
 
-            itemTypes.Remove(itemType);
-            await SaveToFile(itemTypes);
+                return itemTypes.Remove(itemType);
+            }, cancellationToken);
         }
 
         public List<ItemType> GetAll(int? pageNumber = null, int? pageSize = null)
         {
-            if (!File.Exists(jsonFilePath))
-            {
-                return new List<ItemType>();
-            }
+            using var trace = RequestProfiler.ServiceCall();
+            return Page(JsonFileStore.Snapshot<ItemType>(jsonFilePath), pageNumber, pageSize);
+        }
 
-            var jsonData = File.ReadAllText(jsonFilePath);
-            var itemTypes = JsonConvert.DeserializeObject<List<ItemType>>(jsonData) ?? new List<ItemType>();
+        public async ValueTask<List<ItemType>> GetAllAsync(int? pageNumber = null, int? pageSize = null, CancellationToken cancellationToken = default)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            return Page(await JsonFileStore.SnapshotAsync<ItemType>(jsonFilePath, cancellationToken), pageNumber, pageSize);
+        }
 
+        private static List<ItemType> Page(IReadOnlyList<ItemType> itemTypes, int? pageNumber, int? pageSize)
+        {
             // Apply pagination only if pageNumber and pageSize are provided and valid
             if (pageNumber.HasValue && pageSize.HasValue && pageNumber > 0 && pageSize > 0)
             {
-                itemTypes = itemTypes
+                return itemTypes
                     .Skip((pageNumber.Value - 1) * pageSize.Value)
                     .Take(pageSize.Value)
                     .ToList();
             }
 
-            return itemTypes;
+            return itemTypes.ToList();
         }
 
 
         public ItemType GetById(int id)
         {
-            var itemTypes = GetAll();
-            var itemType = itemTypes.FirstOrDefault(it => it.Id == id);
+            using var trace = RequestProfiler.ServiceCall();
+            var itemType = JsonFileStore.FindById<ItemType, int>(jsonFilePath, it => it.Id, id);
 
             if (itemType == null)
             {
@@ -77,39 +89,47 @@ namespace Cargohub.services
             return itemType;
         }
 
-        public async Task Update(ItemType entity)
+        public async ValueTask<ItemType> GetByIdAsync(int id, CancellationToken cancellationToken = default)
         {
-            var itemTypes = GetAll() ?? new List<ItemType>();
-            var existingItemType = itemTypes.FirstOrDefault(it => it.Id == entity.Id);
+            using var trace = RequestProfiler.ServiceCall();
+            return await JsonFileStore.FindByIdAsync<ItemType, int>(jsonFilePath, it => it.Id, id, cancellationToken)
+                ?? throw new KeyNotFoundException($"ItemType with ID {id} not found.");
+        }
+
+        public Task Update(ItemType entity) => UpdateAsync(entity);
 
-            if (existingItemType == null)
+        public async Task UpdateAsync(ItemType entity, CancellationToken cancellationToken = default)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            await JsonFileStore.UpdateAsync<ItemType>(jsonFilePath, itemTypes =>
             {
-                throw new KeyNotFoundException($"ItemType with ID {entity.Id} not found.");
-            }
+                var existingItemType = itemTypes.FirstOrDefault(it => it.Id == entity.Id);
+
+                if (existingItemType == null)
+                {
+                    throw new KeyNotFoundException($"ItemType with ID {entity.Id} not found.");
+                }
+
+                var updated = EntityCopy.Shallow(existingItemType);
 
-            existingItemType.Name = entity.Name;
-            existingItemType.Description = entity.Description;
-            existingItemType.Updated_At = DateTime.Now;
+                updated.Name = entity.Name;
+                updated.Description = entity.Description;
+                updated.Updated_At = DateTime.Now;
 
-            await SaveToFile(itemTypes);
+                return itemTypes.Replace(existingItemType, updated);
+            }, cancellationToken);
         }
 
         public List<Item> GetItemsByItemTypeId(int itemTypeId)
         {
+            using var trace = RequestProfiler.ServiceCall();
             if (!File.Exists(itemsFilePath))
             {
                 return new List<Item>();
             }
 
-            var jsonData = File.ReadAllText(itemsFilePath);
-            var items = JsonConvert.DeserializeObject<List<Item>>(jsonData) ?? new List<Item>();
+            var items = JsonFileStore.ReadList<Item>(itemsFilePath);
             return items.Where(it => it.ItemType == itemTypeId).ToList();
         }
-
-        private async Task SaveToFile(List<ItemType> itemTypes)
-        {
-            var jsonData = JsonConvert.SerializeObject(itemTypes, Formatting.Indented);
-            await File.WriteAllTextAsync(jsonFilePath, jsonData);
-        }
     }
 }
\ No newline at end of file
@@ -0,0 +1,501 @@
+using System;
+using System.Collections.Concurrent;
+using System.Collections.Generic;
+using System.Collections.Immutable;
+using System.Diagnostics;
+using System.IO;
+using System.Threading;
+using System.Threading.Tasks;
+using Cargohub.interfaces;
+
+namespace Cargohub.services
+{
+    /// <summary>
+    /// Reads and writes the collection files under data/, each either indented JSON or a
+    /// <see cref="CompactSnapshot"/> binary snapshot. A file is always saved in the format it
+    /// is already in; new files use <see cref="DefaultFormat"/>. Disk access takes the
+    /// file's lock, so a reader never sees a half-written file, and is recorded in
+    /// <see cref="Metrics"/> per collection (lock wait, disk time and bytes, (de)serialization).
+    /// Parsed collections are kept in memory as immutable snapshots that stay valid for as
+    /// long as the file's timestamp and size are unchanged. Readers take the current
+    /// snapshot without locking or copying; writers build the next version from it
+    /// (sharing the unchanged parts), save it and swap it in.
+    /// </summary>
+    public static class JsonFileStore
+    {
+        private static readonly ConcurrentDictionary<string, SemaphoreSlim> _fileLocks = new();
+        private static readonly ConcurrentDictionary<string, CachedCollection> _cache = new();
+
+        /// <summary>
+        /// The format of collection files that do not exist yet, such as new archive or shard files.
+        /// </summary>
+        public static SnapshotFormat DefaultFormat { get; set; } = SnapshotFormat.Json;
+
+        /// <summary>
+        /// Reads and writes the JSON files. Both implementations produce the same bytes.
+        /// </summary>
+        public static IRecordSerializer Serializer { get; set; } = SourceGeneratedRecordSerializer.Instance;
+
+        /// <summary>
+        /// The current version of the collection. Entities in a snapshot are shared with
+        /// every other reader and must not be modified; use <see cref="Update{T}"/> with
+        /// copies instead. An empty list is returned when the file does not exist.
+        /// </summary>
+        public static ImmutableList<T> Snapshot<T>(string filePath)
+        {
+            return File.Exists(filePath) ? Load<T>(filePath).Items : ImmutableList<T>.Empty;
+        }
+
+        public static List<T> ReadList<T>(string filePath)
+        {
+            return new List<T>(Load<T>(filePath).Items);
+        }
+
+        /// <summary>
+        /// Looks an entity up through a key index that is built once per loaded version
+        /// of the file. Returns default when the file or the key does not exist.
+        /// </summary>
+        public static T? FindById<T, TKey>(string filePath, Func<T, TKey> keySelector, TKey id) where TKey : notnull
+        {
+            if (!File.Exists(filePath))
+            {
+                return default;
+            }
+
+            return Lookup(Load<T>(filePath), keySelector, id);
+        }
+
+        /// <summary>
+        /// <see cref="Snapshot{T}"/> without blocking: completes synchronously while the cached
+        /// version is current, and otherwise waits for the file's lock and reads it asynchronously.
+        /// </summary>
+        public static async ValueTask<ImmutableList<T>> SnapshotAsync<T>(string filePath, CancellationToken cancellationToken = default)
+        {
+            return File.Exists(filePath) ? (await LoadAsync<T>(filePath, cancellationToken)).Items : ImmutableList<T>.Empty;
+        }
+
+        public static async ValueTask<T?> FindByIdAsync<T, TKey>(string filePath, Func<T, TKey> keySelector, TKey id, CancellationToken cancellationToken = default) where TKey : notnull
+        {
+            if (!File.Exists(filePath))
+            {
+                return default;
+            }
+
+            return Lookup(await LoadAsync<T>(filePath, cancellationToken), keySelector, id);
+        }
+
+        private static T? Lookup<T, TKey>(CachedCollection<T> collection, Func<T, TKey> keySelector, TKey id) where TKey : notnull
+        {
+            if (collection.Index is not Dictionary<TKey, T> index)
+            {
+                index = new Dictionary<TKey, T>();
+                foreach (var item in collection.Items)
+                {
+                    var key = keySelector(item);
+                    if (key != null)
+                    {
+                        index.TryAdd(key, item);
+                    }
+                }
+                collection.Index = index;
+            }
+
+            return id != null && index.TryGetValue(id, out var found) ? found : default;
+        }
+
+        /// <summary>
+        /// Returns a value derived from the whole collection, such as a secondary index.
+        /// It is built once per loaded version of the file and shared by every caller
+        /// until the file changes, so callers must treat it as read-only.
+        /// </summary>
+        public static TView GetView<T, TView>(string filePath, string name, Func<IReadOnlyList<T>, TView> build) where TView : class
+        {
+            if (!File.Exists(filePath))
+            {
+                return build(ImmutableList<T>.Empty);
+            }
+
+            var collection = Load<T>(filePath);
+            return (TView)collection.Views.GetOrAdd(name, _ => build(collection.Items));
+        }
+
+        /// <summary>
+        /// A number that changes whenever the collection is written or reloaded from disk, and
+        /// 0 while the file does not exist. Lets a value derived from several files be cached
+        /// until one of them changes.
+        /// </summary>
+        public static long Version<T>(string filePath)
+        {
+            return File.Exists(filePath) ? Load<T>(filePath).Version : 0;
+        }
+
+        /// <summary>
+        /// Parses the file into the cache ahead of the first request.
+        /// </summary>
+        public static int Preload<T>(string filePath)
+        {
+            return File.Exists(filePath) ? Load<T>(filePath).Items.Count : 0;
+        }
+
+        /// <summary>
+        /// Applies <paramref name="change"/> to the current snapshot and saves the result.
+        /// Writers to the same file run one at a time, so the change always sees the latest
+        /// version; readers keep using the previous snapshot until the new one is swapped in.
+        /// If <paramref name="change"/> throws, nothing is written.
+        /// </summary>
+        public static ImmutableList<T> Update<T>(string filePath, Func<ImmutableList<T>, ImmutableList<T>> change)
+        {
+            var fileLock = LockFor(filePath);
+            var metrics = Metrics.ForCollection(CollectionName(filePath));
+            WaitForLock(fileLock, filePath, metrics);
+            try
+            {
+                var current = File.Exists(filePath) ? LoadLocked<T>(filePath).Items : ImmutableList<T>.Empty;
+                var next = change(current);
+                if (!ReferenceEquals(next, current))
+                {
+                    WriteLocked(filePath, next, metrics);
+                }
+                return next;
+            }
+            finally
+            {
+                fileLock.Release();
+            }
+        }
+
+        /// <summary>
+        /// <see cref="Update{T}"/> without blocking a thread on the file's lock or on disk.
+        /// Cancellation is honoured until the write starts; a write that has started is always
+        /// finished, so the file is never left half-written.
+        /// </summary>
+        public static async Task<ImmutableList<T>> UpdateAsync<T>(string filePath, Func<ImmutableList<T>, ImmutableList<T>> change, CancellationToken cancellationToken = default)
+        {
+            var fileLock = LockFor(filePath);
+            var metrics = Metrics.ForCollection(CollectionName(filePath));
+            await WaitForLockAsync(fileLock, filePath, metrics, cancellationToken);
+            try
+            {
+                var current = File.Exists(filePath) ? (await LoadLockedAsync<T>(filePath, cancellationToken)).Items : ImmutableList<T>.Empty;
+                var next = change(current);
+                if (!ReferenceEquals(next, current))
+                {
+                    cancellationToken.ThrowIfCancellationRequested();
+                    await WriteLockedAsync(filePath, next, metrics);
+                }
+                return next;
+            }
+            finally
+            {
+                fileLock.Release();
+            }
+        }
+
+        public static void WriteList<T>(string filePath, List<T> data)
+        {
+            var fileLock = LockFor(filePath);
+            var metrics = Metrics.ForCollection(CollectionName(filePath));
+            WaitForLock(fileLock, filePath, metrics);
+            try
+            {
+                WriteLocked(filePath, data.ToImmutableList(), metrics);
+            }
+            finally
+            {
+                fileLock.Release();
+            }
+        }
+
+        public static async Task WriteListAsync<T>(string filePath, List<T> data)
+        {
+            var fileLock = LockFor(filePath);
+            var metrics = Metrics.ForCollection(CollectionName(filePath));
+            await WaitForLockAsync(fileLock, filePath, metrics, CancellationToken.None);
+            try
+            {
+                await WriteLockedAsync(filePath, data.ToImmutableList(), metrics);
+            }
+            finally
+            {
+                fileLock.Release();
+            }
+        }
+
+        /// <summary>
+        /// Rewrites the file in <paramref name="format"/> under its lock, keeping the records as
+        /// they are. Returns false when the file is already in that format.
+        /// </summary>
+        public static bool Convert(string filePath, SnapshotFormat format)
+        {
+            var fileLock = LockFor(filePath);
+            var metrics = Metrics.ForCollection(CollectionName(filePath));
+            WaitForLock(fileLock, filePath, metrics);
+            try
+            {
+                var data = File.ReadAllBytes(filePath);
+                if (CompactSnapshot.FormatOf(data) == format)
+                {
+                    return false;
+                }
+
+                File.WriteAllBytes(filePath, CompactSnapshot.Convert(data, format));
+                _cache.TryRemove(Path.GetFullPath(filePath), out _);
+                return true;
+            }
+            finally
+            {
+                fileLock.Release();
+            }
+        }
+
+        public static string CollectionName(string filePath) => Path.GetFileNameWithoutExtension(filePath);
+
+        private static CachedCollection<T> Load<T>(string filePath)
+        {
+            var fullPath = Path.GetFullPath(filePath);
+            var metrics = Metrics.ForCollection(CollectionName(filePath));
+
+            if (TryGetCurrent<T>(fullPath, out var cached))
+            {
+                metrics.RecordCacheHit();
+                return cached;
+            }
+
+            var fileLock = LockFor(filePath);
+            WaitForLock(fileLock, filePath, metrics);
+            try
+            {
+                return LoadLocked<T>(filePath);
+            }
+            finally
+            {
+                fileLock.Release();
+            }
+        }
+
+        private static ValueTask<CachedCollection<T>> LoadAsync<T>(string filePath, CancellationToken cancellationToken)
+        {
+            var fullPath = Path.GetFullPath(filePath);
+            var metrics = Metrics.ForCollection(CollectionName(filePath));
+
+            if (TryGetCurrent<T>(fullPath, out var cached))
+            {
+                metrics.RecordCacheHit();
+                return new ValueTask<CachedCollection<T>>(cached);
+            }
+
+            return new ValueTask<CachedCollection<T>>(LoadSlowAsync());
+
+            async Task<CachedCollection<T>> LoadSlowAsync()
+            {
+                var fileLock = LockFor(filePath);
+                await WaitForLockAsync(fileLock, filePath, metrics, cancellationToken);
+                try
+                {
+                    return await LoadLockedAsync<T>(filePath, cancellationToken);
+                }
+                finally
+                {
+                    fileLock.Release();
+                }
+            }
+        }
+
+        // Caller holds the file lock. Another thread may have loaded the file while we waited.
+        private static CachedCollection<T> LoadLocked<T>(string filePath)
+        {
+            var fullPath = Path.GetFullPath(filePath);
+            var metrics = Metrics.ForCollection(CollectionName(filePath));
+
+            if (TryGetCurrent<T>(fullPath, out var cached))
+            {
+                metrics.RecordCacheHit();
+                return cached;
+            }
+            metrics.RecordCacheMiss();
+
+            byte[] data;
+            FileInfo stamp;
+            using (RequestProfiler.Step("read", filePath))
+            {
+                stamp = new FileInfo(fullPath);
+                var started = Stopwatch.GetTimestamp();
+                using var stream = new FileStream(filePath, FileMode.Open, FileAccess.Read, FileShare.Read);
+                data = new byte[stream.Length];
+                stream.ReadExactly(data);
+                metrics.RecordRead(stream.Length, Stopwatch.GetTimestamp() - started);
+            }
+
+            return Parse<T>(filePath, data, stamp, metrics);
+        }
+
+        // Caller holds the file lock.
+        private static async ValueTask<CachedCollection<T>> LoadLockedAsync<T>(string filePath, CancellationToken cancellationToken)
+        {
+            var fullPath = Path.GetFullPath(filePath);
+            var metrics = Metrics.ForCollection(CollectionName(filePath));
+
+            if (TryGetCurrent<T>(fullPath, out var cached))
+            {
+                metrics.RecordCacheHit();
+                return cached;
+            }
+            metrics.RecordCacheMiss();
+
+            byte[] data;
+            FileInfo stamp;
+            using (RequestProfiler.Step("read", filePath))
+            {
+                stamp = new FileInfo(fullPath);
+                var started = Stopwatch.GetTimestamp();
+                await using var stream = new FileStream(filePath, FileMode.Open, FileAccess.Read, FileShare.Read, 4096, useAsync: true);
+                data = new byte[stream.Length];
+                await stream.ReadExactlyAsync(data, cancellationToken);
+                metrics.RecordRead(stream.Length, Stopwatch.GetTimestamp() - started);
+            }
+
+            return Parse<T>(filePath, data, stamp, metrics);
+        }
+
+        private static CachedCollection<T> Parse<T>(string filePath, byte[] fileData, FileInfo stamp, CollectionMetrics metrics)
+        {
+            using (RequestProfiler.Step("deserialize", CollectionName(filePath)))
+            {
+                var started = Stopwatch.GetTimestamp();
+                var data = CompactSnapshot.Deserialize<T>(fileData, Serializer);
+                metrics.Deserialize.Record(Stopwatch.GetTimestamp() - started);
+
+                var loaded = new CachedCollection<T>(data.ToImmutableList(), stamp, CompactSnapshot.FormatOf(fileData));
+                _cache[Path.GetFullPath(filePath)] = loaded;
+                return loaded;
+            }
+        }
+
+        private static bool TryGetCurrent<T>(string fullPath, out CachedCollection<T> cached)
+        {
+            if (_cache.TryGetValue(fullPath, out var entry) && entry is CachedCollection<T> typed && typed.IsCurrent(new FileInfo(fullPath)))
+            {
+                cached = typed;
+                return true;
+            }
+            cached = null!;
+            return false;
+        }
+
+        // Caller holds the file lock.
+        private static void WriteLocked<T>(string filePath, ImmutableList<T> snapshot, CollectionMetrics metrics)
+        {
+            var format = FormatFor(filePath);
+            var bytes = Serialize(filePath, snapshot, format, metrics);
+
+            using var step = RequestProfiler.Step("write", filePath);
+            var started = Stopwatch.GetTimestamp();
+            File.WriteAllBytes(filePath, bytes);
+            metrics.RecordWrite(bytes.Length, Stopwatch.GetTimestamp() - started);
+            Publish(filePath, snapshot, format);
+        }
+
+        // Caller holds the file lock.
+        private static async Task WriteLockedAsync<T>(string filePath, ImmutableList<T> snapshot, CollectionMetrics metrics)
+        {
+            var format = FormatFor(filePath);
+            var bytes = Serialize(filePath, snapshot, format, metrics);
+
+            using var step = RequestProfiler.Step("write", filePath);
+            var started = Stopwatch.GetTimestamp();
+            await File.WriteAllBytesAsync(filePath, bytes);
+            metrics.RecordWrite(bytes.Length, Stopwatch.GetTimestamp() - started);
+            Publish(filePath, snapshot, format);
+        }
+
+        private static byte[] Serialize<T>(string filePath, ImmutableList<T> data, SnapshotFormat format, CollectionMetrics metrics)
+        {
+            using var step = RequestProfiler.Step("serialize", CollectionName(filePath));
+            var started = Stopwatch.GetTimestamp();
+            var bytes = CompactSnapshot.Serialize(data, format, Serializer);
+            metrics.Serialize.Record(Stopwatch.GetTimestamp() - started);
+            return bytes;
+        }
+
+        // Caller holds the file lock. The cached entry knows the format unless the file was
+        // replaced behind our back, in which case its header is read.
+        private static SnapshotFormat FormatFor(string filePath)
+        {
+            var file = new FileInfo(Path.GetFullPath(filePath));
+            if (!file.Exists)
+            {
+                return DefaultFormat;
+            }
+            return _cache.TryGetValue(file.FullName, out var cached) && cached.IsCurrent(file)
+                ? cached.Format
+                : CompactSnapshot.FormatOf(filePath);
+        }
+
+        // Called under the file lock right after a write, so the stamp matches the new contents.
+        private static void Publish<T>(string filePath, ImmutableList<T> snapshot, SnapshotFormat format)
+        {
+            var fullPath = Path.GetFullPath(filePath);
+            _cache[fullPath] = new CachedCollection<T>(snapshot, new FileInfo(fullPath), format);
+        }
+
+        private static void WaitForLock(SemaphoreSlim fileLock, string filePath, CollectionMetrics metrics)
+        {
+            var started = Stopwatch.GetTimestamp();
+            using (RequestProfiler.Step("lock", filePath))
+            {
+                fileLock.Wait();
+            }
+            metrics.LockWait.Record(Stopwatch.GetTimestamp() - started);
+        }
+
+        private static async Task WaitForLockAsync(SemaphoreSlim fileLock, string filePath, CollectionMetrics metrics, CancellationToken cancellationToken)
+        {
+            var started = Stopwatch.GetTimestamp();
+            using (RequestProfiler.Step("lock", filePath))
+            {
+                await fileLock.WaitAsync(cancellationToken);
+            }
+            metrics.LockWait.Record(Stopwatch.GetTimestamp() - started);
+        }
+
+        private static SemaphoreSlim LockFor(string filePath) =>
+            _fileLocks.GetOrAdd(Path.GetFullPath(filePath), _ => new SemaphoreSlim(1, 1));
+    }
+
+    internal abstract class CachedCollection
+    {
+        private static long _lastVersion;
+
+        private readonly DateTime _lastWriteUtc;
+        private readonly long _length;
+
+        protected CachedCollection(FileInfo stamp, SnapshotFormat format)
+        {
+            _lastWriteUtc = stamp.LastWriteTimeUtc;
+            _length = stamp.Length;
+            Format = format;
+            Version = Interlocked.Increment(ref _lastVersion);
+        }
+
+        public long Version { get; }
+
+        public SnapshotFormat Format { get; }
+
+        public object? Index { get; set; }
+
+        public ConcurrentDictionary<string, object> Views { get; } = new();
+
+        public bool IsCurrent(FileInfo file) =>
+            file.Exists && file.LastWriteTimeUtc == _lastWriteUtc && file.Length == _length;
+    }
+
+    internal sealed class CachedCollection<T> : CachedCollection
+    {
+        public CachedCollection(ImmutableList<T> items, FileInfo stamp, SnapshotFormat format) : base(stamp, format)
+        {
+            Items = items;
+        }
+
+        public ImmutableList<T> Items { get; }
+    }
+}
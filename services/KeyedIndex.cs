@@ -0,0 +1,50 @@
+using System;
+using System.Collections.Generic;
+using System.Linq;
+
+namespace Cargohub.services
+{
+    /// <summary>
+    /// Records grouped by an integer key, such as orders by warehouse or shipments by order,
+    /// built in one pass. A record with several keys is listed under each of them. Meant to be
+    /// cached with <see cref="JsonFileStore.GetView{T, TView}"/>, so lookups cost only as much
+    /// as the records they return.
+    /// </summary>
+    public class KeyedIndex<T>
+    {
+        private readonly Dictionary<int, List<T>> _byKey = new();
+
+        public static KeyedIndex<T> Build(IEnumerable<T> records, Func<T, IEnumerable<int>> keysOf)
+        {
+            var index = new KeyedIndex<T>();
+            foreach (var record in records)
+            {
+                foreach (var key in keysOf(record).Distinct())
+                {
+                    if (!index._byKey.TryGetValue(key, out var grouped))
+                    {
+                        grouped = new List<T>();
+                        index._byKey[key] = grouped;
+                    }
+                    grouped.Add(record);
+                }
+            }
+            return index;
+        }
+
+        public IReadOnlyList<T> For(int key) =>
+            _byKey.TryGetValue(key, out var grouped) ? grouped : Array.Empty<T>();
+
+        /// <summary>
+        /// The records listed under any of <paramref name="keys"/>, each once, ordered by id.
+        /// </summary>
+        public List<T> For(IEnumerable<int> keys, Func<T, int> idOf)
+        {
+            return keys.Distinct()
+                .SelectMany(For)
+                .DistinctBy(idOf)
+                .OrderBy(idOf)
+                .ToList();
+        }
+    }
+}
@@ -0,0 +1,277 @@
+using System;
+using System.Collections.Generic;
+using System.Globalization;
+using System.Linq;
+using System.Linq.Expressions;
+using System.Reflection;
+using Microsoft.AspNetCore.Http;
+
+namespace Cargohub.services
+{
+    /// <summary>
+    /// Filters and sort order for a list endpoint, taken from the query string:
+    /// <c>order_status=Pending</c> matches a field, <c>order_date[gte]=2024-01-01</c> is a range
+    /// predicate (<c>ne</c>, <c>gt</c>, <c>gte</c>, <c>lt</c>, <c>lte</c>), and
+    /// <c>sort=-order_date,id</c> sorts, descending for fields prefixed with '-'. Field names
+    /// are matched to the entity's properties ignoring case and underscores, and values are
+    /// converted to the property's type, so dates and numbers compare as such.
+    /// </summary>
+    public class ListQuery
+    {
+        private static readonly HashSet<string> ReservedParameters = new(StringComparer.OrdinalIgnoreCase)
+        {
+            "pageNumber", "pageSize", "include_archived", "sort", "format",
+            ProfilingMiddleware.QueryParameter, IdList.Parameter
+        };
+
+        private readonly List<Filter> _filters;
+        private readonly List<(Func<object, object?> Get, bool Descending)> _sort;
+
+        private ListQuery(List<Filter> filters, List<(Func<object, object?> Get, bool Descending)> sort)
+        {
+            _filters = filters;
+            _sort = sort;
+        }
+
+        public bool IsEmpty => _filters.Count == 0 && _sort.Count == 0;
+
+        public bool IsSorted => _sort.Count > 0;
+
+        /// <summary>
+        /// Reads the filters and sort order for <typeparamref name="T"/> from the query string.
+        /// Unknown fields and values of the wrong type throw an
+        /// <see cref="InvalidOperationException"/>.
+        /// </summary>
+        public static ListQuery Parse<T>(IQueryCollection query)
+        {
+            var filters = new List<Filter>();
+            var sort = new List<(Func<object, object?> Get, bool Descending)>();
+
+            foreach (var (key, values) in query)
+            {
+                if (key.Equals("sort", StringComparison.OrdinalIgnoreCase))
+                {
+                    foreach (var field in values.SelectMany(v => (v ?? string.Empty).Split(',', StringSplitOptions.RemoveEmptyEntries | StringSplitOptions.TrimEntries)))
+                    {
+                        var descending = field.StartsWith('-');
+                        sort.Add((QueryFields<T>.Get(descending ? field[1..] : field).Getter, descending));
+                    }
+                    continue;
+                }
+
+                if (ReservedParameters.Contains(key))
+                {
+                    continue;
+                }
+
+                var (name, op) = SplitOperator(key);
+                var property = QueryFields<T>.Get(name);
+                foreach (var value in values)
+                {
+                    filters.Add(new Filter(property, op, property.Convert(value ?? string.Empty)));
+                }
+            }
+
+            return new ListQuery(filters, sort);
+        }
+
+        /// <summary>
+        /// The records worth checking: the matches of the first index whose field has an
+        /// equality filter, or all records when none applies.
+        /// </summary>
+        public IEnumerable<T> Candidates<T>(IEnumerable<T> all, params QueryIndex<T>[] indexes)
+        {
+            foreach (var index in indexes)
+            {
+                var property = QueryFields<T>.Get(index.Field);
+                var filter = _filters.FirstOrDefault(f => f.Field == property && f.Operator == "eq");
+                if (filter != null)
+                {
+                    return index.Lookup(filter.Value);
+                }
+            }
+            return all;
+        }
+
+        /// <summary>
+        /// The records that pass every filter, in the requested order. Records are filtered as
+        /// they are enumerated; only the matches are kept.
+        /// </summary>
+        public List<T> Apply<T>(IEnumerable<T> records)
+        {
+            var matches = Matching(records);
+            if (_sort.Count == 0)
+            {
+                return matches.ToList();
+            }
+
+            IOrderedEnumerable<T> ordered = _sort[0].Descending
+                ? matches.OrderByDescending(r => _sort[0].Get(r!), ValueComparer.Instance)
+                : matches.OrderBy(r => _sort[0].Get(r!), ValueComparer.Instance);
+            foreach (var (get, descending) in _sort.Skip(1))
+            {
+                ordered = descending
+                    ? ordered.ThenByDescending(r => get(r!), ValueComparer.Instance)
+                    : ordered.ThenBy(r => get(r!), ValueComparer.Instance);
+            }
+            return ordered.ToList();
+        }
+
+        /// <summary>
+        /// The records that pass every filter, lazily and in their original order.
+        /// </summary>
+        public IEnumerable<T> Matching<T>(IEnumerable<T> records)
+        {
+            return records.Where(record => record != null && _filters.All(filter => filter.Matches(record)));
+        }
+
+        private static (string Name, string Operator) SplitOperator(string key)
+        {
+            var open = key.IndexOf('[');
+            if (open < 0)
+            {
+                return (key, "eq");
+            }
+
+            var op = key[(open + 1)..].TrimEnd(']').ToLowerInvariant();
+            if (!Filter.Operators.Contains(op))
+            {
+                throw new InvalidOperationException($"Unknown filter operator '{op}'. Use one of: {string.Join(", ", Filter.Operators)}.");
+            }
+            return (key[..open], op);
+        }
+
+        private sealed class Filter
+        {
+            public static readonly string[] Operators = { "eq", "ne", "gt", "gte", "lt", "lte" };
+
+            public Filter(QueryField field, string op, object? value)
+            {
+                Field = field;
+                Operator = op;
+                Value = value;
+            }
+
+            public QueryField Field { get; }
+            public string Operator { get; }
+            public object? Value { get; }
+
+            public bool Matches(object record)
+            {
+                var comparison = ValueComparer.Instance.Compare(Field.Getter(record), Value);
+                return Operator switch
+                {
+                    "eq" => comparison == 0,
+                    "ne" => comparison != 0,
+                    "gt" => comparison > 0,
+                    "gte" => comparison >= 0,
+                    "lt" => comparison < 0,
+                    _ => comparison <= 0
+                };
+            }
+        }
+
+        // Strings compare without regard to case, so status=pending finds "Pending".
+        private sealed class ValueComparer : IComparer<object?>
+        {
+            public static readonly ValueComparer Instance = new();
+
+            public int Compare(object? x, object? y)
+            {
+                if (x is string a && y is string b)
+                {
+                    return string.Compare(a, b, StringComparison.OrdinalIgnoreCase);
+                }
+                return Comparer<object?>.Default.Compare(x, y);
+            }
+        }
+    }
+
+    /// <summary>
+    /// An index a <see cref="ListQuery"/> can use for equality filters on <see cref="Field"/>.
+    /// <see cref="Lookup"/> receives the filter value converted to the field's type.
+    /// </summary>
+    public class QueryIndex<T>
+    {
+        public QueryIndex(string field, Func<object?, IEnumerable<T>> lookup)
+        {
+            Field = field;
+            Lookup = lookup;
+        }
+
+        public string Field { get; }
+        public Func<object?, IEnumerable<T>> Lookup { get; }
+    }
+
+    internal sealed class QueryField
+    {
+        private static readonly HashSet<Type> FilterableTypes = new()
+        {
+            typeof(string), typeof(int), typeof(long), typeof(decimal), typeof(double), typeof(bool), typeof(DateTime)
+        };
+
+        private QueryField(PropertyInfo property, Func<object, object?> getter)
+        {
+            Property = property;
+            Getter = getter;
+        }
+
+        public PropertyInfo Property { get; }
+        public Func<object, object?> Getter { get; }
+
+        public static QueryField? For(PropertyInfo property)
+        {
+            var type = Nullable.GetUnderlyingType(property.PropertyType) ?? property.PropertyType;
+            if (!FilterableTypes.Contains(type) || property.GetIndexParameters().Length > 0)
+            {
+                return null;
+            }
+
+            var record = Expression.Parameter(typeof(object), "record");
+            var getter = Expression.Lambda<Func<object, object?>>(
+                Expression.Convert(Expression.Property(Expression.Convert(record, property.DeclaringType!), property), typeof(object)),
+                record).Compile();
+            return new QueryField(property, getter);
+        }
+
+        public object? Convert(string value)
+        {
+            var type = Nullable.GetUnderlyingType(Property.PropertyType) ?? Property.PropertyType;
+            if (value.Length == 0 && type != typeof(string))
+            {
+                return null;
+            }
+
+            try
+            {
+                if (type == typeof(DateTime))
+                {
+                    return DateTime.Parse(value, CultureInfo.InvariantCulture, DateTimeStyles.RoundtripKind);
+                }
+                return System.Convert.ChangeType(value, type, CultureInfo.InvariantCulture);
+            }
+            catch (Exception ex) when (ex is FormatException || ex is OverflowException)
+            {
+                throw new InvalidOperationException($"'{value}' is not a valid value for {Property.Name}.");
+            }
+        }
+    }
+
+    internal static class QueryFields<T>
+    {
+        private static readonly Dictionary<string, QueryField> _fields = typeof(T)
+            .GetProperties(BindingFlags.Public | BindingFlags.Instance)
+            .Select(QueryField.For)
+            .Where(field => field != null)
+            .ToDictionary(field => Normalize(field!.Property.Name), field => field!);
+
+        public static QueryField Get(string name)
+        {
+            return _fields.TryGetValue(Normalize(name), out var field)
+                ? field
+                : throw new InvalidOperationException($"'{name}' is not a field that can be filtered or sorted on.");
+        }
+
+        private static string Normalize(string name) => name.Replace("_", string.Empty).ToLowerInvariant();
+    }
+}
@@ -0,0 +1,35 @@
+using System.Collections.Generic;
+using Cargohub.models;
+
+namespace Cargohub.services
+{
+    /// <summary>
+    /// Total stock per location id over all inventories, built in one pass. Inventories hold
+    /// stock in several warehouses, so they cannot be split per warehouse on disk; this index
+    /// lets a warehouse-scoped question look at its own locations instead of every inventory.
+    /// </summary>
+    public class LocationStockIndex
+    {
+        private readonly Dictionary<int, int> _quantities = new();
+
+        public static LocationStockIndex Build(IEnumerable<Inventory> inventories)
+        {
+            var index = new LocationStockIndex();
+            foreach (var inventory in inventories)
+            {
+                if (inventory.Locations == null)
+                {
+                    continue;
+                }
+
+                foreach (var (locationId, quantity) in inventory.Locations.ById)
+                {
+                    index._quantities[locationId] = index._quantities.GetValueOrDefault(locationId) + quantity;
+                }
+            }
+            return index;
+        }
+
+        public int QuantityAt(int locationId) => _quantities.GetValueOrDefault(locationId);
+    }
+}
@@ -2,6 +2,7 @@ using System;
 using System.Collections.Generic;
 using System.IO;
 using System.Linq;
+using System.Threading;
 using System.Threading.Tasks;
 using Cargohub.interfaces;
 using Cargohub.models;
@@ -9,47 +10,80 @@ using Newtonsoft.Json;
 
 namespace Cargohub.services
 {
-    public class LocationsService : ICrudService<Location, int>
+    public class LocationsService : ICrudService<Location, int>, IAsyncCrudService<Location, int>
     {
         private readonly string jsonFilePath = "data/locations.json";
+        private readonly WarehouseShards<Location> _shards = new("data/locations.json", l => l.Warehouse_Id, l => l.Id);
 
-        public async Task Create(Location entity)
-        {
-            var locations = GetAll() ?? new List<Location>();
+        public Task Create(Location entity) => CreateAsync(entity);
 
+        public async Task CreateAsync(Location entity, CancellationToken cancellationToken = default)
+        {
+            using var trace = RequestProfiler.ServiceCall();
             // Find the next available ID
-            var nextId = locations.Any() ? locations.Max(l => l.Id) + 1 : 1;
+            var nextId = IdSequence.Next(jsonFilePath, _shards.Records(), l => l.Id);
             entity.Id = nextId;
-            
-            locations.Add(entity);
-            await SaveToFile(locations);
 
+            await _shards.UpdateAsync(entity.Warehouse_Id, locations => locations.Add(entity), cancellationToken);
         }
 
-        public async Task Delete(int id)
+        /// <summary>
+        /// Adds a batch of validated locations with a block of consecutive IDs, in one write
+        /// per warehouse shard.
+        /// </summary>
+        public void CreateMany(IReadOnlyList<Location> entities)
         {
-            var locations = GetAll() ?? new List<Location>();
-            var location = locations.FirstOrDefault(l => l.Id == id);
+            using var trace = RequestProfiler.ServiceCall();
+            var nextId = IdSequence.NextBlock(jsonFilePath, entities.Count, _shards.Records(), l => l.Id);
+            foreach (var entity in entities)
+            {
+                entity.Id = nextId++;
+            }
 
-            if (location == null)
+            foreach (var warehouse in entities.GroupBy(l => l.Warehouse_Id))
             {
-                throw new KeyNotFoundException($"Location with ID {id} not found.");
+                _shards.Update(warehouse.Key, locations => locations.AddRange(warehouse));
             }
+        }
 
-            locations.Remove(location);
-            await SaveToFile(locations);
+        public Task Delete(int id) => DeleteAsync(id);
 
+        public async Task DeleteAsync(int id, CancellationToken cancellationToken = default)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            var existing = await _shards.FindByIdAsync(id, cancellationToken) ?? throw new KeyNotFoundException($"Location with ID {id} not found.");
+
+            await _shards.UpdateAsync(existing.Warehouse_Id, locations =>
+            {
+                var location = locations.FirstOrDefault(l => l.Id == id);
+
+                if (location == null)
+                {
+                    throw new KeyNotFoundException($"Location with ID {id} not found.");
+                }
+
+                return locations.Remove(location);
+            }, cancellationToken);
         }
 
         public List<Location> GetAll(int? pageNumber = null, int? pageSize = null)
         {
-            var jsonData = File.ReadAllText(jsonFilePath);
-            var locations = JsonConvert.DeserializeObject<List<Location>>(jsonData) ?? new List<Location>();
+            using var trace = RequestProfiler.ServiceCall();
+            return Page(_shards.All(), pageNumber, pageSize);
+        }
 
+        public async ValueTask<List<Location>> GetAllAsync(int? pageNumber = null, int? pageSize = null, CancellationToken cancellationToken = default)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            return Page(await _shards.AllAsync(cancellationToken), pageNumber, pageSize);
+        }
+
+        private static List<Location> Page(List<Location> locations, int? pageNumber, int? pageSize)
+        {
             // Apply pagination only if pageNumber and pageSize are provided and valid
             if (pageNumber.HasValue && pageSize.HasValue && pageNumber > 0 && pageSize > 0)
             {
-                locations = locations
+                return locations
                     .Skip((pageNumber.Value - 1) * pageSize.Value)
                     .Take(pageSize.Value)
                     .ToList();
@@ -58,11 +92,41 @@ namespace Cargohub.services
             return locations;
         }
 
+        /// <summary>
+        /// The locations of one warehouse, read from that warehouse's shard only.
+        /// </summary>
+        public List<Location> GetByWarehouse(int warehouseId)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            return _shards.Snapshot(warehouseId).ToList();
+        }
+
+        /// <summary>
+        /// The locations of the given warehouses, ordered by ID. Only their shards are loaded.
+        /// </summary>
+        public List<Location> GetAllForWarehouses(IReadOnlyCollection<int> warehouseIds)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            return warehouseIds.Distinct()
+                .SelectMany(warehouseId => _shards.Snapshot(warehouseId))
+                .OrderBy(l => l.Id)
+                .ToList();
+        }
+
+
+        /// <summary>
+        /// The locations with the given ids, in the order asked for. Unknown ids are skipped.
+        /// </summary>
+        public List<Location> GetByIds(IReadOnlyCollection<int> ids)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            return _shards.FindMany(ids);
+        }
 
         public Location GetById(int id)
         {
-            var locations = GetAll();
-            var location = locations.FirstOrDefault(l => l.Id == id);
+            using var trace = RequestProfiler.ServiceCall();
+            var location = _shards.FindById(id);
 
             if (location == null)
             {
@@ -72,31 +136,51 @@ namespace Cargohub.services
             return location;
         }
 
-        public async Task Update(Location entity)
+        public async ValueTask<Location> GetByIdAsync(int id, CancellationToken cancellationToken = default)
         {
-            var locations = GetAll() ?? new List<Location>();
-            var location = locations.FirstOrDefault(l => l.Id == entity.Id);
+            using var trace = RequestProfiler.ServiceCall();
+            return await _shards.FindByIdAsync(id, cancellationToken)
+                ?? throw new KeyNotFoundException($"Location with ID {id} not found.");
+        }
 
-            if (location == null)
+        public Task Update(Location entity) => UpdateAsync(entity);
+
+        public async Task UpdateAsync(Location entity, CancellationToken cancellationToken = default)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            var location = await _shards.FindByIdAsync(entity.Id, cancellationToken) ?? throw new KeyNotFoundException($"Location with ID {entity.Id} not found.");
+
+            var updated = EntityCopy.Shallow(location);
+
+            updated.Id = entity.Id;
+            updated.Warehouse_Id = entity.Warehouse_Id;
+            updated.Code = entity.Code;
+            updated.Name = entity.Name;
+            updated.Created_At = entity.Created_At;
+            updated.Updated_At = entity.Updated_At;
+
+            if (location.Warehouse_Id != updated.Warehouse_Id)
             {
-                throw new KeyNotFoundException($"Location with ID {entity.Id} not found.");
+                // Moved to another warehouse: add it to the new shard before removing it from
+                // the old one, so an interrupted move never loses the location.
+                // Once the new shard is written the old copy is always removed, even if the
+                // request is cancelled in between.
+                await _shards.UpdateAsync(updated.Warehouse_Id, locations => locations.Add(updated), cancellationToken);
+                await _shards.UpdateAsync(location.Warehouse_Id, locations => locations.RemoveAll(l => l.Id == entity.Id));
+                return;
             }
 
-            location.Id = entity.Id;
-            location.Warehouse_Id = entity.Warehouse_Id;
-            location.Code = entity.Code;
-            location.Name = entity.Name;
-            location.Created_At = entity.Created_At;
-            location.Updated_At = entity.Updated_At;
-
+            await _shards.UpdateAsync(location.Warehouse_Id, locations =>
+            {
+                var current = locations.FirstOrDefault(l => l.Id == entity.Id);
 
-            await SaveToFile(locations);
-        }
+                if (current == null)
+                {
+                    throw new KeyNotFoundException($"Location with ID {entity.Id} not found.");
+                }
 
-        private async Task SaveToFile(List<Location> locations)
-        {
-            var jsonData = JsonConvert.SerializeObject(locations, Formatting.Indented);
-            await File.WriteAllTextAsync(jsonFilePath, jsonData);
+                return locations.Replace(current, updated);
+            }, cancellationToken);
         }
     }
 }
\ No newline at end of file
@@ -13,6 +13,7 @@ namespace Cargohub.services
 
         public List<Dictionary<string, object>> GetAll(string action = null, DateTime? fromDate = null, DateTime? toDate = null, string performedBy = null, string apiKey = null, string changes = null)
         {
+            using var trace = RequestProfiler.ServiceCall();
             if (!File.Exists(logFilePath))
             {
                 Console.WriteLine($"Log file not found at path: {logFilePath}");
@@ -0,0 +1,61 @@
+using System;
+using System.Linq;
+using System.Text.Json;
+using System.Text.Json.Nodes;
+
+namespace Cargohub.services
+{
+    /// <summary>
+    /// JSON merge patch (RFC 7386): the patch lists only the fields to change. A field set to
+    /// null is cleared, a nested object is merged field by field and any other value, arrays
+    /// included, replaces the current one. Field names are matched ignoring case, as in the
+    /// request bodies of the other endpoints.
+    /// </summary>
+    public static class MergePatch
+    {
+        /// <summary>
+        /// A new record with <paramref name="patch"/> applied to <paramref name="current"/>, which
+        /// is left unchanged. A patch that does not fit the record's fields throws an
+        /// <see cref="InvalidOperationException"/>.
+        /// </summary>
+        public static T Apply<T>(T current, JsonObject patch, JsonSerializerOptions options)
+        {
+            var document = JsonSerializer.SerializeToNode(current, options)!.AsObject();
+            Merge(document, patch);
+
+            try
+            {
+                return document.Deserialize<T>(options) ?? throw new InvalidOperationException("The patch removed the whole record.");
+            }
+            catch (JsonException ex)
+            {
+                throw new InvalidOperationException($"The patch does not fit the record: {ex.Message}");
+            }
+        }
+
+        private static void Merge(JsonObject target, JsonObject patch)
+        {
+            foreach (var (name, value) in patch.ToList())
+            {
+                var existing = target.Select(p => p.Key).FirstOrDefault(key => key.Equals(name, StringComparison.OrdinalIgnoreCase)) ?? name;
+                if (value == null)
+                {
+                    target.Remove(existing);
+                }
+                else if (value is JsonObject patchObject)
+                {
+                    if (target[existing] is not JsonObject targetObject)
+                    {
+                        targetObject = new JsonObject();
+                        target[existing] = targetObject;
+                    }
+                    Merge(targetObject, patchObject);
+                }
+                else
+                {
+                    target[existing] = value.DeepClone();
+                }
+            }
+        }
+    }
+}
@@ -0,0 +1,290 @@
+using System;
+using System.Collections.Concurrent;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.Globalization;
+using System.IO;
+using System.Linq;
+using System.Threading;
+
+namespace Cargohub.services
+{
+    /// <summary>
+    /// In-process counters for requests and collection storage. Recording only does
+    /// Interlocked increments so it can stay on the hot path; formatting happens when
+    /// /metrics is scraped.
+    /// </summary>
+    public static class Metrics
+    {
+        private static readonly ConcurrentDictionary<string, RequestMetrics> _requests = new();
+        private static readonly ConcurrentDictionary<string, CollectionMetrics> _collections = new();
+
+        public static RequestMetrics ForRoute(string route) =>
+            _requests.GetOrAdd(route, _ => new RequestMetrics());
+
+        public static CollectionMetrics ForCollection(string collection) =>
+            _collections.GetOrAdd(collection, _ => new CollectionMetrics());
+
+        public static void RecordRequest(string route, int statusCode, long elapsedTicks)
+        {
+            ForRoute(route).Record(statusCode, elapsedTicks);
+        }
+
+        public static object Snapshot()
+        {
+            return new
+            {
+                Requests = _requests.OrderBy(r => r.Key).ToDictionary(r => r.Key, r => r.Value.Snapshot()),
+                Collections = _collections.OrderBy(c => c.Key).ToDictionary(c => c.Key, c => c.Value.Snapshot())
+            };
+        }
+
+        public static void WritePrometheus(TextWriter writer)
+        {
+            writer.WriteLine("# TYPE cargohub_requests_total counter");
+            foreach (var (route, metrics) in _requests.OrderBy(r => r.Key))
+            {
+                for (var statusClass = 1; statusClass <= 5; statusClass++)
+                {
+                    var count = metrics.StatusCount(statusClass);
+                    if (count > 0)
+                    {
+                        writer.WriteLine($"cargohub_requests_total{{route=\"{route}\",status=\"{statusClass}xx\"}} {count}");
+                    }
+                }
+            }
+
+            writer.WriteLine("# TYPE cargohub_requests_coalesced_total counter");
+            foreach (var (route, metrics) in _requests.OrderBy(r => r.Key))
+            {
+                if (metrics.Coalesced > 0)
+                {
+                    writer.WriteLine($"cargohub_requests_coalesced_total{{route=\"{route}\"}} {metrics.Coalesced}");
+                }
+            }
+
+            writer.WriteLine("# TYPE cargohub_compressed_cache_hits_total counter");
+            foreach (var (route, metrics) in _requests.OrderBy(r => r.Key))
+            {
+                if (metrics.CompressedCacheHits > 0)
+                {
+                    writer.WriteLine($"cargohub_compressed_cache_hits_total{{route=\"{route}\"}} {metrics.CompressedCacheHits}");
+                }
+            }
+
+            WriteHistograms(writer, "cargohub_request_duration_seconds", "route", _requests, m => m.Latency);
+            WriteHistograms(writer, "cargohub_response_serialize_seconds", "route", _requests, m => m.ResponseSerialize);
+
+            WriteHistograms(writer, "cargohub_file_read_seconds", "collection", _collections, m => m.FileRead);
+            WriteHistograms(writer, "cargohub_file_write_seconds", "collection", _collections, m => m.FileWrite);
+            WriteHistograms(writer, "cargohub_deserialize_seconds", "collection", _collections, m => m.Deserialize);
+            WriteHistograms(writer, "cargohub_serialize_seconds", "collection", _collections, m => m.Serialize);
+            WriteHistograms(writer, "cargohub_lock_wait_seconds", "collection", _collections, m => m.LockWait);
+
+            writer.WriteLine("# TYPE cargohub_file_read_bytes_total counter");
+            foreach (var (collection, metrics) in _collections.OrderBy(c => c.Key))
+            {
+                writer.WriteLine($"cargohub_file_read_bytes_total{{collection=\"{collection}\"}} {metrics.BytesRead}");
+            }
+
+            writer.WriteLine("# TYPE cargohub_file_write_bytes_total counter");
+            foreach (var (collection, metrics) in _collections.OrderBy(c => c.Key))
+            {
+                writer.WriteLine($"cargohub_file_write_bytes_total{{collection=\"{collection}\"}} {metrics.BytesWritten}");
+            }
+
+            writer.WriteLine("# TYPE cargohub_collection_cache_total counter");
+            foreach (var (collection, metrics) in _collections.OrderBy(c => c.Key))
+            {
+                writer.WriteLine($"cargohub_collection_cache_total{{collection=\"{collection}\",result=\"hit\"}} {metrics.CacheHits}");
+                writer.WriteLine($"cargohub_collection_cache_total{{collection=\"{collection}\",result=\"miss\"}} {metrics.CacheMisses}");
+            }
+        }
+
+        private static void WriteHistograms<T>(TextWriter writer, string name, string label, ConcurrentDictionary<string, T> source, Func<T, LatencyHistogram> selector)
+        {
+            writer.WriteLine($"# TYPE {name} histogram");
+            foreach (var (key, metrics) in source.OrderBy(s => s.Key))
+            {
+                var histogram = selector(metrics);
+                if (histogram.Count == 0)
+                {
+                    continue;
+                }
+                histogram.WritePrometheus(writer, name, $"{label}=\"{key}\"");
+            }
+        }
+    }
+
+    public class RequestMetrics
+    {
+        private readonly long[] _statusClasses = new long[6];
+        private long _coalesced;
+        private long _compressedCacheHits;
+
+        public LatencyHistogram Latency { get; } = new LatencyHistogram();
+        public LatencyHistogram ResponseSerialize { get; } = new LatencyHistogram();
+
+        public void Record(int statusCode, long elapsedTicks)
+        {
+            Interlocked.Increment(ref _statusClasses[Math.Clamp(statusCode / 100, 0, 5)]);
+            Latency.Record(elapsedTicks);
+        }
+
+        public long StatusCount(int statusClass) => Interlocked.Read(ref _statusClasses[statusClass]);
+
+        // Requests answered with the response of an identical in-flight request.
+        public long Coalesced => Interlocked.Read(ref _coalesced);
+
+        public void RecordCoalesced() => Interlocked.Increment(ref _coalesced);
+
+        // Requests answered with a response body kept by the compressed response cache.
+        public long CompressedCacheHits => Interlocked.Read(ref _compressedCacheHits);
+
+        public void RecordCompressedCacheHit() => Interlocked.Increment(ref _compressedCacheHits);
+
+        public object Snapshot()
+        {
+            return new
+            {
+                Count = Latency.Count,
+                Status = Enumerable.Range(1, 5)
+                    .Where(c => StatusCount(c) > 0)
+                    .ToDictionary(c => $"{c}xx", StatusCount),
+                Coalesced,
+                CompressedCacheHits,
+                Latency = Latency.Snapshot(),
+                ResponseSerialize = ResponseSerialize.Snapshot()
+            };
+        }
+    }
+
+    public class CollectionMetrics
+    {
+        private long _bytesRead;
+        private long _bytesWritten;
+        private long _cacheHits;
+        private long _cacheMisses;
+
+        public LatencyHistogram FileRead { get; } = new LatencyHistogram();
+        public LatencyHistogram FileWrite { get; } = new LatencyHistogram();
+        public LatencyHistogram Deserialize { get; } = new LatencyHistogram();
+        public LatencyHistogram Serialize { get; } = new LatencyHistogram();
+        public LatencyHistogram LockWait { get; } = new LatencyHistogram();
+
+        public long BytesRead => Interlocked.Read(ref _bytesRead);
+        public long BytesWritten => Interlocked.Read(ref _bytesWritten);
+        public long CacheHits => Interlocked.Read(ref _cacheHits);
+        public long CacheMisses => Interlocked.Read(ref _cacheMisses);
+
+        public void RecordCacheHit() => Interlocked.Increment(ref _cacheHits);
+        public void RecordCacheMiss() => Interlocked.Increment(ref _cacheMisses);
+
+        public void RecordRead(long bytes, long elapsedTicks)
+        {
+            Interlocked.Add(ref _bytesRead, bytes);
+            FileRead.Record(elapsedTicks);
+        }
+
+        public void RecordWrite(long bytes, long elapsedTicks)
+        {
+            Interlocked.Add(ref _bytesWritten, bytes);
+            FileWrite.Record(elapsedTicks);
+        }
+
+        public object Snapshot()
+        {
+            return new
+            {
+                BytesRead,
+                BytesWritten,
+                CacheHits,
+                CacheMisses,
+                FileRead = FileRead.Snapshot(),
+                FileWrite = FileWrite.Snapshot(),
+                Deserialize = Deserialize.Snapshot(),
+                Serialize = Serialize.Snapshot(),
+                LockWait = LockWait.Snapshot()
+            };
+        }
+    }
+
+    /// <summary>
+    /// Fixed-bucket latency histogram. Timings are recorded in Stopwatch ticks.
+    /// </summary>
+    public class LatencyHistogram
+    {
+        // Upper bounds in seconds, the last bucket is +Inf.
+        private static readonly double[] Bounds = { 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10 };
+        private static readonly long[] BoundTicks = Bounds.Select(b => (long)(b * Stopwatch.Frequency)).ToArray();
+
+        private readonly long[] _buckets = new long[Bounds.Length + 1];
+        private long _count;
+        private long _sumTicks;
+
+        public long Count => Interlocked.Read(ref _count);
+        public double SumSeconds => (double)Interlocked.Read(ref _sumTicks) / Stopwatch.Frequency;
+
+        public void Record(long elapsedTicks)
+        {
+            var bucket = 0;
+            while (bucket < BoundTicks.Length && elapsedTicks > BoundTicks[bucket])
+            {
+                bucket++;
+            }
+
+            Interlocked.Increment(ref _buckets[bucket]);
+            Interlocked.Increment(ref _count);
+            Interlocked.Add(ref _sumTicks, elapsedTicks);
+        }
+
+        public void WritePrometheus(TextWriter writer, string name, string labels)
+        {
+            long cumulative = 0;
+            for (var i = 0; i < _buckets.Length; i++)
+            {
+                cumulative += Interlocked.Read(ref _buckets[i]);
+                var le = i < Bounds.Length ? Bounds[i].ToString(CultureInfo.InvariantCulture) : "+Inf";
+                writer.WriteLine($"{name}_bucket{{{labels},le=\"{le}\"}} {cumulative}");
+            }
+            writer.WriteLine($"{name}_sum{{{labels}}} {SumSeconds.ToString(CultureInfo.InvariantCulture)}");
+            writer.WriteLine($"{name}_count{{{labels}}} {Count}");
+        }
+
+        public object Snapshot()
+        {
+            var count = Count;
+            return new
+            {
+                Count = count,
+                TotalMs = Math.Round(SumSeconds * 1000, 3),
+                AverageMs = count == 0 ? 0 : Math.Round(SumSeconds * 1000 / count, 3),
+                P50Ms = Percentile(0.50),
+                P95Ms = Percentile(0.95),
+                P99Ms = Percentile(0.99)
+            };
+        }
+
+        // Upper bound of the bucket containing the requested percentile, null when it falls in +Inf.
+        private double? Percentile(double percentile)
+        {
+            var count = Count;
+            if (count == 0)
+            {
+                return 0;
+            }
+
+            var target = (long)Math.Ceiling(count * percentile);
+            long cumulative = 0;
+            for (var i = 0; i < Bounds.Length; i++)
+            {
+                cumulative += Interlocked.Read(ref _buckets[i]);
+                if (cumulative >= target)
+                {
+                    return Bounds[i] * 1000;
+                }
+            }
+            return null;
+        }
+    }
+}
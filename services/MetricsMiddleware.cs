@@ -0,0 +1,35 @@
+using System.Diagnostics;
+using System.Threading.Tasks;
+using Microsoft.AspNetCore.Http;
+using Microsoft.AspNetCore.Routing;
+using Cargohub.services;
+
+public class MetricsMiddleware
+{
+    private readonly RequestDelegate _next;
+
+    public MetricsMiddleware(RequestDelegate next)
+    {
+        _next = next;
+    }
+
+    public async Task InvokeAsync(HttpContext context)
+    {
+        var started = Stopwatch.GetTimestamp();
+        try
+        {
+            await _next(context);
+        }
+        finally
+        {
+            // Routing has run by now, so the matched route template is available.
+            Metrics.RecordRequest(RouteLabel(context), context.Response.StatusCode, Stopwatch.GetTimestamp() - started);
+        }
+    }
+
+    public static string RouteLabel(HttpContext context)
+    {
+        var template = (context.GetEndpoint() as RouteEndpoint)?.RoutePattern.RawText;
+        return $"{context.Request.Method} /{template?.TrimStart('/') ?? "(unrouted)"}";
+    }
+}
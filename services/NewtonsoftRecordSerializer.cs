@@ -0,0 +1,30 @@
+using System.Collections.Generic;
+using System.IO;
+using System.Text;
+using Cargohub.interfaces;
+using Newtonsoft.Json;
+
+namespace Cargohub.services
+{
+    /// <summary>
+    /// The reflection-based serializer the data files have always been written with. It is
+    /// the reference for the file format and handles any record type.
+    /// </summary>
+    public sealed class NewtonsoftRecordSerializer : IRecordSerializer
+    {
+        public static readonly NewtonsoftRecordSerializer Instance = new();
+
+        public string Name => "newtonsoft";
+
+        public byte[] SerializeList<T>(IEnumerable<T> records)
+        {
+            return Encoding.UTF8.GetBytes(JsonConvert.SerializeObject(records, Formatting.Indented));
+        }
+
+        public List<T> DeserializeList<T>(byte[] json)
+        {
+            using var reader = new JsonTextReader(new StreamReader(new MemoryStream(json), Encoding.UTF8));
+            return JsonSerializer.CreateDefault().Deserialize<List<T>>(reader) ?? new List<T>();
+        }
+    }
+}
@@ -2,14 +2,18 @@ using System;
 using System.Collections.Generic;
 using System.IO;
 using System.Linq;
+using System.Threading;
 using System.Threading.Tasks;
 using Cargohub.interfaces;
 using Cargohub.models;
 using Newtonsoft.Json;
+using System.Text.Json;
+using System.Text.Json.Nodes;
+using Microsoft.Extensions.Primitives;
 
 namespace Cargohub.services
 {
-    public class OrderService : ICrudService<Order, int>
+    public class OrderService : ICrudService<Order, int>, IAsyncCrudService<Order, int>
     {
         private readonly string jsonFilePath = "data/orders.json";
         private readonly ShipmentService _shipmentService;
@@ -18,88 +22,172 @@ namespace Cargohub.services
         {
             _shipmentService = shipmentService;
         }
-        public Task Create(Order entity)
-        {
-            var orders = GetAll() ?? new List<Order>();
+        public Task Create(Order entity) => CreateAsync(entity);
 
-            // Find the next available ID
-            var nextId = orders.Any() ? orders.Max(o => o.Id) + 1 : 1;
-            entity.Id = nextId;
-            orders.Add(entity);
-            SaveToFile(orders);
-            return Task.CompletedTask;
+        public async Task CreateAsync(Order entity, CancellationToken cancellationToken = default)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            await JsonFileStore.UpdateAsync<Order>(jsonFilePath, orders =>
+            {
+                // Find the next available ID
+                var nextId = IdSequence.Next(jsonFilePath, ColdStorage.WithArchived(jsonFilePath, orders), o => o.Id);
+                entity.Id = nextId;
+                return orders.Add(entity);
+            }, cancellationToken);
         }
 
         public async Task UpdateBackorderStatus(int orderId)
         {
-            var orders = GetAll() ?? new List<Order>();
-            var order = orders.FirstOrDefault(o => o.Id == orderId);
+            using var trace = RequestProfiler.ServiceCall();
+            var existingOrder = ColdStorage.FindById<Order, int>(jsonFilePath, o => o.Id, orderId);
 
-            if (order == null)
+            if (existingOrder == null)
             {
                 throw new KeyNotFoundException($"Order with ID {orderId} not found.");
             }
 
-            var shipments = _shipmentService.GetAll();
-            var orderShipments = shipments.Where(s => s.Order_Id.Contains(orderId)).ToList();
+            var order = EntityCopy.Shallow(existingOrder);
+
+            var missingItems = BackorderEngine.MissingItems(order, _shipmentService.GetShippedTotals());
 
-            var missingItems = new List<ItemDetail>();
-            foreach (var item in order.Items)
+            if (!missingItems.Any())
             {
-                var totalShippedAmount = orderShipments
-                    .SelectMany(s => s.Items)
-                    .Where(si => si.Item_Id == item.Item_Id)
-                    .Sum(si => si.Amount);
+                throw new InvalidOperationException("All items in the order match the items in the shipment. No items to backorder.");
+            }
 
-                if (totalShippedAmount < item.Amount)
+            BackorderEngine.ApplyBackorder(order, missingItems);
+
+            await Update(order);
+        }
+
+        /// <summary>
+        /// Recomputes the backorder status of every order in one pass over orders and
+        /// shipments and saves the result once. Orders without missing items are left as they are.
+        /// </summary>
+        public BackorderRecomputeSummary RecomputeAllBackorders()
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            var shippedTotals = _shipmentService.GetShippedTotals();
+            var processed = 0;
+            var backordered = 0;
+
+            JsonFileStore.Update<Order>(jsonFilePath, orders =>
+            {
+                processed = orders.Count;
+                var updated = orders.ToBuilder();
+
+                for (var i = 0; i < updated.Count; i++)
                 {
-                    missingItems.Add(new ItemDetail
+                    var missingItems = BackorderEngine.MissingItems(updated[i], shippedTotals);
+                    if (!missingItems.Any())
                     {
-                        Item_Id = item.Item_Id,
-                        Amount = item.Amount - totalShippedAmount,
-                        CrossDockingStatus = null
-                    });
+                        continue;
+                    }
+
+                    var order = EntityCopy.Shallow(updated[i]);
+                    BackorderEngine.ApplyBackorder(order, missingItems);
+                    order.Updated_At = DateTime.Now;
+                    updated[i] = order;
+                    backordered++;
                 }
-            }
 
-            if (!missingItems.Any())
+                return backordered > 0 ? updated.ToImmutable() : orders;
+            });
+
+            return new BackorderRecomputeSummary { OrdersProcessed = processed, OrdersBackordered = backordered };
+        }
+
+        public Task Delete(int id) => DeleteAsync(id);
+
+        public async Task DeleteAsync(int id, CancellationToken cancellationToken = default)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            var filePath = await ColdStorage.PathContainingAsync<Order, int>(jsonFilePath, o => o.Id, id, cancellationToken);
+            await JsonFileStore.UpdateAsync<Order>(filePath, orders =>
             {
-                throw new InvalidOperationException("All items in the order match the items in the shipment. No items to backorder.");
-            }
+                var order = orders.FirstOrDefault(o => o.Id == id);
 
-            order.IsBackordered = true;
-            order.ShipmentDetails = missingItems;
+                if (order == null)
+                {
+                    throw new KeyNotFoundException($"Order with ID {id} not found.");
+                }
 
-            // Remove the missing items from the order's Items list to avoid duplicates
-            order.Items = order.Items.Where(item => !missingItems.Any(mi => mi.Item_Id == item.Item_Id)).ToList();
+                return orders.Remove(order);
+            }, cancellationToken);
+        }
 
-            await Update(order);
+        public List<Order> GetAll(int? pageNumber = null, int? pageSize = null)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            return Page(JsonFileStore.Snapshot<Order>(jsonFilePath), pageNumber, pageSize);
         }
 
-        public Task Delete(int id)
+        public async ValueTask<List<Order>> GetAllAsync(int? pageNumber = null, int? pageSize = null, CancellationToken cancellationToken = default)
         {
-            var orders = GetAll() ?? new List<Order>();
-            var order = orders.FirstOrDefault(o => o.Id == id);
+            using var trace = RequestProfiler.ServiceCall();
+            return Page(await JsonFileStore.SnapshotAsync<Order>(jsonFilePath, cancellationToken), pageNumber, pageSize);
+        }
 
-            if (order == null)
+        private static List<Order> Page(IReadOnlyList<Order> orders, int? pageNumber, int? pageSize)
+        {
+            // Apply pagination only if pageNumber and pageSize are provided and valid
+            if (pageNumber.HasValue && pageSize.HasValue && pageNumber > 0 && pageSize > 0)
             {
-                throw new KeyNotFoundException($"Order with ID {id} not found.");
+                return orders
+                    .Skip((pageNumber.Value - 1) * pageSize.Value)
+                    .Take(pageSize.Value)
+                    .ToList();
             }
 
-            orders.Remove(order);
-            SaveToFile(orders);
-            return Task.CompletedTask;
+            return orders.ToList();
         }
 
-        public List<Order> GetAll(int? pageNumber = null, int? pageSize = null)
+        /// <summary>
+        /// Like <see cref="GetAll(int?, int?)"/>, but with <paramref name="includeArchived"/> the
+        /// archived orders are listed too, merged in by ID.
+        /// </summary>
+        public List<Order> GetAll(bool includeArchived, int? pageNumber = null, int? pageSize = null)
+        {
+            if (!includeArchived)
+            {
+                return GetAll(pageNumber, pageSize);
+            }
+
+            using var trace = RequestProfiler.ServiceCall();
+            return Page(ColdStorage.ReadAll<Order>(jsonFilePath, o => o.Id), pageNumber, pageSize);
+        }
+
+        public async ValueTask<List<Order>> GetAllAsync(bool includeArchived, int? pageNumber = null, int? pageSize = null, CancellationToken cancellationToken = default)
+        {
+            if (!includeArchived)
+            {
+                return await GetAllAsync(pageNumber, pageSize, cancellationToken);
+            }
+
+            using var trace = RequestProfiler.ServiceCall();
+            return Page(await ColdStorage.ReadAllAsync<Order>(jsonFilePath, o => o.Id, cancellationToken), pageNumber, pageSize);
+        }
+
+        /// <summary>
+        /// The orders of the given warehouses, read from a per-warehouse index instead of a
+        /// scan over all orders.
+        /// </summary>
+        public List<Order> GetAllForWarehouses(IReadOnlyCollection<int> warehouseIds, bool includeArchived = false, int? pageNumber = null, int? pageSize = null)
         {
-            var jsonData = File.ReadAllText(jsonFilePath);
-            var orders = JsonConvert.DeserializeObject<List<Order>>(jsonData) ?? new List<Order>();
+            using var trace = RequestProfiler.ServiceCall();
+            var orders = ByWarehouse(jsonFilePath).For(warehouseIds, o => o.Id);
+            if (includeArchived)
+            {
+                orders = orders
+                    .Concat(ByWarehouse(ColdStorage.PathFor(jsonFilePath)).For(warehouseIds, o => o.Id))
+                    .OrderBy(o => o.Id)
+                    .ToList();
+            }
 
             // Apply pagination only if pageNumber and pageSize are provided and valid
             if (pageNumber.HasValue && pageSize.HasValue && pageNumber > 0 && pageSize > 0)
             {
-                orders = orders
+                return orders
                     .Skip((pageNumber.Value - 1) * pageSize.Value)
                     .Take(pageSize.Value)
                     .ToList();
@@ -108,10 +196,72 @@ namespace Cargohub.services
             return orders;
         }
 
+        /// <summary>
+        /// The orders matching <paramref name="query"/>, limited to
+        /// <paramref name="warehouseIds"/> when given. Equality filters on Warehouse_Id and
+        /// Order_Status are answered from indexes; other queries scan the orders once.
+        /// </summary>
+        public List<Order> Find(ListQuery query, IReadOnlyCollection<int>? warehouseIds = null, bool includeArchived = false)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            var candidates = Candidates(jsonFilePath, query, warehouseIds);
+            if (includeArchived)
+            {
+                candidates = candidates
+                    .Concat(Candidates(ColdStorage.PathFor(jsonFilePath), query, warehouseIds))
+                    .OrderBy(o => o.Id);
+            }
+
+            return query.Apply(candidates);
+        }
+
+        private static IEnumerable<Order> Candidates(string filePath, ListQuery query, IReadOnlyCollection<int>? warehouseIds)
+        {
+            if (warehouseIds != null)
+            {
+                return ByWarehouse(filePath).For(warehouseIds, o => o.Id);
+            }
+
+            return query.Candidates(JsonFileStore.Snapshot<Order>(filePath),
+                new QueryIndex<Order>("Warehouse_Id", value => value is int warehouseId ? ByWarehouse(filePath).For(warehouseId) : Enumerable.Empty<Order>()),
+                new QueryIndex<Order>("Order_Status", value => JsonFileStore.GetView<Order, ILookup<string, Order>>(filePath, "by-status",
+                    orders => orders.ToLookup(o => o.Order_Status ?? string.Empty, StringComparer.OrdinalIgnoreCase))[(string)value!]));
+        }
+
+        private static KeyedIndex<Order> ByWarehouse(string filePath)
+        {
+            return JsonFileStore.GetView<Order, KeyedIndex<Order>>(filePath, "by-warehouse",
+                orders => KeyedIndex<Order>.Build(orders, o => new[] { o.Warehouse_Id }));
+        }
+
+        /// <summary>
+        /// Moves delivered orders to the archive, and archived orders whose status changed
+        /// back to the hot file. Archived orders are not part of backorder recomputation.
+        /// </summary>
+        public ArchiveResult ArchiveCompleted()
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            return ColdStorage.Rebalance<Order>(jsonFilePath, o => o.Id, order => order.Order_Status == "Delivered");
+        }
+
+        /// <summary>
+        /// The orders with the given ids, archived ones included, in the order asked for.
+        /// Unknown ids are skipped.
+        /// </summary>
+        public List<Order> GetByIds(IEnumerable<int> ids)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            return ids
+                .Select(id => ColdStorage.FindById<Order, int>(jsonFilePath, o => o.Id, id))
+                .Where(order => order != null)
+                .Select(order => order!)
+                .ToList();
+        }
+
         public Order GetById(int id)
         {
-            var orders = GetAll();
-            var order = orders.FirstOrDefault(o => o.Id == id);
+            using var trace = RequestProfiler.ServiceCall();
+            var order = ColdStorage.FindById<Order, int>(jsonFilePath, o => o.Id, id);
 
             if (order == null)
             {
@@ -121,47 +271,105 @@ namespace Cargohub.services
             return order;
         }
 
-        public Task Update(Order entity)
+        public async ValueTask<Order> GetByIdAsync(int id, CancellationToken cancellationToken = default)
         {
-            var orders = GetAll() ?? new List<Order>();
-            var existingOrder = orders.FirstOrDefault(o => o.Id == entity.Id);
+            using var trace = RequestProfiler.ServiceCall();
+            return await ColdStorage.FindByIdAsync<Order, int>(jsonFilePath, o => o.Id, id, cancellationToken)
+                ?? throw new KeyNotFoundException($"Order with ID {id} not found.");
+        }
 
-            if (existingOrder == null)
+        /// <summary>
+        /// Applies a JSON merge patch to the order under the file's write lock, so concurrent
+        /// patches to different fields all survive. When <paramref name="ifMatch"/> is given the
+        /// order must still be at that <see cref="EntityVersion"/>.
+        /// </summary>
+        public Order Patch(int id, JsonObject patch, StringValues ifMatch, JsonSerializerOptions options)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            return Change(id, ifMatch, existing =>
             {
-                throw new KeyNotFoundException($"Order with ID {entity.Id} not found.");
-            }
+                var patched = MergePatch.Apply(existing, patch, options);
+                if (patched.Id != existing.Id)
+                {
+                    throw new InvalidOperationException("The order id cannot be changed.");
+                }
+                return patched;
+            });
+        }
+
+        /// <summary>
+        /// Replaces the order's lines in one write, without a separate read of the order.
+        /// </summary>
+        public Order UpdateItems(int id, List<ItemDetail> items, StringValues ifMatch = default)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            return Change(id, ifMatch, existing =>
+            {
+                var updated = EntityCopy.Shallow(existing);
+                updated.Items = items;
+                return updated;
+            });
+        }
+
+        private Order Change(int id, StringValues ifMatch, Func<Order, Order> change)
+        {
+            Order? changed = null;
+            var filePath = ColdStorage.PathContaining<Order, int>(jsonFilePath, o => o.Id, id);
+            JsonFileStore.Update<Order>(filePath, orders =>
+            {
+                var existingOrder = orders.FirstOrDefault(o => o.Id == id)
+                    ?? throw new KeyNotFoundException($"Order with ID {id} not found.");
+                EntityVersion.Check(existingOrder, ifMatch);
+
+                changed = change(existingOrder);
+                changed.Updated_At = DateTime.Now;
+                return orders.Replace(existingOrder, changed);
+            });
+            return changed!;
+        }
+
+        public Task Update(Order entity) => UpdateAsync(entity);
+
+        public async Task UpdateAsync(Order entity, CancellationToken cancellationToken = default)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            var filePath = await ColdStorage.PathContainingAsync<Order, int>(jsonFilePath, o => o.Id, entity.Id, cancellationToken);
+            await JsonFileStore.UpdateAsync<Order>(filePath, orders =>
+            {
+                var existingOrder = orders.FirstOrDefault(o => o.Id == entity.Id);
+
+                if (existingOrder == null)
+                {
+                    throw new KeyNotFoundException($"Order with ID {entity.Id} not found.");
+                }
+
+                var updated = EntityCopy.Shallow(existingOrder);
+
+                updated.Source_Id = entity.Source_Id;
+                updated.Order_Date = entity.Order_Date;
+                updated.Request_Date = entity.Request_Date;
+                updated.Reference = entity.Reference;
+                updated.Reference_Extra = entity.Reference_Extra;
+                updated.Order_Status = entity.Order_Status;
+                updated.Notes = entity.Notes;
+                updated.Shipping_Notes = entity.Shipping_Notes;
+                updated.Picking_Notes = entity.Picking_Notes;
+                updated.Warehouse_Id = entity.Warehouse_Id;
+                updated.Ship_To = entity.Ship_To;
+                updated.Bill_To = entity.Bill_To;
+                updated.Shipment_Id = entity.Shipment_Id;
+                updated.Total_Amount = entity.Total_Amount;
+                updated.Total_Discount = entity.Total_Discount;
+                updated.Total_Tax = entity.Total_Tax;
+                updated.Total_Surcharge = entity.Total_Surcharge;
+                updated.Created_At = entity.Created_At;
+                updated.Updated_At = DateTime.Now;
+                updated.Items = entity.Items;
+                updated.IsBackordered = entity.IsBackordered; // Update backorder status
+                updated.ShipmentDetails = entity.ShipmentDetails; // Update shipment details
 
-            existingOrder.Source_Id = entity.Source_Id;
-            existingOrder.Order_Date = entity.Order_Date;
-            existingOrder.Request_Date = entity.Request_Date;
-            existingOrder.Reference = entity.Reference;
-            existingOrder.Reference_Extra = entity.Reference_Extra;
-            existingOrder.Order_Status = entity.Order_Status;
-            existingOrder.Notes = entity.Notes;
-            existingOrder.Shipping_Notes = entity.Shipping_Notes;
-            existingOrder.Picking_Notes = entity.Picking_Notes;
-            existingOrder.Warehouse_Id = entity.Warehouse_Id;
-            existingOrder.Ship_To = entity.Ship_To;
-            existingOrder.Bill_To = entity.Bill_To;
-            existingOrder.Shipment_Id = entity.Shipment_Id;
-            existingOrder.Total_Amount = entity.Total_Amount;
-            existingOrder.Total_Discount = entity.Total_Discount;
-            existingOrder.Total_Tax = entity.Total_Tax;
-            existingOrder.Total_Surcharge = entity.Total_Surcharge;
-            existingOrder.Created_At = entity.Created_At;
-            existingOrder.Updated_At = DateTime.Now;
-            existingOrder.Items = entity.Items;
-            existingOrder.IsBackordered = entity.IsBackordered; // Update backorder status
-            existingOrder.ShipmentDetails = entity.ShipmentDetails; // Update shipment details
-
-            SaveToFile(orders);
-            return Task.CompletedTask;
-        }
-
-        private void SaveToFile(List<Order> orders)
-        {
-            var jsonData = JsonConvert.SerializeObject(orders, Formatting.Indented);
-            File.WriteAllText(jsonFilePath, jsonData);
+                return orders.Replace(existingOrder, updated);
+            }, cancellationToken);
         }
     }
 }
\ No newline at end of file
@@ -0,0 +1,71 @@
+using System;
+using System.IO;
+using System.Threading.Tasks;
+using Microsoft.AspNetCore.Http;
+using Newtonsoft.Json;
+using Cargohub.services;
+
+/// <summary>
+/// Profiles requests sent with an "X-Profile: true" header or a "profile=true" query
+/// parameter. The breakdown is returned in the Server-Timing response header and the
+/// full step tree is appended to logs/request_profiles.log.
+/// </summary>
+public class ProfilingMiddleware
+{
+    public const string QueryParameter = "profile";
+
+    private readonly RequestDelegate _next;
+    private readonly string _logFilePath = Path.Combine("logs", "request_profiles.log");
+
+    public ProfilingMiddleware(RequestDelegate next)
+    {
+        _next = next;
+    }
+
+    public async Task InvokeAsync(HttpContext context)
+    {
+        if (!IsRequested(context.Request))
+        {
+            await _next(context);
+            return;
+        }
+
+        var profile = RequestProfiler.Start();
+        context.Response.OnStarting(() =>
+        {
+            context.Response.Headers["Server-Timing"] = profile.ToServerTiming();
+            return Task.CompletedTask;
+        });
+
+        try
+        {
+            await _next(context);
+        }
+        finally
+        {
+            RequestProfiler.Stop();
+            await LogProfile(context, profile);
+        }
+    }
+
+    private static bool IsRequested(HttpRequest request)
+    {
+        var flag = request.Headers["X-Profile"].FirstOrDefault() ?? request.Query[QueryParameter].FirstOrDefault();
+        return flag != null && (flag == "1" || flag.Equals("true", StringComparison.OrdinalIgnoreCase));
+    }
+
+    private async Task LogProfile(HttpContext context, RequestProfile profile)
+    {
+        var logLine = $"Timestamp={DateTime.UtcNow:O} | Method={context.Request.Method} | Path={context.Request.Path}{context.Request.QueryString} | Status={context.Response.StatusCode} | TotalMs={profile.ElapsedMs:F3} | Steps={JsonConvert.SerializeObject(profile.Entries)}";
+
+        try
+        {
+            Directory.CreateDirectory("logs");
+            await File.AppendAllTextAsync(_logFilePath, logLine + Environment.NewLine);
+        }
+        catch (IOException ex)
+        {
+            Console.WriteLine($"Error writing request profile: {ex.Message}");
+        }
+    }
+}
@@ -0,0 +1,126 @@
+using System;
+using System.Buffers;
+using System.Collections;
+using System.Collections.Generic;
+using System.Globalization;
+using System.IO;
+using System.Linq;
+using System.Linq.Expressions;
+using System.Reflection;
+using System.Text;
+using System.Text.Json;
+using System.Threading;
+using System.Threading.Tasks;
+
+namespace Cargohub.services
+{
+    /// <summary>
+    /// Writes records to a stream as NDJSON (one JSON object per line) or CSV while they are
+    /// enumerated. Output goes out in chunks of about <see cref="ChunkSize"/> bytes, so memory
+    /// use does not grow with the number of records.
+    /// </summary>
+    public static class RecordExport
+    {
+        public const int ChunkSize = 64 * 1024;
+
+        private static readonly byte[] NewLine = { (byte)'\n' };
+        private static readonly char[] CsvSpecialCharacters = { ',', '"', '\n', '\r' };
+
+        public static readonly string[] Formats = { "ndjson", "csv" };
+
+        public static string ContentType(string format) =>
+            format == "csv" ? "text/csv; charset=utf-8" : "application/x-ndjson";
+
+        public static async Task WriteNdjson<T>(Stream output, IEnumerable<T> records, JsonSerializerOptions options, CancellationToken cancellationToken)
+        {
+            var buffer = new ArrayBufferWriter<byte>(ChunkSize);
+            using var writer = new Utf8JsonWriter(buffer);
+
+            foreach (var record in records)
+            {
+                JsonSerializer.Serialize(writer, record, options);
+                writer.Flush();
+                writer.Reset();
+                buffer.Write(NewLine);
+
+                if (buffer.WrittenCount >= ChunkSize)
+                {
+                    await output.WriteAsync(buffer.WrittenMemory, cancellationToken);
+                    buffer.ResetWrittenCount();
+                }
+            }
+
+            await output.WriteAsync(buffer.WrittenMemory, cancellationToken);
+        }
+
+        /// <summary>
+        /// One column per public property, named as in the JSON responses. Lists and other
+        /// nested values are written as JSON inside the cell.
+        /// </summary>
+        public static async Task WriteCsv<T>(Stream output, IEnumerable<T> records, JsonSerializerOptions options, CancellationToken cancellationToken)
+        {
+            var columns = CsvColumns<T>.All;
+            var chunk = new StringBuilder(ChunkSize);
+
+            chunk.AppendJoin(',', columns.Select(c => Escape(options.PropertyNamingPolicy?.ConvertName(c.Name) ?? c.Name))).Append('\n');
+            foreach (var record in records)
+            {
+                for (var i = 0; i < columns.Length; i++)
+                {
+                    if (i > 0)
+                    {
+                        chunk.Append(',');
+                    }
+                    chunk.Append(Escape(Format(columns[i].Get(record!), options)));
+                }
+                chunk.Append('\n');
+
+                if (chunk.Length >= ChunkSize)
+                {
+                    await output.WriteAsync(Encoding.UTF8.GetBytes(chunk.ToString()), cancellationToken);
+                    chunk.Clear();
+                }
+            }
+
+            await output.WriteAsync(Encoding.UTF8.GetBytes(chunk.ToString()), cancellationToken);
+        }
+
+        private static string Format(object? value, JsonSerializerOptions options)
+        {
+            return value switch
+            {
+                null => string.Empty,
+                string text => text,
+                DateTime date => date.ToString("O", CultureInfo.InvariantCulture),
+                IFormattable formattable when value is not IEnumerable => formattable.ToString(null, CultureInfo.InvariantCulture),
+                _ => JsonSerializer.Serialize(value, value.GetType(), options)
+            };
+        }
+
+        private static string Escape(string value)
+        {
+            if (value.IndexOfAny(CsvSpecialCharacters) < 0)
+            {
+                return value;
+            }
+            return $"\"{value.Replace("\"", "\"\"")}\"";
+        }
+
+        private static class CsvColumns<T>
+        {
+            public static readonly (string Name, Func<object, object?> Get)[] All = typeof(T)
+                .GetProperties(BindingFlags.Public | BindingFlags.Instance)
+                .Where(property => property.CanRead && property.GetIndexParameters().Length == 0)
+                .Select(property => (property.Name, Getter(property)))
+                .ToArray();
+
+            private static Func<object, object?> Getter(PropertyInfo property)
+            {
+                var record = Expression.Parameter(typeof(object), "record");
+                return Expression.Lambda<Func<object, object?>>(
+                    Expression.Convert(Expression.Property(Expression.Convert(record, property.DeclaringType!), property), typeof(object)),
+                    record).Compile();
+            }
+        }
+    }
+}
@@ -0,0 +1,154 @@
+using System;
+using System.Collections.Concurrent;
+using System.Collections.Generic;
+using System.IO;
+using System.Linq;
+using System.Threading.Tasks;
+using Microsoft.AspNetCore.Http;
+using Microsoft.AspNetCore.Mvc.Controllers;
+using Microsoft.Extensions.Primitives;
+using Newtonsoft.Json;
+using Cargohub.models;
+using Cargohub.services;
+
+/// <summary>
+/// Coalesces identical GET requests that arrive while the same request is still being
+/// handled: the first one runs the controller and buffers its response, the others wait
+/// and receive a copy. Requests are identical when path, query string and the caller's
+/// permission scope (endpoint access and warehouses) match, so callers with different
+/// rights never share a response.
+/// </summary>
+public class RequestCoalescingMiddleware
+{
+    private readonly RequestDelegate _next;
+    private readonly ConcurrentDictionary<string, TaskCompletionSource<BufferedResponse>> _inFlight = new();
+
+    public RequestCoalescingMiddleware(RequestDelegate next)
+    {
+        _next = next;
+    }
+
+    public async Task InvokeAsync(HttpContext context)
+    {
+        var key = CoalescingKey(context);
+        if (key == null)
+        {
+            await _next(context);
+            return;
+        }
+
+        var flight = new TaskCompletionSource<BufferedResponse>(TaskCreationOptions.RunContinuationsAsynchronously);
+        var leader = _inFlight.GetOrAdd(key, flight);
+        if (leader != flight)
+        {
+            BufferedResponse shared;
+            try
+            {
+                shared = await leader.Task.WaitAsync(context.RequestAborted);
+            }
+            catch (Exception) when (!context.RequestAborted.IsCancellationRequested)
+            {
+                // The leading request failed; handle this one on its own.
+                await _next(context);
+                return;
+            }
+
+            Metrics.ForRoute(MetricsMiddleware.RouteLabel(context)).RecordCoalesced();
+            await shared.WriteTo(context.Response);
+            return;
+        }
+
+        try
+        {
+            var originalBody = context.Response.Body;
+            using var buffer = new MemoryStream();
+            context.Response.Body = buffer;
+            try
+            {
+                await _next(context);
+            }
+            finally
+            {
+                context.Response.Body = originalBody;
+            }
+
+            var response = BufferedResponse.From(context.Response, buffer.ToArray());
+            flight.SetResult(response);
+            await context.Response.Body.WriteAsync(response.Body, context.RequestAborted);
+        }
+        catch (Exception ex)
+        {
+            flight.TrySetException(ex);
+            throw;
+        }
+        finally
+        {
+            _inFlight.TryRemove(new KeyValuePair<string, TaskCompletionSource<BufferedResponse>>(key, flight));
+        }
+    }
+
+    private static string? CoalescingKey(HttpContext context)
+    {
+        var endpoint = context.GetEndpoint();
+        if (!HttpMethods.IsGet(context.Request.Method)
+            || endpoint?.Metadata.GetMetadata<ControllerActionDescriptor>() == null
+            || endpoint.Metadata.GetMetadata<NoCoalescingAttribute>() != null
+            || RequestProfiler.Current != null)
+        {
+            return null;
+        }
+
+        var user = AuthProvider.GetUser(context.Request.Headers["API_KEY"].FirstOrDefault());
+        if (user == null)
+        {
+            return null;
+        }
+
+        return $"{context.Request.Path}{context.Request.QueryString}|{PermissionScope(user)}";
+    }
+
+    internal static string PermissionScope(User user)
+    {
+        var access = user.EndpointAccess == null
+            ? string.Empty
+            : JsonConvert.SerializeObject(user.EndpointAccess.OrderBy(e => e.Key, StringComparer.Ordinal));
+        var warehouses = user.Warehouses == null ? string.Empty : string.Join(",", user.Warehouses);
+        return $"{user.IsActive}|{warehouses}|{access}";
+    }
+
+    private sealed class BufferedResponse
+    {
+        public int StatusCode { get; private init; }
+        public List<KeyValuePair<string, StringValues>> Headers { get; private init; } = new();
+        public byte[] Body { get; private init; } = Array.Empty<byte>();
+
+        public static BufferedResponse From(HttpResponse response, byte[] body)
+        {
+            return new BufferedResponse
+            {
+                StatusCode = response.StatusCode,
+                Headers = response.Headers.ToList(),
+                Body = body
+            };
+        }
+
+        public async Task WriteTo(HttpResponse response)
+        {
+            response.StatusCode = StatusCode;
+            foreach (var (name, value) in Headers)
+            {
+                response.Headers[name] = value;
+            }
+            await response.Body.WriteAsync(Body);
+        }
+    }
+}
+
+/// <summary>
+/// Opts an action out of <see cref="RequestCoalescingMiddleware"/>: its response is written
+/// straight to the client instead of being buffered, e.g. because it is streamed.
+/// </summary>
+[AttributeUsage(AttributeTargets.Class | AttributeTargets.Method)]
+public class NoCoalescingAttribute : Attribute
+{
+}
@@ -0,0 +1,141 @@
+using System;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.Globalization;
+using System.IO;
+using System.Linq;
+using System.Runtime.CompilerServices;
+using System.Threading;
+
+namespace Cargohub.services
+{
+    /// <summary>
+    /// Collects a timing breakdown for requests that opt in to profiling. When no
+    /// profile is active every call here returns a no-op step, so the instrumentation
+    /// can stay in place on the hot path.
+    /// </summary>
+    public static class RequestProfiler
+    {
+        private static readonly AsyncLocal<RequestProfile?> _current = new();
+
+        public static RequestProfile? Current => _current.Value;
+
+        public static RequestProfile Start()
+        {
+            var profile = new RequestProfile();
+            _current.Value = profile;
+            return profile;
+        }
+
+        public static void Stop()
+        {
+            _current.Value = null;
+        }
+
+        public static ProfileStep Step(string category, string name)
+        {
+            var profile = _current.Value;
+            return profile == null ? default : profile.Begin(category, name);
+        }
+
+        /// <summary>
+        /// Records a service method call, named after the calling file and member
+        /// (e.g. "InventoryService.GetAll").
+        /// </summary>
+        public static ProfileStep ServiceCall([CallerFilePath] string callerFile = "", [CallerMemberName] string callerMember = "")
+        {
+            var profile = _current.Value;
+            return profile == null ? default : profile.Begin("service", $"{Path.GetFileNameWithoutExtension(callerFile)}.{callerMember}");
+        }
+    }
+
+    public readonly struct ProfileStep : IDisposable
+    {
+        private readonly RequestProfile? _profile;
+        private readonly int _index;
+
+        internal ProfileStep(RequestProfile profile, int index)
+        {
+            _profile = profile;
+            _index = index;
+        }
+
+        public void Dispose()
+        {
+            _profile?.End(_index);
+        }
+    }
+
+    public class ProfileEntry
+    {
+        public string Category { get; set; }
+        public string Name { get; set; }
+        public int Depth { get; set; }
+        public double StartMs { get; set; }
+        public double? DurationMs { get; set; }
+    }
+
+    public class RequestProfile
+    {
+        private readonly object _lock = new();
+        private readonly List<ProfileEntry> _entries = new();
+        private readonly List<long> _startTicks = new();
+        private readonly long _started = Stopwatch.GetTimestamp();
+        private int _depth;
+
+        public double ElapsedMs => TicksToMs(Stopwatch.GetTimestamp() - _started);
+
+        public List<ProfileEntry> Entries
+        {
+            get
+            {
+                lock (_lock)
+                {
+                    return _entries.ToList();
+                }
+            }
+        }
+
+        internal ProfileStep Begin(string category, string name)
+        {
+            var now = Stopwatch.GetTimestamp();
+            lock (_lock)
+            {
+                _entries.Add(new ProfileEntry
+                {
+                    Category = category,
+                    Name = name,
+                    Depth = _depth++,
+                    StartMs = Math.Round(TicksToMs(now - _started), 3)
+                });
+                _startTicks.Add(now);
+                return new ProfileStep(this, _entries.Count - 1);
+            }
+        }
+
+        internal void End(int index)
+        {
+            var now = Stopwatch.GetTimestamp();
+            lock (_lock)
+            {
+                _entries[index].DurationMs = Math.Round(TicksToMs(now - _startTicks[index]), 3);
+                _depth--;
+            }
+        }
+
+        /// <summary>
+        /// Formats the finished steps as a Server-Timing header value, e.g.
+        /// <c>read;desc="data/items.json";dur=2.1, deserialize;desc="items";dur=8.4</c>.
+        /// </summary>
+        public string ToServerTiming()
+        {
+            var parts = Entries
+                .Where(e => e.DurationMs.HasValue)
+                .Select(e => $"{e.Category};desc=\"{e.Name.Replace("\"", "'")}\";dur={e.DurationMs.Value.ToString(CultureInfo.InvariantCulture)}")
+                .Append($"total;dur={Math.Round(ElapsedMs, 3).ToString(CultureInfo.InvariantCulture)}");
+            return string.Join(", ", parts);
+        }
+
+        private static double TicksToMs(long ticks) => ticks * 1000.0 / Stopwatch.Frequency;
+    }
+}
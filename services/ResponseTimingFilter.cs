@@ -0,0 +1,17 @@
+using System.Diagnostics;
+using Microsoft.AspNetCore.Mvc.Filters;
+using Cargohub.services;
+
+public class ResponseTimingFilter : IAsyncResultFilter
+{
+    public async Task OnResultExecutionAsync(ResultExecutingContext context, ResultExecutionDelegate next)
+    {
+        // Executing the result is where the response body is serialized and written.
+        var started = Stopwatch.GetTimestamp();
+        using (RequestProfiler.Step("response", context.Result.GetType().Name))
+        {
+            await next();
+        }
+        Metrics.ForRoute(MetricsMiddleware.RouteLabel(context.HttpContext)).ResponseSerialize.Record(Stopwatch.GetTimestamp() - started);
+    }
+}
@@ -0,0 +1,208 @@
+using System;
+using System.Collections.Concurrent;
+using System.Collections.Generic;
+using System.IO;
+using System.Linq;
+
+namespace Cargohub.services
+{
+    /// <summary>
+    /// Inverted full-text index over a collection file: every word of the indexed fields points
+    /// at the keys of the records containing it. A search returns the records that contain a
+    /// word starting with each of the query's words, e.g. "hand saw" finds "Handheld sawmill".
+    /// The index is built on the first search and then kept up to date one record at a time:
+    /// services call <see cref="Reindex"/> with the key of every record they write. When the
+    /// file's <see cref="JsonFileStore.Version{T}"/> has changed some other way (a restore or an
+    /// edit on disk), the next search builds it again.
+    /// </summary>
+    public class SearchIndex<T, TKey> where TKey : notnull
+    {
+        private static readonly ConcurrentDictionary<string, SearchIndex<T, TKey>> _indexes = new();
+
+        private readonly object _lock = new();
+        private readonly string _filePath;
+        private readonly Func<T, TKey> _keyOf;
+        private readonly Func<T, string?>[] _fields;
+        private readonly Dictionary<string, HashSet<TKey>> _postings = new(StringComparer.Ordinal);
+        private readonly SortedSet<string> _words = new(StringComparer.Ordinal);
+        private readonly Dictionary<TKey, string[]> _wordsByKey = new();
+        // The file version the index was built or last reindexed at; null until the first search.
+        private long? _version;
+
+        private SearchIndex(string filePath, Func<T, TKey> keyOf, Func<T, string?>[] fields)
+        {
+            _filePath = filePath;
+            _keyOf = keyOf;
+            _fields = fields;
+        }
+
+        /// <summary>
+        /// The index of <paramref name="filePath"/>, shared by every service instance using it.
+        /// </summary>
+        public static SearchIndex<T, TKey> For(string filePath, Func<T, TKey> keyOf, params Func<T, string?>[] fields)
+        {
+            return _indexes.GetOrAdd(Path.GetFullPath(filePath), _ => new SearchIndex<T, TKey>(filePath, keyOf, fields));
+        }
+
+        /// <summary>
+        /// The records matching every word of <paramref name="query"/>, ordered by key.
+        /// </summary>
+        public List<T> Search(string query)
+        {
+            var terms = Tokenize(query).Distinct().ToList();
+            if (terms.Count == 0)
+            {
+                return new List<T>();
+            }
+
+            List<TKey> keys;
+            lock (_lock)
+            {
+                EnsureBuilt();
+
+                HashSet<TKey>? matches = null;
+                foreach (var term in terms)
+                {
+                    var termMatches = new HashSet<TKey>();
+                    foreach (var word in _words.GetViewBetween(term, term + char.MaxValue))
+                    {
+                        termMatches.UnionWith(_postings[word]);
+                    }
+
+                    if (matches == null)
+                    {
+                        matches = termMatches;
+                    }
+                    else
+                    {
+                        matches.IntersectWith(termMatches);
+                    }
+
+                    if (matches.Count == 0)
+                    {
+                        break;
+                    }
+                }
+                keys = matches!.ToList();
+            }
+
+            // Records are read from the current snapshot, so a result never shows stale data.
+            return keys
+                .Select(key => JsonFileStore.FindById(_filePath, _keyOf, key))
+                .Where(record => record != null)
+                .Select(record => record!)
+                .OrderBy(_keyOf)
+                .ToList();
+        }
+
+        /// <summary>
+        /// Brings the entry for <paramref name="key"/> in line with the record currently stored
+        /// under it, or drops it when the record was deleted. Safe to call in any order.
+        /// </summary>
+        public void Reindex(TKey key)
+        {
+            lock (_lock)
+            {
+                if (_version == null)
+                {
+                    // The first search builds from the file, which already has this write.
+                    return;
+                }
+
+                Remove(key);
+                var record = JsonFileStore.FindById(_filePath, _keyOf, key);
+                if (record != null)
+                {
+                    Add(record);
+                }
+                _version = JsonFileStore.Version<T>(_filePath);
+            }
+        }
+
+        // Caller holds _lock.
+        private void EnsureBuilt()
+        {
+            // Read before the snapshot, so a write in between only causes one more rebuild.
+            var version = JsonFileStore.Version<T>(_filePath);
+            if (_version == version)
+            {
+                return;
+            }
+
+            _postings.Clear();
+            _words.Clear();
+            _wordsByKey.Clear();
+            foreach (var record in JsonFileStore.Snapshot<T>(_filePath))
+            {
+                Add(record);
+            }
+            _version = version;
+        }
+
+        private void Add(T record)
+        {
+            var key = _keyOf(record);
+            var words = _fields.SelectMany(field => Tokenize(field(record))).Distinct().ToArray();
+            if (_wordsByKey.TryGetValue(key, out var existing))
+            {
+                // Two records share a key; keep the words of both.
+                words = existing.Union(words).ToArray();
+            }
+            _wordsByKey[key] = words;
+
+            foreach (var word in words)
+            {
+                if (!_postings.TryGetValue(word, out var keys))
+                {
+                    keys = new HashSet<TKey>();
+                    _postings[word] = keys;
+                    _words.Add(word);
+                }
+                keys.Add(key);
+            }
+        }
+
+        private void Remove(TKey key)
+        {
+            if (!_wordsByKey.Remove(key, out var words))
+            {
+                return;
+            }
+
+            foreach (var word in words)
+            {
+                var keys = _postings[word];
+                keys.Remove(key);
+                if (keys.Count == 0)
+                {
+                    _postings.Remove(word);
+                    _words.Remove(word);
+                }
+            }
+        }
+
+        // Words are runs of letters and digits, compared in lower case.
+        private static IEnumerable<string> Tokenize(string? text)
+        {
+            if (string.IsNullOrEmpty(text))
+            {
+                yield break;
+            }
+
+            var start = -1;
+            for (var i = 0; i <= text.Length; i++)
+            {
+                var inWord = i < text.Length && char.IsLetterOrDigit(text[i]);
+                if (inWord && start < 0)
+                {
+                    start = i;
+                }
+                else if (!inWord && start >= 0)
+                {
+                    yield return text[start..i].ToLowerInvariant();
+                    start = -1;
+                }
+            }
+        }
+    }
+}
@@ -0,0 +1,135 @@
+using System;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.IO;
+using System.Linq;
+using Cargohub.interfaces;
+using Cargohub.models;
+
+namespace Cargohub.services
+{
+    /// <summary>
+    /// Compares the <see cref="IRecordSerializer"/>s on the collection files under data/, instead
+    /// of starting the server: <c>dotnet Cargohub.dll serializer-benchmark [rounds]</c>. For each
+    /// collection it prints the median read (parse) and write time per serializer, the
+    /// allocations of one read and write, and whether both wrote the same bytes. Binary snapshots
+    /// are measured on their JSON form, and a collection split into warehouse shards as the sum
+    /// over its shard files.
+    /// </summary>
+    public static class SerializerBenchmark
+    {
+        public const string Command = "serializer-benchmark";
+
+        private static readonly IRecordSerializer[] Serializers =
+        {
+            NewtonsoftRecordSerializer.Instance,
+            SourceGeneratedRecordSerializer.Instance
+        };
+
+        public static int Run(string[] args, TextWriter output)
+        {
+            var rounds = args.Length > 0 && int.TryParse(args[0], out var parsed) && parsed > 0 ? parsed : 10;
+
+            output.WriteLine($"{"collection",-16} {"records",8} {"KiB",8} {"serializer",-17} {"read ms",9} {"write ms",9} {"alloc KiB",10} {"same bytes",10}");
+            var mismatches = 0;
+            mismatches += Measure<Warehouse>("data/warehouses.json", rounds, output);
+            mismatches += Measure<Location>("data/locations.json", ShardFiles<Location>("data/locations.json"), rounds, output);
+            mismatches += Measure<Inventory>("data/inventories.json", rounds, output);
+            mismatches += Measure<Item>("data/items.json", rounds, output);
+            mismatches += Measure<ItemLine>("data/item_lines.json", rounds, output);
+            mismatches += Measure<ItemGroup>("data/item_groups.json", rounds, output);
+            mismatches += Measure<ItemType>("data/item_types.json", rounds, output);
+            mismatches += Measure<Order>("data/orders.json", rounds, output);
+            mismatches += Measure<Shipment>("data/shipments.json", rounds, output);
+            mismatches += Measure<Transfer>("data/transfers.json", rounds, output);
+            mismatches += Measure<Supplier>("data/suppliers.json", rounds, output);
+            mismatches += Measure<Client>("data/clients.json", rounds, output);
+            mismatches += Measure<Classifications>("data/classifications.json", rounds, output);
+            mismatches += Measure<User>("data/users.json", rounds, output);
+            return mismatches == 0 ? 0 : 1;
+        }
+
+        private static int Measure<T>(string filePath, int rounds, TextWriter output)
+        {
+            return Measure<T>(filePath, new[] { filePath }, rounds, output);
+        }
+
+        // The collection file itself while it is not split yet, otherwise its shard files.
+        private static IReadOnlyList<string> ShardFiles<T>(string collectionPath)
+        {
+            if (File.Exists(collectionPath))
+            {
+                return new[] { collectionPath };
+            }
+
+            var shards = new WarehouseShards<T>(collectionPath, _ => 0, _ => 0);
+            return shards.WarehouseIds().Select(shards.PathFor).ToList();
+        }
+
+        private static int Measure<T>(string collectionPath, IReadOnlyList<string> filePaths, int rounds, TextWriter output)
+        {
+            var files = filePaths.Where(File.Exists).Select(ReadJson).ToList();
+            if (files.Count == 0)
+            {
+                return 0;
+            }
+
+            var references = files.Select(json => NewtonsoftRecordSerializer.Instance.DeserializeList<T>(json)).ToList();
+            var expected = references.Select(reference => NewtonsoftRecordSerializer.Instance.SerializeList(reference)).ToList();
+            var mismatches = 0;
+
+            foreach (var serializer in Serializers)
+            {
+                // The first round pays for JIT and type metadata and is left out of the medians.
+                var reads = new List<double>();
+                var writes = new List<double>();
+                var written = new byte[files.Count][];
+                long allocated = 0;
+                for (var round = 0; round <= rounds; round++)
+                {
+                    var before = GC.GetAllocatedBytesForCurrentThread();
+                    double read = 0, write = 0;
+                    for (var i = 0; i < files.Count; i++)
+                    {
+                        var started = Stopwatch.GetTimestamp();
+                        var records = serializer.DeserializeList<T>(files[i]);
+                        read += Stopwatch.GetElapsedTime(started).TotalMilliseconds;
+
+                        started = Stopwatch.GetTimestamp();
+                        written[i] = serializer.SerializeList(records);
+                        write += Stopwatch.GetElapsedTime(started).TotalMilliseconds;
+                    }
+                    allocated = GC.GetAllocatedBytesForCurrentThread() - before;
+
+                    if (round > 0)
+                    {
+                        reads.Add(read);
+                        writes.Add(write);
+                    }
+                }
+
+                var same = written.Select((bytes, i) => bytes.AsSpan().SequenceEqual(expected[i])).All(equal => equal);
+                if (!same)
+                {
+                    mismatches++;
+                }
+                output.WriteLine($"{JsonFileStore.CollectionName(collectionPath),-16} {references.Sum(r => r.Count),8} {files.Sum(json => json.Length) / 1024,8} {serializer.Name,-17} {Median(reads),9:F2} {Median(writes),9:F2} {allocated / 1024,10} {(same ? "yes" : "NO"),10}");
+            }
+            return mismatches;
+        }
+
+        private static byte[] ReadJson(string filePath)
+        {
+            var bytes = File.ReadAllBytes(filePath);
+            return CompactSnapshot.FormatOf(bytes) == SnapshotFormat.Binary
+                ? CompactSnapshot.Convert(bytes, SnapshotFormat.Json)
+                : bytes;
+        }
+
+        private static double Median(List<double> values)
+        {
+            var sorted = values.OrderBy(v => v).ToList();
+            return sorted.Count == 0 ? 0 : sorted[sorted.Count / 2];
+        }
+    }
+}
@@ -1,93 +1,249 @@
+using System.Collections.Immutable;
 using Cargohub.interfaces;
 using Cargohub.models;
+using Cargohub.services;
 using Newtonsoft.Json;
 using StrawhatsV2.models;
 
-public class ShipmentService : ICrudService<Shipment, int>
+public class ShipmentService : ICrudService<Shipment, int>, IAsyncCrudService<Shipment, int>
 {
     private readonly string jsonFilePath = "data/shipments.json";
     private readonly string logFilePath = "logs/picking_logs.log";
 
-    public Task Create(Shipment entity)
-    {
-        var shipments = GetAll() ?? new List<Shipment>();
-        var nextId = shipments.Any() ? shipments.Max(s => s.Id) + 1 : 1;
+    public Task Create(Shipment entity) => CreateAsync(entity);
 
-        entity.Id = nextId;
-        entity.Created_At = DateTime.Now;
-        entity.Updated_At = DateTime.Now;
-        shipments.Add(entity);
-        SaveToFile(shipments);
+    public async Task CreateAsync(Shipment entity, CancellationToken cancellationToken = default)
+    {
+        using var trace = RequestProfiler.ServiceCall();
+        await JsonFileStore.UpdateAsync<Shipment>(jsonFilePath, shipments =>
+        {
+            var nextId = IdSequence.Next(jsonFilePath, ColdStorage.WithArchived(jsonFilePath, shipments), s => s.Id);
 
-        return Task.CompletedTask;
+            entity.Id = nextId;
+            entity.Created_At = DateTime.Now;
+            entity.Updated_At = DateTime.Now;
+            return SortedById(shipments.Add(entity));
+        }, cancellationToken);
     }
 
     public async Task SavePickingList(int shipmentId, Dictionary<string, int> pickedItems, string performedBy, string description = null)
         {
-            var shipments = GetAll() ?? new List<Shipment>();
-            var shipment = shipments.FirstOrDefault(s => s.Id == shipmentId);
+            using var trace = RequestProfiler.ServiceCall();
+            var filePath = ColdStorage.PathContaining<Shipment, int>(jsonFilePath, s => s.Id, shipmentId);
+            JsonFileStore.Update<Shipment>(filePath, shipments =>
+            {
+                var existingShipment = shipments.FirstOrDefault(s => s.Id == shipmentId);
 
-            if (shipment == null)
+                if (existingShipment == null)
+                {
+                    throw new KeyNotFoundException($"Shipment with ID {shipmentId} not found.");
+                }
+
+                var shipment = CopyForPicking(existingShipment);
+                var itemsById = ItemLookup(shipment);
+                var invalidItems = InvalidPicks(itemsById, pickedItems);
+
+                if (invalidItems.Any())
+                {
+                    throw new InvalidOperationException($"Cannot pick the following items due to insufficient quantity: {string.Join(", ", invalidItems)}");
+                }
+
+                ApplyPicks(shipment, itemsById, pickedItems);
+
+                shipment.Shipment_Status = shipment.Items.All(i => i.Amount == 0) ? "Picked" : "Partially Picked";
+                shipment.Updated_At = DateTime.Now;
+
+                return shipments.Replace(existingShipment, shipment);
+            });
+
+            // Log the picking action
+            var logEntry = new PickingLogEntry
             {
-                throw new KeyNotFoundException($"Shipment with ID {shipmentId} not found.");
+                Timestamp = DateTime.Now,
+                PerformedBy = performedBy,
+                ShipmentId = shipmentId,
+                PickedItems = pickedItems,
+                Description = description
+            };
+
+            await LogPickingAction(logEntry);
+        }
+
+        /// <summary>
+        /// Applies the picks of a whole wave: every shipment is validated first, then all
+        /// picks are applied, shipments.json is written once and the log lines are appended
+        /// in one go. Picks for the same shipment are added together. Nothing is saved if any
+        /// shipment is missing or any item is over-picked.
+        /// </summary>
+        public async Task<string> SaveWavePicking(List<ShipmentPicks> picks, string performedBy, string description = null)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            var picksByShipment = new Dictionary<int, Dictionary<string, int>>();
+            foreach (var pick in picks)
+            {
+                if (!picksByShipment.TryGetValue(pick.ShipmentId, out var merged))
+                {
+                    merged = new Dictionary<string, int>();
+                    picksByShipment[pick.ShipmentId] = merged;
+                }
+
+                foreach (var pickedItem in pick.PickedItems ?? new Dictionary<string, int>())
+                {
+                    merged[pickedItem.Key] = merged.GetValueOrDefault(pickedItem.Key) + pickedItem.Value;
+                }
             }
 
-            var invalidItems = new List<string>();
+            var now = DateTime.Now;
+            // Archived shipments are picked in the cold partition, as in SavePickingList. Both
+            // files are checked before either is written, so a wave is applied entirely or not at all.
+            JsonFileStore.Update<Shipment>(jsonFilePath, hot =>
+            {
+                var nextHot = hot;
+                JsonFileStore.Update<Shipment>(ColdStorage.PathFor(jsonFilePath), cold =>
+                {
+                    var hotIds = hot.Select(s => s.Id).ToHashSet();
+                    var coldIds = cold.Select(s => s.Id).ToHashSet();
+                    var missingShipments = picksByShipment.Keys.Where(id => !hotIds.Contains(id) && !coldIds.Contains(id)).ToList();
+                    if (missingShipments.Any())
+                    {
+                        throw new KeyNotFoundException($"Shipments not found: {string.Join(", ", missingShipments)}");
+                    }
 
-            foreach (var pickedItem in pickedItems)
+                    var hotWave = new WavePicks(hot, picksByShipment.Where(p => hotIds.Contains(p.Key)));
+                    var coldWave = new WavePicks(cold, picksByShipment.Where(p => !hotIds.Contains(p.Key)));
+                    var invalidItems = hotWave.InvalidItems().Concat(coldWave.InvalidItems()).ToList();
+                    if (invalidItems.Any())
+                    {
+                        throw new InvalidOperationException($"Cannot pick the following items due to insufficient quantity: {string.Join(", ", invalidItems)}");
+                    }
+
+                    nextHot = hotWave.Apply(now);
+                    return coldWave.Apply(now);
+                });
+                return nextHot;
+            });
+
+            var waveId = Guid.NewGuid().ToString("N");
+            var logLines = picksByShipment.Select(p => FormatPickingLogLine(new PickingLogEntry
+            {
+                Timestamp = now,
+                PerformedBy = performedBy,
+                ShipmentId = p.Key,
+                PickedItems = p.Value,
+                Description = description
+            }, waveId));
+
+            await File.AppendAllLinesAsync(logFilePath, logLines);
+            return waveId;
+        }
+
+        // The picks of a wave that fall in one collection file, checked against and applied to
+        // copies of its shipments.
+        private sealed class WavePicks
+        {
+            private readonly ImmutableList<Shipment> _shipments;
+            private readonly Dictionary<int, Dictionary<string, int>> _picks;
+            private readonly Dictionary<int, int> _positions = new();
+            private readonly Dictionary<int, Shipment> _copies;
+            private readonly Dictionary<int, Dictionary<string, ItemDetail>> _lookups;
+
+            public WavePicks(ImmutableList<Shipment> shipments, IEnumerable<KeyValuePair<int, Dictionary<string, int>>> picks)
             {
-                var shipmentItem = shipment.Items.FirstOrDefault(i => i.Item_Id == pickedItem.Key);
-                if (shipmentItem != null)
+                _shipments = shipments;
+                _picks = picks.ToDictionary(p => p.Key, p => p.Value);
+                if (_picks.Count > 0)
                 {
-                    if (shipmentItem.Amount < pickedItem.Value)
+                    for (var i = 0; i < shipments.Count; i++)
                     {
-                        invalidItems.Add(pickedItem.Key);
+                        _positions.TryAdd(shipments[i].Id, i);
                     }
                 }
+                _copies = _picks.Keys.ToDictionary(id => id, id => CopyForPicking(shipments[_positions[id]]));
+                _lookups = _copies.ToDictionary(c => c.Key, c => ItemLookup(c.Value));
             }
 
-            if (invalidItems.Any())
+            public IEnumerable<string> InvalidItems()
             {
-                throw new InvalidOperationException($"Cannot pick the following items due to insufficient quantity: {string.Join(", ", invalidItems)}");
+                return _picks.SelectMany(p => InvalidPicks(_lookups[p.Key], p.Value).Select(itemId => $"{p.Key}:{itemId}"));
             }
 
-            foreach (var pickedItem in pickedItems)
+            // The same list when there is nothing to pick, so the file is not rewritten.
+            public ImmutableList<Shipment> Apply(DateTime now)
             {
-                var shipmentItem = shipment.Items.FirstOrDefault(i => i.Item_Id == pickedItem.Key);
-                if (shipmentItem != null)
+                if (_picks.Count == 0)
                 {
-                    shipmentItem.Amount -= pickedItem.Value;
-                    shipmentItem.CrossDockingStatus = shipmentItem.Amount == 0 ? "Picked" : "Partially Picked";
+                    return _shipments;
                 }
-            }
 
-            shipment.Shipment_Status = shipment.Items.All(i => i.Amount == 0) ? "Picked" : "Partially Picked";
-            shipment.Updated_At = DateTime.Now;
+                var updated = _shipments.ToBuilder();
+                foreach (var (shipmentId, pickedItems) in _picks)
+                {
+                    var shipment = _copies[shipmentId];
+                    ApplyPicks(shipment, _lookups[shipmentId], pickedItems);
+                    shipment.Shipment_Status = shipment.Items.All(i => i.Amount == 0) ? "Picked" : "Partially Picked";
+                    shipment.Updated_At = now;
+                    updated[_positions[shipmentId]] = shipment;
+                }
+                return updated.ToImmutable();
+            }
+        }
 
-            SaveToFile(shipments);
+        // Picking changes item amounts, so the item lines are copied along with the shipment.
+        private static Shipment CopyForPicking(Shipment shipment)
+        {
+            var copy = EntityCopy.Shallow(shipment);
+            copy.Items = EntityCopy.ShallowAll(shipment.Items);
+            return copy;
+        }
 
-            // Log the picking action
-            var logEntry = new PickingLogEntry
+        // First item per Item_Id, the same one FirstOrDefault would find.
+        private static Dictionary<string, ItemDetail> ItemLookup(Shipment shipment)
+        {
+            var itemsById = new Dictionary<string, ItemDetail>();
+            foreach (var item in shipment.Items ?? new List<ItemDetail>())
             {
-                Timestamp = DateTime.Now,
-                PerformedBy = performedBy,
-                ShipmentId = shipmentId,
-                PickedItems = pickedItems,
-                Description = description
-            };
+                if (item.Item_Id != null)
+                {
+                    itemsById.TryAdd(item.Item_Id, item);
+                }
+            }
+            return itemsById;
+        }
 
-            await LogPickingAction(logEntry);
+        private static List<string> InvalidPicks(Dictionary<string, ItemDetail> itemsById, Dictionary<string, int> pickedItems)
+        {
+            return pickedItems
+                .Where(p => itemsById.TryGetValue(p.Key, out var shipmentItem) && shipmentItem.Amount < p.Value)
+                .Select(p => p.Key)
+                .ToList();
+        }
+
+        private static void ApplyPicks(Shipment shipment, Dictionary<string, ItemDetail> itemsById, Dictionary<string, int> pickedItems)
+        {
+            foreach (var pickedItem in pickedItems)
+            {
+                if (itemsById.TryGetValue(pickedItem.Key, out var shipmentItem))
+                {
+                    shipmentItem.Amount -= pickedItem.Value;
+                    shipmentItem.CrossDockingStatus = shipmentItem.Amount == 0 ? "Picked" : "Partially Picked";
+                }
+            }
         }
 
         private async Task LogPickingAction(PickingLogEntry logEntry)
         {
-            var logLine = $"Timestamp={logEntry.Timestamp:O} | PerformedBy={logEntry.PerformedBy} | ShipmentId={logEntry.ShipmentId} | Description={logEntry.Description} | PickedItems={string.Join(", ", logEntry.PickedItems.Select(kv => $"{kv.Key}:{kv.Value}"))}";
+            await File.AppendAllTextAsync(logFilePath, FormatPickingLogLine(logEntry) + Environment.NewLine);
+        }
 
-            await File.AppendAllTextAsync(logFilePath, logLine + Environment.NewLine);
+        private static string FormatPickingLogLine(PickingLogEntry logEntry, string waveId = null)
+        {
+            var wave = waveId == null ? string.Empty : $" | WaveId={waveId}";
+            return $"Timestamp={logEntry.Timestamp:O} | PerformedBy={logEntry.PerformedBy} | ShipmentId={logEntry.ShipmentId}{wave} | Description={logEntry.Description} | PickedItems={string.Join(", ", logEntry.PickedItems.Select(kv => $"{kv.Key}:{kv.Value}"))}";
         }
         
         public List<ItemDetail> GeneratePicklist(int shipmentId)
         {
+            using var trace = RequestProfiler.ServiceCall();
             var shipment = GetById(shipmentId);
             if (shipment == null)
             {
@@ -97,30 +253,118 @@ public class ShipmentService : ICrudService<Shipment, int>
             return shipment.Items.Where(i => i.Amount > 0).ToList();
         }
 
-    public Task Delete(int id)
+    public ShippedTotalsIndex GetShippedTotals()
     {
-        var shipments = GetAll();
-        var shipment = shipments.FirstOrDefault(s => s.Id == id);
+        using var trace = RequestProfiler.ServiceCall();
+        // Archived shipments still count towards what has been shipped for an order.
+        var hot = JsonFileStore.GetView<Shipment, ShippedTotalsIndex>(jsonFilePath, "shipped-totals", ShippedTotalsIndex.Build);
+        var archived = JsonFileStore.GetView<Shipment, ShippedTotalsIndex>(ColdStorage.PathFor(jsonFilePath), "shipped-totals", ShippedTotalsIndex.Build);
+        return hot.Including(archived);
+    }
 
-        if (shipment == null)
+    /// <summary>
+    /// Moves delivered and shipped shipments to the archive, and archived shipments whose
+    /// status changed back to the hot file.
+    /// </summary>
+    public ArchiveResult ArchiveCompleted()
+    {
+        using var trace = RequestProfiler.ServiceCall();
+        return ColdStorage.Rebalance<Shipment>(jsonFilePath, s => s.Id, IsCompleted);
+    }
+
+    private static bool IsCompleted(Shipment shipment) =>
+        shipment.Shipment_Status == "Delivered" || shipment.Shipment_Status == "Shipped";
+
+    public Task Delete(int id) => DeleteAsync(id);
+
+    public async Task DeleteAsync(int id, CancellationToken cancellationToken = default)
+    {
+        using var trace = RequestProfiler.ServiceCall();
+        var filePath = await ColdStorage.PathContainingAsync<Shipment, int>(jsonFilePath, s => s.Id, id, cancellationToken);
+        await JsonFileStore.UpdateAsync<Shipment>(filePath, shipments =>
         {
-            throw new KeyNotFoundException($"Shipment with ID {id} not found.");
-        }
+            var shipment = shipments.FirstOrDefault(s => s.Id == id);
 
-        shipments.Remove(shipment);
-        SaveToFile(shipments);
+            if (shipment == null)
+            {
+                throw new KeyNotFoundException($"Shipment with ID {id} not found.");
+            }
 
-        return Task.CompletedTask;
+            return SortedById(shipments.Remove(shipment));
+        }, cancellationToken);
     }
 
     public List<Shipment> GetAll(int? pageNumber = null, int? pageSize = null)
     {
-        var jsonData = File.ReadAllText(jsonFilePath);
-        var shipments = JsonConvert.DeserializeObject<List<Shipment>>(jsonData) ?? new List<Shipment>();
+        using var trace = RequestProfiler.ServiceCall();
+        return Page(JsonFileStore.Snapshot<Shipment>(jsonFilePath), pageNumber, pageSize);
+    }
 
+    public async ValueTask<List<Shipment>> GetAllAsync(int? pageNumber = null, int? pageSize = null, CancellationToken cancellationToken = default)
+    {
+        using var trace = RequestProfiler.ServiceCall();
+        return Page(await JsonFileStore.SnapshotAsync<Shipment>(jsonFilePath, cancellationToken), pageNumber, pageSize);
+    }
+
+    private static List<Shipment> Page(IReadOnlyList<Shipment> shipments, int? pageNumber, int? pageSize)
+    {
         if (pageNumber.HasValue && pageSize.HasValue && pageNumber > 0 && pageSize > 0)
+        {
+            return shipments
+                .Skip((pageNumber.Value - 1) * pageSize.Value)
+                .Take(pageSize.Value)
+                .ToList();
+        }
+
+        return shipments.ToList();
+    }
+
+    /// <summary>
+    /// Like <see cref="GetAll(int?, int?)"/>, but with <paramref name="includeArchived"/> the
+    /// archived shipments are listed too, merged in by ID.
+    /// </summary>
+    public List<Shipment> GetAll(bool includeArchived, int? pageNumber = null, int? pageSize = null)
+    {
+        if (!includeArchived)
+        {
+            return GetAll(pageNumber, pageSize);
+        }
+
+        using var trace = RequestProfiler.ServiceCall();
+        return Page(ColdStorage.ReadAll<Shipment>(jsonFilePath, s => s.Id), pageNumber, pageSize);
+    }
+
+    public async ValueTask<List<Shipment>> GetAllAsync(bool includeArchived, int? pageNumber = null, int? pageSize = null, CancellationToken cancellationToken = default)
+    {
+        if (!includeArchived)
+        {
+            return await GetAllAsync(pageNumber, pageSize, cancellationToken);
+        }
+
+        using var trace = RequestProfiler.ServiceCall();
+        return Page(await ColdStorage.ReadAllAsync<Shipment>(jsonFilePath, s => s.Id, cancellationToken), pageNumber, pageSize);
+    }
+
+    /// <summary>
+    /// The shipments of the given orders, read from a per-order index instead of a scan over
+    /// all shipments. Used to scope shipment lists to the warehouses of those orders.
+    /// </summary>
+    public List<Shipment> GetAllForOrders(IEnumerable<int> orderIds, bool includeArchived = false, int? pageNumber = null, int? pageSize = null)
+    {
+        using var trace = RequestProfiler.ServiceCall();
+        var ids = orderIds.ToList();
+        var shipments = ByOrder(jsonFilePath).For(ids, s => s.Id);
+        if (includeArchived)
         {
             shipments = shipments
+                .Concat(ByOrder(ColdStorage.PathFor(jsonFilePath)).For(ids, s => s.Id))
+                .OrderBy(s => s.Id)
+                .ToList();
+        }
+
+        if (pageNumber.HasValue && pageSize.HasValue && pageNumber > 0 && pageSize > 0)
+        {
+            return shipments
                 .Skip((pageNumber.Value - 1) * pageSize.Value)
                 .Take(pageSize.Value)
                 .ToList();
@@ -129,41 +373,106 @@ public class ShipmentService : ICrudService<Shipment, int>
         return shipments;
     }
 
-    public Shipment GetById(int id)
+    /// <summary>
+    /// The shipments matching <paramref name="query"/>, limited to the shipments of
+    /// <paramref name="orderIds"/> when given. Equality filters on Shipment_Status are answered
+    /// from an index; other queries scan the shipments once.
+    /// </summary>
+    public List<Shipment> Find(ListQuery query, IReadOnlyCollection<int>? orderIds = null, bool includeArchived = false)
     {
-        var shipments = GetAll();
-        return shipments.FirstOrDefault(s => s.Id == id) ?? throw new KeyNotFoundException($"Shipment with ID {id} not found.");
+        using var trace = RequestProfiler.ServiceCall();
+        var candidates = Candidates(jsonFilePath, query, orderIds);
+        if (includeArchived)
+        {
+            candidates = candidates
+                .Concat(Candidates(ColdStorage.PathFor(jsonFilePath), query, orderIds))
+                .OrderBy(s => s.Id);
+        }
+
+        return query.Apply(candidates);
     }
 
-    public Task Update(Shipment entity)
+    private static IEnumerable<Shipment> Candidates(string filePath, ListQuery query, IReadOnlyCollection<int>? orderIds)
     {
-        var shipments = GetAll();
-        var existingShipment = shipments.FirstOrDefault(s => s.Id == entity.Id);
-
-        if (existingShipment == null)
+        if (orderIds != null)
         {
-            throw new KeyNotFoundException($"Shipment with ID {entity.Id} not found.");
+            return ByOrder(filePath).For(orderIds, s => s.Id);
         }
 
-        // Ensure the existing shipment is replaced correctly
-        shipments.Remove(existingShipment);
-        shipments.Add(entity);
+        return query.Candidates(JsonFileStore.Snapshot<Shipment>(filePath),
+            new QueryIndex<Shipment>("Shipment_Status", value => JsonFileStore.GetView<Shipment, ILookup<string, Shipment>>(filePath, "by-status",
+                shipments => shipments.ToLookup(s => s.Shipment_Status ?? string.Empty, StringComparer.OrdinalIgnoreCase))[(string)value!]));
+    }
+
+    private static KeyedIndex<Shipment> ByOrder(string filePath)
+    {
+        return JsonFileStore.GetView<Shipment, KeyedIndex<Shipment>>(filePath, "by-order",
+            shipments => KeyedIndex<Shipment>.Build(shipments, s => s.Order_Id ?? Enumerable.Empty<int>()));
+    }
+
+    /// <summary>
+    /// The shipments with the given ids, archived ones included, in the order asked for.
+    /// Unknown ids are skipped.
+    /// </summary>
+    public List<Shipment> GetByIds(IEnumerable<int> ids)
+    {
+        using var trace = RequestProfiler.ServiceCall();
+        return ids
+            .Select(id => ColdStorage.FindById<Shipment, int>(jsonFilePath, s => s.Id, id))
+            .Where(shipment => shipment != null)
+            .Select(shipment => shipment!)
+            .ToList();
+    }
+
+    public Shipment GetById(int id)
+    {
+        using var trace = RequestProfiler.ServiceCall();
+        return ColdStorage.FindById<Shipment, int>(jsonFilePath, s => s.Id, id) ?? throw new KeyNotFoundException($"Shipment with ID {id} not found.");
+    }
+
+    public async ValueTask<Shipment> GetByIdAsync(int id, CancellationToken cancellationToken = default)
+    {
+        using var trace = RequestProfiler.ServiceCall();
+        return await ColdStorage.FindByIdAsync<Shipment, int>(jsonFilePath, s => s.Id, id, cancellationToken)
+            ?? throw new KeyNotFoundException($"Shipment with ID {id} not found.");
+    }
+
+    public Task Update(Shipment entity) => UpdateAsync(entity);
 
-        Console.WriteLine($"Updating Shipment ID: {entity.Id}");
-        Console.WriteLine(JsonConvert.SerializeObject(entity, Formatting.Indented));
+    public async Task UpdateAsync(Shipment entity, CancellationToken cancellationToken = default)
+    {
+        using var trace = RequestProfiler.ServiceCall();
+        var filePath = await ColdStorage.PathContainingAsync<Shipment, int>(jsonFilePath, s => s.Id, entity.Id, cancellationToken);
+        await JsonFileStore.UpdateAsync<Shipment>(filePath, shipments =>
+        {
+            var existingShipment = shipments.FirstOrDefault(s => s.Id == entity.Id);
+
+            if (existingShipment == null)
+            {
+                throw new KeyNotFoundException($"Shipment with ID {entity.Id} not found.");
+            }
 
-        SaveToFile(shipments);
+            Console.WriteLine($"Updating Shipment ID: {entity.Id}");
+            Console.WriteLine(JsonConvert.SerializeObject(entity, Formatting.Indented));
 
-        return Task.CompletedTask;
+            // Ensure the existing shipment is replaced correctly
+            return SortedById(shipments.Replace(existingShipment, entity));
+        }, cancellationToken);
     }
 
 
-    private void SaveToFile(List<Shipment> shipments)
+    // Shipment files are kept sorted by ID. The list normally already is, in which case
+    // it is returned as is instead of being rebuilt.
+    private static ImmutableList<Shipment> SortedById(ImmutableList<Shipment> shipments)
     {
-        // Sort shipments by ID before saving
-        var sortedShipments = shipments.OrderBy(s => s.Id).ToList();
-        var jsonData = JsonConvert.SerializeObject(sortedShipments, Formatting.Indented);
-        File.WriteAllText(jsonFilePath, jsonData);
+        for (var i = 1; i < shipments.Count; i++)
+        {
+            if (shipments[i - 1].Id > shipments[i].Id)
+            {
+                return shipments.OrderBy(s => s.Id).ToImmutableList();
+            }
+        }
+        return shipments;
     }
 
 }
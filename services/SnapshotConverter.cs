@@ -0,0 +1,56 @@
+using System;
+using System.Collections.Generic;
+using System.IO;
+using System.Linq;
+using Newtonsoft.Json;
+
+namespace Cargohub.services
+{
+    /// <summary>
+    /// Converts collection files between the two <see cref="SnapshotFormat"/>s from the command
+    /// line, instead of starting the server: <c>dotnet Cargohub.dll snapshot binary
+    /// data/orders.json data/shipments.json</c>, and <c>snapshot json ...</c> to make them
+    /// readable again for export or debugging. Files are converted in place and keep their names;
+    /// the server reads either format and saves each file in the format it finds.
+    /// </summary>
+    public static class SnapshotConverter
+    {
+        public const string Command = "snapshot";
+
+        // Read directly rather than through JsonFileStore, so they have to stay JSON.
+        private static readonly HashSet<string> JsonOnlyFiles = new(StringComparer.OrdinalIgnoreCase) { "users.json", "sequences.json" };
+
+        public static int Run(string[] args, TextWriter output)
+        {
+            if (args.Length < 2 || !Enum.TryParse<SnapshotFormat>(args[0], ignoreCase: true, out var format) || !Enum.IsDefined(format))
+            {
+                output.WriteLine($"Usage: {Command} <json|binary> <collection file>...");
+                return 2;
+            }
+
+            var failed = 0;
+            foreach (var file in args.Skip(1))
+            {
+                if (format == SnapshotFormat.Binary && JsonOnlyFiles.Contains(Path.GetFileName(file)))
+                {
+                    output.WriteLine($"{file}: skipped, it is not a collection file");
+                    continue;
+                }
+
+                try
+                {
+                    var before = new FileInfo(file).Length;
+                    output.WriteLine(JsonFileStore.Convert(file, format)
+                        ? $"{file}: {before} -> {new FileInfo(file).Length} bytes"
+                        : $"{file}: already {format}");
+                }
+                catch (Exception ex) when (ex is IOException || ex is UnauthorizedAccessException || ex is JsonException)
+                {
+                    output.WriteLine($"{file}: {ex.Message}");
+                    failed++;
+                }
+            }
+            return failed == 0 ? 0 : 1;
+        }
+    }
+}
@@ -0,0 +1,195 @@
+using System;
+using System.Collections.Generic;
+using System.Globalization;
+using System.Reflection;
+using System.Text.Encodings.Web;
+using System.Text.Json;
+using System.Text.Json.Serialization;
+using System.Text.Json.Serialization.Metadata;
+using Cargohub.interfaces;
+using Cargohub.models;
+
+namespace Cargohub.services
+{
+    /// <summary>
+    /// System.Text.Json with metadata generated at compile time for the collections in
+    /// <see cref="RecordJsonContext"/>, so there is no reflection or per-type warm-up and far
+    /// fewer allocations than with Newtonsoft. Output matches <see cref="NewtonsoftRecordSerializer"/>
+    /// byte for byte: C# property names (or a Newtonsoft [JsonProperty] name), two-space
+    /// indentation, Newtonsoft's date and number formats and unescaped non-ASCII text. Reading is
+    /// as lenient about names, number strings and "yyyy-MM-dd HH:mm:ss" dates. Record types that
+    /// are not generated, and files it cannot read, are handed to Newtonsoft.
+    /// </summary>
+    public sealed class SourceGeneratedRecordSerializer : IRecordSerializer
+    {
+        public static readonly SourceGeneratedRecordSerializer Instance = new();
+
+        private static readonly JsonSerializerOptions Options = new()
+        {
+            TypeInfoResolver = RecordJsonContext.Default.WithAddedModifier(UseNewtonsoftNames),
+            WriteIndented = true,
+            PropertyNameCaseInsensitive = true,
+            NumberHandling = JsonNumberHandling.AllowReadingFromString,
+            ReadCommentHandling = JsonCommentHandling.Skip,
+            AllowTrailingCommas = true,
+            Encoder = JavaScriptEncoder.UnsafeRelaxedJsonEscaping,
+            Converters = { new IsoDateTimeConverter(), new DecimalConverter(), new DoubleConverter() }
+        };
+
+        public string Name => "source-generated";
+
+        public byte[] SerializeList<T>(IEnumerable<T> records)
+        {
+            if (!Options.TryGetTypeInfo(typeof(List<T>), out var typeInfo))
+            {
+                return NewtonsoftRecordSerializer.Instance.SerializeList(records);
+            }
+            return JsonSerializer.SerializeToUtf8Bytes(records as List<T> ?? new List<T>(records), (JsonTypeInfo<List<T>>)typeInfo);
+        }
+
+        public List<T> DeserializeList<T>(byte[] json)
+        {
+            if (!Options.TryGetTypeInfo(typeof(List<T>), out var typeInfo))
+            {
+                return NewtonsoftRecordSerializer.Instance.DeserializeList<T>(json);
+            }
+
+            var utf8 = json.AsSpan();
+            if (utf8.StartsWith(Utf8Bom))
+            {
+                utf8 = utf8[Utf8Bom.Length..];
+            }
+
+            try
+            {
+                return JsonSerializer.Deserialize(utf8, (JsonTypeInfo<List<T>>)typeInfo) ?? new List<T>();
+            }
+            catch (JsonException)
+            {
+                // Something only Newtonsoft accepts, such as a number where a string is expected.
+                return NewtonsoftRecordSerializer.Instance.DeserializeList<T>(json);
+            }
+        }
+
+        private static ReadOnlySpan<byte> Utf8Bom => new byte[] { 0xEF, 0xBB, 0xBF };
+
+        private static void UseNewtonsoftNames(JsonTypeInfo typeInfo)
+        {
+            if (typeInfo.Kind != JsonTypeInfoKind.Object)
+            {
+                return;
+            }
+
+            foreach (var property in typeInfo.Properties)
+            {
+                var member = property.AttributeProvider as MemberInfo ?? typeInfo.Type.GetProperty(property.Name);
+                var name = member?.GetCustomAttribute<Newtonsoft.Json.JsonPropertyAttribute>()?.PropertyName;
+                if (name != null)
+                {
+                    property.Name = name;
+                }
+            }
+        }
+
+        // Newtonsoft's IsoDateTimeConverter format: trailing zeros of the fraction dropped and the
+        // kind kept ("Z" for UTC, the offset for local times, nothing when unspecified).
+        private sealed class IsoDateTimeConverter : JsonConverter<DateTime>
+        {
+            private const string Format = "yyyy-MM-ddTHH:mm:ss.FFFFFFFK";
+
+            public override DateTime Read(ref Utf8JsonReader reader, Type typeToConvert, JsonSerializerOptions options)
+            {
+                if (reader.TokenType == JsonTokenType.String)
+                {
+                    if (reader.TryGetDateTime(out var value)
+                        || DateTime.TryParse(reader.GetString(), CultureInfo.InvariantCulture, DateTimeStyles.RoundtripKind, out value))
+                    {
+                        return value;
+                    }
+                }
+                throw new JsonException($"Cannot read a date from {reader.TokenType}.");
+            }
+
+            public override void Write(Utf8JsonWriter writer, DateTime value, JsonSerializerOptions options)
+            {
+                Span<char> buffer = stackalloc char[40];
+                value.TryFormat(buffer, out var written, Format, CultureInfo.InvariantCulture);
+                writer.WriteStringValue(buffer[..written]);
+            }
+        }
+
+        // Newtonsoft always writes a decimal point, so 12m is "12.0".
+        private sealed class DecimalConverter : JsonConverter<decimal>
+        {
+            public override decimal Read(ref Utf8JsonReader reader, Type typeToConvert, JsonSerializerOptions options)
+            {
+                return reader.TokenType == JsonTokenType.String
+                    ? decimal.Parse(reader.GetString()!, NumberStyles.Number, CultureInfo.InvariantCulture)
+                    : reader.GetDecimal();
+            }
+
+            public override void Write(Utf8JsonWriter writer, decimal value, JsonSerializerOptions options)
+            {
+                Span<char> buffer = stackalloc char[34];
+                value.TryFormat(buffer, out var written, default, CultureInfo.InvariantCulture);
+                if (buffer[..written].IndexOf('.') < 0)
+                {
+                    ".0".AsSpan().CopyTo(buffer[written..]);
+                    written += 2;
+                }
+                writer.WriteRawValue(buffer[..written], skipInputValidation: true);
+            }
+        }
+
+        private sealed class DoubleConverter : JsonConverter<double>
+        {
+            public override double Read(ref Utf8JsonReader reader, Type typeToConvert, JsonSerializerOptions options)
+            {
+                return reader.TokenType == JsonTokenType.String
+                    ? double.Parse(reader.GetString()!, NumberStyles.Float | NumberStyles.AllowThousands, CultureInfo.InvariantCulture)
+                    : reader.GetDouble();
+            }
+
+            public override void Write(Utf8JsonWriter writer, double value, JsonSerializerOptions options)
+            {
+                if (!double.IsFinite(value))
+                {
+                    writer.WriteStringValue(value.ToString(CultureInfo.InvariantCulture));
+                    return;
+                }
+
+                Span<char> buffer = stackalloc char[34];
+                value.TryFormat(buffer, out var written, "R", CultureInfo.InvariantCulture);
+                if (buffer[..written].IndexOfAny('.', 'E', 'e') < 0)
+                {
+                    ".0".AsSpan().CopyTo(buffer[written..]);
+                    written += 2;
+                }
+                writer.WriteRawValue(buffer[..written], skipInputValidation: true);
+            }
+        }
+    }
+
+    /// <summary>
+    /// The record types whose JSON metadata is generated at compile time. API responses use it
+    /// too, with the web naming policy applied on top.
+    /// </summary>
+    [JsonSourceGenerationOptions(GenerationMode = JsonSourceGenerationMode.Metadata)]
+    [JsonSerializable(typeof(List<Classifications>))]
+    [JsonSerializable(typeof(List<Client>))]
+    [JsonSerializable(typeof(List<Inventory>))]
+    [JsonSerializable(typeof(List<Item>))]
+    [JsonSerializable(typeof(List<ItemGroup>))]
+    [JsonSerializable(typeof(List<ItemLine>))]
+    [JsonSerializable(typeof(List<ItemType>))]
+    [JsonSerializable(typeof(List<Location>))]
+    [JsonSerializable(typeof(List<Order>))]
+    [JsonSerializable(typeof(List<Shipment>))]
+    [JsonSerializable(typeof(List<Supplier>))]
+    [JsonSerializable(typeof(List<Transfer>))]
+    [JsonSerializable(typeof(List<User>))]
+    [JsonSerializable(typeof(List<Warehouse>))]
+    public partial class RecordJsonContext : JsonSerializerContext
+    {
+    }
+}
@@ -0,0 +1,136 @@
+using System;
+using System.Collections.Concurrent;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.Linq;
+using System.Text.Json;
+using System.Threading;
+using System.Threading.Tasks;
+using Cargohub.interfaces;
+using Cargohub.models;
+using Microsoft.AspNetCore.Mvc;
+using Microsoft.Extensions.DependencyInjection;
+using Microsoft.Extensions.Hosting;
+using Microsoft.Extensions.Options;
+
+namespace Cargohub.services
+{
+    /// <summary>
+    /// Loads users and every collection in parallel once the host has started, so the
+    /// first requests after a restart don't pay for parsing data files, building the
+    /// id indexes and JIT-compiling the read and serialization paths.
+    /// </summary>
+    public class StartupWarmup : BackgroundService
+    {
+        private readonly IServiceProvider _services;
+        private readonly WarmupStatus _status;
+        private readonly JsonSerializerOptions _jsonOptions;
+
+        public StartupWarmup(IServiceProvider services, WarmupStatus status, IOptions<JsonOptions> jsonOptions)
+        {
+            _services = services;
+            _status = status;
+            _jsonOptions = jsonOptions.Value.JsonSerializerOptions;
+        }
+
+        protected override async Task ExecuteAsync(CancellationToken stoppingToken)
+        {
+            var jobs = new List<Action>
+            {
+                () => _status.Record("users", AuthProvider.GetUsers().Count, 0),
+                () => Warm<Warehouse, int>("warehouses", w => w.Id),
+                () => Warm<Location, int>("locations", l => l.Id),
+                () => Warm<Inventory, int>("inventories", i => i.Id),
+                () => Warm<Item, string>("items", i => i.Uid),
+                () => Warm<ItemLine, int>("item_lines", i => i.Id),
+                () => Warm<ItemGroup, int>("item_groups", i => i.Id),
+                () => Warm<ItemType, int>("item_types", i => i.Id),
+                () => Warm<Order, int>("orders", o => o.Id),
+                () => Warm<Shipment, int>("shipments", s => s.Id),
+                () => Warm<Transfer, int>("transfers", t => t.Id),
+                () => Warm<Supplier, int>("suppliers", s => s.Id),
+                () => Warm<Client, int>("clients", c => c.Id),
+                () => Warm<Classifications, int>("classifications", c => c.Id)
+            };
+
+            await Task.WhenAll(jobs.Select(job => Task.Run(() =>
+            {
+                try
+                {
+                    job();
+                }
+                catch (Exception ex)
+                {
+                    _status.RecordError(ex.Message);
+                }
+            }, stoppingToken)));
+
+            _status.MarkFinished();
+            Console.WriteLine(_status.IsReady
+                ? $"Warm-up finished in {_status.ElapsedMs:F0} ms"
+                : $"Warm-up finished in {_status.ElapsedMs:F0} ms with errors; not reporting ready");
+        }
+
+        private void Warm<T, TKey>(string collection, Func<T, TKey> keySelector)
+        {
+            var started = Stopwatch.GetTimestamp();
+            var service = _services.GetRequiredService<ICrudService<T, TKey>>();
+
+            var all = service.GetAll();
+            if (all.Count > 0)
+            {
+                service.GetById(keySelector(all[0]));
+            }
+
+            // Runs the same serializer setup MVC uses for responses, so its type metadata is built now.
+            JsonSerializer.SerializeToUtf8Bytes(service.GetAll(1, 10), _jsonOptions);
+
+            _status.Record(collection, all.Count, Stopwatch.GetTimestamp() - started);
+        }
+    }
+
+    /// <summary>
+    /// Progress of the warm-up for /health/ready. The service is ready once the warm-up has
+    /// finished and every collection loaded; a failed load keeps it not ready, so it is not
+    /// put in rotation while a collection cannot be read.
+    /// </summary>
+    public class WarmupStatus
+    {
+        private readonly long _started = Stopwatch.GetTimestamp();
+        private readonly ConcurrentDictionary<string, object> _collections = new();
+        private readonly ConcurrentBag<string> _errors = new();
+        private long _finished;
+
+        public bool IsFinished => Interlocked.Read(ref _finished) != 0;
+
+        public bool IsReady => IsFinished && _errors.IsEmpty;
+
+        public double ElapsedMs => ((IsFinished ? Interlocked.Read(ref _finished) : Stopwatch.GetTimestamp()) - _started) * 1000.0 / Stopwatch.Frequency;
+
+        public void Record(string collection, int count, long elapsedTicks)
+        {
+            _collections[collection] = new { Count = count, WarmupMs = Math.Round(elapsedTicks * 1000.0 / Stopwatch.Frequency, 1) };
+        }
+
+        public void RecordError(string message)
+        {
+            _errors.Add(message);
+        }
+
+        public void MarkFinished()
+        {
+            Interlocked.Exchange(ref _finished, Stopwatch.GetTimestamp());
+        }
+
+        public object Snapshot()
+        {
+            return new
+            {
+                Status = !IsFinished ? "warming" : IsReady ? "ready" : "failed",
+                ElapsedMs = Math.Round(ElapsedMs, 1),
+                Collections = _collections.OrderBy(c => c.Key).ToDictionary(c => c.Key, c => c.Value),
+                Errors = _errors.ToList()
+            };
+        }
+    }
+}
@@ -15,6 +15,7 @@ namespace Cargohub.services
 
         public List<LogEntry> GetAll(int? pageNumber = null, int? pageSize = null)
         {
+            using var trace = RequestProfiler.ServiceCall();
             if (!File.Exists(logFilePath))
             {
                 Console.WriteLine($"Log file not found at path: {logFilePath}");
@@ -69,12 +70,14 @@ namespace Cargohub.services
 
         public LogEntry GetById(string timestamp)
         {
+            using var trace = RequestProfiler.ServiceCall();
             var logs = GetAll();
             return logs.FirstOrDefault(log => log.Timestamp == timestamp);
         }
 
         public async Task Create(LogEntry newLogEntry)
         {
+            using var trace = RequestProfiler.ServiceCall();
             var logLine = $"Timestamp={newLogEntry.Timestamp:O} | PerformedBy={newLogEntry.PerformedBy} | Status={newLogEntry.Status} | AuditData={JsonConvert.SerializeObject(newLogEntry.AuditData)} | Discrepancies={JsonConvert.SerializeObject(newLogEntry.Discrepancies)}";
 
             await File.AppendAllTextAsync(logFilePath, logLine + Environment.NewLine);
@@ -82,6 +85,7 @@ namespace Cargohub.services
 
         public async Task Update(LogEntry updatedLogEntry)
         {
+            using var trace = RequestProfiler.ServiceCall();
             var logs = GetAll();
             var logEntryIndex = logs.FindIndex(log => log.Timestamp == updatedLogEntry.Timestamp);
 
@@ -96,6 +100,7 @@ namespace Cargohub.services
 
         public async Task Delete(string timestamp)
         {
+            using var trace = RequestProfiler.ServiceCall();
             var logs = GetAll();
             var logEntry = logs.FirstOrDefault(log => log.Timestamp == timestamp);
 
@@ -0,0 +1,122 @@
+using System;
+using System.Collections.Concurrent;
+using System.Collections.Generic;
+using System.IO;
+using System.Linq;
+using Cargohub.models;
+
+namespace Cargohub.services
+{
+    /// <summary>
+    /// Where stock may be stored: the warehouse of every location and whether that warehouse
+    /// accepts hazardous items. It is built from the locations, warehouses and classifications
+    /// and rebuilt only when one of those files changes, so checking an inventory costs one
+    /// dictionary lookup per location.
+    /// </summary>
+    public sealed class StorageRules
+    {
+        public const string HazardousClassification = "hazardous";
+
+        private static readonly ConcurrentDictionary<string, StorageRules> _current = new();
+
+        private readonly long[] _versions;
+        private readonly int? _hazardousId;
+        private readonly Dictionary<int, int> _warehouseOfLocation;
+        private readonly Dictionary<int, bool> _acceptsHazardous;
+
+        private StorageRules(long[] versions, int? hazardousId, Dictionary<int, int> warehouseOfLocation, Dictionary<int, bool> acceptsHazardous)
+        {
+            _versions = versions;
+            _hazardousId = hazardousId;
+            _warehouseOfLocation = warehouseOfLocation;
+            _acceptsHazardous = acceptsHazardous;
+        }
+
+        /// <summary>
+        /// The rules for the current contents of the three collections. The previous rules are
+        /// returned as long as none of the files has changed since they were built.
+        /// </summary>
+        public static StorageRules For(WarehouseShards<Location> locations, string warehousesPath, string classificationsPath)
+        {
+            var versions = locations.Versions()
+                .Append(JsonFileStore.Version<Warehouse>(warehousesPath))
+                .Append(JsonFileStore.Version<Classifications>(classificationsPath))
+                .ToArray();
+            var key = $"{Path.GetFullPath(locations.CollectionPath)}|{Path.GetFullPath(warehousesPath)}|{Path.GetFullPath(classificationsPath)}";
+
+            if (_current.TryGetValue(key, out var rules) && rules._versions.SequenceEqual(versions))
+            {
+                return rules;
+            }
+
+            rules = Build(versions, locations.Records(), JsonFileStore.Snapshot<Warehouse>(warehousesPath), JsonFileStore.Snapshot<Classifications>(classificationsPath));
+            _current[key] = rules;
+            return rules;
+        }
+
+        private static StorageRules Build(long[] versions, IEnumerable<Location> locations, IEnumerable<Warehouse> warehouses, IEnumerable<Classifications> classifications)
+        {
+            var hazardousId = classifications.FirstOrDefault(c => c.Name == HazardousClassification)?.Id;
+
+            var warehouseOfLocation = new Dictionary<int, int>();
+            foreach (var location in locations)
+            {
+                warehouseOfLocation.TryAdd(location.Id, location.Warehouse_Id);
+            }
+
+            var acceptsHazardous = new Dictionary<int, bool>();
+            foreach (var warehouse in warehouses)
+            {
+                acceptsHazardous.TryAdd(warehouse.Id, hazardousId.HasValue && warehouse.Classifications_Id?.Contains(hazardousId.Value) == true);
+            }
+
+            return new StorageRules(versions, hazardousId, warehouseOfLocation, acceptsHazardous);
+        }
+
+        public bool IsHazardous(Item item) =>
+            _hazardousId.HasValue && item.Classifications_Id?.Contains(_hazardousId.Value) == true;
+
+        public bool TryGetWarehouse(int locationId, out int warehouseId) =>
+            _warehouseOfLocation.TryGetValue(locationId, out warehouseId);
+
+        /// <summary>
+        /// Whether the warehouse carries the hazardous classification, or null when it does not exist.
+        /// </summary>
+        public bool? AcceptsHazardous(int warehouseId) =>
+            _acceptsHazardous.TryGetValue(warehouseId, out var accepts) ? accepts : null;
+
+        /// <summary>
+        /// Why <paramref name="item"/> may not be stored at <paramref name="locations"/>, or null
+        /// when it may. Only hazardous items are checked.
+        /// </summary>
+        public string? Check(Item item, LocationQuantities? locations)
+        {
+            if (!IsHazardous(item) || locations == null)
+            {
+                return null;
+            }
+
+            if (locations.NonNumericKeys.Any())
+            {
+                return "Invalid locationId";
+            }
+
+            foreach (var (locationId, _) in locations.ById)
+            {
+                if (!TryGetWarehouse(locationId, out var warehouseId))
+                {
+                    return "Location not found";
+                }
+
+                switch (AcceptsHazardous(warehouseId))
+                {
+                    case null:
+                        return "Warehouse not found";
+                    case false:
+                        return "Warehouse is non-hazardous";
+                }
+            }
+            return null;
+        }
+    }
+}
@@ -2,6 +2,7 @@ using System;
 using System.Collections.Generic;
 using System.IO;
 using System.Linq;
+using System.Threading;
 using System.Threading.Tasks;
 using Cargohub.interfaces;
 using Cargohub.models;
@@ -9,60 +10,88 @@ using Newtonsoft.Json;
 
 namespace Cargohub.services
 {
-    public class SupplierService : ICrudService<Supplier, int>
+    public class SupplierService : ICrudService<Supplier, int>, IAsyncCrudService<Supplier, int>
     {
         private readonly string jsonFilePath = "data/suppliers.json";
+        private readonly SearchIndex<Supplier, int> _search =
+            SearchIndex<Supplier, int>.For("data/suppliers.json", s => s.Id, s => s.Code, s => s.Name);
 
-        public Task Create(Supplier entity)
+        public Task Create(Supplier entity) => CreateAsync(entity);
+
+        public async Task CreateAsync(Supplier entity, CancellationToken cancellationToken = default)
         {
-            var suppliers = GetAll() ?? new List<Supplier>();
-
-            // Find the next available ID
-            var nextId = suppliers.Any() ? suppliers.Max(s => s.Id) + 1 : 1;
-            entity.Id = nextId;
-            entity.Created_At = DateTime.Now;
-            entity.Updated_At = DateTime.Now;
-            suppliers.Add(entity);
-            SaveToFile(suppliers);
-            return Task.CompletedTask;
+            using var trace = RequestProfiler.ServiceCall();
+            await JsonFileStore.UpdateAsync<Supplier>(jsonFilePath, suppliers =>
+            {
+                // Find the next available ID
+                var nextId = IdSequence.Next(jsonFilePath, suppliers, s => s.Id);
+                entity.Id = nextId;
+                entity.Created_At = DateTime.Now;
+                entity.Updated_At = DateTime.Now;
+                return suppliers.Add(entity);
+            }, cancellationToken);
+            _search.Reindex(entity.Id);
         }
 
-        public Task Delete(int id)
-        {
-            var suppliers = GetAll() ?? new List<Supplier>();
-            var supplier = suppliers.FirstOrDefault(s => s.Id == id);
+        public Task Delete(int id) => DeleteAsync(id);
 
-            if (supplier == null)
+        public async Task DeleteAsync(int id, CancellationToken cancellationToken = default)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            await JsonFileStore.UpdateAsync<Supplier>(jsonFilePath, suppliers =>
             {
-                throw new KeyNotFoundException($"Supplier with ID {id} not found.");
-            }
+                var supplier = suppliers.FirstOrDefault(s => s.Id == id);
+
+                if (supplier == null)
+                {
+                    throw new KeyNotFoundException($"Supplier with ID {id} not found.");
+                }
 
-            suppliers.Remove(supplier);
-            SaveToFile(suppliers);
-            return Task.CompletedTask;
+                return suppliers.Remove(supplier);
+            }, cancellationToken);
+            _search.Reindex(id);
         }
 
         public List<Supplier> GetAll(int? pageNumber = null, int? pageSize = null)
         {
-            var jsonData = File.ReadAllText(jsonFilePath);
-            var suppliers = JsonConvert.DeserializeObject<List<Supplier>>(jsonData) ?? new List<Supplier>();
+            using var trace = RequestProfiler.ServiceCall();
+            return Page(JsonFileStore.Snapshot<Supplier>(jsonFilePath), pageNumber, pageSize);
+        }
 
+        public async ValueTask<List<Supplier>> GetAllAsync(int? pageNumber = null, int? pageSize = null, CancellationToken cancellationToken = default)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            return Page(await JsonFileStore.SnapshotAsync<Supplier>(jsonFilePath, cancellationToken), pageNumber, pageSize);
+        }
+
+        private static List<Supplier> Page(IReadOnlyList<Supplier> suppliers, int? pageNumber, int? pageSize)
+        {
             // Apply pagination only if pageNumber and pageSize are provided and valid
             if (pageNumber.HasValue && pageSize.HasValue && pageNumber > 0 && pageSize > 0)
             {
-                suppliers = suppliers
+                return suppliers
                     .Skip((pageNumber.Value - 1) * pageSize.Value)
                     .Take(pageSize.Value)
                     .ToList();
             }
 
-            return suppliers;
+            return suppliers.ToList();
+        }
+
+        /// <summary>
+        /// Suppliers whose name or code contain words starting with every word of
+        /// <paramref name="query"/>.
+        /// </summary>
+        public List<Supplier> Search(string query)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            return _search.Search(query);
         }
 
         public Supplier GetById(int id)
         {
-            var suppliers = GetAll();
-            var supplier = suppliers.FirstOrDefault(s => s.Id == id);
+            using var trace = RequestProfiler.ServiceCall();
+            var supplier = JsonFileStore.FindById<Supplier, int>(jsonFilePath, s => s.Id, id);
 
             if (supplier == null)
             {
@@ -72,36 +101,45 @@ namespace Cargohub.services
             return supplier;
         }
 
-        public Task Update(Supplier entity)
+        public async ValueTask<Supplier> GetByIdAsync(int id, CancellationToken cancellationToken = default)
         {
-            var suppliers = GetAll() ?? new List<Supplier>();
-            var existingSupplier = suppliers.FirstOrDefault(s => s.Id == entity.Id);
-
-            if (existingSupplier == null)
-            {
-                throw new KeyNotFoundException($"Supplier with ID {entity.Id} not found.");
-            }
-            existingSupplier.Code = entity.Code;
-            existingSupplier.Name = entity.Name;
-            existingSupplier.Address = entity.Address;
-            existingSupplier.Address_Extra = entity.Address_Extra;
-            existingSupplier.City = entity.City;
-            existingSupplier.Zip_Code = entity.Zip_Code;
-            existingSupplier.Province = entity.Province;
-            existingSupplier.Country = entity.Country;
-            existingSupplier.Contact_Name = entity.Contact_Name;
-            existingSupplier.PhoneNumber = entity.PhoneNumber;
-            existingSupplier.Reference = entity.Reference;
-
-            existingSupplier.Updated_At = DateTime.Now;
-            SaveToFile(suppliers);
-            return Task.CompletedTask;
+            using var trace = RequestProfiler.ServiceCall();
+            return await JsonFileStore.FindByIdAsync<Supplier, int>(jsonFilePath, s => s.Id, id, cancellationToken)
+                ?? throw new KeyNotFoundException($"Supplier with ID {id} not found.");
         }
 
-        private void SaveToFile(List<Supplier> suppliers)
+        public Task Update(Supplier entity) => UpdateAsync(entity);
+
+        public async Task UpdateAsync(Supplier entity, CancellationToken cancellationToken = default)
         {
-            var jsonData = JsonConvert.SerializeObject(suppliers, Formatting.Indented);
-            File.WriteAllText(jsonFilePath, jsonData);
+            using var trace = RequestProfiler.ServiceCall();
+            await JsonFileStore.UpdateAsync<Supplier>(jsonFilePath, suppliers =>
+            {
+                var existingSupplier = suppliers.FirstOrDefault(s => s.Id == entity.Id);
+
+                if (existingSupplier == null)
+                {
+                    throw new KeyNotFoundException($"Supplier with ID {entity.Id} not found.");
+                }
+
+                var updated = EntityCopy.Shallow(existingSupplier);
+                updated.Code = entity.Code;
+                updated.Name = entity.Name;
+                updated.Address = entity.Address;
+                updated.Address_Extra = entity.Address_Extra;
+                updated.City = entity.City;
+                updated.Zip_Code = entity.Zip_Code;
+                updated.Province = entity.Province;
+                updated.Country = entity.Country;
+                updated.Contact_Name = entity.Contact_Name;
+                updated.PhoneNumber = entity.PhoneNumber;
+                updated.Reference = entity.Reference;
+
+                updated.Updated_At = DateTime.Now;
+
+                return suppliers.Replace(existingSupplier, updated);
+            }, cancellationToken);
+            _search.Reindex(entity.Id);
         }
     }
 }
\ No newline at end of file
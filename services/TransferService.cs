@@ -2,6 +2,7 @@ using System;
 using System.Collections.Generic;
 using System.IO;
 using System.Linq;
+using System.Threading;
 using System.Threading.Tasks;
 using Cargohub.interfaces;
 using Cargohub.models;
@@ -9,68 +10,97 @@ using Newtonsoft.Json;
 
 namespace Cargohub.services
 {
-  public class TransferService : ICrudService<Transfer, int>
+  public class TransferService : ICrudService<Transfer, int>, IAsyncCrudService<Transfer, int>
   {
     private readonly string jsonFilePath = "data/transfers.json";
 
-    public Task Create(Transfer entity)
-    {
-      var transfers = GetAll() ?? new List<Transfer>();
-
-      // Find the next available ID
-      var nextId = transfers.Any() ? transfers.Max(t => t.Id) + 1 : 1;
-      entity.Id = nextId;
-      entity.Created_At = DateTime.UtcNow;
-      entity.Updated_At = DateTime.UtcNow;
+    public Task Create(Transfer entity) => CreateAsync(entity);
 
-      transfers.Add(entity);
-      SaveToFile(transfers);
-      return Task.CompletedTask;
+    public async Task CreateAsync(Transfer entity, CancellationToken cancellationToken = default)
+    {
+        using var trace = RequestProfiler.ServiceCall();
+      await JsonFileStore.UpdateAsync<Transfer>(jsonFilePath, transfers =>
+      {
+        // Find the next available ID
+        var nextId = IdSequence.Next(jsonFilePath, transfers, t => t.Id);
+        entity.Id = nextId;
+        entity.Created_At = DateTime.UtcNow;
+        entity.Updated_At = DateTime.UtcNow;
+
+        return transfers.Add(entity);
+      }, cancellationToken);
     }
 
     public List<ItemDetail> GetTransferItems(int transferId)
       {
+          using var trace = RequestProfiler.ServiceCall();
           var transfer = GetById(transferId);
           return transfer?.Items ?? new List<ItemDetail>();
       }
 
-    public Task Delete(int id)
-    {
-      var transfers = GetAll() ?? new List<Transfer>();
-      var transfer = transfers.FirstOrDefault(t => t.Id == id);
+    public Task Delete(int id) => DeleteAsync(id);
 
-      if (transfer == null)
+    public async Task DeleteAsync(int id, CancellationToken cancellationToken = default)
+    {
+        using var trace = RequestProfiler.ServiceCall();
+      await JsonFileStore.UpdateAsync<Transfer>(jsonFilePath, transfers =>
       {
-        throw new KeyNotFoundException($"Transfer with ID {id} not found.");
-      }
+        var transfer = transfers.FirstOrDefault(t => t.Id == id);
+
+        if (transfer == null)
+        {
+          throw new KeyNotFoundException($"Transfer with ID {id} not found.");
+        }
 
-      transfers.Remove(transfer);
-      SaveToFile(transfers);
-      return Task.CompletedTask;
+        return transfers.Remove(transfer);
+      }, cancellationToken);
     }
 
     public List<Transfer> GetAll(int? pageNumber = null, int? pageSize = null)
     {
-        var jsonData = File.ReadAllText(jsonFilePath);
-        var transfers = JsonConvert.DeserializeObject<List<Transfer>>(jsonData) ?? new List<Transfer>();
+        using var trace = RequestProfiler.ServiceCall();
+        return Page(JsonFileStore.Snapshot<Transfer>(jsonFilePath), pageNumber, pageSize);
+    }
+
+    public async ValueTask<List<Transfer>> GetAllAsync(int? pageNumber = null, int? pageSize = null, CancellationToken cancellationToken = default)
+    {
+        using var trace = RequestProfiler.ServiceCall();
+        return Page(await JsonFileStore.SnapshotAsync<Transfer>(jsonFilePath, cancellationToken), pageNumber, pageSize);
+    }
 
+    private static List<Transfer> Page(IReadOnlyList<Transfer> transfers, int? pageNumber, int? pageSize)
+    {
         // Apply pagination only if pageNumber and pageSize are provided and valid
         if (pageNumber.HasValue && pageSize.HasValue && pageNumber > 0 && pageSize > 0)
         {
-            transfers = transfers
+            return transfers
                 .Skip((pageNumber.Value - 1) * pageSize.Value)
                 .Take(pageSize.Value)
                 .ToList();
         }
 
-        return transfers;
+        return transfers.ToList();
     }
 
 
+    /// <summary>
+    /// The transfers matching <paramref name="query"/>. Equality filters on Transfer_Status are
+    /// answered from an index; other queries scan the transfers once.
+    /// </summary>
+    public List<Transfer> Find(ListQuery query)
+    {
+        using var trace = RequestProfiler.ServiceCall();
+        var candidates = query.Candidates(JsonFileStore.Snapshot<Transfer>(jsonFilePath),
+            new QueryIndex<Transfer>("Transfer_Status", value => JsonFileStore.GetView<Transfer, ILookup<string, Transfer>>(jsonFilePath, "by-status",
+                transfers => transfers.ToLookup(t => t.Transfer_Status ?? string.Empty, StringComparer.OrdinalIgnoreCase))[(string)value!]));
+
+        return query.Apply(candidates);
+    }
+
     public Transfer GetById(int id)
     {
-      var transfers = GetAll();
-      var transfer = transfers.FirstOrDefault(t => t.Id == id);
+        using var trace = RequestProfiler.ServiceCall();
+      var transfer = JsonFileStore.FindById<Transfer, int>(jsonFilePath, t => t.Id, id);
 
       if (transfer == null)
       {
@@ -80,32 +110,39 @@ namespace Cargohub.services
       return transfer;
     }
 
-    public Task Update(Transfer entity)
+    public async ValueTask<Transfer> GetByIdAsync(int id, CancellationToken cancellationToken = default)
     {
-      var transfers = GetAll() ?? new List<Transfer>();
-      var existingTransfer = transfers.FirstOrDefault(t => t.Id == entity.Id);
+        using var trace = RequestProfiler.ServiceCall();
+      return await JsonFileStore.FindByIdAsync<Transfer, int>(jsonFilePath, t => t.Id, id, cancellationToken)
+        ?? throw new KeyNotFoundException($"Transfer with ID {id} not found.");
+    }
+
+    public Task Update(Transfer entity) => UpdateAsync(entity);
 
-      if (existingTransfer == null)
+    public async Task UpdateAsync(Transfer entity, CancellationToken cancellationToken = default)
+    {
+        using var trace = RequestProfiler.ServiceCall();
+      await JsonFileStore.UpdateAsync<Transfer>(jsonFilePath, transfers =>
       {
-        throw new KeyNotFoundException($"Transfer with ID {entity.Id} not found.");
-      }
+        var existingTransfer = transfers.FirstOrDefault(t => t.Id == entity.Id);
 
-      // Update properties
-      existingTransfer.Reference = entity.Reference;
-      existingTransfer.Transfer_From = entity.Transfer_From;
-      existingTransfer.Transfer_To = entity.Transfer_To;
-      existingTransfer.Transfer_Status = entity.Transfer_Status;
-      existingTransfer.Items = entity.Items;
-      existingTransfer.Updated_At = DateTime.UtcNow;
+        if (existingTransfer == null)
+        {
+          throw new KeyNotFoundException($"Transfer with ID {entity.Id} not found.");
+        }
 
-      SaveToFile(transfers);
-      return Task.CompletedTask;
-    }
+        var updated = EntityCopy.Shallow(existingTransfer);
 
-    private void SaveToFile(List<Transfer> transfers)
-    {
-      var jsonData = JsonConvert.SerializeObject(transfers, Formatting.Indented);
-      File.WriteAllText(jsonFilePath, jsonData);
+        // Update properties
+        updated.Reference = entity.Reference;
+        updated.Transfer_From = entity.Transfer_From;
+        updated.Transfer_To = entity.Transfer_To;
+        updated.Transfer_Status = entity.Transfer_Status;
+        updated.Items = entity.Items;
+        updated.Updated_At = DateTime.UtcNow;
+
+        return transfers.Replace(existingTransfer, updated);
+      }, cancellationToken);
     }
   }
 }
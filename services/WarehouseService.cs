@@ -2,6 +2,7 @@ using System;
 using System.Collections.Generic;
 using System.IO;
 using System.Linq;
+using System.Threading;
 using System.Threading.Tasks;
 using Cargohub.interfaces;
 using Cargohub.models;
@@ -9,78 +10,85 @@ using Newtonsoft.Json;
 
 namespace Cargohub.services
 {
-    public class WarehouseService : ICrudService<Warehouse, int>
+    public class WarehouseService : ICrudService<Warehouse, int>, IAsyncCrudService<Warehouse, int>
     {
         private readonly string jsonFilePath = "data/warehouses.json";
-        private readonly string locationsFilePath = "data/locations.json";
+        private readonly WarehouseShards<Location> _locationShards = new("data/locations.json", l => l.Warehouse_Id, l => l.Id);
         private readonly string inventoriesFilePath = "data/inventories.json";
+        private readonly string classificationsFilePath = "data/classifications.json";
 
         
 
-        public Task Create(Warehouse entity)
-        {
-            var warehouses = GetAll() ?? new List<Warehouse>();
+        public Task Create(Warehouse entity) => CreateAsync(entity);
 
-            // Find the next available ID
-            var nextId = warehouses.Any() ? warehouses.Max(w => w.Id) + 1 : 1;
-            entity.Id = nextId;
+        public async Task CreateAsync(Warehouse entity, CancellationToken cancellationToken = default)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            await JsonFileStore.UpdateAsync<Warehouse>(jsonFilePath, warehouses =>
+            {
+                // Find the next available ID
+                var nextId = IdSequence.Next(jsonFilePath, warehouses, w => w.Id);
+                entity.Id = nextId;
 
-            warehouses.Add(entity);
-            SaveToFile(warehouses);
-            return Task.CompletedTask;
+                return warehouses.Add(entity);
+            }, cancellationToken);
         }
 
         public List<Location> GetWarehouseLocations(int warehouseId)
         {
-            var jsonData = File.ReadAllText(locationsFilePath);
-            var allLocations = JsonConvert.DeserializeObject<List<Location>>(jsonData) ?? new List<Location>();
-
-            return allLocations.Where(location => location.Warehouse_Id == warehouseId).ToList();
+            using var trace = RequestProfiler.ServiceCall();
+            return _locationShards.Snapshot(warehouseId).ToList();
         }
 
-        private List<Inventory> GetInventories()
-        {
-            var jsonData = File.ReadAllText(inventoriesFilePath);
-            return JsonConvert.DeserializeObject<List<Inventory>>(jsonData) ?? new List<Inventory>();
-        }
+        public Task Delete(int id) => DeleteAsync(id);
 
-        public Task Delete(int id)
+        public async Task DeleteAsync(int id, CancellationToken cancellationToken = default)
         {
-            var warehouses = GetAll() ?? new List<Warehouse>();
-            var warehouse = warehouses.FirstOrDefault(w => w.Id == id);
-
-            if (warehouse == null)
+            using var trace = RequestProfiler.ServiceCall();
+            await JsonFileStore.UpdateAsync<Warehouse>(jsonFilePath, warehouses =>
             {
-                throw new KeyNotFoundException($"Warehouse with ID {id} not found.");
-            }
+                var warehouse = warehouses.FirstOrDefault(w => w.Id == id);
 
-            warehouses.Remove(warehouse);
-            SaveToFile(warehouses);
-            return Task.CompletedTask;
+                if (warehouse == null)
+                {
+                    throw new KeyNotFoundException($"Warehouse with ID {id} not found.");
+                }
+
+                return warehouses.Remove(warehouse);
+            }, cancellationToken);
         }
 
         public List<Warehouse> GetAll(int? pageNumber = null, int? pageSize = null)
         {
-            var jsonData = File.ReadAllText(jsonFilePath);
-            var warehouses = JsonConvert.DeserializeObject<List<Warehouse>>(jsonData) ?? new List<Warehouse>();
+            using var trace = RequestProfiler.ServiceCall();
+            return Page(JsonFileStore.Snapshot<Warehouse>(jsonFilePath), pageNumber, pageSize);
+        }
+
+        public async ValueTask<List<Warehouse>> GetAllAsync(int? pageNumber = null, int? pageSize = null, CancellationToken cancellationToken = default)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            return Page(await JsonFileStore.SnapshotAsync<Warehouse>(jsonFilePath, cancellationToken), pageNumber, pageSize);
+        }
 
+        private static List<Warehouse> Page(IReadOnlyList<Warehouse> warehouses, int? pageNumber, int? pageSize)
+        {
             // Apply pagination only if pageNumber and pageSize are provided and valid
             if (pageNumber.HasValue && pageSize.HasValue && pageNumber > 0 && pageSize > 0)
             {
-                warehouses = warehouses
+                return warehouses
                     .Skip((pageNumber.Value - 1) * pageSize.Value)
                     .Take(pageSize.Value)
                     .ToList();
             }
 
-            return warehouses;
+            return warehouses.ToList();
         }
 
 
         public Warehouse GetById(int id)
         {
-            var warehouses = GetAll();
-            var warehouse = warehouses.FirstOrDefault(w => w.Id == id);
+            using var trace = RequestProfiler.ServiceCall();
+            var warehouse = JsonFileStore.FindById<Warehouse, int>(jsonFilePath, w => w.Id, id);
 
             if (warehouse == null)
             {
@@ -90,72 +98,69 @@ namespace Cargohub.services
             return warehouse;
         }
 
-        public Task Update(Warehouse entity)
+        public async ValueTask<Warehouse> GetByIdAsync(int id, CancellationToken cancellationToken = default)
         {
-            var warehouses = GetAll() ?? new List<Warehouse>();
-            var existingWarehouse = warehouses.FirstOrDefault(w => w.Id == entity.Id);
+            using var trace = RequestProfiler.ServiceCall();
+            return await JsonFileStore.FindByIdAsync<Warehouse, int>(jsonFilePath, w => w.Id, id, cancellationToken)
+                ?? throw new KeyNotFoundException($"Warehouse with ID {id} not found.");
+        }
+
+        public Task Update(Warehouse entity) => UpdateAsync(entity);
 
-            if (existingWarehouse == null)
+        public async Task UpdateAsync(Warehouse entity, CancellationToken cancellationToken = default)
+        {
+            using var trace = RequestProfiler.ServiceCall();
+            await JsonFileStore.UpdateAsync<Warehouse>(jsonFilePath, warehouses =>
             {
-                throw new KeyNotFoundException($"Warehouse with ID {entity.Id} not found.");
-            }
+                var existingWarehouse = warehouses.FirstOrDefault(w => w.Id == entity.Id);
 
-            // Update the properties
-            existingWarehouse.Code = entity.Code;
-            existingWarehouse.Name = entity.Name;
-            existingWarehouse.Address = entity.Address;
-            existingWarehouse.Zip = entity.Zip;
-            existingWarehouse.City = entity.City;
-            existingWarehouse.Province = entity.Province;
-            existingWarehouse.Country = entity.Country;
-            existingWarehouse.Contact = entity.Contact;
-            existingWarehouse.Created_At = entity.Created_At;
-            existingWarehouse.Updated_At = entity.Updated_At;
+                if (existingWarehouse == null)
+                {
+                    throw new KeyNotFoundException($"Warehouse with ID {entity.Id} not found.");
+                }
 
-            SaveToFile(warehouses);
-            return Task.CompletedTask;
+                var updated = EntityCopy.Shallow(existingWarehouse);
+
+                // Update the properties
+                updated.Code = entity.Code;
+                updated.Name = entity.Name;
+                updated.Address = entity.Address;
+                updated.Zip = entity.Zip;
+                updated.City = entity.City;
+                updated.Province = entity.Province;
+                updated.Country = entity.Country;
+                updated.Contact = entity.Contact;
+                updated.Created_At = entity.Created_At;
+                updated.Updated_At = entity.Updated_At;
+
+                return warehouses.Replace(existingWarehouse, updated);
+            }, cancellationToken);
         }
 
          public (int totalCapacity, int currentCapacity) CalculateWarehouseCapacities(int warehouseId)
         {
-            var inventories = GetInventories();
-            var warehouseLocations = GetWarehouseLocations(warehouseId);
-
-            if (!warehouseLocations.Any())
-                throw new KeyNotFoundException($"No locations found for Warehouse ID {warehouseId}");
-
-            int totalCapacity = 0;
-            int currentCapacity = 0;
-
-            foreach (var inventory in inventories)
-            {
-                foreach (var location in inventory.Locations)
-                {
-                    // Check if the location belongs to the warehouse
-                    if (warehouseLocations.Any(loc => loc.Id == Convert.ToInt32(location.Key)))
-                    {
-                        totalCapacity += location.Value; // Capacity per location
-                        currentCapacity += location.Value; // Adjust based on utilization logic if needed
-                    }
-                }
-            }
-
-            return (totalCapacity, currentCapacity);
+            using var trace = RequestProfiler.ServiceCall();
+            return CalculateWarehouseCapacities(_locationShards.Snapshot(warehouseId), warehouseId, StockIndex());
         }
 
         public List<object> CalculateAllWarehouseCapacities(int pageNumber, int pageSize)
         {
-            var warehouses = GetAll();
+            using var trace = RequestProfiler.ServiceCall();
+            var warehouses = JsonFileStore.Snapshot<Warehouse>(jsonFilePath);
             var pagedWarehouses = warehouses
                 .Skip((pageNumber - 1) * pageSize)
                 .Take(pageSize)
                 .ToList();
 
+            // One stock index for the whole page: inventory writes made meanwhile neither block
+            // this loop nor show up halfway through it. Only the shards of the page's warehouses
+            // are loaded.
+            var stock = StockIndex();
             var capacities = new List<object>();
 
             foreach (var warehouse in pagedWarehouses)
             {
-                var (totalCapacity, currentCapacity) = CalculateWarehouseCapacities(warehouse.Id);
+                var (totalCapacity, currentCapacity) = CalculateWarehouseCapacities(_locationShards.Snapshot(warehouse.Id), warehouse.Id, stock);
                 capacities.Add(new
                 {
                     WarehouseId = warehouse.Id,
@@ -167,84 +172,108 @@ namespace Cargohub.services
 
             return capacities;
         }
-        public Warehouse AddClassifications(int warehouseId, List<int> newClassifications)
+
+        /// <summary>
+        /// Which warehouse each location belongs to and which warehouses take hazardous items.
+        /// </summary>
+        public StorageRules StorageRules()
         {
-            var warehouses = GetAll() ?? new List<Warehouse>();
-            var warehouse = warehouses.FirstOrDefault(w => w.Id == warehouseId);
+            using var trace = RequestProfiler.ServiceCall();
+            return services.StorageRules.For(_locationShards, jsonFilePath, classificationsFilePath);
+        }
 
-            if (warehouse == null)
-            {
-                throw new KeyNotFoundException($"Warehouse with ID {warehouseId} not found.");
-            }
+        private LocationStockIndex StockIndex()
+        {
+            return JsonFileStore.GetView<Inventory, LocationStockIndex>(inventoriesFilePath, "location-stock", LocationStockIndex.Build);
+        }
+
+        private static (int totalCapacity, int currentCapacity) CalculateWarehouseCapacities(
+            IReadOnlyList<Location> warehouseLocations, int warehouseId, LocationStockIndex stock)
+        {
+            if (!warehouseLocations.Any())
+                throw new KeyNotFoundException($"No locations found for Warehouse ID {warehouseId}");
+
+            int totalCapacity = 0;
+            int currentCapacity = 0;
 
-            if (warehouse.Classifications_Id == null)
+            foreach (var location in warehouseLocations)
             {
-                warehouse.Classifications_Id = new List<int>();
+                var quantity = stock.QuantityAt(location.Id);
+                totalCapacity += quantity; // Capacity per location
+                currentCapacity += quantity; // Adjust based on utilization logic if needed
             }
 
-            // Add only unique classifications
-            warehouse.Classifications_Id.AddRange(newClassifications.Except(warehouse.Classifications_Id));
-            SaveToFile(warehouses);
-
-            return warehouse; // Return the updated warehouse
+            return (totalCapacity, currentCapacity);
         }
 
-        private void SaveToFile(List<Warehouse> warehouses)
+        public Warehouse AddClassifications(int warehouseId, List<int> newClassifications)
         {
-            var jsonData = JsonConvert.SerializeObject(warehouses, Formatting.Indented);
-            File.WriteAllText(jsonFilePath, jsonData);
+            using var trace = RequestProfiler.ServiceCall();
+            Warehouse? warehouse = null;
+            JsonFileStore.Update<Warehouse>(jsonFilePath, warehouses =>
+            {
+                var existingWarehouse = warehouses.FirstOrDefault(w => w.Id == warehouseId);
+
+                if (existingWarehouse == null)
+                {
+                    throw new KeyNotFoundException($"Warehouse with ID {warehouseId} not found.");
+                }
+
+                warehouse = EntityCopy.Shallow(existingWarehouse);
+                var classifications = warehouse.Classifications_Id ?? new List<int>();
+
+                // Add only unique classifications
+                warehouse.Classifications_Id = classifications.Concat(newClassifications.Except(classifications)).ToList();
+
+                return warehouses.Replace(existingWarehouse, warehouse);
+            });
+
+            return warehouse!; // Return the updated warehouse
         }
 
-        public async Task TransferItemBetweenWarehouses(int sourceWarehouseId, int destinationWarehouseId, string itemId, int quantity)
+        public async Task TransferItemBetweenWarehouses(int sourceWarehouseId, int destinationWarehouseId, string itemId, int quantity, CancellationToken cancellationToken = default)
         {
-            var inventories = GetInventories();
+            using var trace = RequestProfiler.ServiceCall();
             var sourceWarehouseLocations = GetWarehouseLocations(sourceWarehouseId);
             var destinationWarehouseLocations = GetWarehouseLocations(destinationWarehouseId);
 
             if (!sourceWarehouseLocations.Any() || !destinationWarehouseLocations.Any())
                 throw new KeyNotFoundException("One or both warehouses do not have any locations.");
 
-            var sourceInventory = inventories.FirstOrDefault(inv => inv.Item_Id == itemId);
-            if (sourceInventory == null || sourceInventory.Total_On_Hand < quantity)
-                throw new InvalidOperationException("Insufficient inventory in the source warehouse.");
-
-            // Deduct from source warehouse
-            foreach (var location in sourceWarehouseLocations)
+            await JsonFileStore.UpdateAsync<Inventory>(inventoriesFilePath, inventories =>
             {
-                if (sourceInventory.Locations.ContainsKey(location.Id.ToString()))
+                var existingInventory = inventories.FirstOrDefault(inv => inv.Item_Id == itemId);
+                if (existingInventory == null || existingInventory.Total_On_Hand < quantity)
+                    throw new InvalidOperationException("Insufficient inventory in the source warehouse.");
+
+                var sourceInventory = EntityCopy.Shallow(existingInventory);
+                sourceInventory.Locations = existingInventory.Locations?.Copy() ?? new LocationQuantities();
+
+                // Deduct from source warehouse
+                foreach (var location in sourceWarehouseLocations)
                 {
-                    var availableQuantity = sourceInventory.Locations[location.Id.ToString()];
-                    if (availableQuantity >= quantity)
+                    if (sourceInventory.Locations.TryGetQuantity(location.Id, out var availableQuantity))
                     {
-                        sourceInventory.Locations[location.Id.ToString()] -= quantity;
-                        break;
-                    }
-                    else
-                    {
-                        quantity -= availableQuantity;
-                        sourceInventory.Locations[location.Id.ToString()] = 0;
+                        if (availableQuantity >= quantity)
+                        {
+                            sourceInventory.Locations[location.Id] -= quantity;
+                            break;
+                        }
+                        else
+                        {
+                            quantity -= availableQuantity;
+                            sourceInventory.Locations[location.Id] = 0;
+                        }
                     }
                 }
-            }
 
-            // Add to destination warehouse
-            var destinationLocation = destinationWarehouseLocations.First();
-            if (sourceInventory.Locations.ContainsKey(destinationLocation.Id.ToString()))
-            {
-                sourceInventory.Locations[destinationLocation.Id.ToString()] += quantity;
-            }
-            else
-            {
-                sourceInventory.Locations[destinationLocation.Id.ToString()] = quantity;
-            }
-
-            SaveToFile(inventories);
-        }
+                // Add to destination warehouse
+                var destinationLocation = destinationWarehouseLocations.First();
+                sourceInventory.Locations.TryGetQuantity(destinationLocation.Id, out var destinationQuantity);
+                sourceInventory.Locations[destinationLocation.Id] = destinationQuantity + quantity;
 
-        private void SaveToFile(List<Inventory> inventories)
-        {
-            var jsonData = JsonConvert.SerializeObject(inventories, Formatting.Indented);
-            File.WriteAllText(inventoriesFilePath, jsonData);
+                return inventories.Replace(existingInventory, sourceInventory);
+            }, cancellationToken);
         }
     }
 }
@@ -0,0 +1,338 @@
+using System;
+using System.Collections.Concurrent;
+using System.Collections.Generic;
+using System.Collections.Immutable;
+using System.IO;
+using System.Linq;
+using System.Threading;
+using System.Threading.Tasks;
+
+namespace Cargohub.services
+{
+    /// <summary>
+    /// A collection stored as one file per warehouse, e.g. data/locations/locations.w12.json
+    /// for the locations of warehouse 12. Every shard is a separate <see cref="JsonFileStore"/>
+    /// file, so it is parsed, cached, locked and written on its own: warehouse-scoped reads and
+    /// writes only touch their own warehouse's data. An existing single collection file is
+    /// split into shards the first time the collection is used. The list of shards and an
+    /// id-to-warehouse index are shared by every instance for the same collection, so a lookup
+    /// by id reads a single shard instead of visiting all of them.
+    /// </summary>
+    public class WarehouseShards<T>
+    {
+        private static readonly ConcurrentDictionary<string, object> _migrationLocks = new();
+        private static readonly ConcurrentDictionary<string, ShardList> _shardLists = new();
+        private static readonly ConcurrentDictionary<string, IdIndex> _idIndexes = new();
+
+        private readonly string _collectionPath;
+        private readonly string _directory;
+        private readonly string _name;
+        private readonly Func<T, int> _warehouseOf;
+        private readonly Func<T, int> _idOf;
+
+        public WarehouseShards(string collectionPath, Func<T, int> warehouseOf, Func<T, int> idOf)
+        {
+            _collectionPath = collectionPath;
+            _name = JsonFileStore.CollectionName(collectionPath);
+            _directory = Path.Combine(Path.GetDirectoryName(collectionPath) ?? string.Empty, _name);
+            _warehouseOf = warehouseOf;
+            _idOf = idOf;
+        }
+
+        public string CollectionPath => _collectionPath;
+
+        public string PathFor(int warehouseId) => Path.Combine(_directory, $"{_name}.w{warehouseId}.json");
+
+        /// <summary>
+        /// The records of one warehouse. Only that warehouse's shard is loaded.
+        /// </summary>
+        public ImmutableList<T> Snapshot(int warehouseId)
+        {
+            EnsureMigrated();
+            return JsonFileStore.Snapshot<T>(PathFor(warehouseId));
+        }
+
+        /// <summary>
+        /// All records of every shard, ordered by id.
+        /// </summary>
+        public List<T> All()
+        {
+            return Records().OrderBy(_idOf).ToList();
+        }
+
+        /// <summary>
+        /// <see cref="All"/> without blocking on shards that have to be read from disk.
+        /// </summary>
+        public async ValueTask<List<T>> AllAsync(CancellationToken cancellationToken = default)
+        {
+            EnsureMigrated();
+            var records = new List<T>();
+            foreach (var warehouseId in WarehouseIds())
+            {
+                records.AddRange(await JsonFileStore.SnapshotAsync<T>(PathFor(warehouseId), cancellationToken));
+            }
+            return records.OrderBy(_idOf).ToList();
+        }
+
+        /// <summary>
+        /// Every record, shard by shard. Shards are loaded as the enumeration reaches them.
+        /// </summary>
+        public IEnumerable<T> Records()
+        {
+            EnsureMigrated();
+            foreach (var warehouseId in WarehouseIds())
+            {
+                foreach (var record in JsonFileStore.Snapshot<T>(PathFor(warehouseId)))
+                {
+                    yield return record;
+                }
+            }
+        }
+
+        /// <summary>
+        /// Looks the record up in the shard the id index names. Only when it is not there (a new
+        /// or moved record) is the index checked against the shard versions and rebuilt.
+        /// </summary>
+        public T? FindById(int id)
+        {
+            EnsureMigrated();
+            return FindIndexed(id, Index(refresh: false)) ?? FindIndexed(id, Index(refresh: true));
+        }
+
+        /// <summary>
+        /// <see cref="FindById"/> reading the shard without blocking; the id index itself is
+        /// shared with the synchronous lookups.
+        /// </summary>
+        public async ValueTask<T?> FindByIdAsync(int id, CancellationToken cancellationToken = default)
+        {
+            EnsureMigrated();
+            return await FindIndexedAsync(id, Index(refresh: false), cancellationToken)
+                ?? await FindIndexedAsync(id, Index(refresh: true), cancellationToken);
+        }
+
+        /// <summary>
+        /// The records with the given ids, in the order of <paramref name="ids"/>, each read from
+        /// the shard the id index names; unknown ids are skipped.
+        /// </summary>
+        public List<T> FindMany(IReadOnlyCollection<int> ids)
+        {
+            EnsureMigrated();
+            var found = new Dictionary<int, T>();
+            var index = Index(refresh: false);
+            foreach (var id in ids)
+            {
+                if (!found.ContainsKey(id) && FindIndexed(id, index) is { } record)
+                {
+                    found[id] = record;
+                }
+            }
+
+            if (found.Count < ids.Distinct().Count())
+            {
+                index = Index(refresh: true);
+                foreach (var id in ids)
+                {
+                    if (!found.ContainsKey(id) && FindIndexed(id, index) is { } record)
+                    {
+                        found[id] = record;
+                    }
+                }
+            }
+            return ids.Where(found.ContainsKey).Select(id => found[id]).ToList();
+        }
+
+        private T? FindIndexed(int id, IdIndex index)
+        {
+            return index.WarehouseOf.TryGetValue(id, out var warehouseId)
+                ? JsonFileStore.FindById(PathFor(warehouseId), _idOf, id)
+                : default;
+        }
+
+        private async ValueTask<T?> FindIndexedAsync(int id, IdIndex index, CancellationToken cancellationToken)
+        {
+            return index.WarehouseOf.TryGetValue(id, out var warehouseId)
+                ? await JsonFileStore.FindByIdAsync(PathFor(warehouseId), _idOf, id, cancellationToken)
+                : default;
+        }
+
+        // The shared index as it is, or, with refresh, rebuilt first if a shard has changed since
+        // it was built.
+        private IdIndex Index(bool refresh)
+        {
+            var key = Path.GetFullPath(_collectionPath);
+            if (_idIndexes.TryGetValue(key, out var index) && !refresh)
+            {
+                return index;
+            }
+
+            var versions = Versions();
+            if (index != null && index.Versions.SequenceEqual(versions))
+            {
+                return index;
+            }
+
+            var warehouseOf = new Dictionary<int, int>();
+            foreach (var warehouseId in WarehouseIds())
+            {
+                foreach (var record in JsonFileStore.Snapshot<T>(PathFor(warehouseId)))
+                {
+                    warehouseOf.TryAdd(_idOf(record), warehouseId);
+                }
+            }
+            index = new IdIndex(versions, warehouseOf);
+            _idIndexes[key] = index;
+            return index;
+        }
+
+        /// <summary>
+        /// The warehouse whose shard holds the record, or null when no shard does.
+        /// </summary>
+        public int? WarehouseOf(int id)
+        {
+            var found = FindById(id);
+            return found == null ? null : _warehouseOf(found);
+        }
+
+        /// <summary>
+        /// The <see cref="JsonFileStore.Version{T}"/> of every shard. The list changes when any
+        /// shard is written, added or removed.
+        /// </summary>
+        public long[] Versions()
+        {
+            EnsureMigrated();
+            return WarehouseIds().Select(warehouseId => JsonFileStore.Version<T>(PathFor(warehouseId))).ToArray();
+        }
+
+        /// <summary>
+        /// The versions of the sharded collection at <paramref name="collectionPath"/> for callers
+        /// without a <see cref="WarehouseShards{T}"/>: the single file (0 once it is split) followed
+        /// by every shard. Unlike <see cref="Versions()"/> it never splits the file.
+        /// </summary>
+        public static long[] VersionsOf(string collectionPath)
+        {
+            var shards = new WarehouseShards<T>(collectionPath, _ => 0, _ => 0);
+            return shards.WarehouseIds()
+                .Select(warehouseId => JsonFileStore.Version<T>(shards.PathFor(warehouseId)))
+                .Prepend(JsonFileStore.Version<T>(collectionPath))
+                .ToArray();
+        }
+
+        public ImmutableList<T> Update(int warehouseId, Func<ImmutableList<T>, ImmutableList<T>> change)
+        {
+            EnsureMigrated();
+            var path = PathFor(warehouseId);
+            var created = !File.Exists(path);
+            try
+            {
+                return JsonFileStore.Update(path, change);
+            }
+            finally
+            {
+                if (created)
+                {
+                    _shardLists.TryRemove(Path.GetFullPath(_directory), out _);
+                }
+            }
+        }
+
+        public async Task<ImmutableList<T>> UpdateAsync(int warehouseId, Func<ImmutableList<T>, ImmutableList<T>> change, CancellationToken cancellationToken = default)
+        {
+            EnsureMigrated();
+            var path = PathFor(warehouseId);
+            var created = !File.Exists(path);
+            try
+            {
+                return await JsonFileStore.UpdateAsync(path, change, cancellationToken);
+            }
+            finally
+            {
+                if (created)
+                {
+                    _shardLists.TryRemove(Path.GetFullPath(_directory), out _);
+                }
+            }
+        }
+
+        /// <summary>
+        /// The warehouses that have a shard. The directory is only listed again after a shard was
+        /// created through <see cref="Update"/> or the directory's timestamp changed.
+        /// </summary>
+        public IEnumerable<int> WarehouseIds()
+        {
+            var directory = new DirectoryInfo(_directory);
+            if (!directory.Exists)
+            {
+                return Enumerable.Empty<int>();
+            }
+
+            var key = directory.FullName;
+            var stamp = directory.LastWriteTimeUtc;
+            if (_shardLists.TryGetValue(key, out var cached) && cached.Stamp == stamp)
+            {
+                return cached.WarehouseIds;
+            }
+
+            var prefix = $"{_name}.w";
+            var warehouseIds = Directory.EnumerateFiles(_directory, $"{prefix}*.json")
+                .Select(path => Path.GetFileNameWithoutExtension(path).Substring(prefix.Length))
+                .Select(suffix => int.TryParse(suffix, out var warehouseId) ? (int?)warehouseId : null)
+                .Where(warehouseId => warehouseId.HasValue)
+                .Select(warehouseId => warehouseId!.Value)
+                .OrderBy(warehouseId => warehouseId)
+                .ToArray();
+            _shardLists[key] = new ShardList(stamp, warehouseIds);
+            return warehouseIds;
+        }
+
+        // Splits the old single file once. The shards are written before the original file is
+        // renamed, so an interrupted split is simply redone on the next start.
+        private void EnsureMigrated()
+        {
+            if (!File.Exists(_collectionPath))
+            {
+                return;
+            }
+
+            lock (_migrationLocks.GetOrAdd(Path.GetFullPath(_collectionPath), _ => new object()))
+            {
+                if (!File.Exists(_collectionPath))
+                {
+                    return;
+                }
+
+                Directory.CreateDirectory(_directory);
+                foreach (var shard in JsonFileStore.Snapshot<T>(_collectionPath).GroupBy(_warehouseOf))
+                {
+                    JsonFileStore.WriteList(PathFor(shard.Key), shard.ToList());
+                }
+                File.Move(_collectionPath, _collectionPath + ".migrated", overwrite: true);
+                _shardLists.TryRemove(Path.GetFullPath(_directory), out _);
+            }
+        }
+
+        private sealed class ShardList
+        {
+            public ShardList(DateTime stamp, int[] warehouseIds)
+            {
+                Stamp = stamp;
+                WarehouseIds = warehouseIds;
+            }
+
+            public DateTime Stamp { get; }
+            public int[] WarehouseIds { get; }
+        }
+
+        private sealed class IdIndex
+        {
+            public IdIndex(long[] versions, Dictionary<int, int> warehouseOf)
+            {
+                Versions = versions;
+                WarehouseOf = warehouseOf;
+            }
+
+            // The shard versions the index was built from.
+            public long[] Versions { get; }
+            public Dictionary<int, int> WarehouseOf { get; }
+        }
+    }
+}
@@ -0,0 +1,413 @@
+"""Replay recorded Cargohub activity against a running server.
+
+The service writes an audit trail of what its users did to four log files:
+
+* ``logs/user_changes.log``      - API key administration (users endpoints)
+* ``logs/picking_logs.log``      - picking lists saved per shipment
+* ``logs/cross_docking_logs.log`` - shipments received / shipped at the dock
+* ``logs/inventory_audit.log``   - physical inventory counts
+
+This tool turns those records into a timed workload and fires it at a
+server (by default the local one on port 3000). Every record keeps its
+original offset from the first record, divided by ``--speed``, so bursts
+such as shift changes are reproduced with their real concurrency instead of
+the evenly spaced load a synthetic benchmark produces. Long idle periods
+(nights, weekends) can be shortened with ``--max-gap``.
+
+Usage::
+
+    python tools/trace_replay.py --speed 10 --max-gap 30
+    python tools/trace_replay.py --dry-run
+"""
+
+import argparse
+import ast
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+DEFAULT_BASE_URL = "http://localhost:3000/api/v2"
+
+LOG_FILES = {
+    "user_changes": "user_changes.log",
+    "picking": "picking_logs.log",
+    "cross_docking": "cross_docking_logs.log",
+    "inventory_audit": "inventory_audit.log",
+}
+
+_FRACTION = re.compile(r"\.(\d+)")
+
+
+@dataclass
+class ReplayEvent:
+    """A single request recorded in the logs, ready to be replayed."""
+    timestamp: datetime
+    source: str
+    api_key: str
+    method: str
+    path: str
+    body: object = None
+    # Name of the endpoint used when aggregating latencies, e.g. "POST /shipments/{id}/pickinglist".
+    endpoint: str = ""
+    # Changes applied on top of the current resource for read-modify-write updates.
+    changes: dict = field(default_factory=dict)
+    offset: float = 0.0
+
+
+def parse_timestamp(value):
+    """Parse the ISO 8601 timestamps written by both the Python and the .NET services."""
+    value = value.strip()
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    # .NET writes 7 fractional digits, datetime only accepts up to 6.
+    value = _FRACTION.sub(lambda m: "." + m.group(1)[:6].ljust(6, "0"), value, count=1)
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def parse_literal(text):
+    """Parse a JSON value, falling back to the Python literal format used by older log lines."""
+    text = text.strip()
+    try:
+        return json.loads(text)
+    except ValueError:
+        return ast.literal_eval(text)
+
+
+def split_fields(line):
+    """Split a ``Key=value | Key=value`` log line into a dict, keeping nested values intact."""
+    fields = {}
+    for part in _split_top_level(line, "|"):
+        if "=" not in part:
+            continue
+        key, value = part.split("=", 1)
+        fields[key.strip()] = value.strip()
+    return fields
+
+
+def parse_changes(text):
+    """Parse the ``Changes=`` field of a user change (``App={...}, EndpointAccess={...}``)."""
+    changes = {}
+    for part in _split_top_level(text, ","):
+        if "=" not in part:
+            continue
+        key, value = part.split("=", 1)
+        changes[key.strip()] = parse_literal(value)
+    return changes
+
+
+def _split_top_level(text, separator):
+    parts, depth, quote, start = [], 0, None, 0
+    for index, char in enumerate(text):
+        if quote:
+            if char == quote and text[index - 1] != "\\":
+                quote = None
+        elif char in "'\"":
+            quote = char
+        elif char in "{[(":
+            depth += 1
+        elif char in "}])":
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(text[start:index])
+            start = index + 1
+    parts.append(text[start:])
+    return [part.strip() for part in parts if part.strip()]
+
+
+def read_user_changes(path):
+    """Read user changes written either as ``Key=value`` lines or as indented JSON objects."""
+    with open(path, encoding="utf-8") as handle:
+        content = handle.read()
+
+    records, decoder, index = [], json.JSONDecoder(), 0
+    while index < len(content):
+        while index < len(content) and content[index].isspace():
+            index += 1
+        if index >= len(content):
+            break
+        if content[index] == "{":
+            record, index = decoder.raw_decode(content, index)
+            records.append({
+                "Timestamp": record.get("Timestamp"),
+                "Action": record.get("Action"),
+                "PerformedBy": record.get("PerformedBy"),
+                "APIkey": record.get("APIkey"),
+                "Changes": record.get("Changes") or {},
+            })
+            continue
+        end = content.find("\n", index)
+        end = len(content) if end == -1 else end
+        fields = split_fields(content[index:end])
+        index = end
+        if "Timestamp" in fields:
+            fields["Changes"] = parse_changes(fields.get("Changes", ""))
+            records.append(fields)
+
+    events = []
+    for record in records:
+        event = _user_change_event(record)
+        if event is not None:
+            events.append(event)
+    return events
+
+
+def _user_change_event(record):
+    action = record.get("Action")
+    target = record.get("APIkey")
+    changes = record.get("Changes") or {}
+    event = ReplayEvent(
+        timestamp=parse_timestamp(record["Timestamp"]),
+        source="user_changes",
+        api_key=record.get("PerformedBy"),
+        method="",
+        path="",
+    )
+
+    if action == "Created" and "NewUser" in changes:
+        event.method, event.path, event.body = "POST", "/users", changes["NewUser"]
+        event.endpoint = "POST /users"
+    elif action == "Deleted":
+        event.method, event.path = "DELETE", f"/users/{target}"
+        event.endpoint = "DELETE /users/{apiKey}"
+    elif action in ("Deactivated", "Reactivated"):
+        verb = action[:-1].lower()
+        event.method, event.path = "POST", f"/users/{target}/{verb}"
+        event.endpoint = f"POST /users/{{apiKey}}/{verb}"
+    elif action in ("AddedWarehouse", "RemovedWarehouse"):
+        warehouses = changes.get("Warehouses") or {}
+        old, new = set(warehouses.get("OldValue") or []), set(warehouses.get("NewValue") or [])
+        changed = sorted(new - old) if action == "AddedWarehouse" else sorted(old - new)
+        if not changed:
+            return None
+        verb = "add" if action == "AddedWarehouse" else "remove"
+        event.method, event.path, event.body = "PUT", f"/users/{target}/warehouses/{verb}", changed[0]
+        event.endpoint = f"PUT /users/{{apiKey}}/warehouses/{verb}"
+    elif action == "Updated":
+        # Only the changed fields are logged, so the update is replayed as
+        # read-modify-write on the user as it exists on the target server.
+        event.method, event.path, event.changes = "PUT", f"/users/{target}", changes
+        event.endpoint = "PUT /users/{apiKey}"
+    else:
+        return None
+    return event
+
+
+def read_key_value_log(path, source):
+    """Read one of the ``Key=value | ...`` operation logs."""
+    events = []
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            fields = split_fields(line)
+            if "Timestamp" not in fields:
+                continue
+            event = _operation_event(source, fields)
+            if event is not None:
+                events.append(event)
+    return events
+
+
+def _operation_event(source, fields):
+    timestamp = parse_timestamp(fields["Timestamp"])
+    api_key = fields.get("PerformedBy")
+
+    if source == "picking":
+        picked = {}
+        for pair in _split_top_level(fields.get("PickedItems", ""), ","):
+            item_id, _, amount = pair.rpartition(":")
+            picked[item_id.strip()] = int(amount)
+        return ReplayEvent(
+            timestamp, source, api_key, "POST", f"/shipments/{fields['ShipmentId']}/pickinglist",
+            body={"pickedItems": picked, "description": fields.get("Description")},
+            endpoint="POST /shipments/{id}/pickinglist",
+        )
+
+    if source == "cross_docking":
+        details = parse_literal(fields.get("Details", "{}"))
+        operation = {"ReceiveShipment": "receive", "ShipItems": "ship"}.get(fields.get("Operation"))
+        if operation is None or "ShipmentId" not in details:
+            return None
+        return ReplayEvent(
+            timestamp, source, api_key, "POST", f"/cross-docking/{operation}",
+            body=details["ShipmentId"], endpoint=f"POST /cross-docking/{operation}",
+        )
+
+    if source == "inventory_audit":
+        audit = parse_literal(fields.get("AuditData", "{}"))
+        return ReplayEvent(
+            timestamp, source, api_key, "POST", "/inventories/audit",
+            body=audit, endpoint="POST /inventories/audit",
+        )
+
+    return None
+
+
+def load_workload(logs_dir, sources=None, speed=1.0, max_gap=None):
+    """Parse every log into one ordered workload with replay offsets (in seconds)."""
+    events = []
+    for source, file_name in LOG_FILES.items():
+        if sources and source not in sources:
+            continue
+        path = os.path.join(logs_dir, file_name)
+        if not os.path.exists(path):
+            continue
+        if source == "user_changes":
+            events.extend(read_user_changes(path))
+        else:
+            events.extend(read_key_value_log(path, source))
+
+    events.sort(key=lambda event: event.timestamp)
+    offset, previous = 0.0, None
+    for event in events:
+        if previous is not None:
+            gap = (event.timestamp - previous).total_seconds()
+            if max_gap is not None:
+                gap = min(gap, max_gap)
+            offset += gap / speed
+        event.offset = offset
+        previous = event.timestamp
+    return events
+
+
+def _apply_changes(user, changes):
+    for name, change in changes.items():
+        if name == "EndpointAccess":
+            access = user.setdefault("endpointAccess", {})
+            for endpoint, permissions in change.items():
+                if "NewValue" in permissions:
+                    access[endpoint] = permissions["NewValue"]
+                    continue
+                current = access.setdefault(endpoint, {})
+                for permission, value in permissions.items():
+                    current[permission[0].lower() + permission[1:]] = value["NewValue"]
+        elif isinstance(change, dict) and "NewValue" in change:
+            user[name[0].lower() + name[1:]] = change["NewValue"]
+    return user
+
+
+class ReplayStats:
+    """Thread-safe latency and status bookkeeping per endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = {}
+        self.statuses = {}
+        self.lag = []
+
+    def record(self, endpoint, status, latency, lag):
+        with self._lock:
+            self.latencies.setdefault(endpoint, []).append(latency)
+            self.statuses.setdefault(endpoint, {}).setdefault(status, 0)
+            self.statuses[endpoint][status] += 1
+            self.lag.append(lag)
+
+    def report(self):
+        lines = [f"{'endpoint':45} {'count':>6} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}  statuses"]
+        for endpoint in sorted(self.latencies):
+            values = sorted(self.latencies[endpoint])
+            statuses = ", ".join(f"{code}: {count}" for code, count in sorted(self.statuses[endpoint].items()))
+            lines.append(
+                f"{endpoint:45} {len(values):>6} {_percentile(values, 50) * 1000:>8.1f} "
+                f"{_percentile(values, 95) * 1000:>8.1f} {values[-1] * 1000:>8.1f}  {statuses}"
+            )
+        if self.lag:
+            lines.append(f"schedule lag p95: {_percentile(sorted(self.lag), 95) * 1000:.1f} ms")
+        return "\n".join(lines)
+
+
+def _percentile(values, percentile):
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, int(round(percentile / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def _send(session, base_url, event, api_key, timeout):
+    headers = {"API_KEY": api_key or event.api_key}
+    url = base_url + event.path
+    if event.changes:
+        current = session.get(url, headers=headers, timeout=timeout)
+        if current.status_code != 200:
+            return current.status_code
+        body = _apply_changes(current.json(), event.changes)
+    else:
+        body = event.body
+    response = session.request(event.method, url, json=body, headers=headers, timeout=timeout)
+    return response.status_code
+
+
+def replay(events, base_url=DEFAULT_BASE_URL, workers=64, api_key=None, timeout=30.0):
+    """Fire every event at its offset; requests that overlap in the trace overlap on the wire."""
+    import requests
+
+    stats = ReplayStats()
+    local = threading.local()
+
+    def run(event, due):
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        lag = time.perf_counter() - due
+        started = time.perf_counter()
+        try:
+            status = _send(local.session, base_url, event, api_key, timeout)
+        except requests.RequestException as ex:
+            status = type(ex).__name__
+        stats.record(event.endpoint, status, time.perf_counter() - started, lag)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for event in events:
+            due = start + event.offset
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(run, event, due)
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logs-dir", default="logs", help="directory containing the Cargohub log files")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL)
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed multiplier (1 = real time)")
+    parser.add_argument("--max-gap", type=float, default=None,
+                        help="cap idle gaps between consecutive records to this many seconds (before --speed)")
+    parser.add_argument("--source", action="append", choices=sorted(LOG_FILES),
+                        help="only replay the given log (repeatable)")
+    parser.add_argument("--workers", type=int, default=64, help="maximum number of requests in flight")
+    parser.add_argument("--api-key", default=None, help="send every request with this key instead of PerformedBy")
+    parser.add_argument("--dry-run", action="store_true", help="print the schedule without sending anything")
+    args = parser.parse_args(argv)
+
+    if args.speed <= 0:
+        parser.error("--speed must be greater than zero")
+
+    events = load_workload(args.logs_dir, args.source, args.speed, args.max_gap)
+    if not events:
+        print(f"No replayable records found in {args.logs_dir}")
+        return 1
+
+    if args.dry_run:
+        for event in events:
+            print(f"+{event.offset:10.3f}s  {event.method:6} {event.path}  ({event.source})")
+        return 0
+
+    print(f"Replaying {len(events)} requests over {events[-1].offset:.1f}s against {args.base_url}")
+    stats = replay(events, args.base_url, args.workers, args.api_key)
+    print(stats.report())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+using System;
+using System.Collections.Generic;
+using Xunit;
+using Cargohub.models;
+using Cargohub.services;
+
+namespace Cargohub.UnitTests
+{
+    public class BackorderEngineTests
+    {
+        private static Shipment NewShipment(List<int> orderIds, params (string ItemId, int Amount)[] items)
+        {
+            var shipment = new Shipment { Order_Id = orderIds, Items = new List<ItemDetail>() };
+            foreach (var (itemId, amount) in items)
+            {
+                shipment.Items.Add(new ItemDetail { Item_Id = itemId, Amount = amount });
+            }
+            return shipment;
+        }
+
+        [Fact]
+        public void ShippedTotals_ShouldSumItemsAcrossShipmentsPerOrder()
+        {
+            // Arrange
+            var shipments = new List<Shipment>
+            {
+                NewShipment(new List<int> { 1 }, ("P1", 3), ("P2", 1)),
+                NewShipment(new List<int> { 1, 2 }, ("P1", 2)),
+                NewShipment(new List<int> { 3 }, ("P1", 9))
+            };
+
+            // Act
+            var index = ShippedTotalsIndex.Build(shipments);
+
+            // Assert
+            Assert.Equal(5, index.ForOrder(1)["P1"]);
+            Assert.Equal(1, index.ForOrder(1)["P2"]);
+            Assert.Equal(2, index.ForOrder(2)["P1"]);
+            Assert.Empty(index.ForOrder(4));
+        }
+
+        [Fact]
+        public void MissingItems_ShouldReturnOnlyUnderShippedLines()
+        {
+            // Arrange
+            var order = new Order
+            {
+                Id = 1,
+                Items = new List<ItemDetail>
+                {
+                    new ItemDetail { Item_Id = "P1", Amount = 5 },
+                    new ItemDetail { Item_Id = "P2", Amount = 4 },
+                    new ItemDetail { Item_Id = "P3", Amount = 2 }
+                }
+            };
+            var index = ShippedTotalsIndex.Build(new List<Shipment> { NewShipment(new List<int> { 1 }, ("P1", 5), ("P2", 1)) });
+
+            // Act
+            var missing = BackorderEngine.MissingItems(order, index);
+            BackorderEngine.ApplyBackorder(order, missing);
+
+            // Assert
+            Assert.Equal(2, missing.Count);
+            Assert.Equal(3, missing.Find(m => m.Item_Id == "P2")!.Amount);
+            Assert.Equal(2, missing.Find(m => m.Item_Id == "P3")!.Amount);
+            Assert.True(order.IsBackordered);
+            Assert.Single(order.Items);
+            Assert.Equal("P1", order.Items[0].Item_Id);
+        }
+    }
+}
@@ -0,0 +1,127 @@
+using System;
+using System.Collections.Generic;
+using System.IO;
+using System.Linq;
+using System.Text;
+using System.Text.Json;
+using System.Threading;
+using System.Threading.Tasks;
+using Xunit;
+using Cargohub.models;
+using Cargohub.services;
+
+namespace Cargohub.UnitTests
+{
+    public class BulkImportTests
+    {
+        private static readonly JsonSerializerOptions Options = new JsonSerializerOptions(JsonSerializerDefaults.Web);
+
+        private static Stream Input(string text) => new MemoryStream(Encoding.UTF8.GetBytes(text));
+
+        private static Func<Item, string?> Items() => BulkImportService.ItemValidator(
+            new HashSet<int> { 1 }, new HashSet<int> { 2 }, new HashSet<int> { 3 }, new HashSet<int> { 4 }, new HashSet<int> { 5 });
+
+        [Fact]
+        public async Task Import_Csv_ShouldReadQuotedCellsAcrossLinesAndNumberRowsByTheirFirstLine()
+        {
+            // Arrange
+            var csv = "uid,code,description,classifications_id\n"
+                + "P1,C1,plain,[5]\n"
+                + "P2,C2,\"two\nlines, a comma and \"\"quotes\"\"\",\"[5]\"\n"
+                + "P3,C3\n"
+                + "P4,C4,last,\n";
+            var committed = new List<Item>();
+
+            // Act
+            var report = await BulkImportService.Import(Input(csv), "csv", Options, Items(), _ => null, committed.AddRange, CancellationToken.None);
+
+            // Assert
+            Assert.Equal(4, report.Received);
+            Assert.Equal(new[] { "P1", "P2", "P4" }, committed.Select(i => i.Uid).ToArray());
+            Assert.Equal("two\nlines, a comma and \"quotes\"", committed[1].Description);
+            Assert.Equal(new List<int> { 5 }, committed[1].Classifications_Id);
+            Assert.Null(committed[2].Classifications_Id);
+            var error = Assert.Single(report.Errors);
+            Assert.Equal(5, error.Row);
+            Assert.Equal("Expected 4 columns but found 2.", error.Message);
+        }
+
+        [Fact]
+        public async Task Import_ShouldRejectUnknownReferencesMalformedRowsAndDuplicateUids()
+        {
+            // Arrange
+            var ndjson = "{\"uid\":\"P1\",\"itemLine\":1,\"supplierId\":4}\n"
+                + "{\"uid\":\"P2\",\"itemLine\":9}\n"
+                + "\n"
+                + "{\"uid\":\"P0\"}\n"
+                + "{\"uid\":\"P1\",\"itemType\":3}\n"
+                + "{\"uid\":\n"
+                + "{\"uid\":\"P3\",\"classifications_Id\":[5,6]}\n"
+                + "{\"uid\":\"\"}\n";
+            var committed = new List<Item>();
+            var claim = BulkImportService.UidClaim(new HashSet<string> { "P0" });
+
+            // Act
+            var report = await BulkImportService.Import(Input(ndjson), "ndjson", Options, Items(), claim, committed.AddRange, CancellationToken.None);
+
+            // Assert
+            Assert.Equal(7, report.Received);
+            Assert.Equal(1, report.Imported);
+            Assert.Equal("P1", Assert.Single(committed).Uid);
+            Assert.Equal(new[] { 2, 4, 5, 6, 7, 8 }, report.Errors.Select(e => e.Row).ToArray());
+            Assert.Equal("Item line 9 not found.", report.Errors[0].Message);
+            Assert.Equal("Item with UID P0 already exists.", report.Errors[1].Message);
+            Assert.Equal("Item with UID P1 already exists.", report.Errors[2].Message);
+            Assert.Equal("Classification 6 not found.", report.Errors[4].Message);
+            Assert.Equal("Uid is required.", report.Errors[5].Message);
+        }
+
+        [Fact]
+        public async Task Import_ShouldCommitEachBatchInRowOrder()
+        {
+            // Arrange
+            var rows = Enumerable.Range(1, BulkImportService.BatchSize + 1).Select(i => $"{{\"uid\":\"P{i}\"}}");
+            var batches = new List<List<string>>();
+
+            // Act
+            var report = await BulkImportService.Import(Input(string.Join("\n", rows)), "ndjson", Options, Items(), _ => null,
+                (IReadOnlyList<Item> batch) => batches.Add(batch.Select(i => i.Uid).ToList()), CancellationToken.None);
+
+            // Assert
+            Assert.Equal(BulkImportService.BatchSize + 1, report.Imported);
+            Assert.Equal(new[] { BulkImportService.BatchSize, 1 }, batches.Select(b => b.Count).ToArray());
+            Assert.Equal(Enumerable.Range(1, BulkImportService.BatchSize).Select(i => $"P{i}"), batches[0]);
+            Assert.Empty(report.Errors);
+        }
+
+        [Fact]
+        public async Task ImportInventories_ShouldRejectUnknownItemsLocationsAndHazardousStock()
+        {
+            // Arrange
+            using var directory = new TempDirectory();
+            var rules = StorageRules.For(
+                new WarehouseShards<Location>(directory.File("locations.json", "[{\"Id\":1,\"Warehouse_Id\":1},{\"Id\":2,\"Warehouse_Id\":2}]"), l => l.Warehouse_Id, l => l.Id),
+                directory.File("warehouses.json", "[{\"Id\":1,\"Classifications_Id\":[7]},{\"Id\":2,\"Classifications_Id\":[]}]"),
+                directory.File("classifications.json", "[{\"Id\":7,\"Name\":\"hazardous\"}]"));
+            var items = new Dictionary<string, Item>
+            {
+                ["P1"] = new Item { Uid = "P1", Classifications_Id = new List<int> { 7 } },
+                ["P2"] = new Item { Uid = "P2" }
+            };
+            var ndjson = "{\"item_Id\":\"P1\",\"locations\":{\"1\":5}}\n"
+                + "{\"item_Id\":\"P1\",\"locations\":{\"2\":5}}\n"
+                + "{\"item_Id\":\"P2\",\"locations\":{\"3\":5}}\n"
+                + "{\"item_Id\":\"P9\"}\n"
+                + "{\"item_Id\":\"P2\",\"locations\":{\"2\":5}}\n";
+            var committed = new List<Inventory>();
+
+            // Act
+            var report = await BulkImportService.Import(Input(ndjson), "ndjson", Options, BulkImportService.InventoryValidator(items, rules), _ => null, committed.AddRange, CancellationToken.None);
+
+            // Assert
+            Assert.Equal(2, report.Imported);
+            Assert.Equal(new[] { "Warehouse 2 is non-hazardous", "Location 3 not found", "Item not found" }, report.Errors.Select(e => e.Message).ToArray());
+            Assert.Equal(new[] { 2, 3, 4 }, report.Errors.Select(e => e.Row).ToArray());
+        }
+    }
+}
@@ -0,0 +1,101 @@
+using System;
+using System.IO;
+using System.Linq;
+using Xunit;
+using Cargohub.models;
+using Cargohub.services;
+
+namespace Cargohub.UnitTests
+{
+    public class ColdStorageTests
+    {
+        private static string NewShipmentsFile(TempDirectory directory) => directory.File("shipments.json",
+            "[{\"Id\":1,\"Shipment_Status\":\"Delivered\"},{\"Id\":2,\"Shipment_Status\":\"Pending\"},{\"Id\":3,\"Shipment_Status\":\"Delivered\"}]");
+
+        private static bool IsDelivered(Shipment shipment) => shipment.Shipment_Status == "Delivered";
+
+        [Fact]
+        public void Rebalance_ShouldMoveTerminalRecordsToTheArchive()
+        {
+            // Arrange
+            using var directory = new TempDirectory();
+            var path = NewShipmentsFile(directory);
+
+            // Act
+            var result = ColdStorage.Rebalance<Shipment>(path, s => s.Id, IsDelivered);
+
+            // Assert
+            Assert.Equal(2, result.Archived);
+            Assert.Equal(new[] { 2 }, JsonFileStore.Snapshot<Shipment>(path).Select(s => s.Id).ToArray());
+            Assert.Equal(new[] { 1, 3 }, JsonFileStore.Snapshot<Shipment>(ColdStorage.PathFor(path)).Select(s => s.Id).ToArray());
+            Assert.Equal(3, ColdStorage.FindById<Shipment, int>(path, s => s.Id, 3)!.Id);
+            Assert.Equal(new[] { 1, 2, 3 }, ColdStorage.ReadAll<Shipment>(path, s => s.Id).Select(s => s.Id).ToArray());
+        }
+
+        [Fact]
+        public void Rebalance_ShouldRestoreRecordsThatAreNoLongerTerminal()
+        {
+            // Arrange
+            using var directory = new TempDirectory();
+            var path = NewShipmentsFile(directory);
+            ColdStorage.Rebalance<Shipment>(path, s => s.Id, IsDelivered);
+            var coldPath = ColdStorage.PathContaining<Shipment, int>(path, s => s.Id, 3);
+            JsonFileStore.Update<Shipment>(coldPath, shipments =>
+            {
+                var reopened = EntityCopy.Shallow(shipments.Single(s => s.Id == 3));
+                reopened.Shipment_Status = "Pending";
+                return shipments.Replace(shipments.Single(s => s.Id == 3), reopened);
+            });
+
+            // Act
+            var result = ColdStorage.Rebalance<Shipment>(path, s => s.Id, IsDelivered);
+
+            // Assert
+            Assert.Equal(ColdStorage.PathFor(path), coldPath);
+            Assert.Equal(1, result.Restored);
+            Assert.Equal(new[] { 2, 3 }, JsonFileStore.Snapshot<Shipment>(path).Select(s => s.Id).ToArray());
+            Assert.Equal(new[] { 1 }, JsonFileStore.Snapshot<Shipment>(coldPath).Select(s => s.Id).ToArray());
+        }
+
+        [Fact]
+        public void Create_AfterArchivingTheHighestIds_ShouldNotReissueArchivedIds()
+        {
+            // Arrange
+            using var directory = new TempDirectory();
+            var path = NewShipmentsFile(directory);
+            ColdStorage.Rebalance<Shipment>(path, s => s.Id, IsDelivered);
+
+            // Act
+            JsonFileStore.Update<Shipment>(path, shipments =>
+            {
+                var id = IdSequence.Next(path, ColdStorage.WithArchived(path, shipments), s => s.Id);
+                return shipments.Add(new Shipment { Id = id, Shipment_Status = "Pending" });
+            });
+            var result = ColdStorage.Rebalance<Shipment>(path, s => s.Id, IsDelivered);
+
+            // Assert
+            Assert.Empty(result.Conflicts);
+            Assert.Equal(new[] { 2, 4 }, JsonFileStore.Snapshot<Shipment>(path).Select(s => s.Id).ToArray());
+            Assert.Equal(new[] { 1, 3 }, JsonFileStore.Snapshot<Shipment>(ColdStorage.PathFor(path)).Select(s => s.Id).ToArray());
+        }
+
+        [Fact]
+        public void Rebalance_ShouldKeepBothCopiesOfAnIdStoredDifferentlyInBothFiles()
+        {
+            // Arrange
+            using var directory = new TempDirectory();
+            var path = NewShipmentsFile(directory);
+            ColdStorage.Rebalance<Shipment>(path, s => s.Id, IsDelivered);
+            JsonFileStore.Update<Shipment>(path, shipments => shipments.Add(new Shipment { Id = 3, Shipment_Status = "Delivered", Notes = "reissued" }));
+
+            // Act
+            var result = ColdStorage.Rebalance<Shipment>(path, s => s.Id, IsDelivered);
+
+            // Assert
+            Assert.Equal(new[] { 3 }, result.Conflicts.ToArray());
+            Assert.Equal(0, result.Archived);
+            Assert.Equal("reissued", JsonFileStore.Snapshot<Shipment>(path).Single(s => s.Id == 3).Notes);
+            Assert.Null(JsonFileStore.Snapshot<Shipment>(ColdStorage.PathFor(path)).Single(s => s.Id == 3).Notes);
+        }
+    }
+}
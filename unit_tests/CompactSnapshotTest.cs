@@ -0,0 +1,61 @@
+using System;
+using System.Collections.Generic;
+using System.IO;
+using System.Linq;
+using Xunit;
+using Cargohub.models;
+using Cargohub.services;
+
+namespace Cargohub.UnitTests
+{
+    public class CompactSnapshotTests
+    {
+        [Fact]
+        public void Binary_ShouldRoundTripRecords()
+        {
+            // Arrange
+            var orders = new List<Order>
+            {
+                new Order { Id = 1, Reference = "ORD1", Notes = "", Total_Amount = 12.35m, Order_Date = new DateTime(2024, 5, 1, 8, 30, 0, DateTimeKind.Utc), Shipment_Id = new List<int?> { 4, null }, Items = new List<ItemDetail> { new ItemDetail { Item_Id = "P000001", Amount = -3 } } },
+                new Order { Id = 2, Reference = "ORD2", Notes = null }
+            };
+
+            // Act
+            var bytes = CompactSnapshot.Serialize(orders, SnapshotFormat.Binary, JsonFileStore.Serializer);
+            var loaded = CompactSnapshot.Deserialize<Order>(bytes, JsonFileStore.Serializer);
+
+            // Assert
+            Assert.Equal(SnapshotFormat.Binary, CompactSnapshot.FormatOf(bytes));
+            Assert.Equal(2, loaded.Count);
+            Assert.Equal(12.35m, loaded[0].Total_Amount);
+            Assert.Equal(orders[0].Order_Date, loaded[0].Order_Date);
+            Assert.Equal(DateTimeKind.Utc, loaded[0].Order_Date.Kind);
+            Assert.Equal(new int?[] { 4, null }, loaded[0].Shipment_Id.ToArray());
+            Assert.Equal(-3, loaded[0].Items.Single().Amount);
+            Assert.Equal("", loaded[0].Notes);
+            Assert.Null(loaded[1].Notes);
+        }
+
+        [Fact]
+        public void Convert_ShouldKeepTheFileFormatAcrossUpdates()
+        {
+            // Arrange
+            using var directory = new TempDirectory();
+            var path = directory.File("item_groups.json", "[{\"Id\":1,\"Name\":\"First\",\"Created_At\":\"2020-01-01 00:00:00\"}]");
+
+            // Act
+            var converted = JsonFileStore.Convert(path, SnapshotFormat.Binary);
+            JsonFileStore.Update<ItemGroup>(path, groups => groups.Add(new ItemGroup { Id = 2, Name = "Second" }));
+            var formatAfterUpdate = CompactSnapshot.FormatOf(path);
+            JsonFileStore.Convert(path, SnapshotFormat.Json);
+
+            // Assert
+            Assert.True(converted);
+            Assert.Equal(SnapshotFormat.Binary, formatAfterUpdate);
+            Assert.Equal(SnapshotFormat.Json, CompactSnapshot.FormatOf(path));
+            Assert.Contains("\"Name\": \"Second\"", File.ReadAllText(path));
+            Assert.Equal(new[] { "First", "Second" }, JsonFileStore.Snapshot<ItemGroup>(path).Select(g => g.Name).ToArray());
+            Assert.False(JsonFileStore.Convert(path, SnapshotFormat.Json));
+        }
+    }
+}
@@ -0,0 +1,72 @@
+using System;
+using System.IO;
+using Microsoft.Extensions.Primitives;
+using Xunit;
+using Cargohub.models;
+using Cargohub.services;
+
+namespace Cargohub.UnitTests
+{
+    public class CompressedResponseCacheTests
+    {
+        [Fact]
+        public void ChooseEncoding_ShouldPreferBrotliWithinAcceptEncoding()
+        {
+            // Act
+            var browser = CompressedResponseCacheMiddleware.ChooseEncoding(new StringValues("gzip, deflate, br"));
+            var gzipOnly = CompressedResponseCacheMiddleware.ChooseEncoding(new StringValues("gzip"));
+            var gzipPreferred = CompressedResponseCacheMiddleware.ChooseEncoding(new StringValues("br;q=0.5, gzip"));
+            var refused = CompressedResponseCacheMiddleware.ChooseEncoding(new StringValues("br;q=0, gzip;q=0"));
+            var none = CompressedResponseCacheMiddleware.ChooseEncoding(StringValues.Empty);
+
+            // Assert
+            Assert.Equal("br", browser);
+            Assert.Equal("gzip", gzipOnly);
+            Assert.Equal("gzip", gzipPreferred);
+            Assert.Null(refused);
+            Assert.Null(none);
+        }
+
+        [Fact]
+        public void Versions_ShouldChangeWhenTheCollectionIsWritten()
+        {
+            // Arrange
+            using var directory = new TempDirectory();
+            var path = directory.File("item_groups.json", "[{\"Id\":1,\"Name\":\"First\"}]");
+            var source = new CompressedResponseCacheAttribute<ItemGroup>(path);
+            var before = source.Versions();
+
+            // Act
+            var unchanged = source.Versions();
+            JsonFileStore.Update<ItemGroup>(path, groups => groups.Add(new ItemGroup { Id = 2, Name = "Second" }));
+            var after = source.Versions();
+
+            // Assert
+            Assert.Equal(before, unchanged);
+            Assert.NotEqual(before, after);
+        }
+
+        [Fact]
+        public void Versions_ShouldChangeWhenADependentLocationShardIsWritten()
+        {
+            // Arrange
+            using var directory = new TempDirectory();
+            var inventories = directory.File("inventories.json", "[{\"Id\":1,\"Locations\":{\"1\":5}}]");
+            var locations = directory.File("locations.json", "[{\"Id\":1,\"Warehouse_Id\":1}]");
+            var shards = new WarehouseShards<Location>(locations, l => l.Warehouse_Id, l => l.Id);
+            shards.Snapshot(1);
+            var source = new CompressedResponseCacheAttribute<Inventory>(inventories) { LocationsPath = locations };
+            var before = source.Versions();
+
+            // Act
+            shards.Update(2, all => all.Add(new Location { Id = 2, Warehouse_Id = 2 }));
+            var afterNewShard = source.Versions();
+            shards.Update(1, all => all.Add(new Location { Id = 3, Warehouse_Id = 1 }));
+            var afterWrite = source.Versions();
+
+            // Assert
+            Assert.NotEqual(before, afterNewShard);
+            Assert.NotEqual(afterNewShard, afterWrite);
+        }
+    }
+}
@@ -0,0 +1,134 @@
+using System;
+using System.Collections.Generic;
+using System.IO;
+using System.Linq;
+using System.Text.Json.Nodes;
+using Microsoft.AspNetCore.Mvc;
+using Microsoft.Extensions.Options;
+using Microsoft.Extensions.Primitives;
+using Xunit;
+using Cargohub.models;
+using Cargohub.services;
+
+namespace Cargohub.UnitTests
+{
+    public class ExpansionTests
+    {
+        private static readonly Order Order = new Order
+        {
+            Id = 1,
+            Items = new List<ItemDetail> { new ItemDetail { Item_Id = "P1", Amount = 1 }, new ItemDetail { Item_Id = "P2", Amount = 2 } }
+        };
+
+        private static void WriteData(TempDirectory directory)
+        {
+            Directory.CreateDirectory(directory.File("data"));
+            directory.File("data/items.json", "[{\"Uid\":\"P1\",\"Code\":\"C1\"},{\"Uid\":\"P2\",\"Code\":\"C2\"},{\"Uid\":\"P3\",\"Code\":\"C3\"}]");
+            directory.File("data/inventories.json",
+                "[{\"Id\":1,\"Item_Id\":\"P1\",\"Locations\":{\"10\":5}},{\"Id\":2,\"Item_Id\":\"P2\",\"Locations\":{\"20\":3,\"30\":1}},{\"Id\":3,\"Item_Id\":\"P3\",\"Locations\":{\"30\":4}}]");
+            directory.File("data/locations.json", "[{\"Id\":10,\"Warehouse_Id\":1},{\"Id\":20,\"Warehouse_Id\":2},{\"Id\":30,\"Warehouse_Id\":1}]");
+            directory.File("data/orders.json", "[{\"Id\":1,\"Items\":[{\"Item_Id\":\"P1\",\"Amount\":1},{\"Item_Id\":\"P2\",\"Amount\":2}]}]");
+            directory.File("data/shipments.json", "[{\"Id\":5,\"Order_Id\":[1]},{\"Id\":6,\"Order_Id\":[2]}]");
+        }
+
+        private static ExpansionService NewExpansionService()
+        {
+            var shipments = new ShipmentService();
+            return new ExpansionService(new ItemService(), new InventoryService(), new LocationsService(), new OrderService(shipments), shipments,
+                Options.Create(new JsonOptions()));
+        }
+
+        private static string[] Included(object expanded, string relation, string key)
+        {
+            var included = ((JsonObject)expanded)["included"]!.AsObject();
+            return included[relation]!.AsArray().Select(record => record![key]!.ToString()).OrderBy(id => id).ToArray();
+        }
+
+        [Fact]
+        public void Expand_Order_ShouldIncludeItemsInventoriesAndShipments()
+        {
+            // Arrange
+            using var directory = new TempDirectory();
+            WriteData(directory);
+            using var scope = directory.AsCurrentDirectory();
+            var expansion = NewExpansionService();
+
+            // Act
+            var expanded = expansion.Expand(Order, new StringValues(new[] { "items, Inventories", "shipments" }));
+
+            // Assert
+            Assert.Equal(1, ((JsonObject)expanded)["id"]!.GetValue<int>());
+            Assert.Equal(new[] { "P1", "P2" }, Included(expanded, "items", "uid"));
+            Assert.Equal(new[] { "1", "2" }, Included(expanded, "inventories", "id"));
+            Assert.Equal(new[] { "5" }, Included(expanded, "shipments", "id"));
+        }
+
+        [Fact]
+        public void Expand_Warehouse_ShouldIncludeItsLocationsAndTheirInventories()
+        {
+            // Arrange
+            using var directory = new TempDirectory();
+            WriteData(directory);
+            using var scope = directory.AsCurrentDirectory();
+            var expansion = NewExpansionService();
+
+            // Act
+            var expanded = expansion.Expand(new Warehouse { Id = 1 }, "locations,inventories");
+
+            // Assert
+            Assert.Equal(new[] { "10", "30" }, Included(expanded, "locations", "id"));
+            Assert.Equal(new[] { "1", "2", "3" }, Included(expanded, "inventories", "id"));
+        }
+
+        [Fact]
+        public void Expand_Item_ShouldIncludeTheLocationsItIsStoredIn()
+        {
+            // Arrange
+            using var directory = new TempDirectory();
+            WriteData(directory);
+            using var scope = directory.AsCurrentDirectory();
+            var expansion = NewExpansionService();
+
+            // Act
+            var expanded = expansion.Expand(new Item { Uid = "P2" }, "locations");
+
+            // Assert
+            Assert.Equal(new[] { "20", "30" }, Included(expanded, "locations", "id"));
+            Assert.Null(((JsonObject)expanded)["included"]!["inventories"]);
+        }
+
+        [Fact]
+        public void Expand_ShouldRejectUnknownRelations()
+        {
+            // Arrange
+            using var directory = new TempDirectory();
+            WriteData(directory);
+            using var scope = directory.AsCurrentDirectory();
+            var expansion = NewExpansionService();
+
+            // Act
+            var exception = Assert.Throws<InvalidOperationException>(() => expansion.Expand(Order, "items,customers"));
+
+            // Assert
+            Assert.Equal("'customers' cannot be included. Use one of: items, inventories, shipments.", exception.Message);
+        }
+
+        [Fact]
+        public void Expand_WithoutInclude_ShouldReturnTheRecordUnchanged()
+        {
+            // Arrange
+            using var directory = new TempDirectory();
+            WriteData(directory);
+            using var scope = directory.AsCurrentDirectory();
+            var expansion = NewExpansionService();
+
+            // Act
+            var missing = expansion.Expand(Order, StringValues.Empty);
+            var blank = expansion.Expand(Order, " , ");
+
+            // Assert
+            Assert.Same(Order, missing);
+            Assert.Same(Order, blank);
+        }
+    }
+}
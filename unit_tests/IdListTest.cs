@@ -0,0 +1,33 @@
+using System;
+using System.Linq;
+using Microsoft.Extensions.Primitives;
+using Xunit;
+using Cargohub.services;
+
+namespace Cargohub.UnitTests
+{
+    public class IdListTests
+    {
+        [Fact]
+        public void ParseInts_ShouldSplitDeduplicateAndKeepOrder()
+        {
+            // Arrange
+            var values = new StringValues(new[] { "3, 1,3", "2" });
+
+            // Act
+            var ids = IdList.ParseInts(values);
+
+            // Assert
+            Assert.Equal(new[] { 3, 1, 2 }, ids.ToArray());
+        }
+
+        [Fact]
+        public void ParseInts_ShouldRejectInvalidOrMissingIds()
+        {
+            // Act & Assert
+            Assert.Throws<InvalidOperationException>(() => IdList.ParseInts(new StringValues("1,x")));
+            Assert.Throws<InvalidOperationException>(() => IdList.ParseInts(new StringValues(",")));
+            Assert.Throws<InvalidOperationException>(() => IdList.Distinct(Enumerable.Range(1, IdList.MaxIds + 1)));
+        }
+    }
+}
@@ -0,0 +1,47 @@
+using System;
+using System.Collections.Generic;
+using System.IO;
+using Xunit;
+using Cargohub.models;
+using Cargohub.services;
+
+namespace Cargohub.UnitTests
+{
+    public class IdSequenceTests
+    {
+        [Fact]
+        public void Next_ShouldContinueFromHighestExistingId()
+        {
+            // Arrange
+            using var directory = new TempDirectory();
+            var filePath = directory.File("warehouses.json");
+            var existing = new List<Warehouse> { new Warehouse { Id = 4 }, new Warehouse { Id = 17 } };
+
+            // Act
+            var first = IdSequence.Next(filePath, existing, w => w.Id);
+            var second = IdSequence.Next(filePath, existing, w => w.Id);
+
+            // Assert
+            Assert.Equal(18, first);
+            Assert.Equal(19, second);
+        }
+
+        [Fact]
+        public void NextBlock_ShouldReserveConsecutiveIdsAndPersistThem()
+        {
+            // Arrange
+            using var directory = new TempDirectory();
+            var filePath = directory.File("orders.json");
+            var existing = new List<Order>();
+
+            // Act
+            var block = IdSequence.NextBlock(filePath, 10, existing, o => o.Id);
+            var next = IdSequence.Next(filePath, existing, o => o.Id);
+
+            // Assert
+            Assert.Equal(1, block);
+            Assert.Equal(11, next);
+            Assert.Contains("\"orders\": 11", File.ReadAllText(directory.File("sequences.json")));
+        }
+    }
+}
@@ -0,0 +1,96 @@
+using System;
+using System.Collections.Generic;
+using System.IO;
+using System.Linq;
+using System.Threading;
+using System.Threading.Tasks;
+using Xunit;
+using Cargohub.models;
+using Cargohub.services;
+
+namespace Cargohub.UnitTests
+{
+    public class JsonFileStoreTests
+    {
+        private static string NewCollectionFile(TempDirectory directory) =>
+            directory.File("item_groups.json", "[{\"Id\":1,\"Name\":\"First\"},{\"Id\":2,\"Name\":\"Second\"}]");
+
+        [Fact]
+        public void Update_ShouldLeaveEarlierSnapshotsUnchanged()
+        {
+            // Arrange
+            using var directory = new TempDirectory();
+            var path = NewCollectionFile(directory);
+            var before = JsonFileStore.Snapshot<ItemGroup>(path);
+
+            // Act
+            JsonFileStore.Update<ItemGroup>(path, groups =>
+            {
+                var updated = EntityCopy.Shallow(groups[0]);
+                updated.Name = "Renamed";
+                return groups.SetItem(0, updated).Add(new ItemGroup { Id = 3, Name = "Third" });
+            });
+            var after = JsonFileStore.Snapshot<ItemGroup>(path);
+
+            // Assert
+            Assert.Equal(2, before.Count);
+            Assert.Equal("First", before[0].Name);
+            Assert.Equal(new[] { "Renamed", "Second", "Third" }, after.Select(g => g.Name).ToArray());
+            Assert.Same(before[1], after[1]);
+            Assert.Equal("Renamed", JsonFileStore.FindById<ItemGroup, int>(path, g => g.Id, 1)!.Name);
+        }
+
+        [Fact]
+        public void Update_ShouldNotWriteWhenTheChangeThrows()
+        {
+            // Arrange
+            using var directory = new TempDirectory();
+            var path = NewCollectionFile(directory);
+            var contents = File.ReadAllText(path);
+
+            // Act
+            Assert.Throws<KeyNotFoundException>(() => JsonFileStore.Update<ItemGroup>(path, groups =>
+                throw new KeyNotFoundException("ItemGroup with ID 9 not found.")));
+
+            // Assert
+            Assert.Equal(contents, File.ReadAllText(path));
+            Assert.Equal(2, JsonFileStore.Snapshot<ItemGroup>(path).Count);
+        }
+
+        [Fact]
+        public async Task UpdateAsync_ShouldWriteAndPublishTheNewSnapshot()
+        {
+            // Arrange
+            using var directory = new TempDirectory();
+            var path = NewCollectionFile(directory);
+            var version = JsonFileStore.Version<ItemGroup>(path);
+
+            // Act
+            await JsonFileStore.UpdateAsync<ItemGroup>(path, groups => groups.Add(new ItemGroup { Id = 3, Name = "Third" }));
+            var after = await JsonFileStore.SnapshotAsync<ItemGroup>(path);
+
+            // Assert
+            Assert.Equal(3, after.Count);
+            Assert.Equal("Third", (await JsonFileStore.FindByIdAsync<ItemGroup, int>(path, g => g.Id, 3))!.Name);
+            Assert.True(JsonFileStore.Version<ItemGroup>(path) > version);
+        }
+
+        [Fact]
+        public async Task UpdateAsync_ShouldNotWriteWhenCancelled()
+        {
+            // Arrange
+            using var directory = new TempDirectory();
+            var path = NewCollectionFile(directory);
+            var contents = File.ReadAllText(path);
+            using var cancelled = new CancellationTokenSource();
+            cancelled.Cancel();
+
+            // Act
+            await Assert.ThrowsAnyAsync<OperationCanceledException>(() =>
+                JsonFileStore.UpdateAsync<ItemGroup>(path, groups => groups.Clear(), cancelled.Token));
+
+            // Assert
+            Assert.Equal(contents, File.ReadAllText(path));
+        }
+    }
+}
@@ -0,0 +1,30 @@
+using System.Linq;
+using Xunit;
+using Cargohub.models;
+using Cargohub.services;
+
+namespace Cargohub.UnitTests
+{
+    public class KeyedIndexTests
+    {
+        [Fact]
+        public void For_ShouldReturnRecordsOfAnyKeyOnceOrderedById()
+        {
+            // Arrange
+            var shipments = new[]
+            {
+                new Shipment { Id = 3, Order_Id = new() { 1, 2 } },
+                new Shipment { Id = 1, Order_Id = new() { 2 } },
+                new Shipment { Id = 2, Order_Id = new() { 5 } }
+            };
+            var index = KeyedIndex<Shipment>.Build(shipments, s => s.Order_Id);
+
+            // Act
+            var forOrders = index.For(new[] { 1, 2, 2 }, s => s.Id);
+
+            // Assert
+            Assert.Equal(new[] { 1, 3 }, forOrders.Select(s => s.Id).ToArray());
+            Assert.Empty(index.For(7));
+        }
+    }
+}
@@ -0,0 +1,68 @@
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using Microsoft.AspNetCore.Http;
+using Microsoft.Extensions.Primitives;
+using Xunit;
+using Cargohub.models;
+using Cargohub.services;
+
+namespace Cargohub.UnitTests
+{
+    public class ListQueryTests
+    {
+        private static IQueryCollection Query(params (string Key, string Value)[] parameters)
+        {
+            return new QueryCollection(parameters.ToDictionary(p => p.Key, p => new StringValues(p.Value)));
+        }
+
+        private static readonly List<Order> Orders = new()
+        {
+            new Order { Id = 1, Warehouse_Id = 2, Order_Status = "Pending", Order_Date = new DateTime(2024, 1, 5) },
+            new Order { Id = 2, Warehouse_Id = 3, Order_Status = "Delivered", Order_Date = new DateTime(2024, 2, 1) },
+            new Order { Id = 3, Warehouse_Id = 2, Order_Status = "Pending", Order_Date = new DateTime(2024, 3, 9) }
+        };
+
+        [Fact]
+        public void Apply_ShouldFilterOnTypedValuesAndSort()
+        {
+            // Arrange
+            var query = ListQuery.Parse<Order>(Query(("order_status", "pending"), ("order_date[gte]", "2024-01-06"), ("sort", "-id")));
+            var moreQuery = ListQuery.Parse<Order>(Query(("warehouse_id[lt]", "3"), ("sort", "-order_date")));
+
+            // Act
+            var pendingSinceJanuary = query.Apply(Orders);
+            var belowWarehouseThree = moreQuery.Apply(Orders);
+
+            // Assert
+            Assert.Equal(new[] { 3 }, pendingSinceJanuary.Select(o => o.Id).ToArray());
+            Assert.Equal(new[] { 3, 1 }, belowWarehouseThree.Select(o => o.Id).ToArray());
+        }
+
+        [Fact]
+        public void Candidates_ShouldUseAnIndexForEqualityFilters()
+        {
+            // Arrange
+            var query = ListQuery.Parse<Order>(Query(("warehouse_id", "3"), ("pageNumber", "1")));
+            var index = new QueryIndex<Order>("Warehouse_Id", value => Orders.Where(o => o.Warehouse_Id == (int)value!).ToList());
+
+            // Act
+            var candidates = query.Candidates(Enumerable.Empty<Order>(), index);
+
+            // Assert
+            Assert.Equal(new[] { 2 }, candidates.Select(o => o.Id).ToArray());
+            Assert.Throws<InvalidOperationException>(() => ListQuery.Parse<Order>(Query(("warehouse_id", "three"))));
+            Assert.Throws<InvalidOperationException>(() => ListQuery.Parse<Order>(Query(("no_such_field", "1"))));
+        }
+
+        [Fact]
+        public void Parse_ShouldIgnoreProfilingAndIdListParameters()
+        {
+            // Act
+            var query = ListQuery.Parse<Order>(Query(("profile", "true"), (IdList.Parameter, "1,2"), ("pageSize", "10")));
+
+            // Assert
+            Assert.True(query.IsEmpty);
+        }
+    }
+}
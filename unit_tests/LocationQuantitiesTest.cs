@@ -0,0 +1,81 @@
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using Xunit;
+using Newtonsoft.Json;
+using Cargohub.models;
+
+namespace Cargohub.UnitTests
+{
+    public class LocationQuantitiesTests
+    {
+        [Fact]
+        public void LocationQuantities_ShouldLookUpByIntAndStringKeys()
+        {
+            // Arrange
+            var locations = new LocationQuantities { { "69", 37 }, { "434", 49 } };
+
+            // Act
+            locations[33] = 17;
+            locations["69"] += 3;
+
+            // Assert
+            Assert.Equal(3, locations.Count);
+            Assert.Equal(40, locations[69]);
+            Assert.Equal(17, locations["33"]);
+            Assert.True(locations.TryGetQuantity(434, out var quantity));
+            Assert.Equal(49, quantity);
+            Assert.False(locations.ContainsLocation(1));
+            Assert.Equal(new[] { 69, 434, 33 }, locations.ById.Select(l => l.Key).ToArray());
+        }
+
+        [Fact]
+        public void LocationQuantities_ShouldKeepNonCanonicalKeysAsStrings()
+        {
+            // Arrange & Act
+            LocationQuantities locations = new Dictionary<string, int> { { "LocationA", 50 }, { "007", 1 }, { "7", 2 } };
+
+            // Assert
+            Assert.Equal(50, locations["LocationA"]);
+            Assert.Equal(1, locations["007"]);
+            Assert.Equal(2, locations[7]);
+            Assert.Equal(new[] { "007", "LocationA" }, locations.NonNumericKeys.OrderBy(k => k).ToArray());
+        }
+
+        [Fact]
+        public void LocationQuantities_ShouldStayConsistentAfterGrowingAndRemoving()
+        {
+            // Arrange
+            var locations = new LocationQuantities();
+            for (var id = 1; id <= 20; id++)
+            {
+                locations[id] = id * 10;
+            }
+
+            // Act
+            locations.RemoveLocation(5);
+            locations.Remove("20");
+
+            // Assert
+            Assert.Equal(18, locations.Count);
+            Assert.False(locations.ContainsKey("5"));
+            Assert.Equal(60, locations[6]);
+            Assert.Equal(190, locations[19]);
+        }
+
+        [Fact]
+        public void LocationQuantities_ShouldRoundTripAsJsonObject()
+        {
+            // Arrange
+            var json = "{\"Id\":1,\"Locations\":{\"69\":37,\"434\":49,\"33\":17}}";
+
+            // Act
+            var inventory = JsonConvert.DeserializeObject<Inventory>(json)!;
+            var written = JsonConvert.SerializeObject(inventory.Locations);
+
+            // Assert
+            Assert.Equal(37, inventory.Locations[69]);
+            Assert.Equal("{\"69\":37,\"434\":49,\"33\":17}", written);
+        }
+    }
+}
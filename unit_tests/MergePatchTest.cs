@@ -0,0 +1,48 @@
+using System;
+using System.Collections.Generic;
+using System.Text.Json;
+using System.Text.Json.Nodes;
+using Microsoft.Extensions.Primitives;
+using Xunit;
+using Cargohub.models;
+using Cargohub.services;
+
+namespace Cargohub.UnitTests
+{
+    public class MergePatchTests
+    {
+        private static readonly JsonSerializerOptions Options = new JsonSerializerOptions(JsonSerializerDefaults.Web);
+
+        [Fact]
+        public void Apply_ShouldChangeOnlyPatchedFields()
+        {
+            // Arrange
+            var order = new Order { Id = 1, Notes = "old", Reference = "ref", Items = new List<ItemDetail>() };
+            var patch = JsonNode.Parse("{\"notes\": \"new\", \"Reference\": null}")!.AsObject();
+
+            // Act
+            var patched = MergePatch.Apply(order, patch, Options);
+
+            // Assert
+            Assert.Equal(1, patched.Id);
+            Assert.Equal("new", patched.Notes);
+            Assert.Null(patched.Reference);
+            Assert.Equal("old", order.Notes);
+        }
+
+        [Fact]
+        public void Check_ShouldRejectStaleVersion()
+        {
+            // Arrange
+            var order = new Order { Id = 1, Notes = "old" };
+            var version = EntityVersion.Of(order);
+            var changed = new Order { Id = 1, Notes = "new" };
+
+            // Act & Assert
+            EntityVersion.Check(order, new StringValues(version));
+            EntityVersion.Check(changed, new StringValues("*"));
+            EntityVersion.Check(changed, StringValues.Empty);
+            Assert.Throws<VersionConflictException>(() => EntityVersion.Check(changed, new StringValues(version)));
+        }
+    }
+}
@@ -0,0 +1,110 @@
+using System;
+using System.Collections.Generic;
+using System.IO;
+using System.Linq;
+using System.Text;
+using System.Text.Json;
+using System.Threading;
+using System.Threading.Tasks;
+using Xunit;
+using Cargohub.models;
+using Cargohub.services;
+
+namespace Cargohub.UnitTests
+{
+    public class RecordExportTests
+    {
+        private static readonly JsonSerializerOptions Options = new JsonSerializerOptions(JsonSerializerDefaults.Web);
+
+        private static async Task<(string Text, List<T> Imported)> RoundTrip<T>(string format, IEnumerable<T> records) where T : class
+        {
+            using var output = new MemoryStream();
+            if (format == "csv")
+            {
+                await RecordExport.WriteCsv(output, records, Options, CancellationToken.None);
+            }
+            else
+            {
+                await RecordExport.WriteNdjson(output, records, Options, CancellationToken.None);
+            }
+
+            var imported = new List<T>();
+            output.Position = 0;
+            var report = await BulkImportService.Import(output, format, Options, (T _) => null, _ => null, imported.AddRange, CancellationToken.None);
+            Assert.Empty(report.Errors);
+            return (Encoding.UTF8.GetString(output.ToArray()), imported);
+        }
+
+        [Fact]
+        public async Task WriteCsv_ShouldBeReadBackByTheCsvImport()
+        {
+            // Arrange
+            var created = new DateTime(2024, 5, 1, 8, 30, 0, DateTimeKind.Utc);
+            var items = new[]
+            {
+                new Item
+                {
+                    Uid = "P1",
+                    Code = "a,b",
+                    Description = "Says \"hi\"\non two lines",
+                    ItemLine = 3,
+                    Created_At = created,
+                    Classifications_Id = new List<int> { 1, 2 }
+                },
+                new Item { Uid = "P2", Code = "plain", Classifications_Id = null }
+            };
+
+            // Act
+            var (csv, imported) = await RoundTrip("csv", items);
+
+            // Assert
+            Assert.StartsWith("uid,code,description,shortDescription,upcCode,modelNumber,commodityCode,itemLine,", csv);
+            Assert.Equal(new[] { "P1", "P2" }, imported.Select(i => i.Uid).ToArray());
+            Assert.Equal("a,b", imported[0].Code);
+            Assert.Equal("Says \"hi\"\non two lines", imported[0].Description);
+            Assert.Equal(3, imported[0].ItemLine);
+            Assert.Equal(created, imported[0].Created_At);
+            Assert.Equal(new List<int> { 1, 2 }, imported[0].Classifications_Id);
+            Assert.Null(imported[1].Classifications_Id);
+        }
+
+        [Fact]
+        public async Task WriteCsv_ShouldRoundTripLocationQuantities()
+        {
+            // Arrange
+            var inventories = new[]
+            {
+                new Inventory { Id = 1, Item_Id = "P1", Locations = new LocationQuantities { [3] = 5, [12] = 0 }, Total_On_Hand = 5 },
+                new Inventory { Id = 2, Item_Id = "P2", Locations = null }
+            };
+
+            // Act
+            var (csv, imported) = await RoundTrip("csv", inventories);
+
+            // Assert
+            Assert.StartsWith("id,item_Id,description,item_Reference,locations,total_On_Hand,", csv);
+            Assert.Equal(new[] { KeyValuePair.Create(3, 5), KeyValuePair.Create(12, 0) }, imported[0].Locations.ById.ToArray());
+            Assert.Equal(5, imported[0].Total_On_Hand);
+            Assert.Null(imported[1].Locations);
+        }
+
+        [Fact]
+        public async Task WriteNdjson_ShouldWriteOneRecordPerLine()
+        {
+            // Arrange
+            var items = new[]
+            {
+                new Item { Uid = "P1", Description = "line\nbreak" },
+                new Item { Uid = "P2", Classifications_Id = new List<int> { 4 } }
+            };
+
+            // Act
+            var (ndjson, imported) = await RoundTrip("ndjson", items);
+
+            // Assert
+            Assert.Equal(2, ndjson.TrimEnd('\n').Split('\n').Length);
+            Assert.Equal("line\nbreak", imported[0].Description);
+            Assert.Equal(new List<int> { 4 }, imported[1].Classifications_Id);
+        }
+    }
+}
@@ -0,0 +1,50 @@
+using System;
+using System.Collections.Generic;
+using System.Text;
+using Xunit;
+using Cargohub.models;
+using Cargohub.services;
+
+namespace Cargohub.UnitTests
+{
+    public class RecordSerializerTests
+    {
+        [Fact]
+        public void SourceGenerated_ShouldWriteTheSameBytesAsNewtonsoft()
+        {
+            // Arrange
+            var shipments = new List<Shipment>
+            {
+                new Shipment { Id = 1, Notes = "Tab\t \"quoted\" <b>& café €", Total_Package_Weight = 12, Order_Date = new DateTime(2024, 5, 1, 8, 30, 0, 120, DateTimeKind.Utc), Request_Date = new DateTime(2024, 5, 1), Created_At = new DateTime(2024, 5, 1, 10, 0, 0, DateTimeKind.Local), Order_Id = new List<int>(), Items = new List<ItemDetail> { new ItemDetail { Item_Id = "P000001", Amount = 3 } } },
+                new Shipment { Id = 2, Total_Package_Weight = 0.1 + 0.2 }
+            };
+            var orders = new List<Order> { new Order { Id = 1, Total_Amount = 12m, Total_Tax = 1.50m, Ship_To = null } };
+            var inventories = new List<Inventory> { new Inventory { Id = 1, Locations = new LocationQuantities { ["69"] = 37, ["LocationA"] = 1 } } };
+            var classifications = new List<Classifications> { new Classifications { Id = 1, Name = "Hazardous" } };
+
+            // Act & Assert
+            Assert.Equal(NewtonsoftRecordSerializer.Instance.SerializeList(shipments), SourceGeneratedRecordSerializer.Instance.SerializeList(shipments));
+            Assert.Equal(NewtonsoftRecordSerializer.Instance.SerializeList(orders), SourceGeneratedRecordSerializer.Instance.SerializeList(orders));
+            Assert.Equal(NewtonsoftRecordSerializer.Instance.SerializeList(inventories), SourceGeneratedRecordSerializer.Instance.SerializeList(inventories));
+            Assert.Equal(NewtonsoftRecordSerializer.Instance.SerializeList(classifications), SourceGeneratedRecordSerializer.Instance.SerializeList(classifications));
+        }
+
+        [Fact]
+        public void SourceGenerated_ShouldReadSnakeCaseFiles()
+        {
+            // Arrange
+            var json = Encoding.UTF8.GetBytes("[{\"id\": 7, \"source_id\": \"3\", \"order_date\": \"2019-04-03 11:33:15\", \"total_amount\": 9.5, \"ship_to\": null, \"shipment_id\": [1], \"items\": [{\"item_id\": \"P000007\", \"amount\": 2}], \"unknown\": true}]");
+
+            // Act
+            var order = SourceGeneratedRecordSerializer.Instance.DeserializeList<Order>(json)[0];
+
+            // Assert
+            Assert.Equal(7, order.Id);
+            Assert.Equal(3, order.Source_Id);
+            Assert.Equal(new DateTime(2019, 4, 3, 11, 33, 15), order.Order_Date);
+            Assert.Equal(9.5m, order.Total_Amount);
+            Assert.Null(order.Ship_To);
+            Assert.Equal("P000007", order.Items[0].Item_Id);
+        }
+    }
+}
@@ -0,0 +1,75 @@
+using System;
+using System.IO;
+using System.Linq;
+using Xunit;
+using Cargohub.models;
+using Cargohub.services;
+
+namespace Cargohub.UnitTests
+{
+    public class SearchIndexTests
+    {
+        private static string NewSuppliersFile(TempDirectory directory) => directory.File("suppliers.json",
+            "[{\"Id\":1,\"Code\":\"SUP0001\",\"Name\":\"Lee, Parks and Johnson\"},{\"Id\":2,\"Code\":\"SUP0002\",\"Name\":\"Holden-Quinn\"},{\"Id\":3,\"Code\":\"SUP0003\",\"Name\":\"Parkside Johnsons\"}]");
+
+        [Fact]
+        public void Search_ShouldMatchEveryWordByPrefix()
+        {
+            // Arrange
+            using var directory = new TempDirectory();
+            var index = SearchIndex<Supplier, int>.For(NewSuppliersFile(directory), s => s.Id, s => s.Code, s => s.Name);
+
+            // Act
+            var parkJohnson = index.Search("PARK johnson");
+            var byCode = index.Search("sup0002");
+
+            // Assert
+            Assert.Equal(new[] { 1, 3 }, parkJohnson.Select(s => s.Id).ToArray());
+            Assert.Equal(new[] { 2 }, byCode.Select(s => s.Id).ToArray());
+            Assert.Empty(index.Search("parks quinn"));
+        }
+
+        [Fact]
+        public void Reindex_ShouldFollowWrites()
+        {
+            // Arrange
+            using var directory = new TempDirectory();
+            var path = NewSuppliersFile(directory);
+            var index = SearchIndex<Supplier, int>.For(path, s => s.Id, s => s.Code, s => s.Name);
+            index.Search("holden");
+
+            // Act
+            JsonFileStore.Update<Supplier>(path, suppliers =>
+            {
+                var renamed = EntityCopy.Shallow(suppliers.Single(s => s.Id == 2));
+                renamed.Name = "Quinn Logistics";
+                return suppliers.Replace(suppliers.Single(s => s.Id == 2), renamed).RemoveAll(s => s.Id == 1);
+            });
+            index.Reindex(2);
+            index.Reindex(1);
+
+            // Assert
+            Assert.Empty(index.Search("holden"));
+            Assert.Equal(new[] { 2 }, index.Search("logist").Select(s => s.Id).ToArray());
+            Assert.Equal(new[] { 3 }, index.Search("park").Select(s => s.Id).ToArray());
+        }
+
+        [Fact]
+        public void Search_ShouldRebuildWhenTheFileChangesOnDisk()
+        {
+            // Arrange
+            using var directory = new TempDirectory();
+            var path = NewSuppliersFile(directory);
+            var index = SearchIndex<Supplier, int>.For(path, s => s.Id, s => s.Code, s => s.Name);
+            index.Search("holden");
+
+            // Act
+            File.WriteAllText(path, "[{\"Id\":4,\"Code\":\"SUP0004\",\"Name\":\"Restored Holdings\"}]");
+            File.SetLastWriteTimeUtc(path, DateTime.UtcNow.AddMinutes(1));
+
+            // Assert
+            Assert.Empty(index.Search("holden"));
+            Assert.Equal(new[] { 4 }, index.Search("hold").Select(s => s.Id).ToArray());
+        }
+    }
+}
@@ -0,0 +1,67 @@
+using System;
+using System.Collections.Generic;
+using System.IO;
+using Xunit;
+using Cargohub.models;
+using Cargohub.services;
+
+namespace Cargohub.UnitTests
+{
+    public class StorageRulesTests
+    {
+        private static (WarehouseShards<Location> Locations, string Warehouses, string Classifications) NewFiles(TempDirectory directory)
+        {
+            var locations = directory.File("locations.json", "[{\"Id\":1,\"Warehouse_Id\":1},{\"Id\":2,\"Warehouse_Id\":2},{\"Id\":3,\"Warehouse_Id\":9}]");
+            var warehouses = directory.File("warehouses.json", "[{\"Id\":1,\"Classifications_Id\":[7]},{\"Id\":2,\"Classifications_Id\":[]}]");
+            var classifications = directory.File("classifications.json", "[{\"Id\":7,\"Name\":\"hazardous\"}]");
+            return (new WarehouseShards<Location>(locations, l => l.Warehouse_Id, l => l.Id), warehouses, classifications);
+        }
+
+        private static LocationQuantities At(params int[] locationIds)
+        {
+            var quantities = new LocationQuantities();
+            foreach (var locationId in locationIds)
+            {
+                quantities[locationId] = 1;
+            }
+            return quantities;
+        }
+
+        [Fact]
+        public void Check_ShouldOnlyAllowHazardousItemsInHazardousWarehouses()
+        {
+            // Arrange
+            using var directory = new TempDirectory();
+            var (locations, warehouses, classifications) = NewFiles(directory);
+            var rules = StorageRules.For(locations, warehouses, classifications);
+            var hazardous = new Item { Classifications_Id = new List<int> { 7 } };
+            var regular = new Item { Classifications_Id = new List<int>() };
+
+            // Act & Assert
+            Assert.Null(rules.Check(hazardous, At(1)));
+            Assert.Equal("Warehouse is non-hazardous", rules.Check(hazardous, At(1, 2)));
+            Assert.Equal("Location not found", rules.Check(hazardous, At(4)));
+            Assert.Equal("Warehouse not found", rules.Check(hazardous, At(3)));
+            Assert.Null(rules.Check(regular, At(2)));
+        }
+
+        [Fact]
+        public void For_ShouldRebuildOnlyWhenAFileChanges()
+        {
+            // Arrange
+            using var directory = new TempDirectory();
+            var (locations, warehouses, classifications) = NewFiles(directory);
+            var first = StorageRules.For(locations, warehouses, classifications);
+
+            // Act
+            var unchanged = StorageRules.For(locations, warehouses, classifications);
+            JsonFileStore.Update<Warehouse>(warehouses, all => all.Add(new Warehouse { Id = 9, Classifications_Id = new List<int> { 7 } }));
+            var changed = StorageRules.For(locations, warehouses, classifications);
+
+            // Assert
+            Assert.Same(first, unchanged);
+            Assert.False(ReferenceEquals(first, changed));
+            Assert.Equal(true, changed.AcceptsHazardous(9));
+        }
+    }
+}
@@ -0,0 +1,51 @@
+using System;
+using System.IO;
+
+namespace Cargohub.UnitTests
+{
+    // A scratch data directory for tests that touch the file store; it is removed again on Dispose.
+    public sealed class TempDirectory : IDisposable
+    {
+        public TempDirectory()
+        {
+            Path = System.IO.Path.Combine(System.IO.Path.GetTempPath(), $"cargohub_{Guid.NewGuid():N}");
+            Directory.CreateDirectory(Path);
+        }
+
+        public string Path { get; }
+
+        public string File(string name) => System.IO.Path.Combine(Path, name);
+
+        public string File(string name, string contents)
+        {
+            var path = File(name);
+            System.IO.File.WriteAllText(path, contents);
+            return path;
+        }
+
+        // The services read "data/..." relative to the working directory, as they do under the app's content root.
+        public IDisposable AsCurrentDirectory()
+        {
+            var previous = Directory.GetCurrentDirectory();
+            Directory.SetCurrentDirectory(Path);
+            return new CurrentDirectoryScope(previous);
+        }
+
+        public void Dispose()
+        {
+            if (Directory.Exists(Path))
+            {
+                Directory.Delete(Path, recursive: true);
+            }
+        }
+
+        private sealed class CurrentDirectoryScope : IDisposable
+        {
+            private readonly string _previous;
+
+            public CurrentDirectoryScope(string previous) => _previous = previous;
+
+            public void Dispose() => Directory.SetCurrentDirectory(_previous);
+        }
+    }
+}
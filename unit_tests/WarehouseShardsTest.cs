@@ -0,0 +1,74 @@
+using System;
+using System.IO;
+using System.Linq;
+using Xunit;
+using Cargohub.models;
+using Cargohub.services;
+
+namespace Cargohub.UnitTests
+{
+    public class WarehouseShardsTests
+    {
+        private static string NewLocationsFile(TempDirectory directory) => directory.File("locations.json",
+            "[{\"Id\":1,\"Warehouse_Id\":1,\"Code\":\"A\"},{\"Id\":2,\"Warehouse_Id\":2,\"Code\":\"B\"},{\"Id\":3,\"Warehouse_Id\":1,\"Code\":\"C\"}]");
+
+        [Fact]
+        public void Snapshot_ShouldSplitTheCollectionFilePerWarehouse()
+        {
+            // Arrange
+            using var directory = new TempDirectory();
+            var path = NewLocationsFile(directory);
+            var shards = new WarehouseShards<Location>(path, l => l.Warehouse_Id, l => l.Id);
+
+            // Act
+            var warehouseOne = shards.Snapshot(1);
+
+            // Assert
+            Assert.Equal(new[] { 1, 3 }, warehouseOne.Select(l => l.Id).ToArray());
+            Assert.Equal(new[] { 1, 2 }, shards.WarehouseIds().ToArray());
+            Assert.Equal(new[] { 1, 2, 3 }, shards.All().Select(l => l.Id).ToArray());
+            Assert.False(File.Exists(path));
+            Assert.Equal(2, shards.WarehouseOf(2));
+        }
+
+        [Fact]
+        public void Update_ShouldOnlyWriteTheWarehouseShard()
+        {
+            // Arrange
+            using var directory = new TempDirectory();
+            var path = NewLocationsFile(directory);
+            var shards = new WarehouseShards<Location>(path, l => l.Warehouse_Id, l => l.Id);
+            var otherShard = shards.Snapshot(2);
+
+            // Act
+            shards.Update(1, locations => locations.Add(new Location { Id = 4, Warehouse_Id = 1, Code = "D", Name = "Dock" }));
+
+            // Assert
+            Assert.Equal(new[] { 1, 3, 4 }, shards.Snapshot(1).Select(l => l.Id).ToArray());
+            Assert.Same(otherShard, shards.Snapshot(2));
+            Assert.Equal(1, shards.FindById(4)!.Warehouse_Id);
+        }
+
+        [Fact]
+        public void FindById_ShouldFindRecordsInNewAndMovedShards()
+        {
+            // Arrange
+            using var directory = new TempDirectory();
+            var path = NewLocationsFile(directory);
+            var shards = new WarehouseShards<Location>(path, l => l.Warehouse_Id, l => l.Id);
+            Assert.Equal(1, shards.FindById(3)!.Warehouse_Id);
+
+            // Act
+            shards.Update(7, locations => locations.Add(new Location { Id = 3, Warehouse_Id = 7, Code = "C" }));
+            shards.Update(1, locations => locations.RemoveAll(l => l.Id == 3));
+            shards.Update(8, locations => locations.Add(new Location { Id = 5, Warehouse_Id = 8, Code = "E" }));
+
+            // Assert
+            Assert.Equal(new[] { 1, 2, 7, 8 }, shards.WarehouseIds().ToArray());
+            Assert.Equal(7, shards.FindById(3)!.Warehouse_Id);
+            Assert.Equal(8, shards.WarehouseOf(5));
+            Assert.Equal(new[] { 5, 3, 1 }, shards.FindMany(new[] { 5, 3, 9, 1 }).Select(l => l.Id).ToArray());
+            Assert.Null(shards.FindById(9));
+        }
+    }
+}